@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmark the rules in rules-config.yaml against the legacy engine and RuleEngineService.
+
+Documents come from the PDFs in testfiles/ and from synthetic closing disclosure
+texts of increasing size. Results are written as a JSON baseline, and a later
+run can be compared against it, failing on throughput regressions. Rules aborted
+by the time budgets are recorded per corpus, and a comparison involving a run
+with aborted rules fails, since its throughput was cut off rather than measured.
+The legacy engine only runs the rules it can evaluate (see shadow_runner), and a
+baseline written by another version of this script is rejected.
+
+Usage:
+    python benchmark_rules.py --output baseline.json
+    python benchmark_rules.py --compare baseline.json --max-regression 15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from engine import RuleEngine
+from services.analysis import RuleEngineService
+from services.analysis.shadow_runner import legacy_skipped_rules
+from services.parsing import DocumentParserService
+
+
+# Bumped when results stop being comparable with older baselines
+BASELINE_VERSION = 2
+
+DEFAULT_SIZES = "10KB,100KB,1MB,5MB"
+UNITS = {'KB': 1024, 'MB': 1024 * 1024}
+
+# Synthetic documents are built from these sections with randomized amounts
+SECTION_TEMPLATES = [
+    "Closing Disclosure\nClosing Information Date Issued {date}\nLoan Terms Loan Amount ${loan:,.2f}\n"
+    "Interest Rate {rate:.3f}%\nMonthly Principal & Interest ${payment:,.2f}\n",
+    "Loan Type Conventional FHA VA Purpose Purchase Product {years} Year Fixed Rate\n"
+    "Projected Payments Estimated Escrow ${escrow:,.2f}\n",
+    "Closing Cost Details\nA. Origination Charges ${origination:,.2f}\n01 % of Loan Amount (Points) ${points:,.2f}\n"
+    "02 Processing Fee Borrower ${processing:,.2f}\n03 Underwriting Fee ${underwriting:,.2f}\n",
+    "C. Services Borrower Did Shop For\nTitle - Lender's Title Insurance ${title:,.2f}\n"
+    "Title - Settlement or Closing Fee ${settlement:,.2f}\nSurvey Fee ${survey:,.2f}\nNotary Fee ${notary:,.2f}\n",
+    "Total Closing Costs ${closing:,.2f}\nCash to Close ${cash:,.2f}\nSale Price ${price:,.2f}\n"
+    "Wire Transfer: ${wire:,.2f}\nOwner's Title Insurance (optional) ${owner_title:,.2f}\n",
+    "Loan Calculations\nTotal of Payments ${total_payments:,.2f}\nFinance Charge ${finance:,.2f}\n"
+    "Amount Financed ${financed:,.2f}\nAnnual Percentage Rate (APR) {apr:.3f}%\n"
+    "Total Interest Percentage (TIP) {tip:.3f}%\n",
+    "Other Disclosures Appraisal Contract Details Liability after Foreclosure Refinance Tax Deductions\n"
+    "Seller {seller} Lender {lender} Real Estate Broker (B) N/A\n"
+]
+
+SELLERS = ["PULTE HOMES OF TEXAS", "LENNAR HOMES", "SMITH FAMILY TRUST", "D.R. HORTON"]
+LENDERS = ["PULTE MORTGAGE LLC", "LENNAR MORTGAGE", "FIRST NATIONAL BANK", "ROCKET MORTGAGE"]
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as 10KB or 5MB into bytes."""
+    size = size.strip().upper()
+    for unit, factor in UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[:-len(unit)]) * factor)
+    return int(size)
+
+
+def synthetic_document(size: int, seed: int = 0) -> str:
+    """Build a closing disclosure-like text of about size bytes."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        loan = rng.uniform(100000, 900000)
+        values = {
+            'date': f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/2024",
+            'loan': loan,
+            'rate': rng.uniform(3.0, 9.5),
+            'payment': loan * rng.uniform(0.004, 0.008),
+            'years': rng.choice([15, 30]),
+            'escrow': rng.uniform(200, 1500),
+            'origination': rng.uniform(500, 12000),
+            'points': rng.uniform(0, 8000),
+            'processing': rng.uniform(200, 1500),
+            'underwriting': rng.uniform(500, 1500),
+            'title': rng.uniform(500, 3500),
+            'settlement': rng.uniform(300, 1200),
+            'survey': rng.uniform(200, 700),
+            'notary': rng.uniform(20, 200),
+            'closing': rng.uniform(0, 30000),
+            'cash': rng.uniform(5000, 150000),
+            'price': loan * rng.uniform(1.05, 1.4),
+            'wire': rng.uniform(1000, 40000),
+            'owner_title': rng.uniform(1000, 4000),
+            'total_payments': loan * rng.uniform(1.5, 2.5),
+            'finance': loan * rng.uniform(0.5, 1.5),
+            'financed': loan * rng.uniform(0.95, 1.0),
+            'apr': rng.uniform(3.0, 10.0),
+            'tip': rng.uniform(50, 160),
+            'seller': rng.choice(SELLERS),
+            'lender': rng.choice(LENDERS)
+        }
+        for template in SECTION_TEMPLATES:
+            part = template.format(**values)
+            parts.append(part)
+            length += len(part.encode('utf-8'))
+    return "".join(parts)
+
+
+def load_corpora(testfiles_dir: Path, sizes: List[str]) -> Dict[str, List[str]]:
+    """Load the testfiles corpus and one synthetic corpus per size."""
+    corpora = {}
+    
+    parser = DocumentParserService(os.environ.get('TEMP_DIR', '/tmp'))
+    texts = []
+    for pdf_path in sorted(testfiles_dir.glob('*.pdf')):
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = parser.extract_text_from_file(str(pdf_path))
+        if text.strip():
+            texts.append(text)
+        else:
+            print(f"Skipping {pdf_path.name}: no text could be extracted")
+    if texts:
+        corpora['testfiles'] = texts
+    
+    for size in sizes:
+        corpora[f"synthetic_{size.strip().upper()}"] = [synthetic_document(parse_size(size))]
+    
+    return corpora
+
+
+def run_legacy(engine: RuleEngine, texts: List[str], repeat: int) -> Dict[str, Any]:
+    """Time the legacy engine, rule by rule, the way check_text runs them, without the rules it cannot evaluate."""
+    best_total = None
+    best_rules: Dict[str, float] = {}
+    skipped = set(legacy_skipped_rules(engine.rules))
+    rules = [rule for rule in engine.rules if str(rule.get('name', 'unknown')) not in skipped]
+    
+    for _ in range(repeat):
+        rule_seconds: Dict[str, float] = {}
+        start = time.perf_counter()
+        for text in texts:
+            flagged_rules = set()
+            for rule in rules:
+                rule_name = rule.get('name', 'unknown')
+                if rule_name in flagged_rules:
+                    continue
+                rule_start = time.perf_counter()
+                try:
+                    if engine._apply_rule(rule, text):
+                        flagged_rules.add(rule_name)
+                except Exception:
+                    pass  # check_text logs and skips failing rules
+                rule_seconds[rule_name] = rule_seconds.get(rule_name, 0.0) + time.perf_counter() - rule_start
+        total = time.perf_counter() - start
+        if best_total is None or total < best_total:
+            best_total, best_rules = total, rule_seconds
+    
+    result = summarize(texts, best_total, best_rules)
+    result['skipped_rules'] = sorted(skipped)
+    return result
+
+
+def run_service(engine: RuleEngineService, texts: List[str], repeat: int) -> Dict[str, Any]:
+    """Time RuleEngineService.analyze, with per-rule times from its profiler and the rules it aborted."""
+    best_total = None
+    best_rules: Dict[str, float] = {}
+    timed_out = set()
+    
+    for _ in range(repeat):
+        engine.profiler.reset()
+        start = time.perf_counter()
+        for text in texts:
+            timed_out.update(engine.analyze(text).stats['timed_out_rules'])
+        total = time.perf_counter() - start
+        if best_total is None or total < best_total:
+            best_total = total
+            best_rules = {rule['rule']: rule['total_ms'] / 1000 for rule in engine.profiler.to_dict()['rules']}
+    
+    return summarize(texts, best_total, best_rules, sorted(timed_out))
+
+
+def summarize(texts: List[str], seconds: float, rule_seconds: Dict[str, float],
+              timed_out_rules: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Throughput of one engine over one corpus."""
+    megabytes = sum(len(text.encode('utf-8')) for text in texts) / UNITS['MB']
+    return {
+        'documents': len(texts),
+        'megabytes': megabytes,
+        'seconds': seconds,
+        'docs_per_sec': len(texts) / seconds if seconds else None,
+        'mb_per_sec': megabytes / seconds if seconds else None,
+        'timed_out_rules': timed_out_rules or [],
+        'rules': {
+            name: {
+                'seconds': elapsed,
+                'mb_per_sec': megabytes / elapsed if elapsed else None
+            }
+            for name, elapsed in sorted(rule_seconds.items(), key=lambda item: item[1], reverse=True)
+        }
+    }
+
+
+def run_benchmark(config_path: str, corpora: Dict[str, List[str]], repeat: int,
+                  legacy_max_bytes: Optional[int], rule_budget: Optional[float] = None,
+                  analysis_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Run every engine over every corpus, the service with the given time budgets (None for no limit)."""
+    legacy_engine = RuleEngine(config_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service_engine = RuleEngineService(config_path, rule_time_budget=rule_budget,
+                                           analysis_time_budget=analysis_budget)
+        service_engine.get_plan()
+    
+    results: Dict[str, Dict[str, Any]] = {'legacy': {}, 'service': {}}
+    for corpus, texts in corpora.items():
+        largest = max(len(text.encode('utf-8')) for text in texts)
+        
+        print(f"Benchmarking {corpus} ({len(texts)} documents)...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            results['service'][corpus] = run_service(service_engine, texts, repeat)
+            if legacy_max_bytes is None or largest <= legacy_max_bytes:
+                results['legacy'][corpus] = run_legacy(legacy_engine, texts, repeat)
+        
+        for engine_name in ('legacy', 'service'):
+            result = results[engine_name].get(corpus)
+            if result is None:
+                print(f"  {engine_name:8} skipped (documents larger than --legacy-max-size)")
+            else:
+                timed_out = f" (aborted: {', '.join(result['timed_out_rules'])})" if result['timed_out_rules'] else ""
+                print(f"  {engine_name:8} {result['docs_per_sec']:10.2f} docs/sec {result['mb_per_sec']:10.2f} MB/sec"
+                      f"{timed_out}")
+    
+    return {
+        'meta': {
+            'version': BASELINE_VERSION,
+            'timestamp': int(time.time()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config_path': config_path,
+            'config_hash': service_engine.get_plan().config_hash,
+            'repeat': repeat,
+            'rule_budget': rule_budget,
+            'analysis_budget': analysis_budget
+        },
+        'results': results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float,
+            min_rule_ms: float) -> List[str]:
+    """
+    Find throughput regressions against a baseline.
+    
+    Totals are compared for every engine and corpus; rules only when they took
+    at least min_rule_ms in the baseline, since shorter timings are mostly noise.
+    A corpus on which either run aborted rules is reported instead of compared.
+    
+    Returns:
+        Descriptions of the regressions above max_regression percent and of the
+        runs with aborted rules
+    """
+    regressions = []
+    if baseline.get('meta', {}).get('version') != BASELINE_VERSION:
+        return [f"baseline format {baseline.get('meta', {}).get('version')} is not {BASELINE_VERSION}; "
+                f"regenerate it with --output"]
+    
+    def check(label: str, before: Optional[float], after: Optional[float]):
+        if not before or after is None:
+            return
+        change = (before - after) / before * 100
+        if change > max_regression:
+            regressions.append(f"{label}: {before:.2f} -> {after:.2f} MB/sec ({change:.1f}% slower)")
+    
+    for engine_name, corpora in baseline.get('results', {}).items():
+        for corpus, before in corpora.items():
+            after = current['results'].get(engine_name, {}).get(corpus)
+            if after is None:
+                continue
+            aborted = sorted(set(before.get('timed_out_rules', [])) | set(after.get('timed_out_rules', [])))
+            if aborted:
+                regressions.append(f"{engine_name}/{corpus}: rules hit the time budget ({', '.join(aborted)}), "
+                                   f"so the throughput is not comparable")
+                continue
+            if before.get('skipped_rules', []) != after.get('skipped_rules', []):
+                regressions.append(f"{engine_name}/{corpus}: the engine skips different rules than in the baseline, "
+                                   f"so the throughput is not comparable")
+                continue
+            check(f"{engine_name}/{corpus}", before['mb_per_sec'], after['mb_per_sec'])
+            
+            for rule_name, rule_before in before['rules'].items():
+                rule_after = after['rules'].get(rule_name)
+                if rule_after is None or rule_before['seconds'] * 1000 < min_rule_ms:
+                    continue
+                check(f"{engine_name}/{corpus}/{rule_name}", rule_before['mb_per_sec'], rule_after['mb_per_sec'])
+    
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    backend_dir = Path(__file__).resolve().parent
+    
+    parser = argparse.ArgumentParser(description="Benchmark rule engines over test files and synthetic documents")
+    parser.add_argument('--config', default=str(backend_dir / 'rules-config.yaml'), help="Rules configuration")
+    parser.add_argument('--testfiles', default=str(backend_dir.parent / 'testfiles'), help="Directory of PDFs")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Synthetic document sizes, e.g. 10KB,1MB")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per corpus; the fastest is kept")
+    parser.add_argument('--legacy-max-size', default='1MB',
+                        help="Skip the legacy engine on larger documents, which it cannot time-bound (0 for no limit)")
+    parser.add_argument('--rule-budget', type=float, default=2.0,
+                        help="Seconds a rule may run before it is aborted, as in production (0 for no limit)")
+    parser.add_argument('--analysis-budget', type=float, default=30.0,
+                        help="Seconds all rules may run on one document (0 for no limit)")
+    parser.add_argument('--output', help="Write results to this JSON baseline file")
+    parser.add_argument('--compare', help="Compare results against this JSON baseline file")
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help="Fail when throughput drops by more than this percentage")
+    parser.add_argument('--min-rule-ms', type=float, default=5.0,
+                        help="Only compare rules that took at least this long in the baseline")
+    args = parser.parse_args()
+    
+    legacy_max_bytes = parse_size(args.legacy_max_size) or None
+    sizes = [size for size in args.sizes.split(',') if size.strip()]
+    corpora = load_corpora(Path(args.testfiles), sizes)
+    results = run_benchmark(args.config, corpora, max(1, args.repeat), legacy_max_bytes,
+                            args.rule_budget or None, args.analysis_budget or None)
+    
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, results, args.max_regression, args.min_rule_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) above {args.max_regression}%:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"✅ No regressions above {args.max_regression}%")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Write the compiled rules snapshot next to the rules configuration.
+
+Run as a build step so workers start from the snapshot instead of parsing
+and analyzing the YAML:
+    python build_rules_snapshot.py [rules-config.yaml]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.analysis import RuleEngineService
+from services.analysis.rule_snapshot import snapshot_path, write_snapshot
+
+
+def main() -> int:
+    """Compile a rules configuration and write its snapshot."""
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "rules-config.yaml"
+    engine = RuleEngineService(config_path)
+    plan = engine.reload_rules()
+    if plan.errors:
+        print(f"Warning: {len(plan.errors)} rule(s) have errors and will be skipped by the engine")
+    
+    path = snapshot_path(config_path)
+    write_snapshot(plan, path)
+    print(f"Wrote snapshot of {len(plan.compiled_rules)} rules to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
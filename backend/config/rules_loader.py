@@ -1,7 +1,8 @@
 """Rules configuration loader."""
 
+import hashlib
 import yaml
-from typing import List
+from typing import Any, Dict, List, Tuple
 from pathlib import Path
 
 from models.core import Rule
@@ -13,28 +14,46 @@ class RulesLoader:
     def __init__(self, config_path: str = "rules-config.yaml"):
         self.config_path = config_path
     
+    def read_config(self) -> bytes:
+        """Read the raw bytes of the rules configuration file."""
+        config_file = Path(self.config_path)
+        if not config_file.exists():
+            raise FileNotFoundError(f"Rules configuration file not found: {self.config_path}")
+        return config_file.read_bytes()
+    
+    def get_config_mtime(self) -> float:
+        """Get the modification time of the rules configuration file."""
+        return Path(self.config_path).stat().st_mtime
+    
+    @staticmethod
+    def hash_config(data: bytes) -> str:
+        """Hash raw configuration bytes to detect content changes."""
+        return hashlib.sha256(data).hexdigest()
+    
+    def parse_rules(self, data: bytes) -> List[Rule]:
+        """Parse rules from raw YAML configuration bytes."""
+        return self.parse_config(data)[0]
+    
+    def parse_config(self, data: bytes) -> Tuple[List[Rule], Dict[str, Any]]:
+        """Parse the rules and the raw 'values' section from raw YAML configuration bytes."""
+        config = yaml.safe_load(data) or {}
+        rules_data = config.get('rules', [])
+        
+        rules = []
+        for rule_data in rules_data:
+            try:
+                rule = Rule.from_dict(rule_data)
+                rules.append(rule)
+            except Exception as e:
+                print(f"Warning: Failed to load rule '{rule_data.get('name', 'unknown')}': {e}")
+                continue
+        
+        return rules, config.get('values') or {}
+    
     def load_rules(self) -> List[Rule]:
         """Load rules from YAML configuration file."""
         try:
-            config_file = Path(self.config_path)
-            if not config_file.exists():
-                raise FileNotFoundError(f"Rules configuration file not found: {self.config_path}")
-            
-            with open(config_file, 'r') as file:
-                config = yaml.safe_load(file)
-                rules_data = config.get('rules', [])
-                
-                rules = []
-                for rule_data in rules_data:
-                    try:
-                        rule = Rule.from_dict(rule_data)
-                        rules.append(rule)
-                    except Exception as e:
-                        print(f"Warning: Failed to load rule '{rule_data.get('name', 'unknown')}': {e}")
-                        continue
-                
-                return rules
-                
+            return self.parse_rules(self.read_config())
         except Exception as e:
             raise Exception(f"Failed to load rules configuration: {e}")
     
@@ -24,9 +24,29 @@ class Settings:
     max_file_size: int = 50 * 1024 * 1024  # 50MB
     allowed_file_types: list = None
     temp_dir: str = "/tmp"
+    upload_memory_limit: int = 32 * 1024 * 1024  # Largest upload, in bytes, processed in memory (0 spills every upload to temp_dir)
     
     # Rules Configuration
     rules_config_path: str = "rules-config.yaml"
+    rule_time_budget: float = 2.0  # Seconds before a single rule is aborted
+    analysis_time_budget: float = 30.0  # Seconds for all rules on one document
+    analysis_cache_size: int = 32  # Documents kept for re-running context rules
+    use_rules_snapshot: bool = True  # Load compiled rules from rules-config.snapshot when it matches the YAML
+    rule_profile_window: int = 1024  # Recent evaluations per rule kept for timing percentiles (0 disables)
+    rescore_interval: float = 30.0  # Seconds between checks for rule changes to re-score reports (0 disables)
+    rescore_document_limit: int = 256  # Documents kept in memory for re-scoring; older ones are read back from rescore_document_dir
+    rescore_document_dir: str = ""  # Where report documents are also written for re-scoring ('' keeps them in memory only)
+    rescore_document_max_age: float = 7 * 24 * 3600  # Seconds a written document is kept (0 until its report is gone)
+    rule_pool_workers: int = 0  # Processes sharing the rules of large documents (0 evaluates in-process)
+    rule_pool_min_chars: int = 500_000  # Smallest document, in characters, evaluated on the rule pool
+    page_pool_workers: int = 0  # Processes extracting the pages of large PDFs (0 extracts in-process)
+    page_pool_min_pages: int = 20  # Smallest PDF, in pages, extracted on the page pool
+    page_pool_timeout: float = 120.0  # Seconds the page pool may take for one PDF before extracting in-process (0 for no limit)
+    locate_cd_pages: bool = True  # Lay out only the Closing Disclosure pages of longer packages
+    text_extractor: str = "pdfplumber"  # Backend for the text rules run on: pdfplumber, pdfium or pypdf2
+    shadow_sample_rate: float = 0.0  # Share of uploads also analyzed by the legacy engine for comparison (0 disables)
+    shadow_store_path: str = "shadow-results.jsonl"  # Where shadow comparisons are recorded
+    shadow_timeout: float = 30.0  # Seconds a shadow run may take before its worker is killed (0 for no limit)
     
     # Scoring Configuration
     max_forensic_score: int = 100
@@ -62,5 +82,25 @@ class Settings:
             api_version=os.getenv('API_VERSION', cls.api_version),
             max_file_size=int(os.getenv('MAX_FILE_SIZE', cls.max_file_size)),
             temp_dir=os.getenv('TEMP_DIR', cls.temp_dir),
-            rules_config_path=os.getenv('RULES_CONFIG_PATH', cls.rules_config_path)
+            upload_memory_limit=int(os.getenv('UPLOAD_MEMORY_LIMIT', cls.upload_memory_limit)),
+            rules_config_path=os.getenv('RULES_CONFIG_PATH', cls.rules_config_path),
+            rule_time_budget=float(os.getenv('RULE_TIME_BUDGET', cls.rule_time_budget)),
+            analysis_time_budget=float(os.getenv('ANALYSIS_TIME_BUDGET', cls.analysis_time_budget)),
+            analysis_cache_size=int(os.getenv('ANALYSIS_CACHE_SIZE', cls.analysis_cache_size)),
+            use_rules_snapshot=os.getenv('USE_RULES_SNAPSHOT', 'true').lower() in ('1', 'true', 'yes'),
+            rule_profile_window=int(os.getenv('RULE_PROFILE_WINDOW', cls.rule_profile_window)),
+            rescore_interval=float(os.getenv('RESCORE_INTERVAL', cls.rescore_interval)),
+            rescore_document_limit=int(os.getenv('RESCORE_DOCUMENT_LIMIT', cls.rescore_document_limit)),
+            rescore_document_dir=os.getenv('RESCORE_DOCUMENT_DIR', cls.rescore_document_dir),
+            rescore_document_max_age=float(os.getenv('RESCORE_DOCUMENT_MAX_AGE', cls.rescore_document_max_age)),
+            rule_pool_workers=int(os.getenv('RULE_POOL_WORKERS', cls.rule_pool_workers)),
+            rule_pool_min_chars=int(os.getenv('RULE_POOL_MIN_CHARS', cls.rule_pool_min_chars)),
+            page_pool_workers=int(os.getenv('PAGE_POOL_WORKERS', cls.page_pool_workers)),
+            page_pool_min_pages=int(os.getenv('PAGE_POOL_MIN_PAGES', cls.page_pool_min_pages)),
+            page_pool_timeout=float(os.getenv('PAGE_POOL_TIMEOUT', cls.page_pool_timeout)),
+            locate_cd_pages=os.getenv('LOCATE_CD_PAGES', 'true').lower() in ('1', 'true', 'yes'),
+            text_extractor=os.getenv('TEXT_EXTRACTOR', cls.text_extractor),
+            shadow_sample_rate=float(os.getenv('SHADOW_SAMPLE_RATE', cls.shadow_sample_rate)),
+            shadow_store_path=os.getenv('SHADOW_STORE_PATH', cls.shadow_store_path),
+            shadow_timeout=float(os.getenv('SHADOW_TIMEOUT', cls.shadow_timeout))
         )
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""Fixtures shared by the backend tests."""
+
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import pytest
+
+from models.document import DocumentLayout, DocumentSection, ParsedDocument
+from services.analysis import RuleEngineService
+from services.parsing import DocumentParserService
+from services.reporting import ReportRescorer
+
+
+TEXT_PDF = os.path.join("..", "testfiles", "Closing Disclosure (Syed A Tabish) (1).pdf")
+
+# Lines of each page, with the TRID section each line belongs to (None outside sections)
+PageLines = Sequence[Tuple[Optional[DocumentSection], str]]
+
+# A short closing disclosure: the loan terms on page 1, then the costs on page 2 ending in section H
+CLOSING_PAGES: List[PageLines] = [
+    [
+        (None, "Closing Disclosure"),
+        (None, "Loan Terms Loan Amount $450,000.00"),
+        (None, "Interest Rate 7.25%"),
+        (None, "Annual Percentage Rate (APR) 7.61%")
+    ],
+    [
+        (None, "Total Closing Costs: $25,000.00"),
+        (None, "Finance Charge $700,000.00"),
+        (None, "Wire Transfer: $15,000.00"),
+        (None, "Buyer waived the home inspection"),
+        (None, "Appraisal Fee $650.00"),
+        (DocumentSection.OTHER, "Owner's Title Insurance Borrower $2,500.00"),
+        (DocumentSection.OTHER, "Survey Borrower $450.00"),
+        (DocumentSection.OTHER, "Seller PULTE HOMES, Austin"),
+        (DocumentSection.OTHER, "Lender PULTE MORTGAGE LLC"),
+        (DocumentSection.OTHER, "Total Interest Percentage (TIP) 135.5%")
+    ]
+]
+
+
+def layout_of(pages: Sequence[PageLines]) -> DocumentLayout:
+    """Join the lines of the pages into a layout, with spans for each page and each run of section lines."""
+    lines = []
+    page_spans = []
+    section_spans = {}
+    position = 0
+    for page in pages:
+        page_start = position
+        previous = None
+        for section, line in page:
+            if section is not None:
+                spans = section_spans.setdefault(section, [])
+                if section == previous:
+                    spans[-1] = (spans[-1][0], position + len(line))
+                else:
+                    spans.append((position, position + len(line)))
+            previous = section
+            lines.append(line)
+            position += len(line) + 1
+        page_spans.append((page_start, position - 1))
+    return DocumentLayout(text="\n".join(lines), page_spans=page_spans, section_spans=section_spans)
+
+
+@pytest.fixture
+def pdf_path() -> str:
+    """Path of a text-based Closing Disclosure from testfiles/."""
+    if not os.path.exists(TEXT_PDF):
+        pytest.skip("Test PDF not found")
+    return TEXT_PDF
+
+
+@pytest.fixture
+def pdf_data(pdf_path) -> bytes:
+    """Content of the text-based Closing Disclosure."""
+    with open(pdf_path, 'rb') as file:
+        return file.read()
+
+
+@pytest.fixture
+def disclosure(pdf_path) -> Tuple[DocumentLayout, Optional[ParsedDocument]]:
+    """Layout and parsed document of the text-based Closing Disclosure."""
+    return DocumentParserService(tempfile.gettempdir()).extract_and_parse_file(pdf_path, "cd.pdf")
+
+
+@pytest.fixture
+def sample_layout() -> Callable[..., DocumentLayout]:
+    """Build the layout of the given pages, by default the sample closing disclosure."""
+    def build(pages: Optional[Sequence[PageLines]] = None) -> DocumentLayout:
+        return layout_of(CLOSING_PAGES if pages is None else pages)
+    return build
+
+
+@pytest.fixture
+def closing_text() -> str:
+    """Text of the sample closing disclosure."""
+    return layout_of(CLOSING_PAGES).text
+
+
+@pytest.fixture
+def write_rules(tmp_path) -> Callable[..., Path]:
+    """Write a rules configuration to the test's directory, optionally with a given modification time."""
+    def write(content: str, mtime: Optional[float] = None, name: str = "rules.yaml") -> Path:
+        path = tmp_path / name
+        path.write_text(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+    return write
+
+
+@pytest.fixture
+def engine_for(write_rules) -> Callable[..., RuleEngineService]:
+    """Create a rule engine for a rules configuration written to the test's directory."""
+    def create(rules: str, **options) -> RuleEngineService:
+        return RuleEngineService(str(write_rules(rules)), **options)
+    return create
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    """
+    The API module with empty report stores and a rescorer writing to the test's directory.
+    
+    The services are created when the module is first imported, so the background
+    rescorer is disabled before that. Tests may swap in their own services with monkeypatch.
+    """
+    os.environ.setdefault('RESCORE_INTERVAL', '0')
+    os.environ.setdefault('RESCORE_DOCUMENT_DIR', '')
+    import main
+    
+    reports_store = {}
+    monkeypatch.setattr(main, 'reports_store', reports_store)
+    monkeypatch.setattr(main, 'analysis_cache', OrderedDict())
+    monkeypatch.setattr(main, 'report_rescorer', ReportRescorer(
+        main.rule_engine_service, main.scoring_service, reports_store, document_dir=str(tmp_path / "documents")
+    ))
+    return main
+
+
+@pytest.fixture
+def client(api):
+    """HTTP client for the API."""
+    from fastapi.testclient import TestClient
+    return TestClient(api.app)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Compare the text extraction backends on the PDFs in testfiles/ for speed and accuracy.
+
+Each PDF is extracted the way an upload is (DocumentParserService with
+TEXT_EXTRACTOR set to each backend), timed, and analyzed with the rules in
+rules-config.yaml. Accuracy is reported against pdfplumber, the reference
+backend: word-level similarity of the text and the rules flagged differently.
+
+Usage:
+    python extraction_report.py [--backends pdfplumber,pdfium,pypdf2] [--repeat 3] [--json]
+"""
+
+import argparse
+import contextlib
+import difflib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.analysis import RuleEngineService
+from services.parsing import DocumentParserService
+from services.parsing.core.extractors import EXTRACTORS
+
+
+REFERENCE_BACKEND = 'pdfplumber'
+
+
+def timed(function, repeat: int):
+    """Call a function repeat times, returning its last result and the fastest time."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def similarity(reference: str, text: str) -> float:
+    """Share of words in common between two texts, in order."""
+    return difflib.SequenceMatcher(None, reference.split(), text.split(), autojunk=False).ratio()
+
+
+def run_report(testfiles_dir: Path, config_path: str, backends: List[str], repeat: int) -> Dict[str, Any]:
+    """Extract and analyze every test file with every backend."""
+    engine = RuleEngineService(config_path, use_snapshot=False)
+    parse_document = engine.requires_document()
+    services = {
+        backend: DocumentParserService(text_extractor=backend)
+        for backend in [REFERENCE_BACKEND] + [name for name in backends if name != REFERENCE_BACKEND]
+    }
+    
+    files = []
+    for path in sorted(testfiles_dir.glob('*.pdf')):
+        reference_text = None
+        reference_rules = None
+        results = {}
+        for backend, service in services.items():
+            try:
+                # Rule text alone, then the whole upload extraction, which also parses the CD when rules need it
+                _, text_seconds = timed(lambda: service.extract_layout_from_file(str(path)), repeat)
+                if parse_document:
+                    (layout, document), seconds = timed(lambda: service.extract_and_parse_file(str(path)), repeat)
+                else:
+                    layout, document, seconds = service.extract_layout_from_file(str(path)), None, text_seconds
+            except Exception as e:
+                results[backend] = {'error': str(e)}
+                continue
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                flags = engine.analyze(layout.text, layout=layout, document=document).flags
+            rules = sorted({flag.rule for flag in flags})
+            if backend == REFERENCE_BACKEND:
+                reference_text, reference_rules = layout.text, rules
+            
+            results[backend] = {
+                'seconds': seconds,
+                'text_seconds': text_seconds,
+                'pages': layout.page_count,
+                'characters': len(layout.text),
+                'rules': rules,
+                'similarity': similarity(reference_text, layout.text) if reference_text is not None else None,
+                'missing_rules': sorted(set(reference_rules) - set(rules)) if reference_rules is not None else [],
+                'extra_rules': sorted(set(rules) - set(reference_rules)) if reference_rules is not None else []
+            }
+        files.append({'file': path.name, 'backends': results})
+    
+    return {
+        'parse_document': parse_document,
+        'files': files,
+        'backends': {backend: summarize(backend, files) for backend in services}
+    }
+
+
+def summarize(backend: str, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals of one backend over all files, against the reference backend."""
+    results = [item['backends'].get(backend, {}) for item in files]
+    references = [item['backends'].get(REFERENCE_BACKEND, {}) for item in files]
+    compared = [
+        (result, reference) for result, reference in zip(results, references)
+        if 'seconds' in result and 'seconds' in reference
+    ]
+    # Files without a text layer compare equal trivially, so only files with reference text count for accuracy
+    with_text = [(result, reference) for result, reference in compared if reference['characters']]
+    
+    seconds = sum(result['seconds'] for result, _ in compared)
+    reference_seconds = sum(reference['seconds'] for _, reference in compared)
+    text_seconds = sum(result['text_seconds'] for result, _ in compared)
+    reference_text_seconds = sum(reference['text_seconds'] for _, reference in compared)
+    pages = sum(result['pages'] for result, _ in compared)
+    return {
+        'files': len(compared),
+        'errors': sum('error' in result for result in results),
+        'seconds': seconds,
+        'speedup': reference_seconds / seconds if seconds > 0 else None,
+        'text_seconds': text_seconds,
+        'text_pages_per_second': pages / text_seconds if text_seconds > 0 else None,
+        'text_speedup': reference_text_seconds / text_seconds if text_seconds > 0 else None,
+        'mean_similarity': (sum(result['similarity'] for result, _ in with_text) / len(with_text)) if with_text else None,
+        'same_flags': sum(not result['missing_rules'] and not result['extra_rules'] for result, _ in with_text),
+        'files_with_text': len(with_text)
+    }
+
+
+def format_optional(value: Optional[float], pattern: str) -> str:
+    """Format an optional figure."""
+    return pattern.format(value) if value is not None else "-"
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a report as readable tables."""
+    print(f"Structure parsed: {'yes' if report['parse_document'] else 'no'} (as uploads are with the current rules)")
+    print("Text: rule text only; Upload: text plus structure parsing\n")
+    print(f"{'Backend':<12} {'Files':>6} {'Text s':>8} {'Pages/s':>8} {'Speedup':>8} {'Upload s':>9} {'Speedup':>8} "
+          f"{'Similarity':>11} {'Same flags':>11}")
+    for backend, summary in report['backends'].items():
+        print(f"{backend:<12} {summary['files']:>6} {summary['text_seconds']:>8.3f} "
+              f"{format_optional(summary['text_pages_per_second'], '{:.1f}'):>8} "
+              f"{format_optional(summary['text_speedup'], '{:.1f}x'):>8} "
+              f"{summary['seconds']:>9.3f} "
+              f"{format_optional(summary['speedup'], '{:.1f}x'):>8} "
+              f"{format_optional(summary['mean_similarity'], '{:.1%}'):>11} "
+              f"{summary['same_flags']:>5}/{summary['files_with_text']:<5}")
+    
+    for item in report['files']:
+        print(f"\n{item['file']}")
+        for backend, result in item['backends'].items():
+            if 'error' in result:
+                print(f"  {backend:<12} error: {result['error']}")
+                continue
+            differences = [f"-{rule}" for rule in result['missing_rules']] + [f"+{rule}" for rule in result['extra_rules']]
+            print(f"  {backend:<12} text {result['text_seconds'] * 1000:>8.1f}ms  upload {result['seconds'] * 1000:>8.1f}ms "
+                  f"{result['characters']:>8} chars "
+                  f"similarity {format_optional(result['similarity'], '{:.1%}'):>6}  "
+                  f"{' '.join(differences) or 'same flags'}")
+
+
+def main() -> int:
+    """Run the report over the test files."""
+    backend_dir = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Compare text extraction backends for speed and rule parity")
+    parser.add_argument('--config', default=str(backend_dir / 'rules-config.yaml'), help="Rules configuration")
+    parser.add_argument('--testfiles', default=str(backend_dir.parent / 'testfiles'), help="Directory of PDFs")
+    parser.add_argument('--backends', default=','.join(EXTRACTORS), help="Backends to compare, e.g. pdfplumber,pdfium")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per file and backend; the fastest is kept")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+    
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    unknown = [name for name in backends if name not in EXTRACTORS]
+    if unknown:
+        print(f"Unknown backends: {', '.join(unknown)}; expected some of: {', '.join(EXTRACTORS)}")
+        return 2
+    
+    report = run_report(Path(args.testfiles), args.config, backends, max(1, args.repeat))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -3,21 +3,27 @@ Updated CloseGuard API using the new modular architecture.
 This maintains full API compatibility while using the new services.
 """
 
+import functools
 import os
 import uuid
 import json
 import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from pathlib import Path
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 # Import new services
-from services.analysis import RuleEngineService, ScoringService, ValidationService
+from services.analysis import RuleEngineService, ScoringService, ValidationService, DocumentAnalysis, ShadowRunner, ShadowStore
+from services.analysis.shadow_runner import legacy_engine, summarize_results
 from services.parsing import DocumentParserService
+from services.parsing.core import MultipartUploadError, UploadedFile, read_multipart
+from services.reporting import ReportRescorer
 from models.core import UserContext as UserContextModel, Report, ReportMetadata
 from config.settings import Settings
 
@@ -44,18 +50,24 @@ app.add_middleware(
 # In-memory store for reports (same as before for compatibility)
 reports_store: Dict[str, Dict[str, Any]] = {}
 
+# Context-free analysis state per report, most recently used last, so that
+# changed user context only re-runs the context rules
+analysis_cache: "OrderedDict[str, DocumentAnalysis]" = OrderedDict()
+
 # Initialize services
 rule_engine_service = None
 scoring_service = None
 document_parser_service = None
 validation_service = None
+report_rescorer = None
+shadow_runner = None
 
 print("Starting CloseGuard API v2 with modular architecture...")
 
 
 def init_services():
     """Initialize all services."""
-    global rule_engine_service, scoring_service, document_parser_service, validation_service
+    global rule_engine_service, scoring_service, document_parser_service, validation_service, report_rescorer, shadow_runner
     
     try:
         # Find rules config file
@@ -66,13 +78,48 @@ def init_services():
         print(f"Looking for rules config at: {config_path}")
         
         # Initialize services
-        rule_engine_service = RuleEngineService(config_path)
+        rule_engine_service = RuleEngineService(
+            config_path,
+            rule_time_budget=settings.rule_time_budget,
+            analysis_time_budget=settings.analysis_time_budget,
+            profile_window=settings.rule_profile_window or None,
+            use_snapshot=settings.use_rules_snapshot,
+            pool_workers=settings.rule_pool_workers or None,
+            pool_min_chars=settings.rule_pool_min_chars
+        )
+        if rule_engine_service.rule_pool is not None:
+            rule_engine_service.rule_pool.start()
         scoring_service = ScoringService(
             max_score=settings.max_forensic_score,
             severity_weights=settings.severity_weights
         )
-        document_parser_service = DocumentParserService(settings.temp_dir)
+        document_parser_service = DocumentParserService(
+            settings.temp_dir,
+            page_pool_workers=settings.page_pool_workers or None,
+            page_pool_min_pages=settings.page_pool_min_pages,
+            page_pool_timeout=settings.page_pool_timeout or None,
+            locate_cd_pages=settings.locate_cd_pages,
+            text_extractor=settings.text_extractor,
+            upload_memory_limit=settings.upload_memory_limit
+        )
+        if document_parser_service.page_pool is not None:
+            document_parser_service.page_pool.start()
         validation_service = ValidationService()
+        report_rescorer = ReportRescorer(rule_engine_service, scoring_service, reports_store,
+                                         max_documents=settings.rescore_document_limit,
+                                         document_dir=settings.rescore_document_dir or None,
+                                         document_max_age=settings.rescore_document_max_age or None)
+        if settings.rescore_interval > 0:
+            report_rescorer.start(settings.rescore_interval)
+        shadow_runner = ShadowRunner(
+            'legacy',
+            functools.partial(legacy_engine, config_path),
+            ShadowStore(settings.shadow_store_path),
+            sample_rate=settings.shadow_sample_rate,
+            timeout=settings.shadow_timeout or None
+        )
+        if settings.shadow_sample_rate > 0:
+            shadow_runner.start()
         
         # Validate rules configuration
         validation_result = rule_engine_service.validate_rules_config()
@@ -82,7 +129,7 @@ def init_services():
                 print(f"Warnings: {validation_result['warnings']}")
         else:
             print(f"WARNING: Rules validation failed: {validation_result['errors']}")
-            
+    
     except Exception as e:
         print(f"ERROR: Failed to initialize services: {e}")
         import traceback
@@ -137,6 +184,14 @@ def convert_api_context_to_model(api_context: UserContext) -> UserContextModel:
     )
 
 
+def cache_analysis(report_id: str, analysis: DocumentAnalysis):
+    """Keep a report's analysis state, evicting the least recently used beyond the cache size."""
+    analysis_cache[report_id] = analysis
+    analysis_cache.move_to_end(report_id)
+    while len(analysis_cache) > settings.analysis_cache_size:
+        analysis_cache.popitem(last=False)
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -158,15 +213,39 @@ async def health_check():
     }
 
 
-@app.post("/upload")
-async def upload_pdf(
-    file: UploadFile = File(...),
-    context: str = Form(None)
-):
+# Documents the form upload_pdf() reads itself, as FastAPI no longer parses it
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {
+                    "file": {"type": "string", "format": "binary", "description": "PDF file to analyze"},
+                    "context": {"type": "string", "description": "JSON string of user expectations and promises"}
+                }
+            }
+        }
+    }
+}
+
+
+@app.post("/upload", openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
+async def upload_pdf(request: Request):
     """
     Upload a PDF file for analysis with optional user context.
     
-    Args:
+    The form is read from the request stream instead of by FastAPI, which spools
+    files over 1MB to disk: the PDF stays in memory up to the document parser's
+    upload memory limit and only larger ones are written to a temporary file.
+    Bodies past the file size limit are rejected while they are received.
+    
+    Extraction and analysis run on a worker thread to keep the event loop serving
+    other requests. Off the main thread the rule time budget cannot interrupt a
+    search, so rules whose patterns may backtrack run on a guarded worker process.
+    
+    Form fields:
         file: PDF file to analyze
         context: JSON string of user expectations and promises
     
@@ -175,15 +254,35 @@ async def upload_pdf(
     """
     start_time = time.time()
     
+    try:
+        form = await read_multipart(
+            request.headers.get('content-type', ''),
+            request.stream(),
+            document_parser_service.upload_memory_limit,
+            document_parser_service.temp_dir,
+            max_file_size=settings.max_file_size
+        )
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        file = form.files.get('file')
+        if file is None:
+            raise HTTPException(status_code=422, detail="Missing PDF file in the 'file' form field")
+        return await run_in_threadpool(analyze_upload, file, form.fields.get('context'), start_time)
+    finally:
+        form.close()
+
+
+def analyze_upload(file: UploadedFile, context: Optional[str], start_time: float) -> Dict[str, str]:
+    """Analyze an uploaded PDF and store its report, returning the report ID."""
     print(f"=== UPLOAD DEBUG ===")
     print(f"File: {file.filename}")
     print(f"Content-Type: {file.content_type}")
     print(f"Context: {context}")
     
     # Validate file using validation service
-    file_size = 0
-    if hasattr(file, 'size'):
-        file_size = file.size
+    file_size = file.size
     
     validation_result = validation_service.validate_file_upload(
         file.filename, 
@@ -198,12 +297,15 @@ async def upload_pdf(
     report_id = str(uuid.uuid4())
     
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Extract text using document parser service
+        # Extract text using document parser service, from memory or from the file
+        # the upload was spilled to
         print(f"Extracting text from uploaded file...")
-        extracted_text = document_parser_service.extract_text_from_upload(content, file.filename)
+        layout, parsed_document = document_parser_service.extract_from_upload(
+            file,
+            file.filename,
+            parse_document=rule_engine_service.requires_document()
+        )
+        extracted_text = layout.text
         print(f"Extracted {len(extracted_text)} characters")
         
         if not extracted_text.strip():
@@ -211,6 +313,7 @@ async def upload_pdf(
         
         # Parse user context if provided
         user_context_model = None
+        context_data = None
         if context:
             try:
                 context_data = json.loads(context)
@@ -223,9 +326,26 @@ async def upload_pdf(
         
         # Analyze text using rule engine service
         print("Running rule analysis...")
-        flags = rule_engine_service.analyze_text(extracted_text, user_context_model)
+        analysis_start = time.perf_counter()
+        document_analysis = rule_engine_service.prepare_analysis(
+            extracted_text,
+            layout=layout,
+            document=parsed_document
+        )
+        analysis = rule_engine_service.reanalyze(document_analysis, user_context_model)
+        flags = analysis.flags
+        analysis_seconds = time.perf_counter() - analysis_start
         print(f"Found {len(flags)} flags")
         
+        # Compare with the legacy engine on sampled uploads, in the background
+        shadow_runner.submit(
+            report_id,
+            extracted_text,
+            [flag.to_dict() for flag in flags],
+            analysis_seconds,
+            context_data if user_context_model else None
+        )
+        
         # Calculate analytics using scoring service
         analytics = scoring_service.create_analytics(flags)
         print(f"Forensic score: {analytics.forensic_score}")
@@ -236,7 +356,9 @@ async def upload_pdf(
             filename=file.filename,
             text_length=len(extracted_text),
             upload_timestamp=str(int(time.time())),
-            processing_time=processing_time
+            processing_time=processing_time,
+            analysis_stats=analysis.stats,
+            rule_hashes=analysis.rule_hashes
         )
         
         # Create report
@@ -250,10 +372,12 @@ async def upload_pdf(
         
         # Store report (convert to dict for compatibility with original format)
         reports_store[report_id] = report.to_dict()
+        cache_analysis(report_id, document_analysis)
+        report_rescorer.store_document(report_id, layout, parsed_document, user_context_model)
         
         print(f"Report {report_id} created successfully in {processing_time:.2f}s")
         return {"report_id": report_id}
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -278,6 +402,64 @@ async def get_report(report_id: str):
     return JSONResponse(content=reports_store[report_id])
 
 
+@app.post("/report/{report_id}/context")
+def update_report_context(report_id: str, context: UserContext):
+    """
+    Re-score a report against new user context.
+    
+    Only the rules that compare the document with the user's expectations are
+    re-run; the rest are reused from the original upload.
+    
+    Args:
+        report_id: ID of the report to update
+        context: User expectations and promises
+    
+    Returns:
+        JSON response with the updated report
+    """
+    start_time = time.time()
+    
+    # Validate report ID
+    validation_result = validation_service.validate_report_id(report_id)
+    if not validation_result['valid']:
+        raise HTTPException(status_code=400, detail=validation_result['errors'][0])
+    
+    if report_id not in reports_store:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    document_analysis = analysis_cache.get(report_id)
+    if document_analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis state for report has expired; upload the document again")
+    analysis_cache.move_to_end(report_id)
+    
+    user_context_model = convert_api_context_to_model(context)
+    analysis = rule_engine_service.reanalyze(document_analysis, user_context_model)
+    flags = analysis.flags
+    print(f"Re-scored report {report_id}: {len(flags)} flags")
+    
+    analytics = scoring_service.create_analytics(flags)
+    
+    stored = reports_store[report_id]
+    report = Report(
+        id=report_id,
+        status="completed",
+        flags=flags,
+        analytics=analytics,
+        metadata=ReportMetadata(
+            filename=stored['metadata']['filename'],
+            text_length=stored['metadata']['text_length'],
+            upload_timestamp=stored['metadata']['upload_timestamp'],
+            processing_time=time.time() - start_time,
+            analysis_stats=analysis.stats,
+            rule_hashes=analysis.rule_hashes
+        )
+    )
+    
+    reports_store[report_id] = report.to_dict()
+    report_rescorer.update_context(report_id, user_context_model)
+    return JSONResponse(content=reports_store[report_id])
+
+
 @app.get("/reports")
 async def list_reports():
     """List all reports (admin endpoint)."""
@@ -300,6 +482,8 @@ async def delete_report(report_id: str):
         raise HTTPException(status_code=404, detail="Report not found")
     
     del reports_store[report_id]
+    analysis_cache.pop(report_id, None)
+    report_rescorer.discard_document(report_id)
     return {"message": "Report deleted successfully"}
 
 
@@ -316,6 +500,56 @@ async def debug_rules():
     }
 
 
+@app.get("/debug/rules/profile")
+async def debug_rules_profile(reset: bool = False):
+    """
+    Debug endpoint with per-rule execution timings, slowest rules first.
+    
+    Args:
+        reset: Clear the collected timings after returning them
+    """
+    if not rule_engine_service:
+        raise HTTPException(status_code=500, detail="Rule engine not initialized")
+    if rule_engine_service.profiler is None:
+        raise HTTPException(status_code=404, detail="Rule profiling is disabled")
+    
+    profile = rule_engine_service.profiler.to_dict()
+    if reset:
+        rule_engine_service.profiler.reset()
+    return profile
+
+
+@app.post("/debug/rescore")
+def debug_rescore():
+    """
+    Re-score stored reports against the current rules without waiting for the background check.
+    
+    Declared without async so the re-scoring runs on the threadpool instead of blocking the event loop.
+    """
+    if not report_rescorer:
+        raise HTTPException(status_code=500, detail="Report rescorer not initialized")
+    
+    return report_rescorer.rescore_all()
+
+
+@app.get("/debug/shadow")
+async def debug_shadow(limit: Optional[int] = None):
+    """
+    Debug endpoint summarizing how the legacy engine's flags and latency compare on sampled uploads.
+    
+    Args:
+        limit: Only summarize the most recent comparisons
+    """
+    if not shadow_runner:
+        raise HTTPException(status_code=500, detail="Shadow runner not initialized")
+    
+    return {
+        "sample_rate": shadow_runner.sample_rate,
+        "runner": dict(shadow_runner.stats),
+        "summary": summarize_results(shadow_runner.store.read(limit))
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
@@ -14,11 +14,14 @@ from .document import (
     PaymentResponsibility, CostCategory, DocumentSection,
     ClosingDisclosureLineItem,
     LoanSummary,
-    ParsedDocument
+    ParsedDocument,
+    DocumentLayout,
+    ValueIndex, ValueKind,
+    KeyValueMap
 )
 
-# Analysis models (future)
-from .analysis import *
+# Analysis models
+from .analysis import AnalysisResult
 
 __all__ = [
     # Core models
@@ -38,5 +41,12 @@ __all__ = [
     'DocumentSection',
     'ClosingDisclosureLineItem',
     'LoanSummary',
-    'ParsedDocument'
+    'ParsedDocument',
+    'DocumentLayout',
+    'ValueIndex',
+    'ValueKind',
+    'KeyValueMap',
+    
+    # Analysis models
+    'AnalysisResult'
 ]
\ No newline at end of file
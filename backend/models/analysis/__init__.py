@@ -1,9 +1,7 @@
 """Analysis result models for document processing."""
 
-# Placeholder for future analysis models
-# Examples:
-# - FraudAnalysisResult
-# - RiskAssessment 
-# - ComplianceReport
+from .analysis_result import AnalysisResult
 
-__all__ = []
\ No newline at end of file
+__all__ = [
+    'AnalysisResult'
+]
\ No newline at end of file
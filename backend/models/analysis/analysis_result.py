@@ -0,0 +1,23 @@
+"""Analysis result model returned by the rule engine."""
+
+from dataclasses import dataclass, field
+from typing import List, Dict, Any
+
+from models.core import Flag
+
+
+@dataclass
+class AnalysisResult:
+    """Flags detected for a document plus statistics about the run."""
+    
+    flags: List[Flag]
+    stats: Dict[str, Any] = field(default_factory=dict)
+    rule_hashes: Dict[str, str] = field(default_factory=dict)  # Hashes of the rules that completed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format for API responses."""
+        return {
+            'flags': [flag.to_dict() for flag in self.flags],
+            'stats': self.stats,
+            'rule_hashes': self.rule_hashes
+        }
\ No newline at end of file
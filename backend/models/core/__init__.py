@@ -1,17 +1,21 @@
 """Core business models for CloseGuard."""
 
-from .flag import Flag, FlagSeverity
+from .flag import Flag, FlagSeverity, determine_severity
 from .report import Report, ReportAnalytics, ReportMetadata
 from .user_context import UserContext
 from .rule import Rule, RuleType
+from .message_template import MessageTemplate, compile_template
 
 __all__ = [
     'Flag',
     'FlagSeverity', 
+    'determine_severity',
     'Report',
     'ReportAnalytics',
     'ReportMetadata',
     'UserContext',
     'Rule',
-    'RuleType'
+    'RuleType',
+    'MessageTemplate',
+    'compile_template'
 ]
\ No newline at end of file
@@ -12,6 +12,23 @@ class FlagSeverity(Enum):
     LOW = "low"
 
 
+def determine_severity(message: str) -> FlagSeverity:
+    """Determine severity based on message content."""
+    message_lower = message.lower()
+    
+    # High severity keywords
+    if any(keyword in message_lower for keyword in ['🚨', 'critical', 'error', 'fraud']):
+        return FlagSeverity.HIGH
+    
+    # Medium severity keywords
+    elif any(keyword in message_lower for keyword in ['⚠️', 'warning', 'dangerous', 'excessive']):
+        return FlagSeverity.MEDIUM
+    
+    # Default to low severity
+    else:
+        return FlagSeverity.LOW
+
+
 @dataclass
 class Flag:
     """Represents a detected issue in a document."""
@@ -29,19 +46,19 @@ class Flag:
     
     def _determine_severity(self) -> FlagSeverity:
         """Determine severity based on message content."""
-        message_lower = self.message.lower()
-        
-        # High severity keywords
-        if any(keyword in message_lower for keyword in ['🚨', 'critical', 'error', 'fraud']):
-            return FlagSeverity.HIGH
-        
-        # Medium severity keywords
-        elif any(keyword in message_lower for keyword in ['⚠️', 'warning', 'dangerous', 'excessive']):
-            return FlagSeverity.MEDIUM
-        
-        # Default to low severity
-        else:
-            return FlagSeverity.LOW
+        return determine_severity(self.message)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Flag':
+        """Create a flag from its API dictionary format, e.g. from a stored report."""
+        severity = data.get('severity')
+        return cls(
+            rule=data.get('rule', ''),
+            message=data.get('message', ''),
+            snippet=data.get('snippet', ''),
+            severity=FlagSeverity(severity) if severity else None,
+            confidence=data.get('confidence')
+        )
     
     def to_dict(self) -> dict:
         """Convert flag to dictionary format for API responses."""
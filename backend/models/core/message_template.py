@@ -0,0 +1,56 @@
+"""Flag message templates compiled once per rule."""
+
+import re
+from functools import lru_cache
+from typing import List
+
+
+# {name} placeholders; a ${name} placeholder is a literal $ followed by one
+_PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+
+class MessageTemplate:
+    """
+    A rule message split into literal text and named placeholder slots.
+    
+    Rendering fills every slot in one pass. Placeholders without a value are
+    kept as written, like the str.replace formatting they replace.
+    """
+    
+    def __init__(self, message: str):
+        self.message = message
+        self.literals: List[str] = []
+        self.slots: List[str] = []
+        
+        position = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(message):
+            self.literals.append(message[position:match.start()])
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.literals.append(message[position:])
+    
+    def render(self, **values) -> str:
+        """Fill the placeholders with the given values."""
+        if not self.slots:
+            return self.message
+        
+        parts = [self.literals[0]]
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            parts.append(str(values[slot]) if slot in values else f"{{{slot}}}")
+            parts.append(literal)
+        return "".join(parts)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, MessageTemplate) and other.message == self.message
+    
+    def __hash__(self) -> int:
+        return hash(self.message)
+    
+    def __repr__(self) -> str:
+        return f"MessageTemplate({self.message!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_template(message: str) -> MessageTemplate:
+    """Compile a message into a template, reusing templates of identical messages."""
+    return MessageTemplate(message)
\ No newline at end of file
@@ -1,6 +1,6 @@
 """Report data models for analysis results."""
 
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from .flag import Flag, FlagSeverity
 
@@ -13,6 +13,8 @@ class ReportMetadata:
     text_length: int
     upload_timestamp: Optional[str] = None
     processing_time: Optional[float] = None
+    analysis_stats: Optional[Dict[str, Any]] = None
+    rule_hashes: Optional[Dict[str, str]] = None  # Content hash of each rule the flags were computed with
 
 
 @dataclass 
@@ -99,6 +101,8 @@ class Report:
                 'filename': self.metadata.filename,
                 'text_length': self.metadata.text_length,
                 'upload_timestamp': self.metadata.upload_timestamp,
-                'processing_time': self.metadata.processing_time
+                'processing_time': self.metadata.processing_time,
+                'analysis_stats': self.metadata.analysis_stats,
+                'rule_hashes': self.metadata.rule_hashes
             } if self.metadata else None
         }
\ No newline at end of file
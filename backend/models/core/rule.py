@@ -1,9 +1,14 @@
 """Rule data model for fraud detection rules."""
 
+import hashlib
+import json
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 
+from .flag import FlagSeverity
+from .message_template import MessageTemplate
+
 
 class RuleType(Enum):
     """Types of rules supported by the engine."""
@@ -15,6 +20,10 @@ class RuleType(Enum):
     COMPOUND_RULE = "compound_rule"
     CROSS_REFERENCE_PATTERN = "cross_reference_pattern"
     CONTEXT_COMPARISON = "context_comparison"
+    FIELD_THRESHOLD = "field_threshold"
+    FIELD_RATIO = "field_ratio"
+    LINE_ITEM_MATCH = "line_item_match"
+    VALUE_THRESHOLD = "value_threshold"
 
 
 @dataclass
@@ -35,6 +44,13 @@ class Rule:
     numerator_pattern: Optional[str] = None
     denominator_pattern: Optional[str] = None
     
+    # Page numbers and/or DocumentSection values the rule is evaluated against
+    scope: Optional[List[Union[int, str]]] = None
+    
+    # Resolved once when the rule plan is compiled
+    severity: Optional[FlagSeverity] = None
+    message_template: Optional[MessageTemplate] = None
+    
     def __post_init__(self):
         """Extract common config fields."""
         if self.config:
@@ -43,6 +59,10 @@ class Rule:
             self.operator = self.config.get('operator', self.operator)
             self.numerator_pattern = self.config.get('numerator_pattern', self.numerator_pattern)
             self.denominator_pattern = self.config.get('denominator_pattern', self.denominator_pattern)
+            self.scope = self.config.get('scope', self.scope)
+        
+        if self.scope is not None and not isinstance(self.scope, list):
+            self.scope = [self.scope]
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Rule':
@@ -58,7 +78,11 @@ class Rule:
             'regex_amount': RuleType.REGEX_AMOUNT,
             'compound_rule': RuleType.COMPOUND_RULE,
             'cross_reference_pattern': RuleType.CROSS_REFERENCE_PATTERN,
-            'context_comparison': RuleType.CONTEXT_COMPARISON
+            'context_comparison': RuleType.CONTEXT_COMPARISON,
+            'field_threshold': RuleType.FIELD_THRESHOLD,
+            'field_ratio': RuleType.FIELD_RATIO,
+            'line_item_match': RuleType.LINE_ITEM_MATCH,
+            'value_threshold': RuleType.VALUE_THRESHOLD
         }
         
         rule_type = type_mapping.get(rule_type_str)
@@ -76,9 +100,15 @@ class Rule:
             threshold=data.get('threshold'),
             operator=data.get('operator'),
             numerator_pattern=data.get('numerator_pattern'),
-            denominator_pattern=data.get('denominator_pattern')
+            denominator_pattern=data.get('denominator_pattern'),
+            scope=data.get('scope')
         )
     
+    def content_hash(self) -> str:
+        """Hash the rule's configuration, to detect rules changed since a report was scored."""
+        data = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert rule back to dictionary format."""
         return {
@@ -5,6 +5,9 @@ from .enums import PaymentResponsibility, CostCategory, DocumentSection
 from .line_item import ClosingDisclosureLineItem
 from .loan_summary import LoanSummary
 from .parsed_document import ParsedDocument
+from .layout import DocumentLayout, Span, ScopeItem
+from .value_index import ValueIndex, ValueEntry, ValueKind
+from .key_values import KeyValueMap, KeyValue, normalize_label
 
 __all__ = [
     'CoordinatePosition',
@@ -13,5 +16,14 @@ __all__ = [
     'DocumentSection',
     'ClosingDisclosureLineItem',
     'LoanSummary',
-    'ParsedDocument'
+    'ParsedDocument',
+    'DocumentLayout',
+    'Span',
+    'ScopeItem',
+    'ValueIndex',
+    'ValueEntry',
+    'ValueKind',
+    'KeyValueMap',
+    'KeyValue',
+    'normalize_label'
 ]
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""Label-to-value map of the key figures in a closing disclosure."""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
+
+from .coordinates import CoordinatePosition
+from .enums import DocumentSection
+from .parsed_document import ParsedDocument
+from .value_index import ValueIndex, ValueKind, label_pattern
+
+
+# Standard TRID labels: normalized key -> (printed labels, kind of value)
+STANDARD_LABELS: Dict[str, Tuple[Tuple[str, ...], ValueKind]] = {
+    'loan amount': (('Loan Amount',), ValueKind.AMOUNT),
+    'interest rate': (('Interest Rate',), ValueKind.PERCENT),
+    'monthly principal & interest': (('Monthly Principal & Interest',), ValueKind.AMOUNT),
+    'sale price': (('Sale Price', 'Purchase Price'), ValueKind.AMOUNT),
+    'closing costs': (('Total Closing Costs', 'Closing Costs'), ValueKind.AMOUNT),
+    'cash to close': (('Cash to Close',), ValueKind.AMOUNT),
+    'total of payments': (('Total of Payments',), ValueKind.AMOUNT),
+    'finance charge': (('Finance Charge',), ValueKind.AMOUNT),
+    'amount financed': (('Amount Financed',), ValueKind.AMOUNT),
+    'annual percentage rate': (('Annual Percentage Rate', 'APR'), ValueKind.PERCENT),
+    'total interest percentage': (('Total Interest Percentage', 'TIP'), ValueKind.PERCENT)
+}
+
+# Page of the form each standard label is printed on
+_LABEL_PAGES = {
+    'total of payments': 5,
+    'finance charge': 5,
+    'amount financed': 5,
+    'annual percentage rate': 5,
+    'total interest percentage': 5
+}
+
+# LoanSummary fields located by the page parsers, by standard label
+_SUMMARY_FIELDS = {
+    'loan amount': 'loan_amount',
+    'interest rate': 'interest_rate',
+    'monthly principal & interest': 'monthly_payment',
+    'sale price': 'sale_price',
+    'closing costs': 'total_closing_costs',
+    'cash to close': 'cash_to_close',
+    'annual percentage rate': 'annual_percentage_rate',
+    'total interest percentage': 'total_interest_percentage'
+}
+
+# Coordinates keys the page 1 parser stores under a different name than the field
+_SUMMARY_COORDINATES = {
+    'total_closing_costs': 'closing_costs'
+}
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a printed label: casefold, drop line numbers, parentheticals and punctuation."""
+    label = re.sub(r'\([^)]*\)', ' ', label.casefold())
+    label = re.sub(r'^\s*[a-z]?\.?\d+\s*', '', label)
+    return ' '.join(re.sub(r'[^a-z0-9&%]+', ' ', label).split())
+
+
+# Normalized printed label -> standard label
+_ALIASES = {
+    normalize_label(alias): standard
+    for standard, (aliases, _) in STANDARD_LABELS.items()
+    for alias in aliases
+}
+
+
+@dataclass
+class KeyValue:
+    """A value printed next to a label."""
+    
+    label: str  # Normalized label
+    value: float
+    kind: ValueKind
+    text: str  # Label and value as printed
+    page: Optional[int] = None
+    start: Optional[int] = None  # Offsets in the document text, when located there
+    end: Optional[int] = None
+    coordinates: Optional[CoordinatePosition] = None  # Position on the page, when located by layout
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API responses."""
+        return {
+            "label": self.label,
+            "value": self.value,
+            "kind": self.kind.value,
+            "text": self.text,
+            "page": self.page,
+            "start": self.start,
+            "end": self.end,
+            "coordinates": self.coordinates.to_dict() if self.coordinates else None
+        }
+
+
+class KeyValueMap:
+    """
+    Normalized {label: [values]} map built once per document.
+    
+    Values located by the page parsers (with page coordinates) come first for each
+    label, followed by values found after the label in the text.
+    """
+    
+    def __init__(self):
+        self.entries: Dict[str, List[KeyValue]] = {}
+    
+    @classmethod
+    def build(cls, values: ValueIndex, document: Optional[ParsedDocument] = None) -> 'KeyValueMap':
+        """
+        Build the map for a document.
+        
+        Args:
+            values: Value index of the document text
+            document: Parsed closing disclosure, whose page parsers locate values by layout
+        """
+        key_values = cls()
+        if document is not None:
+            key_values._add_document_values(document)
+        key_values._add_standard_label_values(values)
+        key_values._add_text_values(values)
+        return key_values
+    
+    def get(self, label: str) -> List[KeyValue]:
+        """Get the values for a label, in order of confidence."""
+        return self.entries.get(self.resolve(label), [])
+    
+    def first(self, label: str) -> Optional[KeyValue]:
+        """Get the most reliable value for a label."""
+        found = self.get(label)
+        return found[0] if found else None
+    
+    def __contains__(self, label: str) -> bool:
+        return bool(self.get(label))
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    @staticmethod
+    def resolve(label: str) -> str:
+        """Resolve a label or one of its printed aliases to its normalized key."""
+        key = normalize_label(label)
+        return _ALIASES.get(key, key)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API responses."""
+        return {label: [entry.to_dict() for entry in entries] for label, entries in self.entries.items()}
+    
+    def _add(self, entry: KeyValue):
+        """Add a value, merging it with the same value of the label found another way."""
+        entries = self.entries.setdefault(entry.label, [])
+        for existing in entries:
+            if entry.start is not None and existing.start == entry.start:
+                return
+            if (existing.value == entry.value and existing.page in (None, entry.page)
+                    and (existing.start is None or entry.start is None)):
+                # A value located by layout, now also found in the text (or vice versa)
+                if existing.start is None:
+                    existing.start, existing.end = entry.start, entry.end
+                existing.page = existing.page or entry.page
+                existing.coordinates = existing.coordinates or entry.coordinates
+                return
+        entries.append(entry)
+    
+    def _add_document_values(self, document: ParsedDocument):
+        """Add the loan summary and loan calculation values located by the page parsers."""
+        summary = document.loan_summary
+        if summary is not None:
+            coordinates = summary.coordinates or {}
+            for label, field_name in _SUMMARY_FIELDS.items():
+                value = getattr(summary, field_name, None)
+                if value is None:
+                    continue
+                kind = STANDARD_LABELS[label][1]
+                self._add(KeyValue(
+                    label=label,
+                    value=float(value),
+                    kind=kind,
+                    text=f"{STANDARD_LABELS[label][0][0]}: {self._format(value, kind)}",
+                    page=_LABEL_PAGES.get(label, 1),
+                    coordinates=coordinates.get(_SUMMARY_COORDINATES.get(field_name, field_name))
+                ))
+        
+        for item in document.find_line_items(sections=[DocumentSection.LOAN_CALCULATIONS]):
+            label = self.resolve(item.description or '')
+            if item.amount is None or label not in STANDARD_LABELS:
+                continue
+            self._add(KeyValue(
+                label=label,
+                value=float(item.amount),
+                kind=STANDARD_LABELS[label][1],
+                text=item.raw_text or f"{item.description}: {self._format(item.amount, STANDARD_LABELS[label][1])}",
+                page=item.page_number,
+                coordinates=item.coordinates
+            ))
+    
+    def _add_standard_label_values(self, values: ValueIndex):
+        """Add the value after each standard label on the same line of the text."""
+        text = values.text
+        for label, (aliases, kind) in STANDARD_LABELS.items():
+            for alias in aliases:
+                for match in label_pattern(alias).finditer(text):
+                    entry = values.value_at_label(match.end(), (kind,))
+                    if entry is None:
+                        continue
+                    self._add(KeyValue(
+                        label=label,
+                        value=entry.value,
+                        kind=kind,
+                        text=text[match.start():entry.end],
+                        page=entry.page,
+                        start=entry.start,
+                        end=entry.end
+                    ))
+    
+    def _add_text_values(self, values: ValueIndex):
+        """Add every amount and percentage under the label printed before it."""
+        for entry in values.find(kinds=(ValueKind.AMOUNT, ValueKind.PERCENT)):
+            label = self.resolve(entry.label)
+            if not label or label.replace(' ', '').isdigit():
+                continue
+            self._add(KeyValue(
+                label=label,
+                value=entry.value,
+                kind=entry.kind,
+                text=f"{entry.label} {entry.raw}",
+                page=entry.page,
+                start=entry.start,
+                end=entry.end
+            ))
+    
+    @staticmethod
+    def _format(value: float, kind: ValueKind) -> str:
+        """Format a value the way it is printed on the form."""
+        return f"{value}%" if kind == ValueKind.PERCENT else f"${value:,.2f}"
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Document layout model mapping pages and sections to spans of extracted text."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterable, Tuple, Union
+
+from .enums import DocumentSection
+from .value_index import ValueIndex
+
+
+# Character range [start, end) in the extracted document text
+Span = Tuple[int, int]
+
+# A rule scope entry is a 1-based page number or a TRID section
+ScopeItem = Union[int, DocumentSection]
+
+
+@dataclass
+class DocumentLayout:
+    """Extracted document text with the spans of its pages and TRID sections."""
+    
+    text: str
+    page_spans: List[Span] = field(default_factory=list)
+    section_spans: Dict[DocumentSection, List[Span]] = field(default_factory=dict)
+    _values: Optional[ValueIndex] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def values(self) -> ValueIndex:
+        """Index of the amounts, percentages and numbers in the text, built on first use."""
+        if self._values is None:
+            self._values = ValueIndex(self.text, self.page_spans)
+        return self._values
+    
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+        return len(self.page_spans)
+    
+    def get_page_text(self, page_number: int) -> Optional[str]:
+        """Get the text of a 1-based page number."""
+        if not 1 <= page_number <= len(self.page_spans):
+            return None
+        start, end = self.page_spans[page_number - 1]
+        return self.text[start:end]
+    
+    def resolve_scope(self, scope: Iterable[ScopeItem]) -> Optional[List[Span]]:
+        """
+        Resolve a rule scope to spans of the document text.
+        
+        Returns:
+            Spans in document order, or None if no part of the scope was found
+        """
+        spans = []
+        for item in scope:
+            if isinstance(item, DocumentSection):
+                spans.extend(self.section_spans.get(item, []))
+            elif 1 <= item <= len(self.page_spans):
+                spans.append(self.page_spans[item - 1])
+        
+        spans = sorted(set(span for span in spans if span[1] > span[0]))
+        return spans or None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API responses."""
+        return {
+            "pageSpans": [list(span) for span in self.page_spans],
+            "sectionSpans": {
+                section.value: [list(span) for span in spans]
+                for section, spans in self.section_spans.items()
+            }
+        }
\ No newline at end of file
@@ -1,7 +1,7 @@
 """Parsed document model representing complete TRID analysis."""
 
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 
 from .line_item import ClosingDisclosureLineItem
 from .loan_summary import LoanSummary
@@ -27,6 +27,12 @@ class ParsedDocument:
     parsing_success: bool = True
     parsing_errors: List[str] = None
     
+    # Positions of line items grouped by (section, payer), built on first filtered lookup
+    _line_item_index: Optional[Dict[Tuple[DocumentSection, PaymentResponsibility], List[int]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _indexed_item_count: int = field(default=0, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         """Initialize empty lists if None."""
         if self.line_items is None:
@@ -50,6 +56,35 @@ class ParsedDocument:
         """Get all line items from a specific section."""
         return [item for item in self.line_items if item.section == section]
     
+    def find_line_items(self, sections: Optional[Iterable[DocumentSection]] = None,
+                        paid_by: Optional[Iterable[PaymentResponsibility]] = None) -> List[ClosingDisclosureLineItem]:
+        """
+        Get line items in any of the given sections and paid by any of the given parties.
+        
+        Lookups go through a (section, payer) index instead of scanning every item.
+        None for either filter matches everything. Items are returned in document order.
+        """
+        index = self._get_line_item_index()
+        sections = set(sections) if sections is not None else None
+        paid_by = set(paid_by) if paid_by is not None else None
+        
+        positions = []
+        for (section, payer), section_positions in index.items():
+            if (sections is None or section in sections) and (paid_by is None or payer in paid_by):
+                positions.extend(section_positions)
+        
+        return [self.line_items[position] for position in sorted(positions)]
+    
+    def _get_line_item_index(self) -> Dict[Tuple[DocumentSection, PaymentResponsibility], List[int]]:
+        """Build the line item index, rebuilding it if items were added since."""
+        if self._line_item_index is None or self._indexed_item_count != len(self.line_items):
+            index: Dict[Tuple[DocumentSection, PaymentResponsibility], List[int]] = {}
+            for position, item in enumerate(self.line_items):
+                index.setdefault((item.section, item.paid_by), []).append(position)
+            self._line_item_index = index
+            self._indexed_item_count = len(self.line_items)
+        return self._line_item_index
+    
     def get_items_by_category(self, category: CostCategory) -> List[ClosingDisclosureLineItem]:
         """Get all line items of a specific category.""" 
         return [item for item in self.line_items if item.category == category]
@@ -0,0 +1,206 @@
+"""Index of every amount, percentage and number in document text, built in one pass."""
+
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+
+class ValueKind(Enum):
+    """Kinds of numeric tokens found in document text."""
+    AMOUNT = "amount"  # Dollar amount, e.g. $1,250.00
+    PERCENT = "percent"  # Percentage, e.g. 6.625%
+    NUMBER = "number"  # Any other number, e.g. a line number or part of a date
+
+
+_KINDS = list(ValueKind)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+# A single pass over the text tokenizes every numeric value
+_TOKEN_PATTERN = re.compile(
+    r'(?P<sign>[-(])?(?P<dollar>\$)?(?P<number>\d(?:[\d,]*\d)?(?:\.\d+)?)(?P<percent> ?%)?'
+)
+
+# Characters trimmed from the label text preceding a value
+_LABEL_TRIM = ' \t:$-(#'
+
+
+@dataclass
+class ValueEntry:
+    """One numeric token in the document text."""
+    
+    value: float
+    kind: ValueKind
+    start: int  # Offset of the token, including its $ sign
+    end: int
+    page: Optional[int]  # 1-based page number, when page spans are known
+    label: str  # Text on the same line between the previous value and this one
+    raw: str  # Token text as it appears in the document
+    
+    @property
+    def number_text(self) -> str:
+        """Digits of the value without currency, percent sign or thousands separators."""
+        return self.raw.strip('$% ').replace(',', '')
+
+
+@lru_cache(maxsize=256)
+def label_pattern(label: str) -> Pattern:
+    """Compile a case-insensitive pattern for a literal label."""
+    return re.compile(re.escape(label), re.IGNORECASE)
+
+
+class ValueIndex:
+    """
+    Array-backed index of the numeric values in a text.
+    
+    Values are stored in document order, so lookups by offset are binary searches
+    instead of fresh regex scans of the text.
+    """
+    
+    def __init__(self, text: str, page_spans: Optional[List[Tuple[int, int]]] = None):
+        """
+        Tokenize text into the index.
+        
+        Args:
+            text: The document (or page) text
+            page_spans: Character spans of the pages in text, to record each value's page
+        """
+        self.text = text
+        self.values = array('d')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.kinds = array('b')
+        self.pages = array('H')  # 0 when the page is unknown
+        self.labels: List[str] = []
+        
+        page_spans = page_spans or []
+        page = 0
+        previous_end = 0
+        
+        for match in _TOKEN_PATTERN.finditer(text):
+            number = match.group('number')
+            try:
+                value = float(number.replace(',', ''))
+            except ValueError:
+                continue
+            
+            if match.group('dollar'):
+                kind = ValueKind.AMOUNT
+                start = match.start('dollar')
+                sign = match.group('sign')
+                if sign == '-' or (sign == '(' and text.startswith(')', match.end())):
+                    value = -value
+            else:
+                kind = ValueKind.PERCENT if match.group('percent') else ValueKind.NUMBER
+                start = match.start('number')
+            end = match.end()
+            
+            # The label runs from the previous value or the start of the line
+            label_start = max(previous_end, text.rfind('\n', previous_end, start) + 1)
+            previous_end = end
+            
+            while page < len(page_spans) and page_spans[page][1] <= start:
+                page += 1
+            in_page = page < len(page_spans) and page_spans[page][0] <= start
+            
+            self.values.append(value)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.kinds.append(_KIND_CODES[kind])
+            self.pages.append(page + 1 if in_page else 0)
+            self.labels.append(text[label_start:start].strip().rstrip(_LABEL_TRIM))
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __iter__(self) -> Iterator[ValueEntry]:
+        return self.find()
+    
+    def entry(self, position: int) -> ValueEntry:
+        """Get the value at a position in the index."""
+        start = self.starts[position]
+        end = self.ends[position]
+        page = self.pages[position]
+        return ValueEntry(
+            value=self.values[position],
+            kind=_KINDS[self.kinds[position]],
+            start=start,
+            end=end,
+            page=page or None,
+            label=self.labels[position],
+            raw=self.text[start:end]
+        )
+    
+    def find(self, start: int = 0, end: Optional[int] = None,
+             kinds: Optional[Iterable[ValueKind]] = None) -> Iterator[ValueEntry]:
+        """Iterate over the values that begin within [start, end) of the text, in order."""
+        codes = self._kind_codes(kinds)
+        first = bisect_left(self.starts, start)
+        last = len(self.starts) if end is None else bisect_left(self.starts, end)
+        for position in range(first, last):
+            if codes is None or self.kinds[position] in codes:
+                yield self.entry(position)
+    
+    def on_page(self, page_number: int, kinds: Optional[Iterable[ValueKind]] = None) -> List[ValueEntry]:
+        """Get the values on a 1-based page."""
+        codes = self._kind_codes(kinds)
+        return [
+            self.entry(position) for position, page in enumerate(self.pages)
+            if page == page_number and (codes is None or self.kinds[position] in codes)
+        ]
+    
+    def first_after(self, offset: int, end: Optional[int] = None,
+                    kinds: Optional[Iterable[ValueKind]] = None) -> Optional[ValueEntry]:
+        """Get the first value beginning at or after offset and before end."""
+        return next(self.find(offset, end, kinds), None)
+    
+    def line_end(self, offset: int) -> int:
+        """Get the offset of the end of the line containing offset."""
+        newline = self.text.find('\n', offset)
+        return len(self.text) if newline == -1 else newline
+    
+    def value_after(self, label: str, kinds: Optional[Iterable[ValueKind]] = (ValueKind.AMOUNT,),
+                    within: Optional[int] = None, same_line: bool = True, gap: Optional[str] = None,
+                    start: int = 0, end: Optional[int] = None) -> Optional[ValueEntry]:
+        """
+        Find the first value following an occurrence of a label.
+        
+        Args:
+            label: Literal label text, matched case-insensitively
+            kinds: Kinds of value to accept, or None for any
+            within: Maximum characters between the end of the label and the value
+            same_line: Require the value to be on the same line as the label
+            gap: If given, the only characters allowed between the label and the value
+            start: Offset in the text to start looking for the label
+            end: Offset in the text to stop looking
+        
+        Returns:
+            The value after the first label occurrence that has one, or None
+        """
+        end = len(self.text) if end is None else end
+        for match in label_pattern(label).finditer(self.text, start, end):
+            entry = self.value_at_label(match.end(), kinds, within, same_line, end)
+            if entry is None:
+                continue
+            if gap is not None and self.text[match.end():entry.start].strip(gap):
+                continue
+            return entry
+        return None
+    
+    def value_at_label(self, label_end: int, kinds: Optional[Iterable[ValueKind]] = (ValueKind.AMOUNT,),
+                       within: Optional[int] = None, same_line: bool = True,
+                       end: Optional[int] = None) -> Optional[ValueEntry]:
+        """Get the first value after a label that ends at label_end, within the given limits."""
+        limit = len(self.text) if end is None else end
+        if same_line:
+            limit = min(limit, self.line_end(label_end))
+        if within is not None:
+            limit = min(limit, label_end + within + 1)
+        return self.first_after(label_end, limit, kinds)
+    
+    def _kind_codes(self, kinds: Optional[Iterable[ValueKind]]) -> Optional[set]:
+        """Convert kinds to the codes stored in the index."""
+        return None if kinds is None else {_KIND_CODES[kind] for kind in kinds}
\ No newline at end of file
@@ -1,88 +1,169 @@
 import pdfplumber
 import PyPDF2
-from typing import Optional
+from typing import Iterator, List, Optional, Union
+from pathlib import Path
+import io
 import os
+import threading
+
+# pdfium (optional - installed with pdfplumber); renders pages for OCR without temporary files
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
 
 # OCR imports (optional - only used if needed)
 try:
     import pytesseract
-    from pdf2image import convert_from_path
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
 
+try:
+    from pdf2image import convert_from_bytes, convert_from_path
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    PDF2IMAGE_AVAILABLE = False
+
+# Scanned pages are rendered by pdfium, or by poppler through pdf2image without it
+OCR_AVAILABLE = OCR_AVAILABLE and (PDFIUM_AVAILABLE or PDF2IMAGE_AVAILABLE)
+
+# pdfium is not thread-safe, so documents are read one at a time
+pdfium_lock = threading.Lock()
+
+# A PDF given by its path, or by its content held in memory
+PdfSource = Union[str, Path, bytes]
+
+
+def pdf_input(source: PdfSource):
+    """
+    File argument for pdfplumber.open or PyPDF2.PdfReader.
+    
+    Args:
+        source: Path to the PDF file, or its content
+        
+    Returns:
+        The path, or a stream over the content; each call gets its own stream position
+    """
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return source
+
 
-def extract_text(path: str) -> str:
+def extract_text(path: PdfSource) -> str:
     """
     Extract text from PDF using pdfplumber as primary method,
     with PyPDF2 as fallback.
     
     Args:
-        path: Path to the PDF file
+        path: Path to the PDF file, or its content
         
     Returns:
         Extracted text content as string
         
+    Raises:
+        Exception: If PDF cannot be processed
+    """
+    return "\n".join(page_text for page_text in extract_pages(path) if page_text)
+
+
+def extract_pages(path: PdfSource) -> List[str]:
+    """
+    Extract text from each page of a PDF, using the same fallbacks as extract_text.
+    
+    Args:
+        path: Path to the PDF file, or its content
+        
+    Returns:
+        Text of each page in order; pages without text are empty strings
+        
     Raises:
         Exception: If PDF cannot be processed
     """
     try:
         # Primary method: pdfplumber (better for tables and complex layouts)
-        with pdfplumber.open(path) as pdf:
-            text_content = []
-            
-            for page in pdf.pages:
-                # Extract text
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
-                
-                # Extract tables and convert to text
-                tables = page.extract_tables()
-                for table in tables:
-                    if table:
-                        for row in table:
-                            if row:
-                                row_text = " | ".join([cell or "" for cell in row])
-                                text_content.append(row_text)
-            
-            return "\n".join(text_content)
+        with pdfplumber.open(pdf_input(path)) as pdf:
+            return [page_content(page) for page in pdf.pages]
             
     except Exception as e:
         # Fallback method: PyPDF2
         try:
-            with open(path, 'rb') as file:
+            with open(path, 'rb') if not isinstance(path, bytes) else io.BytesIO(path) as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text_content = []
+                pages = []
                 
                 for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
+                    pages.append(page.extract_text() or "")
                 
-                return "\n".join(text_content)
+                return pages
                 
         except Exception as fallback_error:
             # Final fallback: OCR for scanned PDFs
             if OCR_AVAILABLE:
                 try:
-                    return extract_text_ocr(path)
+                    return extract_pages_ocr(path)
                 except Exception as ocr_error:
                     raise Exception(f"Failed to extract text from PDF. Primary error: {e}, PyPDF2 error: {fallback_error}, OCR error: {ocr_error}")
             else:
                 raise Exception(f"Failed to extract text from PDF. Primary error: {e}, Fallback error: {fallback_error}. For scanned PDFs, install OCR dependencies: pip install pytesseract pdf2image")
 
 
-def extract_text_ocr(path: str) -> str:
+def page_content(page) -> str:
+    """
+    Text of one pdfplumber page followed by the rows of its tables.
+    
+    Args:
+        page: pdfplumber page, or a PageContext sharing its layout with the document parsers
+        
+    Returns:
+        Page text and table rows, one per line, with cells separated by " | "
+    """
+    text_content = []
+    
+    # Extract text
+    page_text = page.extract_text()
+    if page_text:
+        text_content.append(page_text)
+    
+    # Extract tables and convert to text
+    tables = page.extract_tables()
+    for table in tables:
+        if table:
+            for row in table:
+                if row:
+                    row_text = " | ".join([cell or "" for cell in row])
+                    text_content.append(row_text)
+    
+    return "\n".join(text_content)
+
+
+def extract_text_ocr(path: PdfSource) -> str:
     """
     Extract text from scanned PDF using OCR (Tesseract).
     
     Args:
-        path: Path to the PDF file
+        path: Path to the PDF file, or its content
         
     Returns:
         Extracted text content as string
         
+    Raises:
+        Exception: If OCR processing fails
+    """
+    return "\n".join(page_text for page_text in extract_pages_ocr(path) if page_text)
+
+
+def extract_pages_ocr(path: PdfSource) -> List[str]:
+    """
+    Extract text from each page of a scanned PDF using OCR (Tesseract).
+    
+    Args:
+        path: Path to the PDF file, or its content
+        
+    Returns:
+        Text of each processed page in order; pages without text are empty strings
+        
     Raises:
         Exception: If OCR processing fails
     """
@@ -90,44 +171,82 @@ def extract_text_ocr(path: str) -> str:
         raise Exception("OCR dependencies not available. Install with: pip install pytesseract pdf2image")
     
     try:
-        # Convert PDF pages to images with lower DPI for faster processing
-        print(f"Converting PDF to images for OCR: {path}")
-        images = convert_from_path(path, dpi=150, first_page=1, last_page=10)  # Limit pages and lower DPI
+        # Render PDF pages to images with lower DPI for faster processing
+        print(f"Converting PDF to images for OCR: {path if not isinstance(path, bytes) else 'in-memory upload'}")
+        images = render_pages(path, dpi=150, last_page=5)  # Limit pages and lower DPI
         
-        text_content = []
+        pages = []
         for i, image in enumerate(images):
-            print(f"Processing page {i+1}/{len(images)} with OCR...")
+            print(f"Processing page {i+1} with OCR...")
             
             # Extract text from image using Tesseract with faster config
             page_text = pytesseract.image_to_string(image, config='--psm 6 -c tessedit_do_invert=0')
-            if page_text.strip():
-                text_content.append(page_text)
+            pages.append(page_text if page_text.strip() else "")
             
             # Limit total processing time
             if i >= 4:  # Process max 5 pages to avoid timeout
                 print(f"Limiting OCR to first 5 pages for performance")
                 break
         
-        result = "\n".join(text_content)
-        print(f"OCR completed. Extracted {len(result)} characters.")
-        return result
+        print(f"OCR completed. Extracted {sum(len(page_text) for page_text in pages)} characters.")
+        return pages
         
     except Exception as e:
         raise Exception(f"OCR processing failed: {e}")
 
 
-def extract_tables(path: str) -> list:
+def render_pages(path: PdfSource, dpi: int = 150, last_page: Optional[int] = None) -> Iterator:
+    """
+    Render the pages of a PDF to images, one at a time.
+    
+    pdfium renders in memory; pdf2image, used when pdfium is not installed,
+    goes through poppler and its temporary files.
+    
+    Args:
+        path: Path to the PDF file, or its content
+        dpi: Rendering resolution
+        last_page: Last page to render (1-based), or None for all pages
+        
+    Returns:
+        PIL images of the pages in order
+    """
+    if not PDFIUM_AVAILABLE:
+        if isinstance(path, bytes):
+            yield from convert_from_bytes(path, dpi=dpi, first_page=1, last_page=last_page)
+        else:
+            yield from convert_from_path(path, dpi=dpi, first_page=1, last_page=last_page)
+        return
+    
+    # Each page is rendered under the lock and released before it is OCRed
+    with pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        page_count = len(pdf)
+    try:
+        for index in range(min(page_count, last_page or page_count)):
+            with pdfium_lock:
+                page = pdf[index]
+                try:
+                    image = page.render(scale=dpi / 72).to_pil()
+                finally:
+                    page.close()
+            yield image
+    finally:
+        with pdfium_lock:
+            pdf.close()
+
+
+def extract_tables(path: PdfSource) -> list:
     """
     Extract tables from PDF using pdfplumber.
     
     Args:
-        path: Path to the PDF file
+        path: Path to the PDF file, or its content
         
     Returns:
         List of tables, where each table is a list of rows
     """
     try:
-        with pdfplumber.open(path) as pdf:
+        with pdfplumber.open(pdf_input(path)) as pdf:
             all_tables = []
             
             for page in pdf.pages:
@@ -1,16 +1,29 @@
 """Rule handlers for different types of fraud detection rules."""
 
 from .base_rule import BaseRuleHandler
+from .matcher import DocumentMatcher
+from .time_budget import TimeBudget, RuleTimeoutError
 from .numeric_rules import NumericThresholdHandler
 from .regex_rules import RegexPresenceHandler, RegexAbsenceHandler
 from .compound_rules import CompoundRuleHandler
 from .context_rules import ContextComparisonHandler
+from .field_rules import FieldRuleHandler, LineItemMatchHandler
+from .value_rules import ValueThresholdHandler
+from .derived_values import ValueGraph, ValueDefinition
 
 __all__ = [
     'BaseRuleHandler',
+    'DocumentMatcher',
+    'TimeBudget',
+    'RuleTimeoutError',
     'NumericThresholdHandler',
     'RegexPresenceHandler', 
     'RegexAbsenceHandler',
     'CompoundRuleHandler',
-    'ContextComparisonHandler'
+    'ContextComparisonHandler',
+    'FieldRuleHandler',
+    'LineItemMatchHandler',
+    'ValueThresholdHandler',
+    'ValueGraph',
+    'ValueDefinition'
 ]
\ No newline at end of file
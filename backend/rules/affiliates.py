@@ -0,0 +1,268 @@
+"""Fuzzy company-name index of builders and the service providers they control."""
+
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import yaml
+
+
+# Directory of rules-config.yaml; relative affiliates paths resolve against it, not the working directory
+CONFIG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Data file of known affiliations, next to rules-config.yaml
+DEFAULT_AFFILIATES_PATH = os.path.join(CONFIG_DIR, "affiliates.yaml")
+
+# Role of the company a group is named after
+BUILDER_ROLE = 'builder'
+
+# Legal suffixes dropped from names before matching
+LEGAL_SUFFIXES = frozenset({
+    'LLC', 'LLP', 'LP', 'LTD', 'INC', 'INCORPORATED', 'CORP', 'CORPORATION', 'CO', 'COMPANY', 'PLLC', 'PC', 'NA'
+})
+
+# Words many unrelated companies share; they count toward similarity but never identify a company
+GENERIC_WORDS = frozenset({
+    'THE', 'OF', 'AND', 'TO', 'FOR', 'A', 'AN', 'AT', 'BY', 'DBA',
+    'HOME', 'HOMES', 'BUILDER', 'BUILDERS', 'HOMEBUILDERS', 'CONSTRUCTION', 'COMMUNITIES', 'COMPLETE',
+    'MORTGAGE', 'LENDING', 'LOANS', 'HOMELOANS', 'FINANCIAL', 'FINANCE', 'FUNDING', 'BANK', 'CREDIT',
+    'TITLE', 'ESCROW', 'SETTLEMENT', 'CLOSING', 'ABSTRACT', 'GUARANTY', 'TRUST',
+    'INSURANCE', 'ASSURANCE', 'AGENCY', 'SERVICES', 'SERVICE', 'SOLUTIONS', 'GROUP', 'HOLDINGS',
+    'PARTNERS', 'RESIDENTIAL', 'NATIONAL', 'AMERICAN', 'FIRST', 'UNITED', 'FEE', 'FEES'
+})
+
+_WORD_PATTERN = re.compile(r'[A-Z0-9]+')
+
+
+def normalize_company(name: str) -> str:
+    """Normalize a company name: uppercase words, without punctuation or legal suffixes."""
+    name = name.upper().replace('&', ' AND ')
+    # Join dotted and slashed initials ("D.R.", "M/I") into one word
+    name = re.sub(r'(?<=\b[A-Z])[./](?=[A-Z]\b)', '', name)
+    words = _WORD_PATTERN.findall(name.replace('.', ''))
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def distinctive_tokens(normalized: str) -> FrozenSet[str]:
+    """Words of a normalized name that identify a company rather than its industry."""
+    return frozenset(word for word in normalized.split() if word not in GENERIC_WORDS and word not in LEGAL_SUFFIXES)
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized name, padded so word boundaries count."""
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class Company:
+    """A known company name and the affiliation group it belongs to."""
+    
+    name: str
+    group: str
+    role: str
+    normalized: str
+    tokens: FrozenSet[str]
+    grams: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class AffiliateMatch:
+    """A name found in the index, with how similar it was to the company's name."""
+    
+    company: Company
+    score: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format for API responses."""
+        return {
+            'name': self.company.name,
+            'group': self.company.group,
+            'role': self.company.role,
+            'score': self.score
+        }
+
+
+class AffiliateIndex:
+    """
+    Inverted index of known company names for fuzzy lookups.
+    
+    Names are indexed by their distinctive words and their character trigrams.
+    A lookup only scores the companies sharing a distinctive word or a rare
+    trigram with the name, so its cost does not grow with the number of
+    companies. A company matches when every distinctive word of its name
+    appears in the looked-up name, or when their trigram sets are similar
+    enough and share a distinctive word.
+    """
+    
+    # Trigrams in more than this share of names (e.g. " MO" of MORTGAGE) do not select candidates
+    COMMON_TRIGRAM_SHARE = 0.05
+    # Candidates scored exactly per lookup, best trigram overlap first
+    MAX_CANDIDATES = 32
+    # Looked-up names remembered before the cache is cleared
+    CACHE_SIZE = 4096
+    
+    def __init__(self, companies: List[Company], min_similarity: float = 0.75):
+        """
+        Build the index.
+        
+        Args:
+            companies: Known companies
+            min_similarity: Lowest trigram Dice similarity accepted as a match
+        """
+        self.companies = companies
+        self.min_similarity = min_similarity
+        self.groups: Dict[str, List[Company]] = {}
+        self._by_token: Dict[str, List[int]] = {}
+        self._by_gram: Dict[str, List[int]] = {}
+        self._cache: Dict[str, Optional[AffiliateMatch]] = {}
+        self._lock = threading.Lock()
+        
+        for position, company in enumerate(companies):
+            self.groups.setdefault(company.group, []).append(company)
+            for token in company.tokens:
+                self._by_token.setdefault(token, []).append(position)
+            for gram in company.grams:
+                self._by_gram.setdefault(gram, []).append(position)
+        self._common_limit = max(8, int(len(companies) * self.COMMON_TRIGRAM_SHARE))
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], min_similarity: float = 0.75) -> 'AffiliateIndex':
+        """
+        Build the index from affiliation data.
+        
+        Args:
+            data: Mapping with a 'groups' list; each group has a 'name' and lists
+                company names under role keys such as builder, mortgage, title and insurance
+            min_similarity: Lowest trigram Dice similarity accepted as a match
+        """
+        companies = []
+        seen: Set[Tuple[str, str]] = set()
+        for group in (data or {}).get('groups') or []:
+            group_name = str(group.get('name', ''))
+            for role, names in group.items():
+                if role == 'name' or not names:
+                    continue
+                for name in names if isinstance(names, list) else [names]:
+                    normalized = normalize_company(str(name))
+                    if not normalized or (group_name, normalized) in seen:
+                        continue
+                    seen.add((group_name, normalized))
+                    companies.append(Company(
+                        name=str(name),
+                        group=group_name,
+                        role=str(role),
+                        normalized=normalized,
+                        tokens=distinctive_tokens(normalized),
+                        grams=trigrams(normalized)
+                    ))
+        return cls(companies, min_similarity)
+    
+    @classmethod
+    def load(cls, path: str, min_similarity: float = 0.75) -> 'AffiliateIndex':
+        """Load the index from a YAML data file."""
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls.from_dict(yaml.safe_load(file), min_similarity)
+    
+    def __len__(self) -> int:
+        return len(self.companies)
+    
+    def lookup(self, name: str) -> Optional[AffiliateMatch]:
+        """
+        Find the known company a name refers to.
+        
+        Args:
+            name: Company name as printed in the document, e.g. a line item vendor
+        
+        Returns:
+            The best match, or None if no known company is similar enough
+        """
+        normalized = normalize_company(name)
+        if not normalized:
+            return None
+        with self._lock:
+            if normalized in self._cache:
+                return self._cache[normalized]
+        
+        match = self._find(normalized)
+        with self._lock:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[normalized] = match
+        return match
+    
+    def _find(self, normalized: str) -> Optional[AffiliateMatch]:
+        """Score the companies sharing a distinctive word or a rare trigram with a name."""
+        tokens = distinctive_tokens(normalized)
+        if not tokens:
+            return None
+        grams = trigrams(normalized)
+        
+        candidates: Counter = Counter()
+        for token in tokens:
+            for position in self._by_token.get(token, ()):
+                candidates.setdefault(position, 0)  # Scored even without a shared rare trigram
+        for gram in grams:
+            postings = self._by_gram.get(gram, ())
+            if len(postings) <= self._common_limit:
+                for position in postings:
+                    candidates[position] += 1
+        
+        best: Optional[AffiliateMatch] = None
+        best_dice = 0.0
+        for position, _ in candidates.most_common(self.MAX_CANDIDATES):
+            company = self.companies[position]
+            if not company.tokens & tokens:
+                continue
+            dice = 2 * len(company.grams & grams) / (len(company.grams) + len(grams))
+            contained = company.tokens <= tokens
+            if dice < self.min_similarity and not contained:
+                continue
+            # Full containment ranks above partial overlap; trigram similarity breaks ties
+            score = 1.0 if contained else dice
+            if best is None or (score, dice) > (best.score, best_dice):
+                best = AffiliateMatch(company=company, score=round(score, 4))
+                best_dice = dice
+        
+        return best
+
+
+_indexes: Dict[str, Tuple[float, AffiliateIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def resolve_affiliates_path(path: str) -> str:
+    """Absolute path of an affiliations file, relative paths taken from the rules configuration directory."""
+    return os.path.join(CONFIG_DIR, os.path.expanduser(path))
+
+
+def load_affiliate_index(path: str = DEFAULT_AFFILIATES_PATH) -> Optional[AffiliateIndex]:
+    """
+    Get the index of an affiliations file, reloading it only when the file changes.
+    
+    Args:
+        path: Affiliations file, relative to the rules configuration directory unless absolute
+    
+    Returns:
+        The index, or None if the file does not exist
+    """
+    path = resolve_affiliates_path(path)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    
+    index = AffiliateIndex.load(path)
+    with _indexes_lock:
+        _indexes[path] = (mtime, index)
+    return index
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Literal anchor extraction used to skip patterns that cannot match a document."""
+
+import re
+from typing import FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+# Shorter literals are too common to filter anything out
+MIN_ANCHOR_LENGTH = 3
+
+# A clause is satisfied when any one of its literals is present
+AnchorClause = FrozenSet[str]
+
+# Non-ASCII characters that IGNORECASE matching treats as ASCII letters
+_IGNORECASE_FOLDS = str.maketrans({'ı': 'i', 'İ': 'i', 'ſ': 's', 'K': 'k'})
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None))
+
+
+def normalize_text(text: str) -> str:
+    """Casefold document text the same way anchors are normalized."""
+    if not text.isascii():
+        text = text.translate(_IGNORECASE_FOLDS)
+    return text.casefold()
+
+
+def extract_anchors(pattern: str, flags: int = 0) -> List[AnchorClause]:
+    """
+    Extract the literal substrings every match of a pattern must contain.
+    
+    Args:
+        pattern: Regex pattern
+        flags: Regex flags the pattern is compiled with
+    
+    Returns:
+        Clauses that must all be satisfied; each clause lists alternative literals.
+        An empty list means the pattern cannot be prefiltered.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return []
+    
+    _, clauses = _analyze(parsed)
+    
+    unique = []
+    for clause in clauses:
+        clause = _reduce_clause(clause)
+        if clause not in unique:
+            unique.append(clause)
+    return unique
+
+
+def find_literals(normalized_text: str, literals: Iterable[str]) -> Set[str]:
+    """
+    Find which literals occur in normalized document text.
+    
+    Literals are checked longest first so that any literal contained in one
+    already found is marked present without searching the text again.
+    """
+    present: Set[str] = set()
+    for literal in sorted(set(literals), key=len, reverse=True):
+        if any(literal in found for found in present) or literal in normalized_text:
+            present.add(literal)
+    return present
+
+
+def clauses_satisfied(clauses: List[AnchorClause], present: Set[str]) -> bool:
+    """Check that every clause has at least one literal present."""
+    return all(not clause.isdisjoint(present) for clause in clauses)
+
+
+def _reduce_clause(clause: AnchorClause) -> AnchorClause:
+    """Drop literals that contain another literal of the same clause - the shorter one is implied."""
+    return frozenset(
+        literal for literal in clause
+        if not any(other != literal and other in literal for other in clause)
+    )
+
+
+def _analyze(items) -> Tuple[Optional[str], List[AnchorClause]]:
+    """
+    Analyze a parsed pattern sequence.
+    
+    Returns:
+        Tuple of (literal the sequence matches exactly or None, required clauses)
+    """
+    clauses: List[AnchorClause] = []
+    run: List[str] = []
+    exact = True
+    
+    def flush():
+        if len(run) >= MIN_ANCHOR_LENGTH:
+            clauses.append(frozenset([''.join(run).casefold()]))
+        run.clear()
+    
+    for op, av in items:
+        sub_clauses: List[AnchorClause] = []
+        
+        if op is sre_constants.LITERAL:
+            char = chr(av)
+            if char.isascii():
+                run.append(char)
+                continue
+        elif op is sre_constants.AT:
+            # Zero-width assertions keep the surrounding literals contiguous
+            continue
+        elif op is sre_constants.SUBPATTERN or op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            sub_exact, sub_clauses = _analyze(av[-1] if op is sre_constants.SUBPATTERN else av)
+            if sub_exact is not None:
+                run.extend(sub_exact)
+                continue
+        elif op in _REPEATS:
+            min_count, max_count, sub = av
+            if min_count >= 1:
+                sub_exact, sub_clauses = _analyze(sub)
+                if sub_exact is not None and min_count == max_count == 1:
+                    run.extend(sub_exact)
+                    continue
+        elif op is sre_constants.BRANCH:
+            sub_clauses = _analyze_branch(av[1])
+        
+        # Anything else consumes unknown text and breaks the literal run
+        exact = False
+        flush()
+        clauses.extend(sub_clauses)
+    
+    if exact:
+        literal = ''.join(run)
+        flush()
+        return literal, clauses
+    
+    flush()
+    return None, clauses
+
+
+def _analyze_branch(alternatives) -> List[AnchorClause]:
+    """Build one clause for an alternation from the most selective clause of each branch."""
+    combined: Set[str] = set()
+    
+    for alternative in alternatives:
+        alt_exact, alt_clauses = _analyze(alternative)
+        candidates = list(alt_clauses)
+        if alt_exact is not None and len(alt_exact) >= MIN_ANCHOR_LENGTH:
+            candidates.append(frozenset([alt_exact.casefold()]))
+        if not candidates:
+            return []  # This branch can match without any literal
+        
+        best = max(candidates, key=lambda clause: min(len(literal) for literal in clause))
+        combined.update(best)
+    
+    return [frozenset(combined)] if combined else []
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""Static detection of regex constructs prone to catastrophic backtracking."""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+_BACKTRACKING_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+# Character set categories that match line breaks along with almost everything else
+_BROAD_CATEGORIES = (sre_constants.CATEGORY_NOT_DIGIT, sre_constants.CATEGORY_NOT_WORD)
+_COMPLEMENTARY_CATEGORIES = (
+    (sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_SPACE),
+    (sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_NOT_DIGIT),
+    (sre_constants.CATEGORY_WORD, sre_constants.CATEGORY_NOT_WORD)
+)
+
+
+@dataclass
+class BacktrackingRisk:
+    """A construct that makes matching time grow faster than linearly with document length."""
+    
+    description: str
+    exponential: bool = False
+    
+    def __str__(self) -> str:
+        return self.description
+
+
+def find_backtracking_risks(pattern: str, flags: int = 0) -> List[BacktrackingRisk]:
+    """
+    Find constructs that make a pattern's running time grow faster than linearly.
+    
+    Args:
+        pattern: Regex pattern
+        flags: Regex flags the pattern is compiled with
+    
+    Returns:
+        Risks found; empty if the pattern looks safe
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return []
+    
+    risks: List[BacktrackingRisk] = []
+    wildcards = _scan(parsed, bool(flags & re.DOTALL), risks)
+    
+    if wildcards:
+        risks.append(BacktrackingRisk(
+            f"{wildcards} unbounded wildcard(s) can span line breaks, so a failed match can "
+            f"rescan the rest of the document (worst case O(n^{wildcards + 1}))"
+        ))
+    return risks
+
+
+def _scan(items, dotall: bool, risks: List[BacktrackingRisk]) -> int:
+    """
+    Walk a parsed pattern sequence, recording nested quantifiers.
+    
+    Returns:
+        Largest number of line-spanning wildcards one match attempt passes through
+    """
+    wildcards = 0
+    
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            sub_dotall = (dotall or bool(add_flags & re.DOTALL)) and not del_flags & re.DOTALL
+            wildcards += _scan(sub, sub_dotall, risks)
+        elif op is sre_constants.BRANCH:
+            wildcards += max((_scan(alternative, dotall, risks) for alternative in av[1]), default=0)
+        elif op in _BACKTRACKING_REPEATS:
+            min_count, max_count, sub = av
+            unbounded = max_count == sre_constants.MAXREPEAT
+            if max_count > 1 and _has_unbounded_repeat(sub):
+                risks.append(BacktrackingRisk(
+                    f"nested quantifier '{_quantifier_text(min_count, max_count)}' around an "
+                    f"unbounded repeat can backtrack exponentially",
+                    exponential=True
+                ))
+                continue
+            if unbounded and len(sub) == 1 and _spans_lines(sub[0], dotall):
+                wildcards += 1
+            else:
+                wildcards += _scan(sub, dotall, risks)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _scan(av[1], dotall, risks)
+    
+    return wildcards
+
+
+def _has_unbounded_repeat(items) -> bool:
+    """Check if a parsed sequence contains a repeat without an upper bound."""
+    for op, av in items:
+        if op in _BACKTRACKING_REPEATS:
+            if av[1] == sre_constants.MAXREPEAT or _has_unbounded_repeat(av[2]):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _has_unbounded_repeat(av[-1]):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_has_unbounded_repeat(alternative) for alternative in av[1]):
+                return True
+    return False
+
+
+def _spans_lines(item, dotall: bool) -> bool:
+    """Check if a single parsed item matches line breaks as well as ordinary text."""
+    op, av = item
+    if op is sre_constants.ANY:
+        return dotall
+    if op is sre_constants.NOT_LITERAL:
+        return av != ord('\n')
+    if op is not sre_constants.IN:
+        return False
+    
+    if av and av[0][0] is sre_constants.NEGATE:
+        return (sre_constants.LITERAL, ord('\n')) not in av
+    
+    categories = {value for set_op, value in av if set_op is sre_constants.CATEGORY}
+    if categories.intersection(_BROAD_CATEGORIES):
+        return True
+    return any(first in categories and second in categories for first, second in _COMPLEMENTARY_CATEGORIES)
+
+
+def _quantifier_text(min_count: int, max_count: int) -> str:
+    """Render repeat bounds the way they would be written in a pattern."""
+    if max_count == sre_constants.MAXREPEAT:
+        return {0: '*', 1: '+'}.get(min_count, f'{{{min_count},}}')
+    return f'{{{min_count},{max_count}}}'
\ No newline at end of file
@@ -1,9 +1,10 @@
 """Base rule handler for all rule types."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
-from models.core import Rule, Flag, UserContext
+from models.core import Rule, Flag, UserContext, compile_template
+from .matcher import DocumentMatcher
 
 
 class BaseRuleHandler(ABC):
@@ -18,10 +19,86 @@ class BaseRuleHandler(ABC):
         pass
     
     @abstractmethod
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
         """Process a rule against text and return any flags."""
         pass
     
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield flags lazily; handlers that scan many matches override this to stop early."""
+        yield from self.process_rule(rule, text, context, matcher=matcher)
+    
+    def first_flag(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Optional[Flag]:
+        """Get only the first flag for a rule, without building flags for later matches."""
+        return next(self.iter_flags(rule, text, context, matcher=matcher), None)
+    
+    def splits_scope(self, rule: Rule) -> bool:
+        """
+        Check if a scoped rule is evaluated against each span of its scope separately.
+        
+        Handlers looking for a single match override this so matches cannot run across
+        section boundaries. Otherwise the spans are joined, so that rules combining
+        several facts (or checking for absence) see the whole scope at once.
+        """
+        return False
+    
+    def uses_context(self, rule: Rule) -> bool:
+        """Check if the rule's result depends on the user context passed to process_rule."""
+        return False
+    
+    def requires_document(self, rule: Rule) -> bool:
+        """Check if the rule reads the parsed document (matcher.document) instead of the text."""
+        return False
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check rule configuration when the plan is compiled, returning any errors."""
+        return []
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the (pattern, flags) pairs this handler searches for a rule, for pre-compilation."""
+        return []
+    
+    def get_value_names(self, rule: Rule) -> List[str]:
+        """List the named values from the configuration's 'values' section a rule reads."""
+        return []
+    
+    def get_matcher(self, text: str, matcher: Optional[DocumentMatcher] = None) -> DocumentMatcher:
+        """Use the engine's document matcher, or create one when called standalone."""
+        return matcher if matcher is not None else DocumentMatcher(text)
+    
+    def create_flag(self, rule: Rule, message: str, snippet: str) -> Flag:
+        """Create a flag using the rule's pre-resolved severity when available."""
+        return Flag(
+            rule=rule.name,
+            message=message,
+            snippet=snippet,
+            severity=rule.severity
+        )
+    
+    def evaluate_condition(self, value: float, threshold: float, operator: Optional[str] = None) -> bool:
+        """
+        Evaluate a threshold condition shared by every threshold rule type.
+        
+        A missing or unknown operator means greater than, so rules may leave it out.
+        """
+        if operator == '<':
+            return value < threshold
+        elif operator == '>=':
+            return value >= threshold
+        elif operator == '<=':
+            return value <= threshold
+        elif operator == '==':
+            return value == threshold
+        else:
+            return value > threshold
+    
+    def render_message(self, rule: Rule, **values) -> str:
+        """Render the rule's message template, compiled with the rule plan."""
+        template = rule.message_template or compile_template(rule.message)
+        return template.render(**values)
+    
     def extract_snippet(self, text: str, start_pos: int, end_pos: int, context_chars: int = 50) -> str:
         """Extract a snippet of text around a match."""
         start = max(0, start_pos - context_chars)
@@ -29,17 +106,5 @@ class BaseRuleHandler(ABC):
         return text[start:end].strip()
     
     def format_message(self, message: str, **kwargs) -> str:
-        """Format message with provided values."""
-        formatted = message
-        for key, value in kwargs.items():
-            placeholder = f"{{{key}}}"
-            dollar_placeholder = f"${{{key}}}"
-            
-            # Handle both {value} and ${value} formats
-            if isinstance(value, (int, float)):
-                formatted = formatted.replace(placeholder, str(value))
-                formatted = formatted.replace(dollar_placeholder, f"${value}")
-            else:
-                formatted = formatted.replace(placeholder, str(value))
-        
-        return formatted
\ No newline at end of file
+        """Format message with provided values, handling both {value} and ${value} placeholders."""
+        return compile_template(message).render(**kwargs)
\ No newline at end of file
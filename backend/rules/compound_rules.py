@@ -1,20 +1,43 @@
 """Compound rule handlers for complex logic."""
 
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from models.core import Rule, RuleType, Flag, UserContext
 from .base_rule import BaseRuleHandler
+from .matcher import DocumentMatcher
+from .affiliates import (
+    AffiliateIndex, BUILDER_ROLE, DEFAULT_AFFILIATES_PATH, load_affiliate_index, resolve_affiliates_path,
+    normalize_company, distinctive_tokens
+)
+
+# (rule, affiliates file) pairs already warned about a missing index
+_missing_index_warned = set()
 
 
 class CompoundRuleHandler(BaseRuleHandler):
-    """Handler for compound rules that combine multiple conditions."""
+    """
+    Handler for compound rules that combine multiple conditions.
+    
+    A condition with a `value` compares that named value from the configuration's
+    'values' section against its `threshold`, instead of searching its `pattern`
+    (kept for the legacy engine). The message may use each such condition's
+    `value_name`, or the value's name.
+    """
     
     def can_handle(self, rule: Rule) -> bool:
         """Check if this handler can process the given rule."""
         return rule.rule_type == RuleType.COMPOUND_RULE
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
+    # Regex flags used for each condition type
+    CONDITION_FLAGS = {
+        'regex_presence': re.IGNORECASE | re.DOTALL,
+        'regex_absence': re.IGNORECASE,
+        'numeric_threshold': re.IGNORECASE
+    }
+    
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
         """Process compound rule with multiple conditions."""
         conditions = rule.config.get('conditions', [])
         logic = rule.config.get('logic', 'AND')  # AND or OR
@@ -22,12 +45,23 @@ class CompoundRuleHandler(BaseRuleHandler):
         if not conditions:
             return []
         
+        matcher = self.get_matcher(text, matcher)
         condition_results = []
         match_info = None
+        values = {}
         
         # Evaluate each condition
         for condition in conditions:
-            result, info = self._evaluate_condition(condition, text)
+            if condition.get('value'):
+                value = matcher.named_value(condition['value'])
+                result = value is not None and self.evaluate_condition(
+                    value, condition.get('threshold', 0), condition.get('operator'))
+                if value is not None:
+                    values[condition.get('value_name', condition['value'])] = value
+                condition_results.append(result)
+                continue
+            
+            result, info = self._check_condition(condition, matcher)
             condition_results.append(result)
             
             # Store match info from the first successful condition for snippet
@@ -44,90 +78,102 @@ class CompoundRuleHandler(BaseRuleHandler):
             snippet = 'Multiple conditions met'
             if match_info:
                 snippet = self.extract_snippet(text, match_info['start'], match_info['end'])
+            elif values:
+                snippet = f"{snippet}: {', '.join(f'{name}={value}' for name, value in values.items())}"
             
-            return [Flag(
-                rule=rule.name,
-                message=rule.message,
-                snippet=snippet
-            )]
+            return [self.create_flag(rule, self.render_message(rule, **values), snippet)]
         
         return []
     
-    def _evaluate_condition(self, condition: Dict[str, Any], text: str) -> tuple:
+    def get_value_names(self, rule: Rule) -> List[str]:
+        """The rule reads the named values of its value conditions."""
+        return [str(condition['value']) for condition in rule.config.get('conditions', []) if condition.get('value')]
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the patterns of all evaluable conditions."""
+        patterns = []
+        for condition in rule.config.get('conditions', []):
+            flags = self.CONDITION_FLAGS.get(condition.get('type', ''))
+            if flags is not None and condition.get('pattern'):
+                patterns.append((condition['pattern'], flags))
+        return patterns
+    
+    def _check_condition(self, condition: Dict[str, Any], matcher: DocumentMatcher) -> tuple:
         """Evaluate a single condition."""
         condition_type = condition.get('type', '')
         
         if condition_type == 'regex_presence':
-            return self._check_regex_presence(condition, text)
+            return self._check_regex_presence(condition, matcher)
         elif condition_type == 'regex_absence':
-            return self._check_regex_absence(condition, text)
+            return self._check_regex_absence(condition, matcher)
         elif condition_type == 'numeric_threshold':
-            return self._check_numeric_threshold(condition, text)
+            return self._check_numeric_threshold(condition, matcher)
         else:
             return False, None
     
-    def _check_regex_presence(self, condition: Dict[str, Any], text: str) -> tuple:
+    def _check_regex_presence(self, condition: Dict[str, Any], matcher: DocumentMatcher) -> tuple:
         """Check if regex pattern is present."""
         pattern = condition.get('pattern', '')
-        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        match = matcher.search(pattern, self.CONDITION_FLAGS['regex_presence'])
         
         if match:
             return True, {'start': match.start(), 'end': match.end()}
         return False, None
     
-    def _check_regex_absence(self, condition: Dict[str, Any], text: str) -> tuple:
+    def _check_regex_absence(self, condition: Dict[str, Any], matcher: DocumentMatcher) -> tuple:
         """Check if regex pattern is absent."""
         pattern = condition.get('pattern', '')
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = matcher.search(pattern, self.CONDITION_FLAGS['regex_absence'])
         
         # Return True if pattern is NOT found
         return not bool(match), None
     
-    def _check_numeric_threshold(self, condition: Dict[str, Any], text: str) -> tuple:
+    def _check_numeric_threshold(self, condition: Dict[str, Any], matcher: DocumentMatcher) -> tuple:
         """Check numeric threshold condition."""
         pattern = condition.get('pattern', '')
         threshold = condition.get('threshold', 0)
-        operator = condition.get('operator', '>')
+        operator = condition.get('operator')
         
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = matcher.search(pattern, self.CONDITION_FLAGS['numeric_threshold'])
         if match:
             try:
                 value_str = match.group(1).replace(',', '')
                 value = float(value_str)
                 
-                condition_met = self._evaluate_numeric_condition(value, threshold, operator)
+                condition_met = self.evaluate_condition(value, threshold, operator)
                 if condition_met:
                     return True, {'start': match.start(), 'end': match.end()}
             except (ValueError, IndexError):
                 pass
         
         return False, None
-    
-    def _evaluate_numeric_condition(self, value: float, threshold: float, operator: str) -> bool:
-        """Evaluate numeric condition."""
-        if operator == '>':
-            return value > threshold
-        elif operator == '<':
-            return value < threshold
-        elif operator == '>=':
-            return value >= threshold
-        elif operator == '<=':
-            return value <= threshold
-        elif operator == '==':
-            return value == threshold
-        else:
-            return value > threshold
 
 
 class CrossReferencePatternHandler(BaseRuleHandler):
-    """Handler for cross-reference pattern rules."""
+    """
+    Handler for cross-reference pattern rules.
+    
+    With `reference_pattern`, flags documents matching both it and `primary_pattern`.
+    With `secondary_patterns`, flags service providers affiliated with the company
+    `primary_pattern` captures (e.g. a builder's captive lender or title company).
+    Providers are captured by the secondary patterns and, with `match_vendors`, read
+    from the line item vendors when the disclosure was parsed for other rules (the
+    option alone does not require a parsed document). Affiliations come from the
+    index of known companies in `affiliates_file`; with `fuzzy_match` (the default),
+    providers sharing a distinctive word with the primary company's name match too.
+    """
     
     def can_handle(self, rule: Rule) -> bool:
         """Check if this handler can process the given rule."""
         return rule.rule_type == RuleType.CROSS_REFERENCE_PATTERN
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
         """Process cross-reference pattern rule."""
+        matcher = self.get_matcher(text, matcher)
+        if rule.config.get('secondary_patterns'):
+            return self._check_affiliates(rule, matcher)
+        
         primary_pattern = rule.config.get('primary_pattern', '')
         reference_pattern = rule.config.get('reference_pattern', '')
         
@@ -135,20 +181,141 @@ class CrossReferencePatternHandler(BaseRuleHandler):
             return []
         
         # Find primary match
-        primary_match = re.search(primary_pattern, text, re.IGNORECASE)
+        primary_match = matcher.search(primary_pattern, re.IGNORECASE)
         if not primary_match:
             return []
         
         # Find reference match
-        reference_match = re.search(reference_pattern, text, re.IGNORECASE)
+        reference_match = matcher.search(reference_pattern, re.IGNORECASE)
         if not reference_match:
             return []
         
         # Both patterns found - this indicates a potential issue
         snippet = self.extract_snippet(text, primary_match.start(), primary_match.end())
         
-        return [Flag(
-            rule=rule.name,
-            message=rule.message,
-            snippet=snippet
-        )]
\ No newline at end of file
+        return [self.create_flag(rule, rule.message, snippet)]
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check the secondary patterns and the affiliations file."""
+        errors = []
+        for secondary in rule.config.get('secondary_patterns') or []:
+            if not isinstance(secondary, dict) or not secondary.get('pattern'):
+                errors.append(f"Invalid secondary pattern in rule '{rule.name}': expected a mapping with a 'pattern'")
+        
+        path = rule.config.get('affiliates_file')
+        if path:
+            try:
+                if load_affiliate_index(path) is None:
+                    errors.append(f"Affiliates file '{path}' of rule '{rule.name}' not found")
+            except Exception as e:
+                errors.append(f"Invalid affiliates file '{path}' in rule '{rule.name}': {e}")
+        return errors
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the primary, reference and secondary patterns for pre-compilation."""
+        candidates = [rule.config.get('primary_pattern'), rule.config.get('reference_pattern')]
+        candidates.extend(
+            secondary.get('pattern') for secondary in rule.config.get('secondary_patterns') or []
+            if isinstance(secondary, dict)
+        )
+        return [(pattern, re.IGNORECASE) for pattern in candidates if pattern]
+    
+    def _check_affiliates(self, rule: Rule, matcher: DocumentMatcher) -> List[Flag]:
+        """Flag service providers affiliated with the primary company."""
+        index = self._get_index(rule)
+        
+        primary_value = None
+        primary_pattern = rule.config.get('primary_pattern')
+        if primary_pattern:
+            primary_match = matcher.search(primary_pattern, re.IGNORECASE)
+            if primary_match:
+                primary_value = self._capture(primary_match)
+        
+        providers = self._find_providers(rule, matcher, index)
+        primary_group = None
+        if primary_value and index is not None:
+            found = index.lookup(primary_value)
+            primary_group = found.company.group if found else None
+        elif not primary_value:
+            # Without a primary match, providers of two different services from one known group suffice
+            primary_group = self._shared_group(providers)
+            primary_value = primary_group
+        if not primary_value:
+            return []
+        
+        fuzzy_match = rule.config.get('fuzzy_match', True)
+        primary_normalized = normalize_company(primary_value)
+        primary_tokens = distinctive_tokens(primary_normalized)
+        
+        matched_services = []
+        for service, name, found in providers:
+            if found is not None and found.company.role == BUILDER_ROLE:
+                continue
+            if primary_group is not None and found is not None:
+                match_found = found.company.group == primary_group
+            elif fuzzy_match:
+                match_found = bool(primary_tokens & distinctive_tokens(normalize_company(name)))
+            else:
+                match_found = normalize_company(name) == primary_normalized
+            
+            if match_found and service not in matched_services:
+                matched_services.append(service)
+        
+        if not matched_services:
+            return []
+        
+        services_text = ', '.join(matched_services)
+        formatted_message = self.render_message(rule, primary=primary_value, services=services_text)
+        return [self.create_flag(rule, formatted_message, f"Primary: {primary_value} | Matched services: {services_text}")]
+    
+    def _find_providers(self, rule: Rule, matcher: DocumentMatcher,
+                        index: Optional[AffiliateIndex]) -> List[Tuple[str, str, Any]]:
+        """Collect (service, name, index match) for each provider captured or listed as a vendor."""
+        providers = []
+        for secondary in rule.config.get('secondary_patterns') or []:
+            if not isinstance(secondary, dict) or not secondary.get('pattern'):
+                continue
+            secondary_match = matcher.search(secondary['pattern'], re.IGNORECASE)
+            if secondary_match:
+                name = self._capture(secondary_match)
+                providers.append((secondary.get('service', 'service'), name, index.lookup(name) if index else None))
+        
+        if rule.config.get('match_vendors') and matcher.document is not None:
+            seen = set()
+            for item in matcher.document.line_items:
+                if not item.vendor or item.vendor in seen:
+                    continue
+                seen.add(item.vendor)
+                found = index.lookup(item.vendor) if index else None
+                providers.append((found.company.role if found else item.vendor, item.vendor, found))
+        
+        return providers
+    
+    def _shared_group(self, providers: List[Tuple[str, str, Any]]) -> Optional[str]:
+        """Find a known group that provides at least two different services."""
+        roles: Dict[str, set] = {}
+        for _, _, found in providers:
+            if found is not None and found.company.role != BUILDER_ROLE:
+                roles.setdefault(found.company.group, set()).add(found.company.role)
+        groups = [group for group, group_roles in roles.items() if len(group_roles) >= 2]
+        return groups[0] if groups else None
+    
+    def _get_index(self, rule: Rule) -> Optional[AffiliateIndex]:
+        """Load the rule's affiliations index, or None if the file is missing or invalid."""
+        path = rule.config.get('affiliates_file') or DEFAULT_AFFILIATES_PATH
+        try:
+            index = load_affiliate_index(path)
+        except Exception as e:
+            print(f"Warning: Failed to load affiliates file '{path}': {e}")
+            return None
+        
+        if index is None and rule.config.get('match_vendors') and (rule.name, path) not in _missing_index_warned:
+            _missing_index_warned.add((rule.name, path))
+            print(f"Warning: Rule '{rule.name}' matches vendors but affiliates file "
+                  f"'{resolve_affiliates_path(path)}' was not found; only fuzzy name matching applies")
+        return index
+    
+    def _capture(self, match: re.Match) -> str:
+        """Company name captured by a pattern, or the whole match if it has no group."""
+        value = match.group(1) if match.re.groups else match.group(0)
+        return (value or '').strip().upper()
\ No newline at end of file
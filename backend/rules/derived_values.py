@@ -0,0 +1,282 @@
+"""Named values shared by rules, extracted or derived once per document."""
+
+import ast
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .label_values import VALUE_TYPES
+from models.document import ValueKind
+
+
+# Functions an expression may call
+FUNCTIONS: Dict[str, Callable[..., float]] = {
+    'abs': abs,
+    'min': min,
+    'max': max
+}
+
+# Number of arguments each function accepts: (minimum, maximum or None for any)
+FUNCTION_ARITY: Dict[str, Tuple[int, Optional[int]]] = {
+    'abs': (1, 1),
+    'min': (2, None),
+    'max': (2, None)
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: lambda left, right: left + right,
+    ast.Sub: lambda left, right: left - right,
+    ast.Mult: lambda left, right: left * right,
+    ast.Div: lambda left, right: left / right
+}
+
+# Ways a value can be read from the document, in order of precedence
+SOURCE_KEYS = ('pattern', 'label', 'lookup', 'expression')
+
+
+@dataclass
+class ValueDefinition:
+    """A named value: read from the document by pattern, label or lookup, or computed from other values."""
+    
+    name: str
+    source: str  # One of SOURCE_KEYS
+    config: Dict[str, Any]
+    expression: Optional[ast.Expression] = None
+    dependencies: Tuple[str, ...] = ()
+    
+    @property
+    def pattern(self) -> Optional[str]:
+        """Regex searched for the value: the 'pattern' itself, or one matching any of the labels."""
+        if self.source == 'pattern':
+            return self.config['pattern']
+        if self.source == 'label':
+            labels = self.config['label'] if isinstance(self.config['label'], list) else [self.config['label']]
+            return '|'.join(re.escape(str(label)) for label in labels)
+        return None
+
+
+def parse_value_definition(name: str, data: Any) -> Tuple[Optional[ValueDefinition], List[str]]:
+    """
+    Parse one entry of the 'values' section.
+    
+    A string is an arithmetic expression over other values; a mapping sets one of
+    'pattern', 'label' (with optional 'value_type' and 'within'), 'lookup' or 'expression'.
+    """
+    if isinstance(data, (str, int, float)) and not isinstance(data, bool):
+        data = {'expression': str(data)}
+    if not isinstance(data, dict):
+        return None, [f"Invalid value '{name}': expected an expression or a mapping"]
+    
+    sources = [key for key in SOURCE_KEYS if data.get(key)]
+    if len(sources) != 1:
+        return None, [f"Value '{name}' must set exactly one of {list(SOURCE_KEYS)}"]
+    source = sources[0]
+    
+    definition = ValueDefinition(name=name, source=source, config=data)
+    errors = []
+    if source == 'pattern':
+        try:
+            re.compile(data['pattern'])
+        except re.error as e:
+            errors.append(f"Invalid pattern in value '{name}': {e}")
+    elif source == 'label':
+        value_type = data.get('value_type', 'amount')
+        if value_type not in VALUE_TYPES:
+            errors.append(f"Invalid value_type '{value_type}' in value '{name}': expected one of {sorted(VALUE_TYPES)}")
+        within = data.get('within')
+        if within is not None and (not isinstance(within, int) or isinstance(within, bool) or within < 0):
+            errors.append(f"Invalid within '{within}' in value '{name}': expected a non-negative number of characters")
+    elif source == 'expression':
+        try:
+            definition.expression = ast.parse(str(data['expression']), mode='eval')
+            definition.dependencies = tuple(_check_expression(definition.expression.body))
+        except (SyntaxError, ValueError) as e:
+            errors.append(f"Invalid expression in value '{name}': {e}")
+    
+    return (None if errors else definition), errors
+
+
+def _check_expression(node: ast.AST) -> List[str]:
+    """Check that an expression only uses arithmetic, returning the value names it reads."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return []
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _check_expression(node.left) + _check_expression(node.right)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        return _check_expression(node.operand)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+        _check_call(node)
+        return [name for argument in node.args for name in _check_expression(argument)]
+    raise ValueError(f"unsupported syntax '{ast.unparse(node)}'; use numbers, value names, + - * / and {sorted(FUNCTIONS)}")
+
+
+def _check_call(node: ast.Call):
+    """Check that a function call passes plain positional arguments in the accepted number."""
+    name = node.func.id
+    if node.keywords or any(isinstance(argument, ast.Starred) for argument in node.args):
+        raise ValueError(f"'{ast.unparse(node)}' must pass plain positional arguments to {name}()")
+    minimum, maximum = FUNCTION_ARITY[name]
+    if len(node.args) < minimum or (maximum is not None and len(node.args) > maximum):
+        expected = (f"exactly {minimum}" if minimum == maximum
+                    else f"at least {minimum}" if maximum is None else f"{minimum} to {maximum}")
+        raise ValueError(f"'{ast.unparse(node)}' passes {len(node.args)} argument(s) to {name}(), "
+                         f"which takes {expected}")
+
+
+def _evaluate_expression(node: ast.AST, values: Dict[str, Optional[float]]) -> Optional[float]:
+    """Evaluate a checked expression; None if any value it reads is missing or it divides by zero."""
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        return values.get(node.id)
+    if isinstance(node, ast.BinOp):
+        left = _evaluate_expression(node.left, values)
+        right = _evaluate_expression(node.right, values)
+        if left is None or right is None or (isinstance(node.op, ast.Div) and right == 0):
+            return None
+        return _BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate_expression(node.operand, values)
+        if operand is None:
+            return None
+        return -operand if isinstance(node.op, ast.USub) else operand
+    arguments = [_evaluate_expression(argument, values) for argument in node.args]
+    if any(argument is None for argument in arguments):
+        return None
+    return float(FUNCTIONS[node.func.id](*arguments))
+
+
+class ValueGraph:
+    """
+    The 'values' section of the rules configuration, as a dependency graph.
+    
+    Only the values some enabled rule needs are kept. Each one has its
+    dependencies resolved into a topological order when the plan is compiled,
+    so a document computes every value at most once, dependencies first.
+    """
+    
+    def __init__(self, definitions: Dict[str, ValueDefinition], needed: List[str]):
+        """
+        Build the graph of the needed values and their dependencies.
+        
+        Args:
+            definitions: All parsed value definitions, by name
+            needed: Names of the values referenced by enabled rules
+        """
+        self.definitions: Dict[str, ValueDefinition] = {}
+        self.errors: List[str] = []
+        self.orders: Dict[str, Tuple[str, ...]] = {}
+        
+        for name in needed:
+            order = self._resolve(name, definitions, [], {})
+            if order is not None:
+                self.orders[name] = tuple(order)
+    
+    @classmethod
+    def parse(cls, data: Any, needed: List[str]) -> 'ValueGraph':
+        """Parse the 'values' section of the configuration and build the graph of the needed values."""
+        definitions = {}
+        errors = []
+        if data is not None and not isinstance(data, dict):
+            errors.append("Invalid 'values' section: expected a mapping of names to values")
+            data = {}
+        
+        for name, value_data in (data or {}).items():
+            definition, value_errors = parse_value_definition(str(name), value_data)
+            errors.extend(value_errors)
+            if definition is not None:
+                definitions[definition.name] = definition
+        
+        graph = cls(definitions, needed)
+        graph.errors = errors + graph.errors
+        return graph
+    
+    def _resolve(self, name: str, definitions: Dict[str, ValueDefinition], path: List[str],
+                 resolved: Dict[str, bool]) -> Optional[List[str]]:
+        """Depth-first topological sort of a value's dependencies, ending with the value itself."""
+        if name in path:
+            cycle = " -> ".join(path[path.index(name):] + [name])
+            self.errors.append(f"Values depend on each other in a cycle: {cycle}")
+            return None
+        
+        definition = definitions.get(name)
+        if definition is None:
+            # Unknown names read directly by a rule are reported against the rule
+            if path:
+                self.errors.append(f"Unknown value '{name}' referenced by value '{path[-1]}'")
+            return None
+        
+        order = []
+        for dependency in definition.dependencies:
+            if resolved.get(dependency):
+                continue
+            dependency_order = self._resolve(dependency, definitions, path + [name], resolved)
+            if dependency_order is None:
+                return None
+            order.extend(item for item in dependency_order if item not in order)
+        
+        self.definitions[name] = definition
+        resolved[name] = True
+        order.append(name)
+        return order
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.orders
+    
+    def patterns(self) -> List[Tuple[str, str]]:
+        """(value name, pattern) pairs of the values in the graph searched by regex, for pre-compilation."""
+        return [(name, definition.pattern) for name, definition in self.definitions.items() if definition.pattern]
+    
+    def dependencies(self, name: str) -> Tuple[str, ...]:
+        """A value and everything it is computed from, dependencies first."""
+        return self.orders.get(name, ())
+    
+    @property
+    def requires_document(self) -> bool:
+        """Check if any value looks up the parsed document's key/value map."""
+        return any(definition.source == 'lookup' for definition in self.definitions.values())
+    
+    def evaluate(self, name: str, matcher, cache: Dict[str, Optional[float]]) -> Optional[float]:
+        """
+        Get a value for a document, computing it and its dependencies in order if needed.
+        
+        Args:
+            name: Value name
+            matcher: DocumentMatcher of the document
+            cache: Values already computed for the document, updated in place
+        
+        Returns:
+            The value, or None if it is not in the document or cannot be computed
+        """
+        for item in self.orders.get(name, ()):
+            if item not in cache:
+                cache[item] = self._compute(self.definitions[item], matcher, cache)
+        return cache.get(name)
+    
+    def _compute(self, definition: ValueDefinition, matcher, cache: Dict[str, Optional[float]]) -> Optional[float]:
+        """Compute one value whose dependencies are already in the cache."""
+        config = definition.config
+        if definition.source == 'expression':
+            return _evaluate_expression(definition.expression.body, cache)
+        
+        if definition.source == 'pattern':
+            match = matcher.search(definition.pattern, re.IGNORECASE)
+            if not match:
+                return None
+            try:
+                return float(match.group(1).replace(',', ''))
+            except (ValueError, IndexError):
+                return None
+        
+        if definition.source == 'label':
+            kind = VALUE_TYPES.get(config.get('value_type', 'amount'), ValueKind.AMOUNT)
+            for match in matcher.finditer(definition.pattern, re.IGNORECASE):
+                entry = matcher.values.value_at_label(match.end(), (kind,), config.get('within'))
+                if entry is not None:
+                    return entry.value
+            return None
+        
+        entry = matcher.key_values.first(str(config['lookup']))
+        return entry.value if entry is not None else None
\ No newline at end of file
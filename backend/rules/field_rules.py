@@ -0,0 +1,176 @@
+"""Structured-field rule handlers that read values from a parsed closing disclosure."""
+
+import re
+from dataclasses import fields
+from typing import Iterator, List, Optional, Tuple
+
+from models.core import Rule, RuleType, Flag, UserContext
+from models.document import LoanSummary, ParsedDocument, DocumentSection, PaymentResponsibility
+from .base_rule import BaseRuleHandler
+from .matcher import DocumentMatcher
+
+
+# Numeric and text fields a field rule may reference
+LOAN_SUMMARY_FIELDS = frozenset(f.name for f in fields(LoanSummary) if f.name != 'coordinates')
+
+
+class FieldRuleHandler(BaseRuleHandler):
+    """
+    Handler for rules over parsed LoanSummary fields.
+    
+    field_threshold compares `field` against `threshold` using `operator`.
+    field_ratio compares `numerator_field / denominator_field` as a percentage.
+    """
+    
+    def can_handle(self, rule: Rule) -> bool:
+        """Check if this handler can process the given rule."""
+        return rule.rule_type in [RuleType.FIELD_THRESHOLD, RuleType.FIELD_RATIO]
+    
+    def requires_document(self, rule: Rule) -> bool:
+        """Field rules read the parsed document rather than the text."""
+        return True
+    
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
+        """Process field threshold or field ratio rule."""
+        return list(self.iter_flags(rule, text, context, matcher=matcher))
+    
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield a flag if the field condition holds."""
+        matcher = self.get_matcher(text, matcher)
+        summary = matcher.document.loan_summary if matcher.document else None
+        if summary is None or rule.threshold is None:
+            return
+        
+        if rule.rule_type == RuleType.FIELD_THRESHOLD:
+            field_name = rule.config.get('field')
+            value = self._get_numeric_field(summary, field_name)
+            if value is None:
+                return
+            
+            if self.evaluate_condition(value, rule.threshold, rule.operator):
+                formatted_message = self.render_message(rule, value=value)
+                yield self.create_flag(rule, formatted_message, self._field_snippet(field_name, value))
+        
+        elif rule.rule_type == RuleType.FIELD_RATIO:
+            numerator_field = rule.config.get('numerator_field')
+            denominator_field = rule.config.get('denominator_field')
+            numerator = self._get_numeric_field(summary, numerator_field)
+            denominator = self._get_numeric_field(summary, denominator_field)
+            if numerator is None or not denominator:
+                return
+            
+            percentage = (numerator / denominator) * 100
+            if self.evaluate_condition(percentage, rule.threshold, rule.operator):
+                formatted_message = self.render_message(
+                    rule,
+                    percentage=round(percentage, 2),
+                    numerator=numerator,
+                    denominator=denominator
+                )
+                snippet = f"{self._field_snippet(numerator_field, numerator)}; {self._field_snippet(denominator_field, denominator)}"
+                yield self.create_flag(rule, formatted_message, snippet)
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check that referenced fields exist on LoanSummary."""
+        if rule.rule_type == RuleType.FIELD_THRESHOLD:
+            keys = ['field']
+        else:
+            keys = ['numerator_field', 'denominator_field']
+        
+        errors = []
+        for key in keys:
+            field_name = rule.config.get(key)
+            if field_name not in LOAN_SUMMARY_FIELDS:
+                errors.append(f"Unknown {key} '{field_name}' in rule '{rule.name}'")
+        if rule.threshold is None:
+            errors.append(f"Rule '{rule.name}' has no threshold")
+        return errors
+    
+    def _get_numeric_field(self, summary: LoanSummary, field_name: Optional[str]) -> Optional[float]:
+        """Read a LoanSummary field as a number, or None if missing or not numeric."""
+        if field_name not in LOAN_SUMMARY_FIELDS:
+            return None
+        value = getattr(summary, field_name)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return float(value)
+    
+    def _field_snippet(self, field_name: str, value: float) -> str:
+        """Describe a field value for the flag snippet."""
+        return f"{field_name.replace('_', ' ').title()}: {value}"
+
+
+class LineItemMatchHandler(FieldRuleHandler):
+    """
+    Handler for rules that flag parsed line items.
+    
+    Items are filtered by the rule's `scope` (sections and/or pages) and `paid_by`,
+    then by `description_pattern` and an optional amount `threshold`/`operator`.
+    Section total lines (e.g. "B.00") are skipped unless `include_totals` is set.
+    """
+    
+    def can_handle(self, rule: Rule) -> bool:
+        """Check if this handler can process the given rule."""
+        return rule.rule_type == RuleType.LINE_ITEM_MATCH
+    
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield a flag for each matching line item."""
+        matcher = self.get_matcher(text, matcher)
+        document = matcher.document
+        if document is None:
+            return
+        
+        pattern = rule.config.get('description_pattern')
+        description_regex = matcher.compile(pattern, re.IGNORECASE) if pattern else None
+        include_totals = rule.config.get('include_totals', False)
+        pages = [item for item in rule.scope or [] if isinstance(item, int)]
+        
+        for item in self._find_items(rule, document):
+            if pages and item.page_number not in pages:
+                continue
+            if not include_totals and item.line_number.endswith('.00'):
+                continue
+            if description_regex and not description_regex.search(item.description):
+                continue
+            if rule.threshold is not None:
+                if item.amount is None or not self.evaluate_condition(item.amount, rule.threshold, rule.operator):
+                    continue
+            
+            formatted_message = self.render_message(
+                rule,
+                description=item.description,
+                line_number=item.line_number,
+                vendor=item.vendor or '',
+                amount=item.amount if item.amount is not None else 'N/A'
+            )
+            yield self.create_flag(rule, formatted_message, item.raw_text or item.description)
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the description pattern for pre-compilation."""
+        pattern = rule.config.get('description_pattern')
+        return [(pattern, re.IGNORECASE)] if pattern else []
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check that payer values are valid."""
+        errors = []
+        for payer in self._as_list(rule.config.get('paid_by')):
+            try:
+                PaymentResponsibility(payer)
+            except ValueError:
+                errors.append(f"Invalid paid_by '{payer}' in rule '{rule.name}'")
+        return errors
+    
+    def _find_items(self, rule: Rule, document: ParsedDocument):
+        """Look up candidate items through the document's section/payer index."""
+        sections = [DocumentSection(item) for item in rule.scope or [] if not isinstance(item, int)]
+        payers = [PaymentResponsibility(payer) for payer in self._as_list(rule.config.get('paid_by'))]
+        return document.find_line_items(sections or None, payers or None)
+    
+    def _as_list(self, value) -> list:
+        """Normalize a scalar-or-list config value."""
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Label lookups for rules that read the value printed after a label."""
+
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from models.core import Rule
+from models.document import ValueEntry, ValueKind, KeyValue
+from .matcher import DocumentMatcher
+
+
+# Config keys naming a label to look up in the document's key/value map
+LOOKUP_KEYS = ('lookup', 'numerator_lookup', 'denominator_lookup')
+
+VALUE_TYPES = {
+    'amount': ValueKind.AMOUNT,
+    'percent': ValueKind.PERCENT,
+    'number': ValueKind.NUMBER
+}
+
+
+def get_labels(rule: Rule) -> List[str]:
+    """Get the labels a rule reads values after, from its 'label' config."""
+    labels = rule.config.get('label')
+    if not labels:
+        return []
+    if not isinstance(labels, list):
+        labels = [labels]
+    return [str(label) for label in labels if label]
+
+
+def get_label_pattern(rule: Rule) -> Optional[str]:
+    """Build the pattern matching any of a rule's labels, or None if it has none."""
+    labels = get_labels(rule)
+    if not labels:
+        return None
+    return '|'.join(re.escape(label) for label in labels)
+
+
+def get_label_errors(rule: Rule) -> List[str]:
+    """
+    Check the label lookup settings of a rule.
+    
+    A 'pattern' next to the 'label' is allowed: this engine reads the label, and
+    the pattern serves engines without a value index, such as the legacy one.
+    """
+    if not get_labels(rule):
+        return []
+    
+    errors = []
+    value_type = rule.config.get('value_type', 'amount')
+    if value_type not in VALUE_TYPES:
+        errors.append(f"Invalid value_type '{value_type}' in rule '{rule.name}': expected one of {sorted(VALUE_TYPES)}")
+    
+    within = rule.config.get('within')
+    if within is not None and (not isinstance(within, int) or isinstance(within, bool) or within < 0):
+        errors.append(f"Invalid within '{within}' in rule '{rule.name}': expected a non-negative number of characters")
+    
+    return errors
+
+
+def iter_label_values(rule: Rule, matcher: DocumentMatcher) -> Iterator[Tuple[re.Match, ValueEntry]]:
+    """
+    Find the value after each occurrence of a rule's labels.
+    
+    Like a 'label.*?\\$(amount)' pattern, the value must be on the same line as the
+    label (and within 'within' characters if set); the next label is looked for
+    after the value.
+    
+    Yields:
+        Tuples of (label match, value entry) in document order
+    """
+    pattern = get_label_pattern(rule)
+    if not pattern:
+        return
+    
+    kind = VALUE_TYPES.get(rule.config.get('value_type', 'amount'), ValueKind.AMOUNT)
+    within = rule.config.get('within')
+    values = matcher.values
+    
+    last_end = 0
+    for match in matcher.finditer(pattern, re.IGNORECASE):
+        if match.start() < last_end:
+            continue
+        entry = values.value_at_label(match.end(), (kind,), within)
+        if entry is not None:
+            last_end = entry.end
+            yield match, entry
+
+
+def uses_lookup(rule: Rule) -> bool:
+    """Check if a rule reads values from the document's key/value map."""
+    return any(rule.config.get(key) for key in LOOKUP_KEYS)
+
+
+def get_lookup_errors(rule: Rule) -> List[str]:
+    """Check the key/value map lookups of a rule."""
+    if not uses_lookup(rule):
+        return []
+    
+    errors = []
+    if rule.config.get('lookup') and (rule.pattern or get_labels(rule)):
+        errors.append(f"Rule '{rule.name}' sets 'lookup' with 'pattern' or 'label'; use one of them")
+    for key, pattern in (('numerator_lookup', rule.numerator_pattern), ('denominator_lookup', rule.denominator_pattern)):
+        if rule.config.get(key) and pattern:
+            errors.append(f"Rule '{rule.name}' sets both '{key}' and its pattern; use one or the other")
+    
+    lookup_values = rule.config.get('lookup_values', 'first')
+    if lookup_values not in ('first', 'all'):
+        errors.append(f"Invalid lookup_values '{lookup_values}' in rule '{rule.name}': expected 'first' or 'all'")
+    
+    if rule.scope:
+        errors.append(f"Rule '{rule.name}' cannot combine a scope with lookups, which read the whole document's map")
+    
+    return errors
+
+
+def lookup_values(rule: Rule, matcher: DocumentMatcher, key: str = 'lookup') -> List[KeyValue]:
+    """
+    Get the values a rule looks up in the document's key/value map.
+    
+    Only the most reliable value is used unless the rule sets 'lookup_values: all'.
+    """
+    label = rule.config.get(key)
+    if not label:
+        return []
+    
+    found = matcher.key_values.get(str(label))
+    if rule.config.get('lookup_values', 'first') == 'all':
+        return found
+    return found[:1]
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""Per-document regex matcher shared by all rule handlers."""
+
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Pattern, Set, Tuple
+
+from models.document import ParsedDocument, ValueIndex, KeyValueMap
+
+from .anchors import AnchorClause, normalize_text, find_literals, clauses_satisfied
+from .time_budget import TimeBudget, RuleTimeoutError
+
+
+PatternKey = Tuple[str, int]
+
+
+class MatchSequence:
+    """Matches of one pattern, pulled lazily from finditer and shared by every reader."""
+    
+    def __init__(self, iterator: Iterator[re.Match], check_budget: Optional[Callable[[], None]] = None,
+                 stats: Optional[Dict[str, int]] = None):
+        self._iterator = iterator
+        self._check_budget = check_budget
+        self._stats = stats  # Matcher statistics counting the matches scanned
+        self._matches: List[re.Match] = []
+        self._exhausted = False
+        self._timed_out = False
+    
+    def get(self, index: int) -> Optional[re.Match]:
+        """Get the match at an index, scanning further into the document only if needed."""
+        while len(self._matches) <= index and not self._exhausted:
+            if self._timed_out:
+                # The scan was interrupted and cannot be resumed
+                raise RuleTimeoutError("Pattern already exceeded its time budget")
+            if self._check_budget:
+                self._check_budget()
+            try:
+                match = next(self._iterator, None)
+            except RuleTimeoutError:
+                self._timed_out = True
+                raise
+            if match is None:
+                self._exhausted = True
+            else:
+                self._matches.append(match)
+                if self._stats is not None:
+                    self._stats['matches_scanned'] += 1
+        return self._matches[index] if index < len(self._matches) else None
+    
+    def first(self) -> Optional[re.Match]:
+        """Get the first match, equivalent to re.search."""
+        return self.get(0)
+    
+    def __iter__(self) -> Iterator[re.Match]:
+        index = 0
+        while True:
+            match = self.get(index)
+            if match is None:
+                return
+            yield match
+            index += 1
+
+
+class DocumentMatcher:
+    """Runs rule patterns against one document using pre-compiled regexes."""
+    
+    def __init__(self, text: str, patterns: Optional[Dict[PatternKey, Pattern]] = None,
+                 anchors: Optional[Dict[PatternKey, List[AnchorClause]]] = None,
+                 document: Optional[ParsedDocument] = None, values: Optional[ValueIndex] = None,
+                 value_graph=None):
+        """
+        Initialize matcher for a document.
+        
+        Args:
+            text: The document text to search
+            patterns: Pre-compiled patterns keyed by (pattern, flags), usually from a rule plan
+            anchors: Literal anchors each pattern requires, used to skip hopeless searches
+            document: Parsed closing disclosure for rules that read structured fields
+            values: Index of the numeric values in text, built on first use if not given
+            value_graph: ValueGraph of the named values rules may read, usually from a rule plan
+        """
+        self.text = text
+        self.document = document
+        self._values = values
+        self._key_values: Optional[KeyValueMap] = None
+        self.value_graph = value_graph
+        self._named_values: Dict[str, Optional[float]] = {}
+        self.patterns = patterns or {}
+        self.anchors = anchors or {}
+        self._local_patterns: Dict[PatternKey, Pattern] = {}
+        self._present_literals: Optional[Set[str]] = None
+        self._match_cache: Dict[PatternKey, MatchSequence] = {}
+        self.budget: Optional[TimeBudget] = None  # Budget of the rule currently running
+        self.stats = {
+            'searches': 0,
+            'prefiltered': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'matches_scanned': 0
+        }
+    
+    @property
+    def present_literals(self) -> Set[str]:
+        """Anchor literals found in the document, scanned once on first use."""
+        if self._present_literals is None:
+            literals = {literal for clauses in self.anchors.values() for clause in clauses for literal in clause}
+            self._present_literals = find_literals(normalize_text(self.text), literals) if literals else set()
+        return self._present_literals
+    
+    @property
+    def values(self) -> ValueIndex:
+        """Amounts, percentages and numbers in the document, tokenized once on first use."""
+        if self._values is None:
+            self._values = ValueIndex(self.text)
+        return self._values
+    
+    @property
+    def key_values(self) -> KeyValueMap:
+        """Label-to-value map of the document, built on first use."""
+        if self._key_values is None:
+            self._key_values = KeyValueMap.build(self.values, self.document)
+        return self._key_values
+    
+    def named_value(self, name: str) -> Optional[float]:
+        """Get a named value of the document, computing it and its dependencies at most once."""
+        if self.value_graph is None:
+            return None
+        return self.value_graph.evaluate(name, self, self._named_values)
+    
+    def can_match(self, pattern: str, flags: int = 0) -> bool:
+        """Check if the document contains every literal the pattern requires."""
+        clauses = self.anchors.get((pattern, flags))
+        if not clauses:
+            return True
+        return clauses_satisfied(clauses, self.present_literals)
+    
+    def compile(self, pattern: str, flags: int = 0) -> Pattern:
+        """Get the compiled regex for a pattern, compiling it if the plan does not have it."""
+        key = (pattern, flags)
+        compiled = self.patterns.get(key)
+        if compiled is None:
+            compiled = self._local_patterns.get(key)
+            if compiled is None:
+                compiled = re.compile(pattern, flags)
+                self._local_patterns[key] = compiled
+        return compiled
+    
+    def matches(self, pattern: str, flags: int = 0) -> MatchSequence:
+        """Get the shared match sequence for a pattern, searching the document at most once."""
+        key = (pattern, flags)
+        sequence = self._match_cache.get(key)
+        if sequence is not None:
+            self.stats['cache_hits'] += 1
+            return sequence
+        
+        self.stats['cache_misses'] += 1
+        if self.can_match(pattern, flags):
+            self.stats['searches'] += 1
+            sequence = MatchSequence(self.compile(pattern, flags).finditer(self.text), self.check_budget, self.stats)
+        else:
+            self.stats['prefiltered'] += 1
+            sequence = MatchSequence(iter(()))
+        
+        self._match_cache[key] = sequence
+        return sequence
+    
+    def check_budget(self):
+        """Raise RuleTimeoutError if the running rule is out of time."""
+        if self.budget is not None:
+            self.budget.check()
+    
+    def search(self, pattern: str, flags: int = 0) -> Optional[re.Match]:
+        """Find the first match of a pattern in the document."""
+        return self.matches(pattern, flags).first()
+    
+    def finditer(self, pattern: str, flags: int = 0) -> Iterator[re.Match]:
+        """Iterate over all matches of a pattern in the document."""
+        return iter(self.matches(pattern, flags))
\ No newline at end of file
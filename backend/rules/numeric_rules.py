@@ -1,10 +1,16 @@
 """Numeric rule handlers for threshold-based detection."""
 
 import re
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from models.core import Rule, RuleType, Flag, UserContext
+from models.document import KeyValue
 from .base_rule import BaseRuleHandler
+from .matcher import DocumentMatcher
+from .label_values import (
+    get_labels, get_label_pattern, get_label_errors, iter_label_values,
+    uses_lookup, get_lookup_errors, lookup_values
+)
 
 
 class NumericThresholdHandler(BaseRuleHandler):
@@ -14,113 +20,173 @@ class NumericThresholdHandler(BaseRuleHandler):
         """Check if this handler can process the given rule."""
         return rule.rule_type in [RuleType.NUMERIC_THRESHOLD, RuleType.CALCULATED_PERCENTAGE]
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
-        """Process numeric threshold or calculated percentage rule."""
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
+        """Process numeric threshold or calculated percentage rule, returning a flag per match."""
+        return list(self.iter_flags(rule, text, context, matcher=matcher))
+    
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield flags as qualifying matches are found."""
+        matcher = self.get_matcher(text, matcher)
+        
         if rule.rule_type == RuleType.NUMERIC_THRESHOLD:
-            return self._check_numeric_threshold(rule, text)
+            yield from self._check_numeric_threshold(rule, matcher)
         elif rule.rule_type == RuleType.CALCULATED_PERCENTAGE:
-            return self._check_calculated_percentage(rule, text)
-        return []
+            yield from self._check_calculated_percentage(rule, matcher)
+    
+    def splits_scope(self, rule: Rule) -> bool:
+        """Thresholds are matched per scoped section; percentages may combine values across sections."""
+        return rule.rule_type == RuleType.NUMERIC_THRESHOLD
+    
+    def requires_document(self, rule: Rule) -> bool:
+        """Lookups use the values the page parsers locate by layout."""
+        return uses_lookup(rule)
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check the label and lookup settings of the rule."""
+        errors = get_lookup_errors(rule)
+        if rule.rule_type == RuleType.NUMERIC_THRESHOLD:
+            errors.extend(get_label_errors(rule))
+        return errors
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List patterns used by numeric threshold and calculated percentage rules."""
+        if rule.rule_type == RuleType.NUMERIC_THRESHOLD:
+            candidates = [get_label_pattern(rule) or rule.pattern]
+        else:
+            candidates = [rule.numerator_pattern, rule.denominator_pattern]
+        return [(pattern, re.IGNORECASE) for pattern in candidates if pattern]
+    
+    def extract_values(self, rule: Rule, matcher: DocumentMatcher) -> List[float]:
+        """Extract every value a numeric threshold rule compares, without evaluating it."""
+        return [value for value, _, _, _, _ in self._iter_values(rule, matcher)]
+    
+    def extract_operands(self, rule: Rule, matcher: DocumentMatcher) -> Tuple[Optional[float], Optional[float]]:
+        """Extract the numerator and denominator of a calculated percentage rule, None where not found."""
+        operands = []
+        for pattern, lookup_key in ((rule.numerator_pattern, 'numerator_lookup'),
+                                    (rule.denominator_pattern, 'denominator_lookup')):
+            try:
+                operand = self._find_operand(rule, matcher, pattern, lookup_key)
+            except (ValueError, IndexError):
+                operand = None
+            operands.append(operand[0] if operand else None)
+        return operands[0], operands[1]
     
-    def _check_numeric_threshold(self, rule: Rule, text: str) -> List[Flag]:
-        """Check if numeric values exceed a threshold."""
-        flags = []
+    def _check_numeric_threshold(self, rule: Rule, matcher: DocumentMatcher) -> Iterator[Flag]:
+        """Check if numeric values exceed a threshold, yielding a flag per qualifying match."""
+        text = matcher.text
         
-        if not rule.pattern or rule.threshold is None:
-            return flags
+        if rule.threshold is None:
+            return
         
-        matches = re.finditer(rule.pattern, text, re.IGNORECASE)
+        for value, value_str, start, end, entry in self._iter_values(rule, matcher):
+            # Check threshold condition
+            condition_met = self.evaluate_condition(value, rule.threshold, rule.operator)
+            
+            if condition_met:
+                if entry is not None:
+                    snippet = self._lookup_snippet(text, entry)
+                else:
+                    snippet = self.extract_snippet(text, start, end)
+                formatted_message = self.render_message(rule, value=value, value_str=value_str)
+                
+                yield self.create_flag(rule, formatted_message, snippet)
+    
+    def _iter_values(self, rule: Rule, matcher: DocumentMatcher) -> Iterator[Tuple[float, str, int, int, Optional[KeyValue]]]:
+        """
+        Find the values a numeric threshold rule compares.
+        
+        Yields:
+            Tuples of (value, value text, snippet start, snippet end, key/value map entry
+            for lookup rules) in document order
+        """
+        if rule.config.get('lookup'):
+            # Lookup rules read the value from the document's key/value map
+            for entry in lookup_values(rule, matcher):
+                yield entry.value, str(entry.value), entry.start, entry.end, entry
+            return
+        
+        if get_labels(rule):
+            # Label rules read the value following the label from the document's value index
+            for match, entry in iter_label_values(rule, matcher):
+                yield entry.value, entry.number_text, match.start(), entry.end, None
+            return
+        
+        matches = matcher.finditer(rule.pattern, re.IGNORECASE)
         
         for match in matches:
             try:
                 # Extract numeric value (remove commas and convert to float)
                 value_str = match.group(1).replace(',', '')
                 value = float(value_str)
-                
-                # Check threshold condition
-                condition_met = self._evaluate_condition(value, rule.threshold, rule.operator or '>')
-                
-                if condition_met:
-                    snippet = self.extract_snippet(text, match.start(), match.end())
-                    formatted_message = self.format_message(rule.message, value=value, value_str=value_str)
-                    
-                    flags.append(Flag(
-                        rule=rule.name,
-                        message=formatted_message,
-                        snippet=snippet
-                    ))
-                    
             except (ValueError, IndexError) as e:
                 print(f"Error processing numeric value in rule '{rule.name}': {e}")
                 continue
-        
-        return flags
+            
+            yield value, value_str, match.start(), match.end(), None
     
-    def _check_calculated_percentage(self, rule: Rule, text: str) -> List[Flag]:
-        """Check calculated percentage against threshold."""
-        flags = []
-        
-        if not rule.numerator_pattern or not rule.denominator_pattern or rule.threshold is None:
-            return flags
+    def _check_calculated_percentage(self, rule: Rule, matcher: DocumentMatcher) -> Iterator[Flag]:
+        """Check calculated percentage against threshold, yielding its flag if the condition is met."""
+        has_numerator = rule.numerator_pattern or rule.config.get('numerator_lookup')
+        has_denominator = rule.denominator_pattern or rule.config.get('denominator_lookup')
+        if not has_numerator or not has_denominator or rule.threshold is None:
+            return
         
         try:
             # Find numerator value
-            numerator_match = re.search(rule.numerator_pattern, text, re.IGNORECASE)
-            if not numerator_match:
-                return flags
-            
-            numerator_str = numerator_match.group(1).replace(',', '')
-            numerator = float(numerator_str)
+            numerator_operand = self._find_operand(rule, matcher, rule.numerator_pattern, 'numerator_lookup')
+            if not numerator_operand:
+                return
+            numerator, snippet = numerator_operand
             
             # Find denominator value
-            denominator_match = re.search(rule.denominator_pattern, text, re.IGNORECASE)
-            if not denominator_match:
-                return flags
-            
-            denominator_str = denominator_match.group(1).replace(',', '')
-            denominator = float(denominator_str)
+            denominator_operand = self._find_operand(rule, matcher, rule.denominator_pattern, 'denominator_lookup')
+            if not denominator_operand:
+                return
+            denominator, _ = denominator_operand
             
             if denominator == 0:
-                return flags
+                return
             
             # Calculate percentage
             percentage = (numerator / denominator) * 100
             
             # Check threshold condition
-            condition_met = self._evaluate_condition(percentage, rule.threshold, rule.operator or '>')
+            condition_met = self.evaluate_condition(percentage, rule.threshold, rule.operator)
             
             if condition_met:
                 # Use numerator match for snippet location
-                snippet = self.extract_snippet(text, numerator_match.start(), numerator_match.end())
-                formatted_message = self.format_message(
-                    rule.message, 
+                formatted_message = self.render_message(
+                    rule,
                     percentage=round(percentage, 2),
                     numerator=numerator,
                     denominator=denominator
                 )
                 
-                flags.append(Flag(
-                    rule=rule.name,
-                    message=formatted_message,
-                    snippet=snippet
-                ))
-                
+                yield self.create_flag(rule, formatted_message, snippet)
+        
         except (ValueError, IndexError) as e:
             print(f"Error calculating percentage in rule '{rule.name}': {e}")
+    
+    def _find_operand(self, rule: Rule, matcher: DocumentMatcher, pattern: Optional[str],
+                      lookup_key: str) -> Optional[Tuple[float, str]]:
+        """Find a percentage operand by pattern or lookup, returning its value and snippet."""
+        if pattern:
+            match = matcher.search(pattern, re.IGNORECASE)
+            if not match:
+                return None
+            value = float(match.group(1).replace(',', ''))
+            return value, self.extract_snippet(matcher.text, match.start(), match.end())
         
-        return flags
+        found = lookup_values(rule, matcher, lookup_key)
+        if not found:
+            return None
+        return found[0].value, self._lookup_snippet(matcher.text, found[0])
     
-    def _evaluate_condition(self, value: float, threshold: float, operator: str) -> bool:
-        """Evaluate threshold condition."""
-        if operator == '>':
-            return value > threshold
-        elif operator == '<':
-            return value < threshold
-        elif operator == '>=':
-            return value >= threshold
-        elif operator == '<=':
-            return value <= threshold
-        elif operator == '==':
-            return value == threshold
-        else:
-            return value > threshold  # Default to greater than
\ No newline at end of file
+    def _lookup_snippet(self, text: str, entry: KeyValue) -> str:
+        """Snippet of a looked up value, from the text when it was located there."""
+        if entry.start is not None:
+            return self.extract_snippet(text, entry.start, entry.end)
+        return entry.text
\ No newline at end of file
@@ -1,10 +1,15 @@
 """Regex-based rule handlers."""
 
 import re
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from models.core import Rule, RuleType, Flag, UserContext
 from .base_rule import BaseRuleHandler
+from .matcher import DocumentMatcher
+from .label_values import (
+    get_labels, get_label_pattern, get_label_errors, iter_label_values,
+    uses_lookup, get_lookup_errors, lookup_values
+)
 
 
 class RegexPresenceHandler(BaseRuleHandler):
@@ -14,23 +19,30 @@ class RegexPresenceHandler(BaseRuleHandler):
         """Check if this handler can process the given rule."""
         return rule.rule_type == RuleType.REGEX_PRESENCE
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
         """Process regex presence rule."""
         if not rule.pattern:
             return []
         
+        matcher = self.get_matcher(text, matcher)
+        
         # Check if pattern IS found in text
-        match = re.search(rule.pattern, text, re.IGNORECASE | re.DOTALL)
+        match = matcher.search(rule.pattern, re.IGNORECASE | re.DOTALL)
         if match:
             snippet = self.extract_snippet(text, match.start(), match.end())
             
-            return [Flag(
-                rule=rule.name,
-                message=rule.message,
-                snippet=snippet
-            )]
+            return [self.create_flag(rule, rule.message, snippet)]
         
         return []
+    
+    def splits_scope(self, rule: Rule) -> bool:
+        """Presence is checked within each scoped section on its own."""
+        return True
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the presence pattern for pre-compilation."""
+        return [(rule.pattern, re.IGNORECASE | re.DOTALL)] if rule.pattern else []
 
 
 class RegexAbsenceHandler(BaseRuleHandler):
@@ -40,20 +52,23 @@ class RegexAbsenceHandler(BaseRuleHandler):
         """Check if this handler can process the given rule."""
         return rule.rule_type == RuleType.REGEX_ABSENCE
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
         """Process regex absence rule."""
         if not rule.pattern:
             return []
         
+        matcher = self.get_matcher(text, matcher)
+        
         # Check if pattern is NOT found in text
-        if not re.search(rule.pattern, text, re.IGNORECASE):
-            return [Flag(
-                rule=rule.name,
-                message=rule.message,
-                snippet='Pattern not found in document'
-            )]
+        if not matcher.search(rule.pattern, re.IGNORECASE):
+            return [self.create_flag(rule, rule.message, 'Pattern not found in document')]
         
         return []
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the absence pattern for pre-compilation."""
+        return [(rule.pattern, re.IGNORECASE)] if rule.pattern else []
 
 
 class RegexAmountHandler(BaseRuleHandler):
@@ -63,15 +78,37 @@ class RegexAmountHandler(BaseRuleHandler):
         """Check if this handler can process the given rule."""
         return rule.rule_type == RuleType.REGEX_AMOUNT
     
-    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None) -> List[Flag]:
-        """Process regex amount rule."""
-        flags = []
+    def process_rule(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                     matcher: Optional[DocumentMatcher] = None) -> List[Flag]:
+        """Process regex amount rule, returning a flag per qualifying amount."""
+        return list(self.iter_flags(rule, text, context, matcher=matcher))
+    
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield flags as qualifying amounts are found."""
+        if rule.threshold is None:
+            return
+        
+        matcher = self.get_matcher(text, matcher)
         
-        if not rule.pattern or rule.threshold is None:
-            return flags
+        if rule.config.get('lookup'):
+            for entry in lookup_values(rule, matcher):
+                if self.evaluate_condition(entry.value, rule.threshold, rule.operator):
+                    snippet = entry.text if entry.start is None else self.extract_snippet(text, entry.start, entry.end)
+                    formatted_message = self.render_message(rule, value=entry.value)
+                    yield self.create_flag(rule, formatted_message, snippet)
+            return
+        
+        if get_labels(rule):
+            for match, entry in iter_label_values(rule, matcher):
+                if self.evaluate_condition(entry.value, rule.threshold, rule.operator):
+                    snippet = self.extract_snippet(text, match.start(), entry.end)
+                    formatted_message = self.render_message(rule, value=entry.value)
+                    yield self.create_flag(rule, formatted_message, snippet)
+            return
         
         # Find all matches in the text
-        matches = re.finditer(rule.pattern, text, re.IGNORECASE)
+        matches = matcher.finditer(rule.pattern, re.IGNORECASE)
         
         for match in matches:
             try:
@@ -80,35 +117,31 @@ class RegexAmountHandler(BaseRuleHandler):
                 value = float(value_str)
                 
                 # Check threshold condition
-                condition_met = self._evaluate_condition(value, rule.threshold, rule.operator or '>')
+                condition_met = self.evaluate_condition(value, rule.threshold, rule.operator)
                 
                 if condition_met:
                     snippet = self.extract_snippet(text, match.start(), match.end())
-                    formatted_message = self.format_message(rule.message, value=value)
-                    
-                    flags.append(Flag(
-                        rule=rule.name,
-                        message=formatted_message,
-                        snippet=snippet
-                    ))
+                    formatted_message = self.render_message(rule, value=value)
                     
+                    yield self.create_flag(rule, formatted_message, snippet)
+            
             except (ValueError, IndexError) as e:
                 print(f"Error processing amount in rule '{rule.name}': {e}")
                 continue
-        
-        return flags
     
-    def _evaluate_condition(self, value: float, threshold: float, operator: str) -> bool:
-        """Evaluate threshold condition."""
-        if operator == '>':
-            return value > threshold
-        elif operator == '<':
-            return value < threshold
-        elif operator == '>=':
-            return value >= threshold
-        elif operator == '<=':
-            return value <= threshold
-        elif operator == '==':
-            return value == threshold
-        else:
-            return value > threshold  # Default to greater than
\ No newline at end of file
+    def splits_scope(self, rule: Rule) -> bool:
+        """Amounts are matched within each scoped section on its own."""
+        return True
+    
+    def requires_document(self, rule: Rule) -> bool:
+        """Lookups use the values the page parsers locate by layout."""
+        return uses_lookup(rule)
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check the label and lookup settings of the rule."""
+        return get_label_errors(rule) + get_lookup_errors(rule)
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """List the amount pattern (or label pattern) for pre-compilation."""
+        pattern = get_label_pattern(rule) or rule.pattern
+        return [(pattern, re.IGNORECASE)] if pattern else []
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Execution time budgets used to abort rules that run too long."""
+
+import signal
+import threading
+import time
+from typing import Optional
+
+
+class RuleTimeoutError(Exception):
+    """Raised when a rule exceeds its execution time budget."""
+    pass
+
+
+class TimeBudget:
+    """
+    Deadline for one unit of rule work, used as a context manager.
+    
+    In the main thread a real-time interval timer interrupts a regex that is stuck
+    backtracking inside a single search. Elsewhere signals are unavailable, so the
+    budget is enforced cooperatively through check() between matches.
+    """
+    
+    def __init__(self, seconds: Optional[float]):
+        """
+        Initialize budget.
+        
+        Args:
+            seconds: Time allowed, or None for no limit
+        """
+        self.seconds = seconds
+        self.deadline: Optional[float] = None
+        self._armed = False
+        self._previous_handler = None
+    
+    def __enter__(self) -> 'TimeBudget':
+        if self.seconds is None:
+            return self
+        
+        self.deadline = time.perf_counter() + self.seconds
+        if self.seconds <= 0:
+            raise RuleTimeoutError("No time left in budget")
+        
+        if self.can_interrupt():
+            self._previous_handler = signal.signal(signal.SIGALRM, self._on_alarm)
+            self._armed = True
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if self._armed:
+            self._armed = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler or signal.SIG_DFL)
+        return False
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if unlimited."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.perf_counter()
+    
+    def check(self):
+        """Raise RuleTimeoutError if the deadline has passed."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise RuleTimeoutError(f"Exceeded time budget of {self.seconds:.2f}s")
+    
+    def _on_alarm(self, signum, frame):
+        if self._armed:
+            raise RuleTimeoutError(f"Exceeded time budget of {self.seconds:.2f}s")
+    
+    @staticmethod
+    def can_interrupt() -> bool:
+        """Check if a budget can interrupt a regex search running in this thread."""
+        return (
+            hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+            and signal.getitimer(signal.ITIMER_REAL)[0] == 0  # Don't clobber a timer someone else set
+        )
\ No newline at end of file
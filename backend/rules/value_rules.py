@@ -0,0 +1,74 @@
+"""Rule handler for thresholds on named values from the configuration's 'values' section."""
+
+from typing import Iterator, List, Optional, Tuple
+
+from models.core import Rule, RuleType, Flag, UserContext
+from .matcher import DocumentMatcher
+from .numeric_rules import NumericThresholdHandler
+
+
+class ValueThresholdHandler(NumericThresholdHandler):
+    """
+    Handler for value_threshold rules.
+    
+    Compares the named value `value` against `threshold` using `operator`. The
+    message may use {value} and the name of the value or of anything it is
+    computed from, e.g. {apr} and {interest_rate} for `apr_spread: apr - interest_rate`.
+    """
+    
+    def can_handle(self, rule: Rule) -> bool:
+        """Check if this handler can process the given rule."""
+        return rule.rule_type == RuleType.VALUE_THRESHOLD
+    
+    def iter_flags(self, rule: Rule, text: str, context: Optional[UserContext] = None,
+                   matcher: Optional[DocumentMatcher] = None) -> Iterator[Flag]:
+        """Yield a flag if the named value meets the threshold condition."""
+        matcher = self.get_matcher(text, matcher)
+        name = rule.config.get('value')
+        if not name or rule.threshold is None:
+            return
+        
+        value = matcher.named_value(name)
+        if value is None or not self.evaluate_condition(value, rule.threshold, rule.operator):
+            return
+        
+        # Dependencies are already computed, so these are cache lookups
+        inputs = {}
+        for dependency in matcher.value_graph.dependencies(name):
+            dependency_value = matcher.named_value(dependency)
+            if dependency_value is not None:
+                inputs[dependency] = round(dependency_value, 2)
+        
+        formatted_message = self.render_message(rule, **{**inputs, 'value': round(value, 2)})
+        snippet = "; ".join(f"{self._value_label(key)}: {item}" for key, item in inputs.items())
+        yield self.create_flag(rule, formatted_message, snippet)
+    
+    def splits_scope(self, rule: Rule) -> bool:
+        """Values are read from the whole scope at once."""
+        return False
+    
+    def requires_document(self, rule: Rule) -> bool:
+        """The plan's value graph knows whether the values it reads need the parsed document."""
+        return False
+    
+    def get_rule_errors(self, rule: Rule) -> List[str]:
+        """Check that the rule names a value and a threshold."""
+        errors = []
+        if not rule.config.get('value'):
+            errors.append(f"Rule '{rule.name}' has no value")
+        if rule.threshold is None:
+            errors.append(f"Rule '{rule.name}' has no threshold")
+        return errors
+    
+    def get_patterns(self, rule: Rule) -> List[Tuple[str, int]]:
+        """Value patterns are compiled with the plan's value graph."""
+        return []
+    
+    def get_value_names(self, rule: Rule) -> List[str]:
+        """The rule reads the value it compares."""
+        name = rule.config.get('value')
+        return [str(name)] if name else []
+    
+    def _value_label(self, name: str) -> str:
+        """Describe a value name for the flag snippet."""
+        return name.replace('_', ' ').title()
\ No newline at end of file
@@ -1,11 +1,29 @@
 """Document analysis services for fraud detection and scoring."""
 
 from .rule_engine import RuleEngineService
+from .rule_compiler import RuleCompiler, RulePlan, CompiledRule
+from .document_analysis import DocumentAnalysis, RuleRun
+from .batch_analysis import BatchResult, DocumentCaptures
+from .rule_profiler import RuleProfiler
+from .rule_pool import RulePool
+from .shadow_runner import ShadowRunner, ShadowStore, ShadowResult
 from .scoring_service import ScoringService  
 from .validation_service import ValidationService
 
 __all__ = [
     'RuleEngineService',
+    'RuleCompiler',
+    'RulePlan',
+    'CompiledRule',
+    'DocumentAnalysis',
+    'RuleRun',
+    'BatchResult',
+    'DocumentCaptures',
+    'RuleProfiler',
+    'RulePool',
+    'ShadowRunner',
+    'ShadowStore',
+    'ShadowResult',
     'ScoringService',
     'ValidationService'
 ]
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""Batch rule evaluation over many already-extracted documents."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from models.core import RuleType, UserContext
+from .rule_compiler import RulePlan
+
+
+# Rule types whose comparisons are evaluated for all documents at once
+VECTORIZED_TYPES = (RuleType.NUMERIC_THRESHOLD, RuleType.CALCULATED_PERCENTAGE)
+
+# Batches smaller than this are extracted in-process; starting workers costs more
+MIN_POOL_BATCH = 8
+
+# Set once the missing-NumPy fallback has been reported
+_fallback_warned = False
+
+
+@dataclass
+class DocumentCaptures:
+    """Stage one output for a document: numeric captures plus results of the other rules."""
+    
+    config_hash: str
+    flagged: List[int] = field(default_factory=list)  # Plan positions of non-vectorized rules that flagged
+    values: Dict[int, List[float]] = field(default_factory=dict)  # Threshold rule values, by plan position
+    operands: Dict[int, Tuple[Optional[float], Optional[float]]] = field(default_factory=dict)  # Percentage operands
+    timed_out_rules: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    """Documents x rules flag matrix for a batch of documents."""
+    
+    rule_names: List[str]  # One column per rule in plan order
+    flags: Any  # Boolean numpy array of shape (documents, rules), or nested lists without numpy
+    timed_out_rules: List[List[str]]  # Per document
+    stats: Dict[str, Any] = field(default_factory=dict)
+    
+    def flagged_rules(self, document: int) -> List[str]:
+        """Names of the rules that flagged a document."""
+        return [name for name, flagged in zip(self.rule_names, self.flags[document]) if flagged]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format for API responses."""
+        return {
+            'rule_names': self.rule_names,
+            'flags': self.flags.tolist() if NUMPY_AVAILABLE else self.flags,
+            'timed_out_rules': self.timed_out_rules,
+            'stats': self.stats
+        }
+
+
+def is_vectorized(compiled) -> bool:
+    """Check if a compiled rule's comparison is applied in the vectorized stage."""
+    rule = compiled.rule
+    if not compiled.is_executable or rule.rule_type not in VECTORIZED_TYPES or rule.threshold is None:
+        return False
+    return not compiled.exponential_risk  # Left to the engine, which can time-bound it
+
+
+def evaluate_batch(plan: RulePlan, captures: List[DocumentCaptures]) -> BatchResult:
+    """
+    Apply the threshold comparisons of every vectorized rule to all documents at once.
+    
+    Args:
+        plan: Rule plan the captures were extracted with
+        captures: Stage one output, one per document
+    
+    Returns:
+        BatchResult combining the vectorized comparisons with the other rules' results
+    """
+    global _fallback_warned
+    documents = len(captures)
+    rules = len(plan.compiled_rules)
+    
+    if not NUMPY_AVAILABLE and not _fallback_warned:
+        print("Warning: NumPy is not installed; batch threshold comparisons run in pure Python (pip install numpy)")
+        _fallback_warned = True
+    
+    if NUMPY_AVAILABLE:
+        flags = np.zeros((documents, rules), dtype=bool)
+    else:
+        flags = [[False] * rules for _ in range(documents)]
+    
+    for document, document_captures in enumerate(captures):
+        for position in document_captures.flagged:
+            flags[document][position] = True
+    
+    for position, compiled in enumerate(plan.compiled_rules):
+        if not is_vectorized(compiled):
+            continue
+        if compiled.rule.rule_type == RuleType.NUMERIC_THRESHOLD:
+            _apply_thresholds(flags, position, compiled, captures)
+        else:
+            _apply_percentages(flags, position, compiled, captures)
+    
+    return BatchResult(
+        rule_names=[compiled.name for compiled in plan.compiled_rules],
+        flags=flags,
+        timed_out_rules=[document_captures.timed_out_rules for document_captures in captures],
+        stats={
+            'documents': documents,
+            'rules': rules,
+            'vectorized_rules': sum(1 for compiled in plan.compiled_rules if is_vectorized(compiled)),
+            'numpy': NUMPY_AVAILABLE
+        }
+    )
+
+
+def extract_captures(rule_engine, texts: List[str], user_context: Optional[UserContext] = None,
+                     workers: Optional[int] = None) -> List[DocumentCaptures]:
+    """
+    Run stage one for every document, spread across a process pool.
+    
+    Regex matching holds the GIL, so documents are extracted in worker processes
+    that each load the rule plan once. They are started from a forkserver, so the
+    pool never forks a process that is running other threads (e.g. the server's).
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) < MIN_POOL_BATCH:
+        return [rule_engine.extract_captures(text, user_context) for text in texts]
+    
+    config_hash = rule_engine.get_plan().config_hash
+    chunksize = max(1, len(texts) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=_init_worker,
+        initargs=(rule_engine.rules_loader.config_path, rule_engine.rule_time_budget,
+                  rule_engine.analysis_time_budget, rule_engine.snapshot_path is not None)
+    ) as executor:
+        captures = list(executor.map(_extract_in_worker, texts, [user_context] * len(texts), chunksize=chunksize))
+    
+    if any(document_captures.config_hash != config_hash for document_captures in captures):
+        raise RuntimeError("Rules configuration changed during batch analysis; run the batch again")
+    return captures
+
+
+# Rule engine of a pool worker process, created once by _init_worker
+_worker_engine = None
+
+
+def _init_worker(config_path: str, rule_time_budget: Optional[float], analysis_time_budget: Optional[float],
+                 use_snapshot: bool):
+    """Load the rule plan in a worker process."""
+    global _worker_engine
+    from .rule_engine import RuleEngineService
+    _worker_engine = RuleEngineService(config_path, rule_time_budget=rule_time_budget,
+                                       analysis_time_budget=analysis_time_budget, profile_window=None,
+                                       use_snapshot=use_snapshot)
+    _worker_engine.get_plan()
+
+
+def _extract_in_worker(text: str, user_context: Optional[UserContext]) -> DocumentCaptures:
+    """Run stage one for one document in a worker process."""
+    return _worker_engine.extract_captures(text, user_context)
+
+
+def _apply_thresholds(flags, position: int, compiled, captures: List[DocumentCaptures]):
+    """Flag documents with any captured value meeting a threshold rule's condition."""
+    rule = compiled.rule
+    if not NUMPY_AVAILABLE:
+        for document, document_captures in enumerate(captures):
+            flags[document][position] = any(
+                compiled.handler.evaluate_condition(value, rule.threshold, rule.operator)
+                for value in document_captures.values.get(position, [])
+            )
+        return
+    
+    counts = [len(document_captures.values.get(position, [])) for document_captures in captures]
+    values = np.fromiter(
+        (value for document_captures in captures for value in document_captures.values.get(position, [])),
+        dtype=np.float64, count=sum(counts)
+    )
+    documents = np.repeat(np.arange(len(captures)), counts)
+    met = _compare_array(values, rule.operator, rule.threshold)
+    flags[documents[met], position] = True
+
+
+def _apply_percentages(flags, position: int, compiled, captures: List[DocumentCaptures]):
+    """Flag documents whose numerator/denominator percentage meets a rule's condition."""
+    rule = compiled.rule
+    if not NUMPY_AVAILABLE:
+        for document, document_captures in enumerate(captures):
+            numerator, denominator = document_captures.operands.get(position, (None, None))
+            flags[document][position] = (
+                numerator is not None and bool(denominator)
+                and compiled.handler.evaluate_condition(numerator / denominator * 100, rule.threshold, rule.operator)
+            )
+        return
+    
+    operands = np.array(
+        [document_captures.operands.get(position, (None, None)) for document_captures in captures],
+        dtype=np.float64
+    ).reshape(len(captures), 2)  # None becomes NaN
+    numerators, denominators = operands[:, 0], operands[:, 1]
+    valid = ~np.isnan(numerators) & ~np.isnan(denominators) & (denominators != 0)
+    
+    # Divide before scaling, as CalculatedPercentageHandler does, so values at the threshold compare alike
+    percentages = np.zeros(len(captures))
+    np.divide(numerators, denominators, out=percentages, where=valid)
+    percentages *= 100
+    flags[:, position] = valid & _compare_array(percentages, rule.operator, rule.threshold)
+
+
+def _compare_array(values, operator: Optional[str], threshold: float):
+    """Evaluate a threshold condition over an array of values, like NumericThresholdHandler."""
+    if operator == '<':
+        return values < threshold
+    elif operator == '>=':
+        return values >= threshold
+    elif operator == '<=':
+        return values <= threshold
+    elif operator == '==':
+        return values == threshold
+    else:
+        return values > threshold  # Default to greater than
\ No newline at end of file
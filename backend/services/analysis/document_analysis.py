@@ -0,0 +1,49 @@
+"""Per-document analysis state reused when only the user context changes."""
+
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple
+
+from models.core import Flag
+from models.document import DocumentLayout, ParsedDocument, Span
+from rules.matcher import DocumentMatcher
+
+
+@dataclass
+class RuleRun:
+    """Results of running a subset of the rule plan against a document."""
+    
+    rule_flags: Dict[int, List[Flag]] = field(default_factory=dict)  # Keyed by position in the plan
+    timed_out_rules: List[str] = field(default_factory=list)
+    scoped_rules: int = 0
+
+
+@dataclass
+class DocumentAnalysis:
+    """
+    Context-free rule results for one document, with the matchers that produced them.
+    
+    Context-dependent rules can be re-run against this state without re-parsing the
+    PDF, and they reuse the regex matches already found in the document.
+    """
+    
+    text: str
+    config_hash: str
+    matcher: DocumentMatcher
+    context_free: RuleRun
+    all_matches: bool = False
+    layout: Optional[DocumentLayout] = None
+    document: Optional[ParsedDocument] = None
+    scope_matchers: Dict[Tuple[Span, ...], DocumentMatcher] = field(default_factory=dict)
+    context_free_seconds: float = 0.0  # Spent on the context-free rules, out of the analysis time budget
+    
+    # Matchers are not thread-safe; runs against the same document take turns
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    def get_matcher_stats(self) -> Dict[str, Any]:
+        """Combined statistics of every matcher used on this document so far."""
+        stats = dict(self.matcher.stats)
+        for scope_matcher in self.scope_matchers.values():
+            for key, value in scope_matcher.stats.items():
+                stats[key] += value
+        return stats
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""Rule compiler that turns loaded rules into a reusable execution plan."""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Dict, Pattern, Tuple
+
+from models.core import Rule, RuleType, FlagSeverity, determine_severity, compile_template
+from models.document import DocumentSection, ScopeItem
+from rules.base_rule import BaseRuleHandler
+from rules.matcher import PatternKey
+from rules.anchors import AnchorClause, extract_anchors
+from rules.backtracking import BacktrackingRisk, find_backtracking_risks
+from rules.derived_values import ValueGraph
+
+
+@dataclass
+class CompiledRule:
+    """An enabled rule with its handler, patterns and severity resolved."""
+    
+    rule: Rule
+    handler: Optional[BaseRuleHandler]
+    severity: FlagSeverity
+    patterns: List[PatternKey] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    exponential_risk: bool = False  # Can only be bounded by interrupting the regex engine
+    backtracking_risk: bool = False  # A single search may run long, exponentially or not
+    scope: Optional[Tuple[ScopeItem, ...]] = None
+    uses_context: bool = False  # Re-run whenever the user context changes
+    content_hash: str = ''
+    
+    @property
+    def name(self) -> str:
+        """Name of the underlying rule."""
+        return self.rule.name
+    
+    @property
+    def is_executable(self) -> bool:
+        """Check if the rule has a handler and all of its patterns compiled."""
+        return self.handler is not None and not self.errors
+
+
+@dataclass
+class RulePlan:
+    """Compiled rule set built once per version of the rules configuration."""
+    
+    rules: List[Rule]
+    compiled_rules: List[CompiledRule]
+    dispatch: Dict[RuleType, BaseRuleHandler]
+    patterns: Dict[PatternKey, Pattern]
+    anchors: Dict[PatternKey, List[AnchorClause]]
+    config_hash: str
+    config_mtime: float
+    values: ValueGraph = field(default_factory=lambda: ValueGraph({}, []))
+    value_warnings: List[str] = field(default_factory=list)
+    
+    @property
+    def errors(self) -> List[str]:
+        """Compilation errors across all enabled rules and the values section."""
+        return [error for compiled in self.compiled_rules for error in compiled.errors] + self.values.errors
+    
+    @property
+    def requires_document(self) -> bool:
+        """Check if any executable rule or the values they read need the parsed document."""
+        return self.values.requires_document or any(
+            compiled.is_executable and compiled.handler.requires_document(compiled.rule)
+            for compiled in self.compiled_rules
+        )
+    
+    @property
+    def rule_keys(self) -> List[str]:
+        """Key of each enabled rule in plan order: its name, suffixed with '#n' for the n-th rule of that name."""
+        keys = []
+        seen: Dict[str, int] = {}
+        for compiled in self.compiled_rules:
+            seen[compiled.name] = seen.get(compiled.name, 0) + 1
+            keys.append(compiled.name if seen[compiled.name] == 1 else f"{compiled.name}#{seen[compiled.name]}")
+        return keys
+    
+    @property
+    def rule_hashes(self) -> Dict[str, str]:
+        """Content hash of each enabled rule, by rule key, so rules sharing a name are tracked apart."""
+        return {key: compiled.content_hash for key, compiled in zip(self.rule_keys, self.compiled_rules)}
+    
+    @property
+    def warnings(self) -> List[str]:
+        """Backtracking risks found in the patterns of enabled rules and the values they read."""
+        return [warning for compiled in self.compiled_rules for warning in compiled.warnings] + self.value_warnings
+
+
+class RuleCompiler:
+    """Compiles rules into a plan with pre-compiled regexes and a handler dispatch table."""
+    
+    def __init__(self, handlers: List[BaseRuleHandler]):
+        self.handlers = handlers
+    
+    def build_dispatch_table(self) -> Dict[RuleType, BaseRuleHandler]:
+        """Map every rule type to the first handler that accepts it."""
+        dispatch = {}
+        for rule_type in RuleType:
+            probe = Rule(name='', rule_type=rule_type, message='', config={})
+            for handler in self.handlers:
+                if handler.can_handle(probe):
+                    dispatch[rule_type] = handler
+                    break
+        return dispatch
+    
+    def compile(self, rules: List[Rule], config_hash: str = '', config_mtime: float = 0.0,
+                values: Optional[Dict[str, Any]] = None) -> RulePlan:
+        """
+        Compile rules into an execution plan.
+        
+        Args:
+            rules: All rules loaded from the configuration
+            config_hash: Hash of the configuration the rules were loaded from
+            config_mtime: Modification time of the configuration file
+            values: The configuration's 'values' section of named values rules may read
+        
+        Returns:
+            RulePlan with enabled rules in configuration order
+        """
+        dispatch = self.build_dispatch_table()
+        patterns: Dict[PatternKey, Pattern] = {}
+        anchors: Dict[PatternKey, List[AnchorClause]] = {}
+        risks: Dict[PatternKey, List[BacktrackingRisk]] = {}
+        compiled_rules = []
+        
+        for rule in rules:
+            if not rule.enabled:
+                continue
+            
+            # Resolve severity and the message template once instead of per flag
+            severity_error = None
+            if rule.severity is None:
+                rule.severity, severity_error = self._resolve_severity(rule)
+            rule.message_template = compile_template(rule.message)
+            
+            handler = dispatch.get(rule.rule_type)
+            compiled = CompiledRule(rule=rule, handler=handler, severity=rule.severity,
+                                    content_hash=rule.content_hash())
+            if severity_error:
+                compiled.errors.append(severity_error)
+            compiled.scope = self._compile_scope(rule, compiled.errors)
+            
+            if handler:
+                compiled.uses_context = handler.uses_context(rule)
+                compiled.errors.extend(handler.get_rule_errors(rule))
+                for key in handler.get_patterns(rule):
+                    compiled.patterns.append(key)
+                    if key not in patterns:
+                        try:
+                            patterns[key] = re.compile(*key)
+                        except re.error as e:
+                            compiled.errors.append(f"Invalid pattern in rule '{rule.name}': {e}")
+                            continue
+                        
+                        # Literals the document must contain for the pattern to match
+                        pattern_anchors = extract_anchors(*key)
+                        if pattern_anchors:
+                            anchors[key] = pattern_anchors
+                        risks[key] = find_backtracking_risks(*key)
+                    
+                    for risk in risks[key]:
+                        compiled.warnings.append(f"Pattern in rule '{rule.name}' may backtrack: {risk}")
+                        compiled.exponential_risk = compiled.exponential_risk or risk.exponential
+                        compiled.backtracking_risk = True
+            
+            compiled_rules.append(compiled)
+        
+        value_graph, value_warnings = self._compile_values(values, compiled_rules, patterns, anchors, risks)
+        return RulePlan(
+            rules=rules,
+            compiled_rules=compiled_rules,
+            dispatch=dispatch,
+            patterns=patterns,
+            anchors=anchors,
+            config_hash=config_hash,
+            config_mtime=config_mtime,
+            values=value_graph,
+            value_warnings=value_warnings
+        )
+    
+    def _compile_values(self, values: Optional[Dict[str, Any]], compiled_rules: List[CompiledRule],
+                        patterns: Dict[PatternKey, Pattern], anchors: Dict[PatternKey, List[AnchorClause]],
+                        risks: Dict[PatternKey, List[BacktrackingRisk]]) -> Tuple[ValueGraph, List[str]]:
+        """
+        Build the graph of the named values enabled rules read, and compile their patterns.
+        
+        Values no enabled rule needs are left out, so they are never computed.
+        """
+        rule_values = {
+            compiled.name: compiled.handler.get_value_names(compiled.rule)
+            for compiled in compiled_rules if compiled.handler
+        }
+        needed = list(dict.fromkeys(name for names in rule_values.values() for name in names))
+        graph = ValueGraph.parse(values, needed)
+        
+        warnings = []
+        exponential = set()
+        backtracking = set()
+        for name, pattern in graph.patterns():
+            key = (pattern, re.IGNORECASE)
+            if key not in patterns:
+                patterns[key] = re.compile(*key)
+                pattern_anchors = extract_anchors(*key)
+                if pattern_anchors:
+                    anchors[key] = pattern_anchors
+                risks[key] = find_backtracking_risks(*key)
+            for risk in risks[key]:
+                warnings.append(f"Pattern in value '{name}' may backtrack: {risk}")
+                backtracking.add(name)
+                if risk.exponential:
+                    exponential.add(name)
+        
+        for compiled in compiled_rules:
+            names = rule_values.get(compiled.name, [])
+            if not names:
+                continue
+            
+            # A rule changes whenever a value it reads is redefined
+            definitions = []
+            for name in names:
+                if name not in graph:
+                    compiled.errors.append(f"Value '{name}' in rule '{compiled.name}' is not defined or cannot be computed")
+                    continue
+                for dependency in graph.dependencies(name):
+                    definitions.append((dependency, graph.definitions[dependency].config))
+                    compiled.exponential_risk = compiled.exponential_risk or dependency in exponential
+                    compiled.backtracking_risk = compiled.backtracking_risk or dependency in backtracking
+            digest = hashlib.sha256(f"{compiled.content_hash}{definitions!r}".encode('utf-8'))
+            compiled.content_hash = digest.hexdigest()
+        
+        return graph, warnings
+    
+    def _resolve_severity(self, rule: Rule) -> Tuple[FlagSeverity, Optional[str]]:
+        """Use the rule's declared severity, inferring it from the message keywords if none is set."""
+        declared = rule.config.get('severity')
+        if declared is None:
+            return determine_severity(rule.message), None
+        try:
+            return FlagSeverity(str(declared).lower()), None
+        except ValueError:
+            expected = [severity.value for severity in FlagSeverity]
+            return (determine_severity(rule.message),
+                    f"Invalid severity '{declared}' in rule '{rule.name}': expected one of {expected}")
+    
+    def _compile_scope(self, rule: Rule, errors: List[str]) -> Optional[Tuple[ScopeItem, ...]]:
+        """Resolve a rule's scope entries to page numbers and DocumentSection members."""
+        if not rule.scope:
+            return None
+        
+        scope = []
+        for item in rule.scope:
+            if isinstance(item, int) and not isinstance(item, bool) and item >= 1:
+                scope.append(item)
+                continue
+            try:
+                scope.append(DocumentSection(item))
+            except ValueError:
+                errors.append(f"Invalid scope '{item}' in rule '{rule.name}': expected a page number or document section")
+        
+        return tuple(scope)
\ No newline at end of file
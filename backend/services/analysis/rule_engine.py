@@ -1,23 +1,63 @@
 """Rule engine service using modular rule handlers."""
 
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from typing import List, Optional, Dict, Any, Tuple, Callable
 from collections import defaultdict
 
-from models.core import Rule, Flag, UserContext
+from models.core import Rule, RuleType, Flag, UserContext
+from models.document import DocumentLayout, ParsedDocument, Span
+from models.analysis import AnalysisResult
 from config.rules_loader import RulesLoader
+from rules.base_rule import BaseRuleHandler
+from rules.matcher import DocumentMatcher
+from rules.time_budget import TimeBudget, RuleTimeoutError
+from .rule_compiler import RuleCompiler, RulePlan, CompiledRule
+from .document_analysis import DocumentAnalysis, RuleRun
+from .rule_profiler import RuleProfiler
+from .rule_pool import RulePool, DEFAULT_MIN_CHARS
+from .rule_snapshot import snapshot_path, load_snapshot
+from .batch_analysis import BatchResult, DocumentCaptures, is_vectorized, extract_captures, evaluate_batch
 
 # Import rule handlers
 from rules.numeric_rules import NumericThresholdHandler
 from rules.regex_rules import RegexPresenceHandler, RegexAbsenceHandler, RegexAmountHandler
 from rules.compound_rules import CompoundRuleHandler, CrossReferencePatternHandler
 from rules.context_rules import ContextComparisonHandler
+from rules.field_rules import FieldRuleHandler, LineItemMatchHandler
+from rules.value_rules import ValueThresholdHandler
 
 
 class RuleEngineService:
     """Service for processing rules against document text."""
     
-    def __init__(self, config_path: str = "rules-config.yaml"):
+    def __init__(self, config_path: str = "rules-config.yaml", rule_time_budget: Optional[float] = 2.0,
+                 analysis_time_budget: Optional[float] = 30.0, profile_window: Optional[int] = 1024,
+                 use_snapshot: bool = False, pool_workers: Optional[int] = None,
+                 pool_min_chars: int = DEFAULT_MIN_CHARS):
+        """
+        Initialize rule engine.
+        
+        Args:
+            config_path: Path to the rules YAML configuration
+            rule_time_budget: Seconds a single rule may run before it is aborted, or None for no limit
+            analysis_time_budget: Seconds a whole analysis may run, or None for no limit
+            profile_window: Recent evaluations of each rule kept for timing percentiles,
+                or None to disable profiling
+            use_snapshot: Load the compiled rules from the snapshot next to the configuration
+                when it matches the configuration's hash
+            pool_workers: Worker processes that share the rules of large documents, or None
+                to always evaluate in-process
+            pool_min_chars: Smallest document, in characters, evaluated on the worker pool
+        """
         self.rules_loader = RulesLoader(config_path)
+        self.rule_time_budget = rule_time_budget
+        self.analysis_time_budget = analysis_time_budget
+        self.profiler = RuleProfiler(profile_window) if profile_window else None
+        self.snapshot_path = snapshot_path(config_path) if use_snapshot else None
+        self.rule_pool = RulePool(self, pool_workers, pool_min_chars) if pool_workers else None
+        self._guard_pool: Optional[RulePool] = None  # Runs rules that may backtrack for other threads
+        self._guard_lock = threading.Lock()
         self.handlers = [
             NumericThresholdHandler(),
             RegexPresenceHandler(),
@@ -25,8 +65,59 @@ class RuleEngineService:
             RegexAmountHandler(),
             CompoundRuleHandler(),
             CrossReferencePatternHandler(),
-            ContextComparisonHandler()
+            ContextComparisonHandler(),
+            FieldRuleHandler(),
+            LineItemMatchHandler(),
+            ValueThresholdHandler()
         ]
+        self.compiler = RuleCompiler(self.handlers)
+        self._plan: Optional[RulePlan] = None
+        self._plan_lock = threading.Lock()
+    
+    def get_plan(self) -> RulePlan:
+        """Get the compiled rule plan, rebuilding it only if the config file changed."""
+        plan = self._plan
+        try:
+            mtime = self.rules_loader.get_config_mtime()
+        except OSError as e:
+            if plan is not None:
+                return plan  # Keep serving the last good plan
+            raise Exception(f"Failed to load rules configuration: {e}")
+        
+        if plan is not None and plan.config_mtime == mtime:
+            return plan
+        
+        with self._plan_lock:
+            return self._build_plan(mtime)
+    
+    def _build_plan(self, mtime: float, force: bool = False) -> RulePlan:
+        """Build the rule plan, reusing the current one if the config content is unchanged."""
+        try:
+            data = self.rules_loader.read_config()
+        except Exception as e:
+            raise Exception(f"Failed to load rules configuration: {e}")
+        
+        config_hash = self.rules_loader.hash_config(data)
+        if not force and self._plan is not None and self._plan.config_hash == config_hash:
+            # Touched but not edited - no need to recompile
+            self._plan.config_mtime = mtime
+            return self._plan
+        
+        plan = None
+        if self.snapshot_path and not force:
+            plan = load_snapshot(self.snapshot_path, config_hash, self.compiler.build_dispatch_table(), mtime)
+        if plan is None:
+            rules, values = self.rules_loader.parse_config(data)
+            plan = self.compiler.compile(rules, config_hash, mtime, values)
+        for error in plan.errors:
+            print(f"Warning: {error}")
+        if plan.warnings:
+            # Recorded on the plan and listed by validate_rules_config(), not repeated on every load
+            print(f"Warning: {len(plan.warnings)} patterns may backtrack and only run under the time budget "
+                  f"(see GET /debug/rules)")
+        
+        self._plan = plan
+        return plan
     
     def analyze_text(self, text: str, user_context: Optional[UserContext] = None) -> List[Flag]:
         """
@@ -35,39 +126,443 @@ class RuleEngineService:
         Args:
             text: The document text to analyze
             user_context: Optional user context for enhanced analysis
-            
+        
         Returns:
             List of flags detected by the rules
         """
+        return self.analyze(text, user_context).flags
+    
+    def analyze(self, text: str, user_context: Optional[UserContext] = None,
+                all_matches: bool = False, layout: Optional[DocumentLayout] = None,
+                document: Optional[ParsedDocument] = None) -> AnalysisResult:
+        """
+        Analyze text using all enabled rules and collect run statistics.
+        
+        Args:
+            text: The document text to analyze
+            user_context: Optional user context for enhanced analysis
+            all_matches: Keep every flag a rule produces instead of stopping at the first
+            layout: Page and section spans of the text, used to evaluate scoped rules
+                against their slice only; scoped rules see the whole text without it
+            document: Parsed closing disclosure for field and line item rules, which
+                produce no flags without it
+        
+        Returns:
+            AnalysisResult with the detected flags and matcher statistics
+        """
+        analysis = self.prepare_analysis(text, all_matches, layout, document)
+        return self.reanalyze(analysis, user_context)
+    
+    def prepare_analysis(self, text: str, all_matches: bool = False, layout: Optional[DocumentLayout] = None,
+                         document: Optional[ParsedDocument] = None) -> DocumentAnalysis:
+        """
+        Run the rules that do not depend on user context and keep the state for reuse.
+        
+        Args:
+            text: The document text to analyze
+            all_matches: Keep every flag a rule produces instead of stopping at the first
+            layout: Page and section spans of the text
+            document: Parsed closing disclosure for field and line item rules
+        
+        Returns:
+            DocumentAnalysis to pass to reanalyze() whenever the user context changes
+        """
+        plan = self.get_plan()
+        analysis = self._create_analysis(plan, text, all_matches, layout, document)
+        with analysis.lock:
+            self._run_context_free(plan, analysis)
+        return analysis
+    
+    def reanalyze(self, analysis: DocumentAnalysis, user_context: Optional[UserContext] = None) -> AnalysisResult:
+        """
+        Run only the context-dependent rules, combined with the cached context-free flags.
+        
+        Args:
+            analysis: State from prepare_analysis() for the document
+            user_context: Optional user context for enhanced analysis
+        
+        Returns:
+            AnalysisResult with the detected flags and matcher statistics
+        """
+        plan = self.get_plan()
+        positions = [position for position, compiled in enumerate(plan.compiled_rules) if compiled.uses_context]
+        with analysis.lock:
+            if analysis.config_hash != plan.config_hash:
+                # Rules changed since the document was analyzed - cached results are stale
+                fresh = self._create_analysis(plan, analysis.text, analysis.all_matches,
+                                              analysis.layout, analysis.document)
+                analysis.config_hash = plan.config_hash
+                analysis.matcher = fresh.matcher
+                analysis.scope_matchers = fresh.scope_matchers
+                self._run_context_free(plan, analysis)
+            
+            # The context-free rules already used part of this document's analysis budget
+            remaining = None
+            if self.analysis_time_budget is not None:
+                remaining = max(0.0, self.analysis_time_budget - analysis.context_free_seconds)
+            context_free = analysis.context_free
+            context_run = self._run_rules(plan, analysis, positions, user_context, remaining)
+            stats = analysis.get_matcher_stats()
+        
+        runs = [context_free, context_run]
+        flags = self._collect_flags(
+            plan, lambda position, compiled: context_free.rule_flags.get(position)
+            or context_run.rule_flags.get(position)
+        )
+        
+        stats['scoped_rules'] = sum(run.scoped_rules for run in runs)
+        stats['timed_out_rules'] = [name for run in runs for name in run.timed_out_rules]
+        rule_hashes = {
+            key: compiled.content_hash for key, compiled in zip(plan.rule_keys, plan.compiled_rules)
+            if compiled.name not in stats['timed_out_rules']
+        }
+        return AnalysisResult(flags=flags, stats=stats, rule_hashes=rule_hashes)
+    
+    def analyze_batch(self, texts: List[str], user_context: Optional[UserContext] = None,
+                      workers: Optional[int] = None) -> BatchResult:
+        """
+        Evaluate all enabled rules over many already-extracted documents.
+        
+        Stage one extracts the numeric captures of threshold and calculated percentage
+        rules (and runs the other rules) for each document in a process pool. Stage two
+        applies the threshold comparisons to all documents at once with NumPy.
+        
+        Args:
+            texts: Document texts to analyze
+            user_context: Optional user context applied to every document
+            workers: Worker processes for stage one (default: CPU count; 1 runs in-process)
+        
+        Returns:
+            BatchResult with a documents x rules flag matrix. Unlike analyze(), every
+            rule gets its own column, even when an earlier rule has the same name.
+        """
+        start_time = time.perf_counter()
+        plan = self.get_plan()
+        captures = extract_captures(self, texts, user_context, workers)
+        extracted_time = time.perf_counter()
+        
+        result = evaluate_batch(plan, captures)
+        result.stats['extract_seconds'] = extracted_time - start_time
+        result.stats['evaluate_seconds'] = time.perf_counter() - extracted_time
+        return result
+    
+    def extract_captures(self, text: str, user_context: Optional[UserContext] = None) -> DocumentCaptures:
+        """
+        Run stage one of analyze_batch() for a document.
+        
+        Threshold and calculated percentage rules only have their values extracted;
+        the other rules are run as usual.
+        """
+        plan = self.get_plan()
+        analysis = self._create_analysis(plan, text, False, None, None)
+        matcher = analysis.matcher
+        vectorized = [position for position, compiled in enumerate(plan.compiled_rules) if is_vectorized(compiled)]
+        
+        run = self._run_rules(
+            plan, analysis, [position for position in range(len(plan.compiled_rules)) if position not in vectorized],
+            user_context
+        )
+        captures = DocumentCaptures(
+            config_hash=plan.config_hash,
+            flagged=sorted(run.rule_flags),
+            timed_out_rules=list(run.timed_out_rules)
+        )
+        
+        analysis_deadline = None
+        if self.analysis_time_budget is not None:
+            analysis_deadline = time.perf_counter() + self.analysis_time_budget
+        
+        for position in vectorized:
+            compiled = plan.compiled_rules[position]
+            rule = compiled.rule
+            outcome = 'error'
+            scanned = matcher.stats['matches_scanned']
+            rule_start = time.perf_counter()
+            try:
+                with TimeBudget(self._get_rule_budget(analysis_deadline)) as budget:
+                    matcher.budget = budget
+                    if rule.rule_type == RuleType.NUMERIC_THRESHOLD:
+                        captures.values[position] = compiled.handler.extract_values(rule, matcher)
+                    else:
+                        captures.operands[position] = compiled.handler.extract_operands(rule, matcher)
+                outcome = 'clear'  # Compared in the vectorized stage
+            except RuleTimeoutError as e:
+                print(f"Warning: Rule '{rule.name}' timed out: {e}")
+                captures.timed_out_rules.append(rule.name)
+                outcome = 'timeout'
+            except Exception as e:
+                print(f"Error processing rule '{rule.name}': {e}")
+            finally:
+                matcher.budget = None
+                if self.profiler is not None:
+                    self.profiler.record(rule.name, time.perf_counter() - rule_start,
+                                         matcher.stats['matches_scanned'] - scanned, outcome)
+        
+        return captures
+    
+    def create_analysis(self, text: str, all_matches: bool = False, layout: Optional[DocumentLayout] = None,
+                        document: Optional[ParsedDocument] = None) -> DocumentAnalysis:
+        """Create the analysis state for a document without running any rules."""
+        return self._create_analysis(self.get_plan(), text, all_matches, layout, document)
+    
+    def rescore(self, analysis: DocumentAnalysis, flags: List[Flag], rule_hashes: Dict[str, str],
+                user_context: Optional[UserContext] = None) -> AnalysisResult:
+        """
+        Re-run only the rules added or changed since a document was scored.
+        
+        Args:
+            analysis: Analysis state of the document, e.g. from create_analysis()
+            flags: Flags the document was scored with
+            rule_hashes: Rule hashes the flags were computed with (AnalysisResult.rule_hashes)
+            user_context: User context the document was scored with
+        
+        Returns:
+            AnalysisResult with the kept and new flags. Flags of removed rules are
+            dropped; rules that time out keep their previous flags and hash.
+        """
+        plan = self.get_plan()
+        if analysis.config_hash != plan.config_hash:
+            analysis = self._create_analysis(plan, analysis.text, analysis.all_matches,
+                                             analysis.layout, analysis.document)
+        
+        # Flags only record their rule's name, so every rule sharing a name with a changed rule is re-run
+        changed = {
+            compiled.name for key, compiled in zip(plan.rule_keys, plan.compiled_rules)
+            if rule_hashes.get(key) != compiled.content_hash
+        }
+        positions = [position for position, compiled in enumerate(plan.compiled_rules) if compiled.name in changed]
+        with analysis.lock:
+            run = self._run_rules(plan, analysis, positions, user_context)
+            stats = analysis.get_matcher_stats()
+        
+        rerun = changed - set(run.timed_out_rules)
+        kept: Dict[str, List[Flag]] = {}
+        for flag in flags:
+            kept.setdefault(flag.rule, []).append(flag)
+        
+        flags = self._collect_flags(
+            plan, lambda position, compiled: run.rule_flags.get(position)
+            if compiled.name in rerun else kept.get(compiled.name)
+        )
+        
+        new_hashes = {}
+        for key, compiled in zip(plan.rule_keys, plan.compiled_rules):
+            if compiled.name in rerun:
+                new_hashes[key] = compiled.content_hash
+            elif key in rule_hashes:
+                new_hashes[key] = rule_hashes[key]
+        
+        stats['scoped_rules'] = run.scoped_rules
+        stats['timed_out_rules'] = run.timed_out_rules
+        stats['rescored_rules'] = sorted(rerun)
+        return AnalysisResult(flags=flags, stats=stats, rule_hashes=new_hashes)
+    
+    def _run_context_free(self, plan: RulePlan, analysis: DocumentAnalysis):
+        """Run the rules that do not depend on user context; the caller holds the analysis lock."""
+        positions = [position for position, compiled in enumerate(plan.compiled_rules) if not compiled.uses_context]
+        start = time.perf_counter()
+        analysis.context_free = self._run_rules(plan, analysis, positions, None)
+        analysis.context_free_seconds = time.perf_counter() - start
+    
+    def _create_analysis(self, plan: RulePlan, text: str, all_matches: bool, layout: Optional[DocumentLayout],
+                         document: Optional[ParsedDocument]) -> DocumentAnalysis:
+        """Create the analysis state for a document against a plan."""
+        return DocumentAnalysis(
+            text=text,
+            config_hash=plan.config_hash,
+            matcher=DocumentMatcher(
+                text, plan.patterns, plan.anchors, document,
+                values=layout.values if layout is not None and layout.text == text else None,
+                value_graph=plan.values
+            ),
+            context_free=RuleRun(),
+            all_matches=all_matches,
+            layout=layout,
+            document=document
+        )
+    
+    def _collect_flags(self, plan: RulePlan,
+                       get_flags: Callable[[int, CompiledRule], Optional[List[Flag]]]) -> List[Flag]:
+        """Collect flags in plan order, keeping only the first flagged rule of each name."""
         flags = []
         flagged_rules = set()  # Track which rules have already been flagged to prevent duplicates
         
-        # Load enabled rules
-        rules = self.rules_loader.get_enabled_rules()
+        for position, compiled in enumerate(plan.compiled_rules):
+            if compiled.name in flagged_rules:
+                continue
+            rule_flags = get_flags(position, compiled)
+            if rule_flags:
+                flags.extend(rule_flags)
+                flagged_rules.add(compiled.name)
         
-        for rule in rules:
-            # Skip if this rule has already been flagged
-            if rule.name in flagged_rules:
+        return flags
+    
+    def _run_rules(self, plan: RulePlan, analysis: DocumentAnalysis, positions: List[int],
+                   user_context: Optional[UserContext], analysis_budget: Optional[float] = None) -> RuleRun:
+        """
+        Run the rules at the given plan positions against a document.
+        
+        Args:
+            analysis_budget: Seconds these rules may run in total (default: the analysis time budget)
+        """
+        if analysis_budget is None:
+            analysis_budget = self.analysis_time_budget
+        
+        if self.rule_pool is not None and self.rule_pool.should_shard(analysis.text, positions):
+            run = self.rule_pool.run(plan, analysis, positions, user_context, analysis_budget)
+            if run is not None:
+                return run
+        
+        run = RuleRun()
+        matcher = analysis.matcher
+        layout = analysis.layout
+        
+        analysis_deadline = None
+        if analysis_budget is not None:
+            analysis_deadline = time.perf_counter() + analysis_budget
+        
+        # Off the main thread a stuck search cannot be interrupted, only checked between
+        # matches, so rules whose patterns may backtrack run where their budget can stop them
+        guarded_run = None
+        if self.rule_time_budget is not None and not TimeBudget.can_interrupt():
+            guarded = [position for position in positions
+                       if plan.compiled_rules[position].backtracking_risk and plan.compiled_rules[position].is_executable]
+            if guarded:
+                guarded_run = self._run_guarded(plan, analysis, guarded, user_context, analysis_budget)
+            if guarded_run is not None:
+                guarded_positions = set(guarded)
+                positions = [position for position in positions if position not in guarded_positions]
+        
+        for position in positions:
+            compiled = plan.compiled_rules[position]
+            rule = compiled.rule
+            
+            # Skip rules whose patterns failed to compile
+            if compiled.errors:
+                continue
+            
+            handler = compiled.handler
+            if not handler:
+                print(f"Warning: No handler found for rule type '{rule.rule_type.value}' in rule '{rule.name}'")
                 continue
             
+            targets = [matcher]
+            if compiled.scope and layout is not None:
+                spans = layout.resolve_scope(compiled.scope)
+                if spans:
+                    targets = self._get_scope_matchers(plan, matcher, spans, handler.splits_scope(rule),
+                                                       analysis.scope_matchers)
+                    run.scoped_rules += 1
+            
+            outcome = 'error'
+            scanned = sum(target.stats['matches_scanned'] for target in targets)
+            rule_start = time.perf_counter()
             try:
-                # Find appropriate handler for this rule
-                handler = self._get_handler_for_rule(rule)
-                if handler:
-                    rule_flags = handler.process_rule(rule, text, user_context)
-                    
-                    # If this rule found any flags, add the first one and mark rule as flagged
-                    if rule_flags:
-                        flags.append(rule_flags[0])  # Only take the first match to avoid duplicates
-                        flagged_rules.add(rule.name)
-                else:
-                    print(f"Warning: No handler found for rule type '{rule.rule_type.value}' in rule '{rule.name}'")
-                    
+                with TimeBudget(self._get_rule_budget(analysis_deadline)) as budget:
+                    rule_flags = []
+                    for target in targets:
+                        target.budget = budget
+                        rule_flags.extend(self._run_handler(handler, rule, target, user_context, analysis.all_matches))
+                        if rule_flags and not analysis.all_matches:
+                            break
+                
+                if rule_flags:
+                    run.rule_flags[position] = rule_flags
+                outcome = 'flagged' if rule_flags else 'clear'
+            
+            except RuleTimeoutError as e:
+                print(f"Warning: Rule '{rule.name}' timed out: {e}")
+                run.timed_out_rules.append(rule.name)
+                outcome = 'timeout'
+                continue
             except Exception as e:
                 print(f"Error processing rule '{rule.name}': {e}")
                 continue
+            finally:
+                for target in targets:
+                    target.budget = None
+                if self.profiler is not None:
+                    self.profiler.record(
+                        rule.name, time.perf_counter() - rule_start,
+                        sum(target.stats['matches_scanned'] for target in targets) - scanned, outcome
+                    )
         
-        return flags
+        if guarded_run is not None:
+            run.rule_flags = dict(sorted({**run.rule_flags, **guarded_run.rule_flags}.items()))
+            run.scoped_rules += guarded_run.scoped_rules
+            order = {compiled.name: position for position, compiled in enumerate(plan.compiled_rules)}
+            run.timed_out_rules = sorted(run.timed_out_rules + guarded_run.timed_out_rules,
+                                         key=lambda name: order.get(name, len(order)))
+        return run
+    
+    def _run_guarded(self, plan: RulePlan, analysis: DocumentAnalysis, positions: List[int],
+                     user_context: Optional[UserContext], analysis_budget: Optional[float]) -> Optional[RuleRun]:
+        """
+        Run rules that may backtrack on a worker process, whose main thread can interrupt their searches.
+        
+        Uses the rule pool when there is one, or else a single worker started on first use.
+        Rules that overran the budget on the worker are reported as timed out, never re-run here.
+        
+        Returns:
+            The run, or None if no worker could run the rules (e.g. the pool broke or could
+            not be started); the caller then runs them in-process under the budget, checked
+            between matches
+        """
+        pool = self.rule_pool
+        if pool is None:
+            with self._guard_lock:
+                if self._guard_pool is None:
+                    self._guard_pool = RulePool(self, workers=1)
+                pool = self._guard_pool
+        
+        try:
+            run = pool.run(plan, analysis, positions, user_context, analysis_budget, report_timeout=True)
+        except Exception as e:
+            print(f"Warning: Rule worker could not be used: {e}")
+            run = None
+        if run is None:
+            names = [plan.compiled_rules[position].name for position in positions]
+            print(f"Warning: Running rules in-process, where the time budget cannot interrupt a search: "
+                  f"{', '.join(names)}")
+        return run
+    
+    def _run_handler(self, handler: BaseRuleHandler, rule: Rule, matcher: DocumentMatcher,
+                     user_context: Optional[UserContext], all_matches: bool) -> List[Flag]:
+        """Run one rule against the text of a matcher."""
+        if all_matches:
+            return handler.process_rule(rule, matcher.text, user_context, matcher=matcher)
+        
+        # Only the first match is reported, so stop scanning once it is found
+        flag = handler.first_flag(rule, matcher.text, user_context, matcher=matcher)
+        return [flag] if flag else []
+    
+    def _get_scope_matchers(self, plan: RulePlan, matcher: DocumentMatcher, spans: List[Span], split: bool,
+                            cache: Dict[Tuple[Span, ...], DocumentMatcher]) -> List[DocumentMatcher]:
+        """Get matchers over the scoped slices of the text, shared by rules with the same scope."""
+        groups = [(span,) for span in spans] if split else [tuple(spans)]
+        
+        matchers = []
+        for group in groups:
+            scope_matcher = cache.get(group)
+            if scope_matcher is None:
+                scope_text = "\n".join(matcher.text[start:end] for start, end in group)
+                scope_matcher = DocumentMatcher(scope_text, plan.patterns, plan.anchors, matcher.document,
+                                                value_graph=plan.values)
+                cache[group] = scope_matcher
+            matchers.append(scope_matcher)
+        return matchers
+    
+    def _get_rule_budget(self, analysis_deadline: Optional[float]) -> Optional[float]:
+        """Seconds the next rule may run, capped by what is left of the analysis budget."""
+        budget = self.rule_time_budget
+        if analysis_deadline is not None:
+            remaining = analysis_deadline - time.perf_counter()
+            budget = remaining if budget is None else min(budget, remaining)
+        return budget
+    
+    def requires_document(self) -> bool:
+        """Check if any enabled rule needs a parsed document to be evaluated."""
+        return self.get_plan().requires_document
     
     def analyze_with_context(self, text: str, user_context: UserContext) -> List[Flag]:
         """
@@ -76,7 +571,7 @@ class RuleEngineService:
         Args:
             text: The document text to analyze
             user_context: User context for enhanced analysis
-            
+        
         Returns:
             List of flags with enhanced context-aware detection
         """
@@ -84,7 +579,7 @@ class RuleEngineService:
     
     def get_rules_summary(self) -> Dict[str, Any]:
         """Get summary of loaded rules."""
-        rules = self.rules_loader.load_rules()
+        rules = self.get_plan().rules
         
         summary = {
             'total_rules': len(rules),
@@ -101,7 +596,8 @@ class RuleEngineService:
     def validate_rules_config(self) -> Dict[str, Any]:
         """Validate the rules configuration."""
         try:
-            rules = self.rules_loader.load_rules()
+            plan = self.get_plan()
+            rules = plan.rules
             
             validation_results = {
                 'valid': True,
@@ -110,9 +606,17 @@ class RuleEngineService:
                 'rules_count': len(rules)
             }
             
+            # Patterns that failed to compile
+            if plan.errors:
+                validation_results['errors'].extend(plan.errors)
+                validation_results['valid'] = False
+            
+            # Patterns that may backtrack catastrophically still run, under a time budget
+            validation_results['warnings'].extend(plan.warnings)
+            
             for rule in rules:
                 # Check if we have a handler for this rule type
-                handler = self._get_handler_for_rule(rule)
+                handler = plan.dispatch.get(rule.rule_type)
                 if not handler:
                     validation_results['errors'].append(
                         f"No handler available for rule type '{rule.rule_type.value}' in rule '{rule.name}'"
@@ -128,7 +632,7 @@ class RuleEngineService:
                     validation_results['warnings'].append(f"Rule '{rule.name}' has no message")
             
             return validation_results
-            
+        
         except Exception as e:
             return {
                 'valid': False,
@@ -137,15 +641,10 @@ class RuleEngineService:
                 'rules_count': 0
             }
     
-    def _get_handler_for_rule(self, rule: Rule):
-        """Find the appropriate handler for a rule."""
-        for handler in self.handlers:
-            if handler.can_handle(rule):
-                return handler
-        return None
-    
-    def reload_rules(self):
-        """Reload rules configuration."""
-        # Rules are loaded fresh each time from the loader
-        # This method exists for future caching implementations
-        pass
\ No newline at end of file
+    def reload_rules(self) -> RulePlan:
+        """Reload rules configuration, forcing the rule plan to be recompiled and clearing the rule timings."""
+        with self._plan_lock:
+            plan = self._build_plan(self.rules_loader.get_config_mtime(), force=True)
+        if self.profiler is not None:
+            self.profiler.reset()
+        return plan
\ No newline at end of file
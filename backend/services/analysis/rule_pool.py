@@ -0,0 +1,289 @@
+"""Rule evaluation for very large documents, sharded across a persistent process pool."""
+
+import copy
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from models.core import UserContext
+from models.document import DocumentLayout, DocumentSection, ParsedDocument, Span
+from . import batch_analysis
+from .document_analysis import DocumentAnalysis, RuleRun
+from .rule_compiler import RulePlan
+
+
+# Documents shorter than this (in characters) are evaluated in-process
+DEFAULT_MIN_CHARS = 500_000
+
+# Seconds a run may take on top of its analysis budget, for handing the document to the workers
+TIMEOUT_GRACE = 10.0
+
+
+@dataclass
+class ShardTask:
+    """One shard of the rules to run against a document held in shared memory."""
+    
+    memory_name: str
+    size: int  # Bytes of UTF-8 text in the shared memory block
+    config_hash: str
+    positions: List[int]
+    user_context: Optional[UserContext] = None
+    all_matches: bool = False
+    page_spans: Optional[List[Span]] = None  # Layout spans; the text itself is not pickled
+    section_spans: Optional[Dict[DocumentSection, List[Span]]] = None
+    document: Optional[ParsedDocument] = None
+    analysis_budget: Optional[float] = None  # Seconds left of the analysis budget for this run
+
+
+@dataclass
+class ShardResult:
+    """Results of one shard, as run by a worker."""
+    
+    config_hash: str
+    run: RuleRun
+    matcher_stats: Dict[str, int] = field(default_factory=dict)
+    profile: List[Tuple[str, float, int, str]] = field(default_factory=list)  # RuleProfiler.record arguments
+
+
+class _ShardProfiler:
+    """Collects a worker's profiler records so the parent can replay them into its own profiler."""
+    
+    def __init__(self):
+        self.records: List[Tuple[str, float, int, str]] = []
+    
+    def record(self, rule_name: str, seconds: float, matches_scanned: int, outcome: str):
+        self.records.append((rule_name, seconds, matches_scanned, outcome))
+
+
+class RulePool:
+    """
+    Evaluates the rules of one large document in parallel worker processes.
+    
+    Regex matching holds the GIL, so one analysis otherwise uses a single core.
+    The enabled rules are split into shards balanced by their profiled cost and
+    run on a persistent pool whose workers load the rule plan once. The text is
+    copied into shared memory once per analysis instead of being pickled per
+    shard; each shard decodes it and drops it when done. Flags are merged by
+    plan position, so results are the same as an in-process run.
+    """
+    
+    def __init__(self, rule_engine, workers: Optional[int] = None, min_chars: int = DEFAULT_MIN_CHARS):
+        """
+        Initialize pool.
+        
+        Args:
+            rule_engine: RuleEngineService whose configuration and budgets the workers use
+            workers: Worker processes (default: CPU count)
+            min_chars: Smallest document, in characters, evaluated on the pool
+        """
+        self.rule_engine = rule_engine
+        self.workers = workers or os.cpu_count() or 1
+        self.min_chars = min_chars
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def should_shard(self, text: str, positions: List[int]) -> bool:
+        """Check if a run is large enough to be worth spreading across the pool."""
+        return self.workers > 1 and len(positions) > 1 and len(text) >= self.min_chars
+    
+    def run(self, plan: RulePlan, analysis: DocumentAnalysis, positions: List[int],
+            user_context: Optional[UserContext], analysis_budget: Optional[float] = None,
+            report_timeout: bool = False) -> Optional[RuleRun]:
+        """
+        Run the rules at the given plan positions on the pool.
+        
+        Args:
+            analysis_budget: Seconds the rules may run in total (default: the workers' analysis time budget)
+            report_timeout: Return a run with every rule timed out, instead of None, when the
+                workers overran the budget, for callers that cannot bound the rules themselves
+        
+        Returns:
+            The merged run, or None if the pool could not be used, its workers
+            compiled a different version of the rules or they overran the budget
+            (they are then killed); the caller then runs in-process
+        """
+        shards = self._split(plan, positions)
+        data = analysis.text.encode('utf-8')
+        memory = shared_memory.SharedMemory(name=f"closeguard-{uuid.uuid4().hex[:16]}", create=True,
+                                            size=max(1, len(data)))
+        try:
+            memory.buf[:len(data)] = data
+            layout = analysis.layout
+            document = analysis.document
+            if document is not None and document.raw_text:
+                document = copy.copy(document)
+                document.raw_text = None  # The text is in shared memory already
+            
+            tasks = [
+                ShardTask(
+                    memory_name=memory.name,
+                    size=len(data),
+                    config_hash=plan.config_hash,
+                    positions=shard,
+                    user_context=user_context,
+                    all_matches=analysis.all_matches,
+                    page_spans=layout.page_spans if layout is not None else None,
+                    section_spans=layout.section_spans if layout is not None else None,
+                    document=document,
+                    analysis_budget=analysis_budget
+                )
+                for shard in shards
+            ]
+            try:
+                executor = self._get_executor()
+                futures = [executor.submit(_run_shard, task) for task in tasks]
+                timeout = self._get_timeout(analysis_budget)
+                _, pending = wait(futures, timeout=timeout)
+                if pending:
+                    print(f"Warning: Rule pool took over {timeout}s, killing its workers")
+                    self._reset_executor(kill=True)
+                    if report_timeout:
+                        return RuleRun(timed_out_rules=[plan.compiled_rules[position].name
+                                                        for position in sorted(positions)])
+                    return None
+                results = [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                print(f"Warning: Rule pool failed, evaluating in-process: {e}")
+                self._reset_executor()
+                return None
+        finally:
+            memory.close()
+            memory.unlink()
+        
+        if any(result.config_hash != plan.config_hash for result in results):
+            return None
+        return self._merge(plan, analysis, results)
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        self._reset_executor()
+    
+    def _get_timeout(self, analysis_budget: Optional[float]) -> Optional[float]:
+        """Seconds to wait for the workers, which enforce the budget themselves, or None if unlimited."""
+        if analysis_budget is None:
+            analysis_budget = self.rule_engine.analysis_time_budget
+        return None if analysis_budget is None else analysis_budget + TIMEOUT_GRACE
+    
+    def _split(self, plan: RulePlan, positions: List[int]) -> List[List[int]]:
+        """Split positions into shards of similar expected cost, slowest rules placed first."""
+        costs = self._estimate_costs(plan, positions)
+        shard_count = min(self.workers, len(positions))
+        shards: List[List[int]] = [[] for _ in range(shard_count)]
+        loads = [0.0] * shard_count
+        for position in sorted(positions, key=lambda position: (-costs[position], position)):
+            lightest = loads.index(min(loads))
+            shards[lightest].append(position)
+            loads[lightest] += costs[position]
+        return [sorted(shard) for shard in shards if shard]
+    
+    def _estimate_costs(self, plan: RulePlan, positions: List[int]) -> Dict[int, float]:
+        """Mean profiled time of each rule, or an equal cost for rules not profiled yet."""
+        profiler = self.rule_engine.profiler
+        profiles = dict(profiler.profiles) if profiler is not None else {}
+        costs = {}
+        for position in positions:
+            profile = profiles.get(plan.compiled_rules[position].name)
+            costs[position] = profile.total_seconds / profile.evaluations if profile and profile.evaluations else 0.001
+        return costs
+    
+    def _merge(self, plan: RulePlan, analysis: DocumentAnalysis, results: List[ShardResult]) -> RuleRun:
+        """Combine shard results in plan order and account their work on the parent."""
+        run = RuleRun()
+        timed_out = []
+        for result in results:
+            run.rule_flags.update(result.run.rule_flags)
+            run.scoped_rules += result.run.scoped_rules
+            timed_out.extend(result.run.timed_out_rules)
+            for key, value in result.matcher_stats.items():
+                analysis.matcher.stats[key] = analysis.matcher.stats.get(key, 0) + value
+            if self.rule_engine.profiler is not None:
+                for record in result.profile:
+                    self.rule_engine.profiler.record(*record)
+        
+        run.rule_flags = dict(sorted(run.rule_flags.items()))
+        order = {compiled.name: position for position, compiled in enumerate(plan.compiled_rules)}
+        run.timed_out_rules = sorted(timed_out, key=lambda name: order.get(name, len(order)))
+        return run
+    
+    def start(self):
+        """Start the workers and wait for them to load the rules, so the first large document doesn't pay for it."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it on first use from a forkserver so it never forks the threaded server."""
+        with self._lock:
+            if self._executor is None:
+                engine = self.rule_engine
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=batch_analysis._init_worker,
+                    initargs=(engine.rules_loader.config_path, engine.rule_time_budget,
+                              engine.analysis_time_budget, engine.snapshot_path is not None)
+                )
+            return self._executor
+    
+    def _reset_executor(self, kill: bool = False):
+        """Shut the worker pool down, killing its workers if set (e.g. one stuck in a search); the next run starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if kill:
+            # ProcessPoolExecutor has no public way to stop a busy worker
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _ping() -> bool:
+    """No-op task that returns once the worker has loaded its rules."""
+    return True
+
+
+def _run_shard(task: ShardTask) -> ShardResult:
+    """
+    Run one shard of rules in a worker process.
+    
+    The document is decoded for the shard and dropped with it, so idle workers do
+    not hold the text and matches of the last document they evaluated.
+    """
+    engine = batch_analysis._worker_engine
+    plan = engine.get_plan()
+    if plan.config_hash != task.config_hash:
+        return ShardResult(config_hash=plan.config_hash, run=RuleRun())
+    
+    memory = shared_memory.SharedMemory(name=task.memory_name)
+    try:
+        text = bytes(memory.buf[:task.size]).decode('utf-8')
+    finally:
+        memory.close()  # Workers share the parent's resource tracker, which unlinks the block
+    
+    layout = None
+    if task.page_spans is not None:
+        layout = DocumentLayout(text=text, page_spans=task.page_spans, section_spans=task.section_spans or {})
+    analysis = engine.create_analysis(text, task.all_matches, layout, task.document)
+    
+    before = analysis.get_matcher_stats()
+    profiler = _ShardProfiler()
+    engine.profiler = profiler
+    try:
+        run = engine._run_rules(plan, analysis, task.positions, task.user_context, task.analysis_budget)
+    finally:
+        engine.profiler = None
+    after = analysis.get_matcher_stats()
+    
+    return ShardResult(
+        config_hash=plan.config_hash,
+        run=run,
+        matcher_stats={key: after[key] - before.get(key, 0) for key in after},
+        profile=profiler.records
+    )
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""Per-rule execution profiling kept in rolling windows."""
+
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of recent samples, summarized into percentiles on demand."""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.samples = array('d')
+        self._next = 0
+    
+    def add(self, value: float):
+        """Record a sample, overwriting the oldest once the window is full."""
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            self.samples[self._next] = value
+            self._next = (self._next + 1) % self.size
+    
+    def percentiles(self, *quantiles: float) -> List[Optional[float]]:
+        """Nearest-rank percentiles of the samples in the window."""
+        if not self.samples:
+            return [None] * len(quantiles)
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(quantile * len(ordered)))] for quantile in quantiles]
+
+
+@dataclass
+class RuleProfile:
+    """Running totals and recent timings of one rule."""
+    
+    name: str
+    window: RollingWindow  # Recent wall times in seconds
+    matches_window: RollingWindow  # Recent regex matches scanned
+    evaluations: int = 0
+    flagged: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    matches_scanned: int = 0
+    
+    def to_dict(self, total_seconds: float) -> Dict[str, Any]:
+        """Convert to dictionary format for API responses, times in milliseconds."""
+        p50, p95, p99 = self.window.percentiles(0.5, 0.95, 0.99)
+        matches_p50, matches_p99 = self.matches_window.percentiles(0.5, 0.99)
+        return {
+            'rule': self.name,
+            'evaluations': self.evaluations,
+            'flagged': self.flagged,
+            'flag_rate': self.flagged / self.evaluations if self.evaluations else 0.0,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'total_ms': self.total_seconds * 1000,
+            'mean_ms': self.total_seconds * 1000 / self.evaluations if self.evaluations else None,
+            'p50_ms': p50 * 1000 if p50 is not None else None,
+            'p95_ms': p95 * 1000 if p95 is not None else None,
+            'p99_ms': p99 * 1000 if p99 is not None else None,
+            'max_ms': self.max_seconds * 1000,
+            'time_share': self.total_seconds / total_seconds if total_seconds else 0.0,
+            'matches_scanned': self.matches_scanned,
+            'matches_p50': matches_p50,
+            'matches_p99': matches_p99
+        }
+
+
+class RuleProfiler:
+    """
+    Collects the wall time, regex matches scanned and outcome of each rule evaluation.
+    
+    Totals are kept for the lifetime of the profiler; percentiles cover the most
+    recent evaluations of each rule only, so memory stays bounded.
+    """
+    
+    OUTCOMES = ('flagged', 'clear', 'timeout', 'error')
+    
+    def __init__(self, window_size: int = 1024):
+        """
+        Initialize profiler.
+        
+        Args:
+            window_size: Recent evaluations of each rule kept for percentiles
+        """
+        self.window_size = window_size
+        self.profiles: Dict[str, RuleProfile] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def record(self, rule_name: str, seconds: float, matches_scanned: int, outcome: str):
+        """
+        Record one evaluation of a rule.
+        
+        Args:
+            rule_name: Name of the rule
+            seconds: Wall time of the evaluation
+            matches_scanned: Regex matches pulled from the document while it ran
+            outcome: One of OUTCOMES
+        """
+        with self._lock:
+            profile = self.profiles.get(rule_name)
+            if profile is None:
+                profile = RuleProfile(
+                    name=rule_name,
+                    window=RollingWindow(self.window_size),
+                    matches_window=RollingWindow(self.window_size)
+                )
+                self.profiles[rule_name] = profile
+            
+            profile.evaluations += 1
+            profile.total_seconds += seconds
+            profile.max_seconds = max(profile.max_seconds, seconds)
+            profile.matches_scanned += matches_scanned
+            profile.window.add(seconds)
+            profile.matches_window.add(matches_scanned)
+            if outcome == 'flagged':
+                profile.flagged += 1
+            elif outcome == 'timeout':
+                profile.timeouts += 1
+            elif outcome == 'error':
+                profile.errors += 1
+    
+    def reset(self):
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.profiles = {}
+            self.started = time.time()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize every rule, slowest in total first."""
+        with self._lock:
+            total_seconds = sum(profile.total_seconds for profile in self.profiles.values())
+            rules = [profile.to_dict(total_seconds) for profile in self.profiles.values()]
+        
+        rules.sort(key=lambda rule: rule['total_ms'], reverse=True)
+        return {
+            'since': self.started,
+            'window_size': self.window_size,
+            'total_ms': total_seconds * 1000,
+            'rules': rules
+        }
\ No newline at end of file
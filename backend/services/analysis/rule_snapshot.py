@@ -0,0 +1,126 @@
+"""
+Binary snapshot of the compiled rule plan, for fast worker startup.
+
+The snapshot holds the validated rules with their resolved severities, scopes,
+pattern anchors and backtracking analysis, keyed by the hash of the YAML they
+were compiled from and by a hash of the code that compiles them. Workers load it
+instead of re-parsing and re-analyzing the configuration, and fall back to the
+YAML when either hash no longer matches.
+
+Unpickling recompiles every regex, so loading saves the YAML
+parsing, rule validation, backtracking analysis and anchor extraction, not the
+pattern compilation.
+
+Build it next to the configuration with:
+    python build_rules_snapshot.py [rules-config.yaml]
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import models.core
+import models.document
+import rules
+from models.core import RuleType
+from rules.base_rule import BaseRuleHandler
+from . import rule_compiler
+from .rule_compiler import RulePlan
+
+
+_code_hash: Optional[str] = None
+
+
+def code_hash() -> str:
+    """
+    Hash of the sources that shape a compiled plan: the core and document model
+    packages, the compiler, this module and the rules package. Any change to them
+    invalidates snapshots.
+    """
+    global _code_hash
+    if _code_hash is None:
+        packages = [models.core, models.document, rules]
+        sources = [Path(rule_compiler.__file__), Path(__file__)]
+        for package in packages:
+            sources += sorted(Path(package.__file__).parent.glob('*.py'))
+        root = Path(rules.__file__).parent.parent
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(source.relative_to(root).as_posix().encode('utf-8'))
+            digest.update(source.read_bytes())
+        _code_hash = digest.hexdigest()
+    return _code_hash
+
+
+def snapshot_path(config_path: str) -> str:
+    """Path of the snapshot for a rules configuration, e.g. rules-config.snapshot."""
+    return str(Path(config_path).with_suffix('.snapshot'))
+
+
+def write_snapshot(plan: RulePlan, path: str):
+    """
+    Write a plan to a snapshot file.
+    
+    Handlers are not stored; they are re-attached from the loading engine's dispatch
+    table. The file is replaced atomically so running workers never read a partial one.
+    """
+    handlers = [compiled.handler for compiled in plan.compiled_rules]
+    dispatch = plan.dispatch
+    try:
+        for compiled in plan.compiled_rules:
+            compiled.handler = None
+        plan.dispatch = {}
+        data = pickle.dumps({
+            'code_hash': code_hash(),
+            'python': sys.version_info[:2],
+            'config_hash': plan.config_hash,
+            'plan': plan
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for compiled, handler in zip(plan.compiled_rules, handlers):
+            compiled.handler = handler
+        plan.dispatch = dispatch
+    
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: str, config_hash: str, dispatch: Dict[RuleType, BaseRuleHandler],
+                  config_mtime: float = 0.0) -> Optional[RulePlan]:
+    """
+    Load a plan from a snapshot if it was built from the given configuration.
+    
+    Args:
+        path: Snapshot file
+        config_hash: Hash of the current configuration bytes
+        dispatch: Handler dispatch table of the loading engine
+        config_mtime: Modification time of the configuration file
+    
+    Returns:
+        The plan, or None if the snapshot is missing, unreadable, or stale for
+        the configuration or the compiler code
+    """
+    try:
+        with open(path, 'rb') as file:
+            snapshot = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable rules snapshot {path}: {e}")
+        return None
+    
+    if (not isinstance(snapshot, dict) or snapshot.get('code_hash') != code_hash()
+            or snapshot.get('python') != sys.version_info[:2] or snapshot.get('config_hash') != config_hash):
+        return None
+    
+    plan: RulePlan = snapshot['plan']
+    plan.dispatch = dispatch
+    plan.config_mtime = config_mtime
+    for compiled in plan.compiled_rules:
+        compiled.handler = dispatch.get(compiled.rule.rule_type)
+    return plan
\ No newline at end of file
@@ -0,0 +1,396 @@
+"""
+Shadow runs of an alternate rule engine on sampled uploads.
+
+The engine serving requests stays authoritative; the alternate engine runs the
+same text in a separate worker process, so a backtracking pattern cannot hold
+the serving process's GIL, and the differences in flags and latency are
+appended to a local JSON-lines store, summarized by shadow_report.py.
+"""
+
+import json
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Alternate engine: (text, API user context dict or None) -> flag dicts with 'rule' and 'message'.
+# An engine may set a `skipped_rules` attribute naming the rules it cannot evaluate;
+# they are left out of the comparison and counted separately.
+ShadowEngine = Callable[[str, Optional[Dict[str, Any]]], List[Dict[str, Any]]]
+
+# Rule types the legacy engine evaluates, with the config keys it reads them from
+LEGACY_RULE_KEYS = {
+    'numeric_threshold': ('pattern',),
+    'regex_amount': ('pattern',),
+    'regex_presence': ('pattern',),
+    'regex_absence': ('pattern',),
+    'calculated_percentage': ('numerator_pattern', 'denominator_pattern'),
+    'compound_rule': ('conditions',),
+    'cross_reference_pattern': ('primary_pattern',),
+    'context_comparison': ('comparison_type',)
+}
+
+# Picklable factory building the shadow engine in the worker process, e.g. partial(legacy_engine, path)
+ShadowEngineFactory = Callable[[], ShadowEngine]
+
+# Shadow engine of this worker process
+_worker_engine: Optional[ShadowEngine] = None
+
+
+def legacy_skipped_rules(rules: List[Dict[str, Any]]) -> List[str]:
+    """
+    Names of the configured rules the legacy engine cannot evaluate.
+    
+    Those are rules of types it does not know, and rules missing the keys it reads
+    them from, e.g. value index rules with only a 'label' or 'lookup'.
+    """
+    skipped = set()
+    for rule in rules:
+        keys = LEGACY_RULE_KEYS.get(rule.get('type'))
+        if keys is None or not all(rule.get(key) for key in keys):
+            skipped.add(str(rule.get('name', 'unknown')))
+    return sorted(skipped)
+
+
+def legacy_engine(config_path: str) -> ShadowEngine:
+    """Adapt the legacy engine.RuleEngine to a shadow engine, skipping the rules it cannot evaluate."""
+    from engine import RuleEngine
+    
+    engine = RuleEngine(config_path)
+    skipped_rules = legacy_skipped_rules(engine.rules)
+    engine.rules = [rule for rule in engine.rules if str(rule.get('name', 'unknown')) not in skipped_rules]
+    
+    def analyze(text: str, user_context: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if user_context:
+            return engine.check_text_with_context(text, user_context)
+        return engine.check_text(text)
+    
+    analyze.skipped_rules = skipped_rules
+    return analyze
+
+
+def _init_worker(engine_factory: ShadowEngineFactory):
+    """Build the shadow engine once per worker process."""
+    global _worker_engine
+    _worker_engine = engine_factory()
+
+
+def _ping() -> bool:
+    """No-op task that returns once the worker has built its engine."""
+    return True
+
+
+def _run_engine(text: str, user_context: Optional[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], float, List[str]]:
+    """Run the worker's shadow engine, returning its flags, the seconds it took and the rules it skips."""
+    start = time.perf_counter()
+    flags = _worker_engine(text, user_context)
+    return flags, time.perf_counter() - start, list(getattr(_worker_engine, 'skipped_rules', []))
+
+
+@dataclass
+class ShadowResult:
+    """Differences between the serving engine and the shadow engine on one document."""
+    
+    report_id: str
+    timestamp: float
+    engine: str  # Name of the shadow engine
+    primary_ms: float
+    shadow_ms: float
+    primary_rules: List[str] = field(default_factory=list)
+    shadow_rules: List[str] = field(default_factory=list)
+    only_primary: List[str] = field(default_factory=list)  # Rules only the serving engine flagged
+    only_shadow: List[str] = field(default_factory=list)  # Rules only the shadow engine flagged
+    message_mismatches: List[str] = field(default_factory=list)  # Rules both flagged with different messages
+    skipped_rules: List[str] = field(default_factory=list)  # Rules the shadow engine cannot evaluate, not compared
+    with_context: bool = False
+    error: Optional[str] = None
+    
+    @property
+    def agrees(self) -> bool:
+        """Check if both engines flagged the same rules with the same messages."""
+        return self.error is None and not (self.only_primary or self.only_shadow or self.message_mismatches)
+    
+    @property
+    def latency_ratio(self) -> Optional[float]:
+        """Shadow engine time relative to the serving engine's."""
+        return self.shadow_ms / self.primary_ms if self.primary_ms > 0 else None
+    
+    @classmethod
+    def compare(cls, report_id: str, engine: str, primary_flags: List[Dict[str, Any]], primary_seconds: float,
+                shadow_flags: List[Dict[str, Any]], shadow_seconds: float, with_context: bool,
+                skipped_rules: Optional[List[str]] = None) -> 'ShadowResult':
+        """Compare the flags of both engines, rule by rule, leaving out the rules the shadow engine skips."""
+        skipped = set(skipped_rules or [])
+        primary_messages = {rule: messages for rule, messages in _messages_by_rule(primary_flags).items()
+                            if rule not in skipped}
+        shadow_messages = {rule: messages for rule, messages in _messages_by_rule(shadow_flags).items()
+                           if rule not in skipped}
+        return cls(
+            report_id=report_id,
+            timestamp=time.time(),
+            engine=engine,
+            primary_ms=primary_seconds * 1000,
+            shadow_ms=shadow_seconds * 1000,
+            primary_rules=sorted(primary_messages),
+            shadow_rules=sorted(shadow_messages),
+            only_primary=sorted(set(primary_messages) - set(shadow_messages)),
+            only_shadow=sorted(set(shadow_messages) - set(primary_messages)),
+            message_mismatches=sorted(
+                rule for rule in set(primary_messages) & set(shadow_messages)
+                if primary_messages[rule] != shadow_messages[rule]
+            ),
+            skipped_rules=sorted(skipped),
+            with_context=with_context
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format for storage."""
+        return {
+            'report_id': self.report_id,
+            'timestamp': self.timestamp,
+            'engine': self.engine,
+            'primary_ms': self.primary_ms,
+            'shadow_ms': self.shadow_ms,
+            'primary_rules': self.primary_rules,
+            'shadow_rules': self.shadow_rules,
+            'only_primary': self.only_primary,
+            'only_shadow': self.only_shadow,
+            'message_mismatches': self.message_mismatches,
+            'skipped_rules': self.skipped_rules,
+            'with_context': self.with_context,
+            'error': self.error
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ShadowResult':
+        """Create ShadowResult from a stored dictionary."""
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+
+def _messages_by_rule(flags: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Group flag messages by rule name."""
+    messages: Dict[str, List[str]] = {}
+    for flag in flags:
+        messages.setdefault(flag.get('rule', 'unknown'), []).append(flag.get('message', ''))
+    return {rule: sorted(rule_messages) for rule, rule_messages in messages.items()}
+
+
+class ShadowStore:
+    """Append-only JSON-lines file of shadow results."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def append(self, result: ShadowResult):
+        """Append one result."""
+        line = json.dumps(result.to_dict(), sort_keys=True)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line + '\n')
+    
+    def read(self, limit: Optional[int] = None) -> List[ShadowResult]:
+        """Read the stored results, only the most recent `limit` if given."""
+        if not Path(self.path).exists():
+            return []
+        
+        results = []
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        results.append(ShadowResult.from_dict(json.loads(line)))
+                    except (ValueError, TypeError):
+                        continue  # Partially written line
+        return results[-limit:] if limit else results
+
+
+def _percentile(values: List[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile, or None without values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def summarize_results(results: List[ShadowResult]) -> Dict[str, Any]:
+    """
+    Summarize shadow results into agreement and latency figures.
+    
+    Returns:
+        Dictionary with sample counts, the share of documents both engines agree on,
+        latency percentiles of both engines, the rules they disagree on most and
+        the rules left out because the shadow engine cannot evaluate them
+    """
+    compared = [result for result in results if result.error is None]
+    ratios = [result.latency_ratio for result in compared if result.latency_ratio is not None]
+    primary_ms = [result.primary_ms for result in compared]
+    shadow_ms = [result.shadow_ms for result in compared]
+    
+    rules: Dict[str, Dict[str, int]] = {}
+    for result in compared:
+        for key in ('only_primary', 'only_shadow', 'message_mismatches'):
+            for rule in getattr(result, key):
+                counts = rules.setdefault(rule, {'only_primary': 0, 'only_shadow': 0, 'message_mismatches': 0})
+                counts[key] += 1
+    
+    disagreements = [
+        {'rule': rule, 'documents': sum(counts.values()), **counts}
+        for rule, counts in rules.items()
+    ]
+    disagreements.sort(key=lambda item: (-item['documents'], item['rule']))
+    
+    skipped: Dict[str, int] = {}
+    for result in compared:
+        for rule in result.skipped_rules:
+            skipped[rule] = skipped.get(rule, 0) + 1
+    
+    return {
+        'samples': len(results),
+        'errors': len(results) - len(compared),
+        'engines': sorted({result.engine for result in results}),
+        'agreement_rate': sum(result.agrees for result in compared) / len(compared) if compared else None,
+        'primary_ms': {'p50': _percentile(primary_ms, 0.5), 'p95': _percentile(primary_ms, 0.95)},
+        'shadow_ms': {'p50': _percentile(shadow_ms, 0.5), 'p95': _percentile(shadow_ms, 0.95)},
+        'latency_ratio': {'p50': _percentile(ratios, 0.5), 'p95': _percentile(ratios, 0.95)},
+        'since': min((result.timestamp for result in results), default=None),
+        'rules': disagreements,
+        'skipped_rules': [{'rule': rule, 'documents': count} for rule, count in sorted(skipped.items())]
+    }
+
+
+class ShadowRunner:
+    """
+    Runs a shadow engine on a sample of documents in a worker process.
+    
+    Requests only pay for the sampling decision and queueing; samples arriving
+    while `max_pending` runs are already queued are dropped rather than
+    letting the backlog grow. A background thread hands each run to the worker
+    and waits for it; a run exceeding `timeout` is recorded as an error and the
+    worker is replaced. The worker and its engine are only started once a
+    sample needs them, or by start().
+    """
+    
+    def __init__(self, engine_name: str, engine_factory: ShadowEngineFactory, store: ShadowStore,
+                 sample_rate: float = 0.0, max_pending: int = 8, timeout: Optional[float] = 30.0):
+        """
+        Initialize runner.
+        
+        Args:
+            engine_name: Name of the shadow engine recorded with each result
+            engine_factory: Picklable factory building the shadow engine in the worker
+            store: Where results are recorded
+            sample_rate: Share of documents shadowed, from 0 (off) to 1 (all)
+            max_pending: Shadow runs queued at most before new samples are dropped
+            timeout: Seconds a shadow run may take before the worker is killed (None for no limit)
+        """
+        self.engine_name = engine_name
+        self.engine_factory = engine_factory
+        self.store = store
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.stats = {'sampled': 0, 'dropped': 0, 'completed': 0, 'errors': 0, 'timeouts': 0}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+    
+    def start(self):
+        """Start the worker and wait for it to build its engine, so the first sample doesn't pay for it."""
+        self._get_pool().apply_async(_ping).get()
+    
+    def _get_pool(self):
+        """Worker pool of one process, started from a forkserver so it never forks the threaded server."""
+        with self._pool_lock:
+            if self._pool is None:
+                context = multiprocessing.get_context('forkserver')
+                self._pool = context.Pool(1, initializer=_init_worker, initargs=(self.engine_factory,))
+            return self._pool
+    
+    def _kill_pool(self):
+        """Terminate the worker, e.g. one stuck on a timed-out run; the next run starts a new one."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+    
+    def submit(self, report_id: str, text: str, primary_flags: List[Dict[str, Any]], primary_seconds: float,
+               user_context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Shadow a document if it is sampled.
+        
+        Args:
+            report_id: Report the document belongs to
+            text: Extracted document text
+            primary_flags: Flags of the serving engine, as dictionaries
+            primary_seconds: Time the serving engine took to analyze the text
+            user_context: User context in the API's format, if any
+        
+        Returns:
+            True if a shadow run was queued
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self._pending += 1
+            self.stats['sampled'] += 1
+        
+        self._executor.submit(self._run, report_id, text, primary_flags, primary_seconds, user_context)
+        return True
+    
+    def _run(self, report_id: str, text: str, primary_flags: List[Dict[str, Any]], primary_seconds: float,
+             user_context: Optional[Dict[str, Any]]):
+        """Run the shadow engine in the worker and record the comparison."""
+        try:
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                shadow_flags, shadow_seconds, skipped_rules = self._get_pool().apply_async(
+                    _run_engine, (text, user_context)
+                ).get(self.timeout)
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                self._kill_pool()
+                error = f"Shadow engine timed out after {self.timeout}s"
+            except Exception as e:
+                error = str(e)
+            else:
+                error = None
+            
+            if error:
+                result = ShadowResult(
+                    report_id=report_id, timestamp=time.time(), engine=self.engine_name,
+                    primary_ms=primary_seconds * 1000, shadow_ms=(time.perf_counter() - start) * 1000,
+                    with_context=bool(user_context), error=error
+                )
+            else:
+                result = ShadowResult.compare(
+                    report_id, self.engine_name, primary_flags, primary_seconds,
+                    shadow_flags, shadow_seconds, bool(user_context), skipped_rules
+                )
+            self.store.append(result)
+            with self._lock:
+                self.stats['errors' if result.error else 'completed'] += 1
+                if timed_out:
+                    self.stats['timeouts'] += 1
+        except Exception as e:
+            print(f"Warning: Shadow run for report {report_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting shadow runs, finishing the queued ones if wait is set, and stop the worker."""
+        self._executor.shutdown(wait=wait)
+        self._kill_pool()
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 # New structured parsers
 from .trid import TridParser
-from .core import CoordinateExtractor, BaseParser, TextUtils
+from .core import CoordinateExtractor, BaseParser, TextUtils, PagePool
 
 # Legacy parsers (backup)
 from .legacy.document_parser_legacy import DocumentParserService
@@ -13,6 +13,7 @@ __all__ = [
     'CoordinateExtractor',
     'BaseParser', 
     'TextUtils',
+    'PagePool',
     
     # Legacy service
     'DocumentParserService'
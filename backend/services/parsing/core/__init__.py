@@ -4,10 +4,22 @@ from .base_parser import BaseParser
 from .coordinate_extractor import CoordinateExtractor
 from .text_utils import TextUtils
 from .checkbox_detector import CheckboxDetector
+from .page_context import PageContext
+from .page_pool import PagePool
+from .extractors import TextExtractor, get_extractor
+from .multipart_upload import MultipartForm, MultipartUploadError, UploadedFile, read_multipart
 
 __all__ = [
     'BaseParser',
     'CoordinateExtractor', 
     'TextUtils',
-    'CheckboxDetector'
+    'CheckboxDetector',
+    'PageContext',
+    'PagePool',
+    'TextExtractor',
+    'get_extractor',
+    'MultipartForm',
+    'MultipartUploadError',
+    'UploadedFile',
+    'read_multipart'
 ]
\ No newline at end of file
@@ -1,26 +1,39 @@
 """Base abstract parser for document processing."""
 
 from abc import ABC, abstractmethod
-from typing import Optional, List, Any
+from typing import Dict, Optional, List
 import pdfplumber
 from pathlib import Path
 
 from models.document import ParsedDocument
+from parser import PdfSource, pdf_input
+from .page_context import PageContext
 
 
 class BaseParser(ABC):
     """Abstract base class for all document parsers."""
     
-    def __init__(self, file_path: str):
-        """Initialize parser with file path."""
-        self.file_path = Path(file_path)
+    def __init__(self, file_path: PdfSource, filename: Optional[str] = None):
+        """
+        Initialize parser with file path.
+        
+        Args:
+            file_path: Path to the PDF file, or its content for a PDF held in memory
+            filename: Name of the document (default: the file's name)
+        """
+        in_memory = isinstance(file_path, bytes)
+        self.source = file_path if in_memory else Path(file_path)
+        self.file_path = None if in_memory else self.source
+        self.filename = filename or ("" if in_memory else self.source.name)
         self.pdf_document = None
+        self.page_contexts: Dict[int, PageContext] = {}  # 1-indexed; shared by every reader of a page
+        self.page_texts: Optional[List[Optional[str]]] = None  # Page texts extracted elsewhere, not laid out again
         self.errors: List[str] = []
     
     def __enter__(self):
         """Context manager entry - open PDF."""
         try:
-            self.pdf_document = pdfplumber.open(self.file_path)
+            self.pdf_document = pdfplumber.open(pdf_input(self.source))
             return self
         except Exception as e:
             self.errors.append(f"Failed to open PDF: {e}")
@@ -28,6 +41,7 @@ class BaseParser(ABC):
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - close PDF."""
+        self.page_contexts.clear()
         if self.pdf_document:
             self.pdf_document.close()
     
@@ -36,14 +50,19 @@ class BaseParser(ABC):
         """Parse the document and return structured data."""
         pass
     
-    def get_page(self, page_num: int) -> Optional[Any]:
-        """Get a specific page from the PDF (1-indexed)."""
+    def get_page(self, page_num: int) -> Optional[PageContext]:
+        """Get the extraction context of a specific page from the PDF (1-indexed)."""
         if not self.pdf_document:
             return None
         
         try:
+            if page_num in self.page_contexts:
+                return self.page_contexts[page_num]
             if 1 <= page_num <= len(self.pdf_document.pages):
-                return self.pdf_document.pages[page_num - 1]  # Convert to 0-indexed
+                text = self.page_texts[page_num - 1] if self.page_texts and page_num <= len(self.page_texts) else None
+                context = PageContext(self.pdf_document.pages[page_num - 1], text)  # Convert to 0-indexed
+                self.page_contexts[page_num] = context
+                return context
             else:
                 self.errors.append(f"Page {page_num} out of range")
                 return None
@@ -57,6 +76,10 @@ class BaseParser(ABC):
             return 0
         return len(self.pdf_document.pages)
     
+    def get_pages(self) -> List[PageContext]:
+        """Get the extraction contexts of all pages in order."""
+        return [self.get_page(page_num) for page_num in range(1, self.get_page_count() + 1)]
+    
     def extract_raw_text(self) -> str:
         """Extract all text from document as fallback."""
         if not self.pdf_document:
@@ -64,8 +87,8 @@ class BaseParser(ABC):
         
         try:
             text_content = []
-            for page in self.pdf_document.pages:
-                page_text = page.extract_text()
+            for page in self.get_pages():
+                page_text = page.text
                 if page_text:
                     text_content.append(page_text)
             return "\n".join(text_content)
@@ -2,17 +2,19 @@
 
 from typing import Dict, List, Optional, Tuple
 
+from .page_context import PageContext
+
 
 class CheckboxDetector:
     """Detects filled/selected checkboxes in PDF documents."""
     
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.chars = page.chars
-        self.rectangles = page.rects
-        self.curves = getattr(page, 'curves', [])
-        self.lines = getattr(page, 'lines', [])
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.chars = self.page.chars
+        self.rectangles = self.page.rects
+        self.curves = self.page.curves
+        self.lines = self.page.lines
     
     def find_checkboxes(self, min_size: float = 5, max_size: float = 20) -> List[Dict]:
         """Find all potential checkbox rectangles on the page."""
@@ -3,20 +3,22 @@
 import re
 from typing import List, Optional, Dict, Tuple
 from models.document import CoordinatePosition
+from .page_context import PageContext
 
 
 class CoordinateExtractor:
     """Utility class for extracting text coordinates from PDF pages."""
     
     def __init__(self, page):
-        """Initialize with a pdfplumber page object."""
-        self.page = page
+        """Initialize with a pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
         
     def find_text_coordinates(self, search_text: str, case_sensitive: bool = False) -> List[CoordinatePosition]:
         """Find coordinates for specific text on the page."""
         try:
-            chars = self.page.chars
-            if not chars:
+            # Text string with character positions, built once per page
+            page_text, char_positions = self.page.char_index(case_sensitive)
+            if not char_positions:
                 return []
             
             # Prepare search text
@@ -26,22 +28,6 @@ class CoordinateExtractor:
             coordinates = []
             search_len = len(search_text)
             
-            # Build text string with character positions
-            page_text = ""
-            char_positions = []
-            
-            for char in chars:
-                char_text = char.get('text', '')
-                if not case_sensitive:
-                    char_text = char_text.lower()
-                page_text += char_text
-                char_positions.append({
-                    'x0': char.get('x0', 0),
-                    'y0': char.get('y0', 0), 
-                    'x1': char.get('x1', 0),
-                    'y1': char.get('y1', 0)
-                })
-            
             # Find all occurrences of search text
             start_index = 0
             while True:
@@ -91,7 +77,7 @@ class CoordinateExtractor:
     def find_pattern_coordinates(self, pattern: str) -> List[CoordinatePosition]:
         """Find coordinates for text matching a regex pattern."""
         try:
-            page_text = self.page.extract_text() or ""
+            page_text = self.page.text
             compiled_pattern = re.compile(pattern)
             
             coordinates = []
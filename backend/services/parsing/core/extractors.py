@@ -0,0 +1,139 @@
+"""Pluggable PDF text extraction backends."""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type, Union
+
+import pdfplumber
+import PyPDF2
+
+from parser import PDFIUM_AVAILABLE, PdfSource, page_content, pdf_input, pdfium_lock
+
+# pdfium text extraction (optional - installed with pdfplumber)
+if PDFIUM_AVAILABLE:
+    import pypdfium2 as pdfium
+
+
+class TextExtractor(ABC):
+    """A backend extracting the text of each page of a PDF."""
+    
+    name = ''
+    # Text comes from pdfplumber's layout pass, which the TRID parser can share
+    layout = False
+    
+    @property
+    def available(self) -> bool:
+        """Check if the backend's library is installed."""
+        return True
+    
+    @abstractmethod
+    def extract_pages(self, file_path: PdfSource) -> List[str]:
+        """
+        Extract the text of each page.
+        
+        Args:
+            file_path: Path to the PDF file, or its content
+        
+        Returns:
+            Text of each page in order; pages without text are empty strings
+        """
+        pass
+    
+    def page_count(self, file_path: PdfSource) -> int:
+        """Number of pages in the PDF."""
+        return len(self.extract_pages(file_path))
+
+
+class PdfplumberExtractor(TextExtractor):
+    """pdfminer layout analysis through pdfplumber: page text followed by table rows. Slowest, most faithful."""
+    
+    name = 'pdfplumber'
+    layout = True
+    
+    def extract_pages(self, file_path: PdfSource) -> List[str]:
+        with pdfplumber.open(pdf_input(file_path)) as pdf:
+            return [page_content(page) for page in pdf.pages]
+    
+    def page_count(self, file_path: PdfSource) -> int:
+        with pdfplumber.open(pdf_input(file_path)) as pdf:
+            return len(pdf.pages)
+
+
+class PdfiumExtractor(TextExtractor):
+    """PDFium's text API through pypdfium2: plain text in reading order, extracted in C."""
+    
+    name = 'pdfium'
+    
+    @property
+    def available(self) -> bool:
+        return PDFIUM_AVAILABLE
+    
+    def extract_pages(self, file_path: PdfSource) -> List[str]:
+        with pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                texts = []
+                for index in range(len(pdf)):
+                    page = pdf[index]
+                    try:
+                        text_page = page.get_textpage()
+                        try:
+                            texts.append(text_page.get_text_range().replace('\r\n', '\n'))
+                        finally:
+                            text_page.close()
+                    finally:
+                        page.close()
+                return texts
+            finally:
+                pdf.close()
+    
+    def page_count(self, file_path: PdfSource) -> int:
+        with pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+
+class PyPDF2Extractor(TextExtractor):
+    """PyPDF2's content-stream text extraction, in pure Python without layout analysis."""
+    
+    name = 'pypdf2'
+    
+    def extract_pages(self, file_path: PdfSource) -> List[str]:
+        return [page.extract_text() or "" for page in PyPDF2.PdfReader(pdf_input(file_path)).pages]
+    
+    def page_count(self, file_path: PdfSource) -> int:
+        return len(PyPDF2.PdfReader(pdf_input(file_path)).pages)
+
+
+EXTRACTORS: Dict[str, Type[TextExtractor]] = {
+    extractor.name: extractor for extractor in (PdfplumberExtractor, PdfiumExtractor, PyPDF2Extractor)
+}
+
+
+def get_extractor(extractor: Union[str, TextExtractor]) -> TextExtractor:
+    """
+    Get a text extraction backend.
+    
+    Args:
+        extractor: Backend name (pdfplumber, pdfium or pypdf2) or an instance
+    
+    Returns:
+        The backend, or pdfplumber if the named backend's library is not installed
+    
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    if isinstance(extractor, TextExtractor):
+        return extractor
+    
+    extractor_class = EXTRACTORS.get(extractor.strip().lower())
+    if extractor_class is None:
+        raise ValueError(f"Unknown text extractor '{extractor}'; expected one of: {', '.join(EXTRACTORS)}")
+    
+    instance = extractor_class()
+    if not instance.available:
+        print(f"Warning: Text extractor '{instance.name}' is not installed, using pdfplumber")
+        return PdfplumberExtractor()
+    return instance
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""Streaming reader for multipart form uploads that keeps small files in memory."""
+
+import asyncio
+import codecs
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+from parser import PdfSource
+
+
+# Largest text field or part header, and most parts, accepted in a form (as in Starlette)
+DEFAULT_MAX_FIELD_SIZE = 1024 * 1024
+DEFAULT_MAX_PARTS = 1000
+
+
+class MultipartUploadError(ValueError):
+    """Raised when a request body is not a well-formed multipart form."""
+
+
+class UploadedFile:
+    """
+    File part of a multipart form, held in memory up to a size limit.
+    
+    Once the part grows past the limit, what was received and the rest of the
+    part are written to a temporary file, which is removed by close().
+    """
+    
+    def __init__(self, filename: str, content_type: Optional[str], memory_limit: int, temp_dir: str):
+        """
+        Initialize file part.
+        
+        Args:
+            filename: Filename the client sent, used as the temporary file suffix
+            content_type: Content type the client sent for the part
+            memory_limit: Largest part, in bytes, kept in memory (0 writes every part to disk)
+            temp_dir: Directory for the temporary file of larger parts
+        """
+        self.filename = filename
+        self.content_type = content_type
+        self.memory_limit = memory_limit
+        self.temp_dir = temp_dir
+        self.size = 0
+        self.path: Optional[str] = None
+        self._buffer = bytearray()
+        self._content: Optional[bytes] = None
+        self._file: Optional[BinaryIO] = None
+    
+    @property
+    def in_memory(self) -> bool:
+        """Check if the part is still held in memory."""
+        return self.path is None
+    
+    def spills(self, size: int) -> bool:
+        """Check if writing `size` more bytes goes to, or moves the part to, the temporary file."""
+        return not self.in_memory or self.size + size > self.memory_limit
+    
+    def write(self, data: bytes):
+        """Append received bytes to the part, moving it to a temporary file once past the memory limit."""
+        if self.in_memory and self.size + len(data) > self.memory_limit:
+            self._file = tempfile.NamedTemporaryFile(dir=self.temp_dir, delete=False,
+                                                     suffix=Path(self.filename).suffix)
+            self.path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._buffer.extend(data)
+        self.size += len(data)
+    
+    def finish(self):
+        """Seal the part once it has been received whole, closing its temporary file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self.in_memory and self._content is None:
+            self._content, self._buffer = bytes(self._buffer), bytearray()
+    
+    @property
+    def source(self) -> PdfSource:
+        """The part's content in memory, or the path of its temporary file."""
+        if self.in_memory:
+            self.finish()
+            return self._content
+        return self.path
+    
+    def close(self):
+        """Release the part's content, removing its temporary file."""
+        self.finish()
+        self._content = None
+        if self.path is not None:
+            try:
+                Path(self.path).unlink()
+            except OSError:
+                pass  # File might already be deleted
+
+
+@dataclass
+class MultipartForm:
+    """Fields and files of a multipart form."""
+    
+    fields: Dict[str, str] = field(default_factory=dict)
+    files: Dict[str, UploadedFile] = field(default_factory=dict)
+    
+    def close(self):
+        """Release every file part."""
+        for upload in self.files.values():
+            upload.close()
+
+
+class _FormBuilder:
+    """
+    python-multipart callbacks assembling the parts of a form as they are parsed.
+    
+    The size and count limits are checked as each piece of a part is parsed, so a
+    body exceeding them is rejected before the rest of it is read or written to disk.
+    """
+    
+    def __init__(self, charset: str, memory_limit: int, temp_dir: str, max_file_size: Optional[int],
+                 max_field_size: int, max_parts: int):
+        self.charset = charset
+        self.memory_limit = memory_limit
+        self.temp_dir = temp_dir
+        self.max_file_size = max_file_size
+        self.max_field_size = max_field_size
+        self.max_parts = max_parts
+        self.parts = 0
+        self.form = MultipartForm()
+        self.uploads: List[UploadedFile] = []  # Every file part begun, to release on errors
+        self.received: List[Tuple[UploadedFile, bytes]] = []  # File data parsed from the last chunk
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._name = ""
+        self._upload: Optional[UploadedFile] = None
+        self._data = bytearray()
+        self._size = 0  # Bytes of the current part parsed so far
+        self.complete = False  # Set once the closing boundary is parsed
+    
+    def callbacks(self) -> dict:
+        return {
+            'on_part_begin': self.on_part_begin,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end,
+            'on_end': self.on_end
+        }
+    
+    def decode(self, value: bytes) -> str:
+        return value.decode(self.charset, errors='replace')
+    
+    def on_part_begin(self):
+        self.parts += 1
+        if self.parts > self.max_parts:
+            raise MultipartUploadError(f"Form has more than {self.max_parts} parts")
+        self._headers = {}
+        self._upload = None
+        self._data = bytearray()
+        self._size = 0
+    
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+        self._check_header()
+    
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+        self._check_header()
+    
+    def _check_header(self):
+        if len(self._header_name) + len(self._header_value) > self.max_field_size:
+            raise MultipartUploadError(f"Part header exceeds maximum allowed size ({self.max_field_size} bytes)")
+    
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b'content-disposition'))
+        if b'name' not in options:
+            raise MultipartUploadError('The Content-Disposition header of a part must give its "name"')
+        self._name = self.decode(options[b'name'])
+        if b'filename' in options:
+            content_type = self._headers.get(b'content-type')
+            self._upload = UploadedFile(
+                self.decode(options[b'filename']),
+                self.decode(content_type) if content_type else None,
+                self.memory_limit,
+                self.temp_dir
+            )
+            self.uploads.append(self._upload)
+    
+    def on_part_data(self, data: bytes, start: int, end: int):
+        self._size += end - start
+        if self._upload is not None:
+            if self.max_file_size is not None and self._size > self.max_file_size:
+                raise MultipartUploadError(
+                    f"File size exceeds maximum allowed size ({self.max_file_size} bytes)")
+            self.received.append((self._upload, data[start:end]))
+        else:
+            if self._size > self.max_field_size:
+                raise MultipartUploadError(
+                    f"Form field '{self._name}' exceeds maximum allowed size ({self.max_field_size} bytes)")
+            self._data.extend(data[start:end])
+    
+    def on_part_end(self):
+        if self._upload is not None:
+            replaced = self.form.files.get(self._name)
+            if replaced is not None:
+                replaced.close()
+            self.form.files[self._name] = self._upload
+        else:
+            self.form.fields[self._name] = self.decode(self._data)
+    
+    def on_end(self):
+        self.complete = True
+
+
+async def read_multipart(content_type: str, chunks: AsyncIterator[bytes], memory_limit: int,
+                         temp_dir: str, max_file_size: Optional[int] = None,
+                         max_field_size: int = DEFAULT_MAX_FIELD_SIZE,
+                         max_parts: int = DEFAULT_MAX_PARTS) -> MultipartForm:
+    """
+    Parse a multipart form from the request body as it is received.
+    
+    Unlike Starlette's form parsing, which spools files over 1MB to disk, file
+    parts are kept in memory up to `memory_limit` bytes; only larger ones are
+    written to a temporary file in `temp_dir`, and only once. The limits are
+    enforced while the body is received, so an oversized one is rejected as soon
+    as a limit is passed instead of after it was read whole.
+    
+    Args:
+        content_type: The request's Content-Type header, with the multipart boundary
+        chunks: The request body, e.g. Request.stream()
+        memory_limit: Largest file part, in bytes, kept in memory (0 writes every file to disk)
+        temp_dir: Directory for the temporary files of larger parts
+        max_file_size: Largest file part, in bytes (None for no limit)
+        max_field_size: Largest text field or part header, in bytes
+        max_parts: Most parts the form may have
+    
+    Returns:
+        MultipartForm with the text fields and file parts; close() it when done
+    
+    Raises:
+        MultipartUploadError: If the body is not a complete multipart form, or passes a limit
+    """
+    media_type, params = parse_options_header(content_type)
+    if media_type != b'multipart/form-data' or b'boundary' not in params:
+        raise MultipartUploadError("Expected a multipart/form-data body with a boundary")
+    
+    charset = params.get(b'charset', b'utf-8').decode('latin-1')
+    try:
+        charset = codecs.lookup(charset).name
+    except LookupError:
+        charset = 'latin-1'
+    
+    builder = _FormBuilder(charset, memory_limit, temp_dir, max_file_size, max_field_size, max_parts)
+    parser = MultipartParser(params[b'boundary'], builder.callbacks())
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+            for upload, data in builder.received:
+                if upload.spills(len(data)):
+                    # Disk writes run on a thread so they do not hold up the event loop
+                    await asyncio.to_thread(upload.write, data)
+                else:
+                    upload.write(data)
+            builder.received.clear()
+        parser.finalize()
+        if not builder.complete:
+            raise MultipartUploadError("Multipart body ended before its closing boundary")
+        for upload in builder.uploads:
+            upload.finish()
+    except BaseException as e:
+        for upload in builder.uploads:
+            upload.close()
+        if isinstance(e, MultipartParseError):
+            raise MultipartUploadError(f"Malformed multipart body: {e}") from e
+        raise
+    return builder.form
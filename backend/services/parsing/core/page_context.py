@@ -0,0 +1,147 @@
+"""Per-page extraction context shared by text, table and coordinate extraction."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PageContext:
+    """
+    One layout pass over a pdfplumber page, shared by everything that reads it.
+    
+    The page's objects are laid out once; plain text, tables, words and the
+    character index used for coordinate lookups are derived from them on first
+    use and cached. Passing the same context to the raw-text fallback, the
+    structure validation and the page parsers means each page is analyzed
+    once per document instead of once per consumer.
+    
+    The context mirrors the parts of the pdfplumber page API the parsers use
+    (extract_text, extract_tables, extract_words, chars, rects, lines, curves,
+    bbox), so it can be passed wherever a page is expected.
+    """
+    
+    def __init__(self, page, text: Optional[str] = None):
+        """
+        Initialize context.
+        
+        Args:
+            page: pdfplumber page object
+            text: Plain text of the page if it was already extracted elsewhere, e.g. by a PagePool worker
+        """
+        self.page = page
+        self._objects: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._text = text
+        self._tables: Dict[str, List[List[List[Optional[str]]]]] = {}
+        self._words: Optional[List[Dict[str, Any]]] = None
+        self._char_index: Dict[bool, Tuple[str, List[Dict[str, float]]]] = {}
+    
+    @classmethod
+    def of(cls, page) -> 'PageContext':
+        """Get the context of a page, wrapping a plain pdfplumber page if needed."""
+        return page if isinstance(page, cls) else cls(page)
+    
+    @property
+    def page_number(self) -> int:
+        return self.page.page_number
+    
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return self.page.bbox
+    
+    @property
+    def width(self) -> float:
+        return self.page.width
+    
+    @property
+    def height(self) -> float:
+        return self.page.height
+    
+    @property
+    def objects(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Laid-out page objects by kind, from the one pdfminer pass over the page."""
+        if self._objects is None:
+            self._objects = self.page.objects
+        return self._objects
+    
+    @property
+    def chars(self) -> List[Dict[str, Any]]:
+        return self.objects.get('char', [])
+    
+    @property
+    def rects(self) -> List[Dict[str, Any]]:
+        return self.objects.get('rect', [])
+    
+    @property
+    def lines(self) -> List[Dict[str, Any]]:
+        return self.objects.get('line', [])
+    
+    @property
+    def curves(self) -> List[Dict[str, Any]]:
+        return self.objects.get('curve', [])
+    
+    @property
+    def text(self) -> str:
+        """Plain text of the page, empty if it has none."""
+        if self._text is None:
+            self._text = self.page.extract_text() or ""
+        return self._text
+    
+    def extract_text(self) -> str:
+        """Plain text of the page, as pdfplumber's extract_text() with default settings."""
+        return self.text
+    
+    def extract_tables(self, table_settings: Optional[Dict[str, Any]] = None) -> List[List[List[Optional[str]]]]:
+        """Tables found with the given settings, each found at most once per page."""
+        key = repr(sorted(table_settings.items())) if table_settings else ''
+        if key not in self._tables:
+            self._tables[key] = self.page.extract_tables(table_settings=table_settings)
+        return self._tables[key]
+    
+    @property
+    def tables(self) -> List[List[List[Optional[str]]]]:
+        """Tables found with pdfplumber's default settings."""
+        return self.extract_tables()
+    
+    def extract_words(self) -> List[Dict[str, Any]]:
+        """Words with their bounding boxes, as pdfplumber's extract_words() with default settings."""
+        if self._words is None:
+            self._words = self.page.extract_words()
+        return self._words
+    
+    @property
+    def words(self) -> List[Dict[str, Any]]:
+        return self.extract_words()
+    
+    def char_index(self, case_sensitive: bool = False) -> Tuple[str, List[Dict[str, float]]]:
+        """
+        Concatenated character text of the page and the box of each character.
+        
+        Args:
+            case_sensitive: Keep the characters' case; otherwise each is lowercased
+        
+        Returns:
+            Tuple of (text, boxes), where boxes[i] has the x0, y0, x1 and y1 of
+            the page character at text position i
+        """
+        if case_sensitive not in self._char_index:
+            chars = self.chars
+            texts = [char.get('text', '') for char in chars]
+            if not case_sensitive:
+                texts = [text.lower() for text in texts]
+            boxes = [
+                {
+                    'x0': char.get('x0', 0),
+                    'y0': char.get('y0', 0),
+                    'x1': char.get('x1', 0),
+                    'y1': char.get('y1', 0)
+                }
+                for char in chars
+            ]
+            self._char_index[case_sensitive] = (''.join(texts), boxes)
+        return self._char_index[case_sensitive]
+    
+    def close(self):
+        """Release the cached layout of the page."""
+        self._objects = None
+        self._tables.clear()
+        self._words = None
+        self._char_index.clear()
+        self.page.close()
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Page extraction for large PDFs, split across a persistent process pool."""
+
+import io
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+
+import pdfplumber
+
+from parser import page_content
+from .page_context import PageContext
+
+
+# PDFs with fewer pages than this are extracted in-process
+DEFAULT_MIN_PAGES = 20
+
+# Page ranges per worker; more, smaller ranges even out pages of uneven cost
+RANGES_PER_WORKER = 4
+
+# Seconds the pool may take for one PDF before it is restarted and the PDF extracted in-process
+DEFAULT_TIMEOUT = 120.0
+
+
+@dataclass
+class PageRangeTask:
+    """A range of pages to extract from a PDF held in shared memory."""
+    
+    memory_name: str
+    size: int  # Bytes of PDF in the shared memory block
+    first: int  # 0-indexed, inclusive
+    last: int  # 0-indexed, exclusive
+    page_count: int  # Pages in the PDF; the range ending there closes the worker's copy
+
+
+@dataclass
+class ExtractedPages:
+    """Text of each page of a PDF, in page order."""
+    
+    texts: List[str]  # Plain text, as PageContext.text
+    contents: List[str]  # Text followed by table rows, as parser.page_content
+
+
+class PagePool:
+    """
+    Extracts the pages of one large PDF in parallel worker processes.
+    
+    pdfminer layout analysis is pure Python, so a 150-page closing package
+    otherwise takes one core for the whole request. The PDF bytes are copied
+    into shared memory once; each worker opens the PDF from them at most once
+    per document and lays out the page ranges it is given. Workers close the
+    document after its final range or when released once all ranges are done.
+    Pages are reassembled in order, so the result is the same as extract_pages.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, min_pages: int = DEFAULT_MIN_PAGES,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT):
+        """
+        Initialize pool.
+        
+        Args:
+            workers: Worker processes (default: CPU count)
+            min_pages: Smallest PDF, in pages, extracted on the pool
+            timeout: Seconds the workers may take for one PDF before they are killed (None for no limit)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_pages = min_pages
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def should_split(self, page_count: int) -> bool:
+        """Check if a PDF has enough pages to be worth spreading across the pool."""
+        return self.workers > 1 and page_count >= max(2, self.min_pages)
+    
+    def extract(self, data: bytes, page_count: Optional[int] = None) -> Optional[ExtractedPages]:
+        """
+        Extract the text of every page of a PDF on the pool.
+        
+        Args:
+            data: PDF file content
+            page_count: Pages in the PDF, if already known
+        
+        Returns:
+            The pages in order, or None if the PDF is below the page threshold or
+            the pool could not extract it; the caller then extracts in-process
+        """
+        if page_count is None:
+            try:
+                with pdfplumber.open(io.BytesIO(data)) as pdf:
+                    page_count = len(pdf.pages)
+            except Exception as e:
+                print(f"Warning: Could not count PDF pages for the page pool: {e}")
+                return None
+        if not self.should_split(page_count):
+            return None
+        
+        memory = shared_memory.SharedMemory(name=f"closeguard-{uuid.uuid4().hex[:16]}", create=True,
+                                            size=max(1, len(data)))
+        try:
+            memory.buf[:len(data)] = data
+            tasks = [
+                PageRangeTask(memory_name=memory.name, size=len(data), first=first, last=last,
+                              page_count=page_count)
+                for first, last in self._split(page_count)
+            ]
+            try:
+                executor = self._get_executor()
+                futures = [executor.submit(_extract_range, task) for task in tasks]
+                _, pending = wait(futures, timeout=self.timeout)
+                if pending:
+                    print(f"Warning: Page pool took over {self.timeout}s, extracting in-process")
+                    self._reset_executor(kill=True)
+                    return None
+                results = [future.result() for future in futures]
+                # Idle workers pick these up; one that misses its release closes the PDF on its next document
+                for _ in range(self.workers):
+                    executor.submit(_release_pdf, memory.name)
+            except BrokenProcessPool as e:
+                print(f"Warning: Page pool failed, extracting in-process: {e}")
+                self._reset_executor()
+                return None
+            except Exception as e:
+                print(f"Warning: Page pool extraction failed, extracting in-process: {e}")
+                return None
+        finally:
+            memory.close()
+            memory.unlink()
+        
+        pages = ExtractedPages(texts=[], contents=[])
+        for result in results:
+            for text, content in result:
+                pages.texts.append(text)
+                pages.contents.append(content)
+        return pages
+    
+    def start(self):
+        """Start the workers ahead of the first large PDF, so it doesn't pay for their startup."""
+        executor = self._get_executor()
+        for future in [executor.submit(_release_pdf) for _ in range(self.workers)]:
+            future.result()
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        self._reset_executor()
+    
+    def _split(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split the pages into contiguous ranges, several per worker."""
+        range_count = min(page_count, self.workers * RANGES_PER_WORKER)
+        bounds = [page_count * index // range_count for index in range(range_count + 1)]
+        return [(first, last) for first, last in zip(bounds, bounds[1:]) if last > first]
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it on first use from a forkserver so it never forks the threaded server."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('forkserver'))
+            return self._executor
+    
+    def _reset_executor(self, kill: bool = False):
+        """Shut the worker pool down, killing its workers if set (e.g. one stuck on a page); the next run starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if kill:
+            # ProcessPoolExecutor has no public way to stop a busy worker
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# PDF most recently opened by this worker, reused by its later page ranges
+_worker_pdf: Optional[Tuple[str, Any]] = None
+
+
+def _release_pdf(memory_name: Optional[str] = None):
+    """Close the PDF this worker holds, only if it is the given document when one is given."""
+    global _worker_pdf
+    if _worker_pdf is not None and memory_name in (None, _worker_pdf[0]):
+        _worker_pdf[1].close()
+        _worker_pdf = None
+
+
+def _extract_range(task: PageRangeTask) -> List[Tuple[str, str]]:
+    """Extract one range of pages in a worker process."""
+    global _worker_pdf
+    if _worker_pdf is None or _worker_pdf[0] != task.memory_name:
+        _release_pdf()
+        memory = shared_memory.SharedMemory(name=task.memory_name)
+        try:
+            data = bytes(memory.buf[:task.size])
+        finally:
+            memory.close()  # Workers share the parent's resource tracker, which unlinks the block
+        _worker_pdf = (task.memory_name, pdfplumber.open(io.BytesIO(data)))
+    pdf = _worker_pdf[1]
+    
+    pages = []
+    try:
+        for index in range(task.first, task.last):
+            context = PageContext(pdf.pages[index])
+            pages.append((context.text, page_content(context)))
+            context.close()  # Release the page's layout before the next one
+    finally:
+        if task.last >= task.page_count:
+            _release_pdf(task.memory_name)
+    return pages
\ No newline at end of file
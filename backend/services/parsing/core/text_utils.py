@@ -3,6 +3,8 @@
 import re
 from typing import Optional, List, Dict, Any
 
+from .page_context import PageContext
+
 
 class TextUtils:
     """Utility functions for text processing and extraction."""
@@ -176,6 +178,7 @@ class TextUtils:
                 "join_tolerance": 3
             }
         
+        page = PageContext.of(page)
         try:
             tables = page.extract_tables(table_settings=table_settings)
             return tables[0] if tables else []
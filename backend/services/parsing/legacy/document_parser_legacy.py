@@ -1,48 +1,299 @@
 """Document parsing service for extracting text from PDFs."""
 
+import shutil
 import tempfile
-from typing import Optional
+from typing import Any, BinaryIO, List, Optional, Tuple, Union
 from pathlib import Path
 
+import pdfplumber
+
 # Import the existing parser functionality
-from parser import extract_text
+from parser import PdfSource, extract_pages, page_content, pdf_input
+from models.document import DocumentLayout, ParsedDocument
+from ..core.extractors import TextExtractor, get_extractor
+from ..core.multipart_upload import UploadedFile
+from ..core.page_pool import DEFAULT_MIN_PAGES, DEFAULT_TIMEOUT as DEFAULT_PAGE_POOL_TIMEOUT, ExtractedPages, PagePool
+from ..trid.page_locator import CD_PAGE_COUNT, CdPageLocator, CdPageMap
+from ..trid.section_locator import SectionLocator
+from ..trid.trid_parser import TridParser
+
+
+# Uploads up to this size are processed in memory; larger ones are spilled to a temporary file
+DEFAULT_UPLOAD_MEMORY_LIMIT = 32 * 1024 * 1024
 
 
 class DocumentParserService:
     """Service for parsing documents and extracting text."""
     
-    def __init__(self, temp_dir: str = "/tmp"):
+    def __init__(self, temp_dir: str = "/tmp", page_pool_workers: Optional[int] = None,
+                 page_pool_min_pages: int = DEFAULT_MIN_PAGES, locate_cd_pages: bool = True,
+                 text_extractor: Union[str, TextExtractor] = 'pdfplumber',
+                 upload_memory_limit: int = DEFAULT_UPLOAD_MEMORY_LIMIT,
+                 page_pool_timeout: Optional[float] = DEFAULT_PAGE_POOL_TIMEOUT):
+        """
+        Initialize service.
+        
+        Args:
+            temp_dir: Directory for temporary upload files
+            page_pool_workers: Processes extracting the pages of large PDFs in parallel (default: in-process)
+            page_pool_min_pages: Smallest PDF, in pages, extracted on the page pool
+            locate_cd_pages: In PDFs longer than a Closing Disclosure, lay out only the CD pages
+                and keep the pre-pass text of the others
+            text_extractor: Backend for the text rules are evaluated on (pdfplumber, pdfium or
+                pypdf2). With a backend other than pdfplumber, pdfplumber only lays out the CD
+                pages the TRID parser reads coordinates and tables from
+            upload_memory_limit: Largest upload, in bytes, processed in memory; larger
+                uploads are written to temp_dir first (0 writes every upload)
+            page_pool_timeout: Seconds the page pool may take for one PDF before it is
+                restarted and the PDF extracted in-process (None for no limit)
+        """
         self.temp_dir = temp_dir
+        self.upload_memory_limit = upload_memory_limit
+        self.section_locator = SectionLocator()
+        self.page_locator = CdPageLocator() if locate_cd_pages else None
+        self.page_pool = (PagePool(page_pool_workers, page_pool_min_pages, page_pool_timeout)
+                          if page_pool_workers else None)
+        self.text_extractor = get_extractor(text_extractor)
     
-    def extract_text_from_file(self, file_path: str) -> str:
+    def extract_text_from_file(self, file_path: PdfSource) -> str:
         """Extract text from a file path."""
+        return self.extract_layout_from_file(file_path).text
+    
+    def extract_layout_from_file(self, file_path: PdfSource) -> DocumentLayout:
+        """Extract text from a file path, or PDF content in memory, along with its page and section spans."""
+        if not self.text_extractor.layout:
+            cd_map = self._extract_text_pages(file_path)
+            if cd_map is not None:
+                return self.section_locator.locate(cd_map.texts, cd_map.cd_pages)
+        
+        cd_map = self._locate_cd_pages(file_path)
+        if cd_map is not None:
+            try:
+                with pdfplumber.open(pdf_input(file_path)) as pdf:
+                    pages = self._located_page_content(pdf.pages, cd_map)
+                if pages is not None:
+                    return self.section_locator.locate(pages, cd_map.cd_pages)
+            except Exception as e:
+                print(f"Warning: Failed to extract located CD pages, extracting all pages: {e}")
+        
+        pooled = self._extract_pooled(file_path)
+        if pooled is not None:
+            return self.section_locator.locate(pooled.contents)
+        
         try:
-            return extract_text(file_path)
+            pages = extract_pages(file_path)
         except Exception as e:
             raise Exception(f"Failed to extract text from file: {e}")
+        return self.section_locator.locate(pages)
+    
+    def parse_document_from_file(self, file_path: PdfSource, cd_map: Optional[CdPageMap] = None,
+                                 filename: Optional[str] = None) -> Optional[ParsedDocument]:
+        """
+        Parse a TRID Closing Disclosure into structured fields, or None if it cannot be parsed.
+        
+        Args:
+            file_path: Path to the PDF file, or its content
+            cd_map: CD page locations and the text of the other pages, if already known
+            filename: Name of the document (default: the file's name)
+        """
+        try:
+            with TridParser(file_path, filename) as parser:
+                cd_map = cd_map or self._locate_cd_pages(file_path)
+                if cd_map is not None and cd_map.page_count == parser.get_page_count():
+                    parser.cd_pages = cd_map.cd_pages
+                    parser.page_texts = cd_map.seed_texts()
+                return self._parse_structure(parser)
+        except Exception as e:
+            print(f"Warning: Failed to parse document structure: {e}")
+            return None
+    
+    def extract_and_parse_file(self, file_path: PdfSource,
+                               filename: Optional[str] = None) -> Tuple[DocumentLayout, Optional[ParsedDocument]]:
+        """
+        Extract text and layout from a file and parse its structure, laying out each page once.
+        
+        The layout text and the TRID parser read the same page contexts. In a
+        package longer than the Closing Disclosure, only the located CD pages
+        are laid out; otherwise large PDFs have their pages extracted on the
+        page pool, and the TRID parser reuses that text. If the pages cannot be
+        read either way, the text falls back to extract_pages (PyPDF2, then
+        OCR) and the structure is parsed only if the PDF opened.
+        
+        Args:
+            file_path: Path to the PDF file, or its content
+            filename: Name of the document (default: the file's name)
+        
+        Returns:
+            Tuple of (layout, parsed document or None)
+        """
+        if not self.text_extractor.layout:
+            cd_map = self._extract_text_pages(file_path)
+            if cd_map is not None:
+                layout = self.section_locator.locate(cd_map.texts, cd_map.cd_pages)
+                return layout, self.parse_document_from_file(file_path, cd_map, filename)
+        
+        pages = None
+        cd_map = None
+        document = None
+        try:
+            with TridParser(file_path, filename) as parser:
+                cd_map = self._locate_cd_pages(file_path)
+                if cd_map is not None and cd_map.page_count != parser.get_page_count():
+                    cd_map = None
+                pooled = self._extract_pooled(file_path, parser.get_page_count()) if cd_map is None else None
+                try:
+                    if cd_map is not None:
+                        parser.cd_pages = cd_map.cd_pages
+                        parser.page_texts = cd_map.seed_texts()
+                        pages = self._located_page_content(parser.get_pages(), cd_map)
+                    elif pooled is not None:
+                        parser.page_texts = pooled.texts
+                        pages = pooled.contents
+                    else:
+                        pages = [page_content(page) for page in parser.get_pages()]
+                except Exception as e:
+                    print(f"Warning: Failed to extract page content, using fallback extraction: {e}")
+                document = self._parse_structure(parser)
+        except Exception as e:
+            print(f"Warning: Failed to parse document structure: {e}")
+        
+        if pages is None:
+            return self.extract_layout_from_file(file_path), document
+        return self.section_locator.locate(pages, cd_map.cd_pages if cd_map is not None else None), document
+    
+    def _locate_cd_pages(self, file_path: PdfSource) -> Optional[CdPageMap]:
+        """Locate the Closing Disclosure pages of a package, or None to extract every page."""
+        if self.page_locator is None:
+            return None
+        return self.page_locator.locate(file_path)
+    
+    def _extract_text_pages(self, file_path: PdfSource) -> Optional[CdPageMap]:
+        """
+        Extract every page with the configured text backend and locate the CD pages in that text.
+        
+        Returns:
+            The text of each page with the CD page locations (pages 1-5 unless located
+            elsewhere), or None if the backend failed or found no text, e.g. in a scanned
+            PDF; the pdfplumber path with its OCR fallback is then used
+        """
+        try:
+            texts = self.text_extractor.extract_pages(file_path)
+        except Exception as e:
+            print(f"Warning: {self.text_extractor.name} text extraction failed, using pdfplumber: {e}")
+            return None
+        if not any(text.strip() for text in texts):
+            return None
+        
+        cd_pages = None
+        if self.page_locator is not None and len(texts) > CD_PAGE_COUNT:
+            cd_pages = self.page_locator.match_pages(texts)
+        if cd_pages is None:
+            cd_pages = {cd_page: cd_page for cd_page in range(1, min(CD_PAGE_COUNT, len(texts)) + 1)}
+        return CdPageMap(page_count=len(texts), cd_pages=cd_pages, texts=texts)
+    
+    def _located_page_content(self, pages: List[Any], cd_map: CdPageMap) -> Optional[List[str]]:
+        """
+        Content of each page: full text and tables for CD pages, pre-pass text for the others.
+        
+        Returns:
+            Content of each page in order, or None if the PDF's page count differs from the pre-pass
+        """
+        if len(pages) != cd_map.page_count:
+            return None
+        layout_pages = cd_map.layout_pages
+        return [
+            page_content(page) if number in layout_pages else cd_map.texts[number - 1]
+            for number, page in enumerate(pages, 1)
+        ]
+    
+    def _extract_pooled(self, file_path: PdfSource, page_count: Optional[int] = None) -> Optional[ExtractedPages]:
+        """Extract the pages of a large PDF on the page pool, or None to extract in-process."""
+        if self.page_pool is None or (page_count is not None and not self.page_pool.should_split(page_count)):
+            return None
+        try:
+            data = file_path if isinstance(file_path, bytes) else Path(file_path).read_bytes()
+        except OSError:
+            return None
+        return self.page_pool.extract(data, page_count)
+    
+    def _parse_structure(self, parser: TridParser) -> Optional[ParsedDocument]:
+        """Run an open TRID parser, or None if no structured data could be parsed."""
+        try:
+            document = parser.parse()
+        except Exception as e:
+            print(f"Warning: Failed to parse document structure: {e}")
+            return None
+        
+        if document.loan_summary is None and not document.line_items:
+            print(f"Warning: No structured data parsed: {'; '.join(document.parsing_errors)}")
+            return None
+        return document
     
     def extract_text_from_upload(self, file_content: bytes, filename: str) -> str:
         """Extract text from uploaded file content."""
+        return self.extract_layout_from_upload(file_content, filename).text
+    
+    def extract_layout_from_upload(self, file_content: bytes, filename: str) -> DocumentLayout:
+        """Extract text from uploaded file content along with its page and section spans."""
+        return self.extract_from_upload(file_content, filename)[0]
+    
+    def extract_from_upload(self, file_content: Union[bytes, BinaryIO, UploadedFile], filename: str,
+                            parse_document: bool = False) -> Tuple[DocumentLayout, Optional[ParsedDocument]]:
+        """
+        Extract text and layout from uploaded file content, optionally parsing its structure too.
+        
+        Uploads up to upload_memory_limit bytes are read straight from memory.
+        Larger ones are spilled to a temporary file so the PDF libraries page
+        them from disk instead of holding several copies in memory; a stream is
+        copied there in chunks rather than read whole. A file part from
+        read_multipart() was already kept in memory or spilled as it was received.
+        
+        Args:
+            file_content: Raw uploaded bytes, a binary stream of them, or a file part from read_multipart()
+            filename: Original filename, used as the document name and the temporary file suffix
+            parse_document: Also run the TRID parser for structured-field rules
+        
+        Returns:
+            Tuple of (layout, parsed document or None)
+        """
         try:
+            if isinstance(file_content, UploadedFile):
+                return self._extract_source(file_content.source, filename, parse_document)
+            
+            stream = None
+            if not isinstance(file_content, (bytes, bytearray, memoryview)):
+                # Read one byte past the limit to tell whether the upload fits in memory
+                stream, file_content = file_content, file_content.read(self.upload_memory_limit + 1)
+            if len(file_content) <= self.upload_memory_limit:
+                return self._extract_source(bytes(file_content), filename, parse_document)
+            
             # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as temp_file:
+            with tempfile.NamedTemporaryFile(dir=self.temp_dir, delete=False, suffix=Path(filename).suffix) as temp_file:
                 temp_file.write(file_content)
+                if stream is not None:
+                    shutil.copyfileobj(stream, temp_file)
                 temp_file_path = temp_file.name
             
             try:
-                # Extract text using existing parser
-                text = self.extract_text_from_file(temp_file_path)
-                return text
+                return self._extract_source(temp_file_path, filename, parse_document)
             finally:
                 # Clean up temporary file
                 try:
                     Path(temp_file_path).unlink()
                 except OSError:
                     pass  # File might already be deleted
-                    
+        
         except Exception as e:
             raise Exception(f"Failed to process uploaded file: {e}")
     
+    def _extract_source(self, source: PdfSource, filename: str,
+                        parse_document: bool) -> Tuple[DocumentLayout, Optional[ParsedDocument]]:
+        """Extract an uploaded PDF from memory or from its spilled file."""
+        # Extract text using existing parser
+        if parse_document:
+            return self.extract_and_parse_file(source, Path(filename).name)
+        return self.extract_layout_from_file(source), None
+    
     def validate_file_type(self, filename: str, allowed_types: list = None) -> bool:
         """Validate file type based on extension."""
         if allowed_types is None:
@@ -4,10 +4,15 @@ from .trid_parser import TridParser
 from .page1_parser import Page1Parser
 from .page2_parser import Page2Parser  
 from .page3_parser import Page3Parser
+from .section_locator import SectionLocator
+from .page_locator import CdPageLocator, CdPageMap
 
 __all__ = [
     'TridParser',
     'Page1Parser',
     'Page2Parser',
-    'Page3Parser'
+    'Page3Parser',
+    'SectionLocator',
+    'CdPageLocator',
+    'CdPageMap'
 ]
\ No newline at end of file
@@ -1,19 +1,21 @@
 """Page 1 parser for TRID loan summary information."""
 
 import re
-from typing import Optional, Dict
-from ..core import CoordinateExtractor, TextUtils
-from models.document import LoanSummary, CoordinatePosition
+import string
+from typing import Optional, Dict, List
+from ..core import CoordinateExtractor, TextUtils, PageContext
+from models.document import LoanSummary, CoordinatePosition, ValueIndex, ValueKind
 
 
 class Page1Parser:
     """Parser for TRID Closing Disclosure Page 1 - Loan Summary."""
     
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.coordinate_extractor = CoordinateExtractor(page)
-        self.page_text = page.extract_text() or ""
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.coordinate_extractor = CoordinateExtractor(self.page)
+        self.page_text = self.page.text
+        self.values = ValueIndex(self.page_text)
     
     def parse(self) -> Optional[LoanSummary]:
         """Parse page 1 and extract loan summary information."""
@@ -47,44 +49,32 @@ class Page1Parser:
             loan_summary.coordinates = coordinates if coordinates else None
             
             return loan_summary
-            
+        
         except Exception as e:
             # Return None if parsing fails completely
             return None
     
     def _extract_loan_amount(self, coordinates: Dict) -> Optional[float]:
         """Extract loan amount from page."""
-        patterns = [
-            r'Loan Amount\s*\$?([0-9,]+\.?\d*)',
-            r'Loan Amount\s*([0-9,]+\.?\d*)',
-            r'Principal Amount\s*\$?([0-9,]+\.?\d*)'
-        ]
+        labels = ['Loan Amount', 'Principal Amount']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
-                if amount:
-                    # Find coordinates for highlighting
-                    coords = self.coordinate_extractor.find_amount_coordinates(amount)
-                    if coords:
-                        coordinates['loan_amount'] = coords[0]
-                    return amount
+        amount = self._find_value_after(labels, (ValueKind.AMOUNT, ValueKind.NUMBER))
+        if amount:
+            coords = self.coordinate_extractor.find_amount_coordinates(amount)
+            if coords:
+                coordinates['loan_amount'] = coords[0]
+            return amount
         
         return None
     
     def _extract_interest_rate(self, coordinates: Dict) -> Optional[float]:
         """Extract interest rate from page."""
-        patterns = [
-            r'Interest Rate\s*([0-9.]+)\s*%',
-            r'Rate\s*([0-9.]+)\s*%',
-            r'Interest\s*([0-9.]+)\s*%'
-        ]
+        labels = ['Interest Rate', 'Rate', 'Interest']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                rate = float(match.group(1))
+        for label in labels:
+            entry = self.values.value_after(label, (ValueKind.PERCENT,), same_line=False, gap=string.whitespace)
+            if entry:
+                rate = entry.value
                 # Find coordinates
                 coords = self.coordinate_extractor.find_text_coordinates(f"{rate}%")
                 if coords:
@@ -95,21 +85,14 @@ class Page1Parser:
     
     def _extract_monthly_payment(self, coordinates: Dict) -> Optional[float]:
         """Extract monthly principal & interest payment."""
-        patterns = [
-            r'Monthly Principal & Interest\s*\$?([0-9,]+\.?\d*)',
-            r'Monthly Payment\s*\$?([0-9,]+\.?\d*)',
-            r'Principal & Interest\s*\$?([0-9,]+\.?\d*)'
-        ]
+        labels = ['Monthly Principal & Interest', 'Monthly Payment', 'Principal & Interest']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
-                if amount:
-                    coords = self.coordinate_extractor.find_amount_coordinates(amount)
-                    if coords:
-                        coordinates['monthly_payment'] = coords[0]
-                    return amount
+        amount = self._find_value_after(labels, (ValueKind.AMOUNT, ValueKind.NUMBER))
+        if amount:
+            coords = self.coordinate_extractor.find_amount_coordinates(amount)
+            if coords:
+                coordinates['monthly_payment'] = coords[0]
+            return amount
         
         return None
     
@@ -174,21 +157,14 @@ class Page1Parser:
     
     def _extract_sale_price(self, coordinates: Dict) -> Optional[float]:
         """Extract sale price."""
-        patterns = [
-            r'Sale Price\s*\$?([0-9,]+\.?\d*)',
-            r'Purchase Price\s*\$?([0-9,]+\.?\d*)',
-            r'Sales Price\s*\$?([0-9,]+\.?\d*)'
-        ]
+        labels = ['Sale Price', 'Purchase Price', 'Sales Price']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
-                if amount:
-                    coords = self.coordinate_extractor.find_amount_coordinates(amount)
-                    if coords:
-                        coordinates['sale_price'] = coords[0]
-                    return amount
+        amount = self._find_value_after(labels, (ValueKind.AMOUNT, ValueKind.NUMBER))
+        if amount:
+            coords = self.coordinate_extractor.find_amount_coordinates(amount)
+            if coords:
+                coordinates['sale_price'] = coords[0]
+            return amount
         
         return None
     
@@ -252,44 +228,38 @@ class Page1Parser:
     
     def _extract_closing_costs(self, coordinates: Dict) -> Optional[float]:
         """Extract total closing costs."""
-        patterns = [
-            r'Closing Costs\s*\$?([0-9,]+\.?\d*)',
-            r'Total Closing Costs\s*\$?([0-9,]+\.?\d*)',
-            r'Total Costs\s*\$?([0-9,]+\.?\d*)'
-        ]
+        labels = ['Closing Costs', 'Total Closing Costs', 'Total Costs']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
-                if amount:
-                    coords = self.coordinate_extractor.find_amount_coordinates(amount)
-                    if coords:
-                        coordinates['closing_costs'] = coords[0]
-                    return amount
+        amount = self._find_value_after(labels, (ValueKind.AMOUNT, ValueKind.NUMBER))
+        if amount:
+            coords = self.coordinate_extractor.find_amount_coordinates(amount)
+            if coords:
+                coordinates['closing_costs'] = coords[0]
+            return amount
         
         return None
     
     def _extract_cash_to_close(self, coordinates: Dict) -> Optional[float]:
         """Extract cash to close amount."""
-        patterns = [
-            r'Cash to Close\s*\$?([0-9,]+\.?\d*)',
-            r'Cash Required\s*\$?([0-9,]+\.?\d*)',
-            r'Funds Required\s*\$?([0-9,]+\.?\d*)'
-        ]
+        labels = ['Cash to Close', 'Cash Required', 'Funds Required']
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
-                if amount:
-                    coords = self.coordinate_extractor.find_amount_coordinates(amount)
-                    if coords:
-                        coordinates['cash_to_close'] = coords[0]
-                    return amount
+        amount = self._find_value_after(labels, (ValueKind.AMOUNT, ValueKind.NUMBER))
+        if amount:
+            coords = self.coordinate_extractor.find_amount_coordinates(amount)
+            if coords:
+                coordinates['cash_to_close'] = coords[0]
+            return amount
         
         return None
     
+    def _find_value_after(self, labels: List[str], kinds) -> Optional[float]:
+        """Get the non-zero value printed right after a label, trying labels in order."""
+        for label in labels:
+            entry = self.values.value_after(label, kinds, same_line=False, gap=string.whitespace)
+            if entry and entry.value:
+                return entry.value
+        return None
+    
     def _extract_loan_type(self, coordinates: Dict) -> Optional[str]:
         """Extract loan type using checkbox detection."""
         try:
@@ -320,7 +290,7 @@ class Page1Parser:
                     return loan_type
             
             return None
-            
+        
         except Exception as e:
             # Fallback to text-based detection if checkbox detection fails
             loan_types = ['Conventional', 'FHA', 'VA', 'USDA', 'Jumbo']
@@ -2,7 +2,7 @@
 
 import re
 from typing import List, Optional, Dict, Tuple
-from ..core import CoordinateExtractor, TextUtils
+from ..core import CoordinateExtractor, TextUtils, PageContext
 from models.document import (
     ClosingDisclosureLineItem, 
     DocumentSection, 
@@ -15,25 +15,26 @@ from models.document import (
 class Page2Parser:
     """Parser for TRID Closing Disclosure Page 2 - Closing Costs."""
     
+    # Section mappings
+    SECTION_MAP = {
+        'A': DocumentSection.ORIGINATION_CHARGES,
+        'B': DocumentSection.SERVICES_NOT_SHOPPED,  
+        'C': DocumentSection.SERVICES_SHOPPED,
+        'D': DocumentSection.ORIGINATION_CHARGES,  # Total loan costs (summary)
+        'E': DocumentSection.TAXES_GOVERNMENT_FEES,
+        'F': DocumentSection.PREPAIDS,
+        'G': DocumentSection.INITIAL_ESCROW,
+        'H': DocumentSection.OTHER,
+        'I': DocumentSection.OTHER,  # Total other costs (summary)
+        'J': DocumentSection.OTHER   # Total closing costs (summary)
+    }
+    
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.coordinate_extractor = CoordinateExtractor(page)
-        self.page_text = page.extract_text() or ""
-        
-        # Section mappings
-        self.section_map = {
-            'A': DocumentSection.ORIGINATION_CHARGES,
-            'B': DocumentSection.SERVICES_NOT_SHOPPED,  
-            'C': DocumentSection.SERVICES_SHOPPED,
-            'D': DocumentSection.ORIGINATION_CHARGES,  # Total loan costs (summary)
-            'E': DocumentSection.TAXES_GOVERNMENT_FEES,
-            'F': DocumentSection.PREPAIDS,
-            'G': DocumentSection.INITIAL_ESCROW,
-            'H': DocumentSection.OTHER,
-            'I': DocumentSection.OTHER,  # Total other costs (summary)
-            'J': DocumentSection.OTHER   # Total closing costs (summary)
-        }
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.coordinate_extractor = CoordinateExtractor(self.page)
+        self.page_text = self.page.text
+        self.section_map = self.SECTION_MAP
     
     def parse(self) -> List[ClosingDisclosureLineItem]:
         """Parse page 2 and extract all closing cost line items."""
@@ -131,7 +132,8 @@ class Page2Parser:
         
         return -1
     
-    def _parse_section_header(self, line: str) -> Optional[Dict]:
+    @staticmethod
+    def _parse_section_header(line: str) -> Optional[Dict]:
         """Parse section header and extract section info."""
         # Pattern for section headers like "A. Origination Charges $3,846.86"
         pattern = r'^([A-H])\. (.+?)(?:\s+\$([\d,]+\.?\d*))?$'
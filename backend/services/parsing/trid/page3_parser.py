@@ -2,7 +2,7 @@
 
 import re
 from typing import List, Optional, Dict
-from ..core import CoordinateExtractor, TextUtils
+from ..core import CoordinateExtractor, TextUtils, PageContext
 from models.document import (
     ClosingDisclosureLineItem, 
     DocumentSection, 
@@ -16,10 +16,10 @@ class Page3Parser:
     """Parser for TRID Closing Disclosure Page 3 - Transaction Summaries."""
     
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.coordinate_extractor = CoordinateExtractor(page)
-        self.page_text = page.extract_text() or ""
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.coordinate_extractor = CoordinateExtractor(self.page)
+        self.page_text = self.page.text
     
     def parse(self) -> List[ClosingDisclosureLineItem]:
         """Parse page 3 and extract transaction line items."""
@@ -2,7 +2,7 @@
 
 import re
 from typing import List, Optional, Dict, Any
-from ..core import CoordinateExtractor, TextUtils, CheckboxDetector
+from ..core import CoordinateExtractor, TextUtils, CheckboxDetector, PageContext
 from models.document import (
     ClosingDisclosureLineItem, 
     DocumentSection, 
@@ -16,11 +16,11 @@ class Page4Parser:
     """Parser for TRID Closing Disclosure Page 4 - Loan Disclosures & Escrow."""
     
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.coordinate_extractor = CoordinateExtractor(page)
-        self.checkbox_detector = CheckboxDetector(page)
-        self.page_text = page.extract_text() or ""
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.coordinate_extractor = CoordinateExtractor(self.page)
+        self.checkbox_detector = CheckboxDetector(self.page)
+        self.page_text = self.page.text
     
     def parse(self) -> List[ClosingDisclosureLineItem]:
         """Parse page 4 and extract loan disclosures and escrow information."""
@@ -2,13 +2,15 @@
 
 import re
 from typing import List, Optional, Dict
-from ..core import CoordinateExtractor, TextUtils
+from ..core import CoordinateExtractor, TextUtils, PageContext
 from models.document import (
     ClosingDisclosureLineItem, 
     DocumentSection, 
     PaymentResponsibility, 
     CostCategory,
-    CoordinatePosition
+    CoordinatePosition,
+    ValueIndex,
+    ValueKind
 )
 
 
@@ -16,10 +18,11 @@ class Page5Parser:
     """Parser for TRID Closing Disclosure Page 5 - Loan Calculations."""
     
     def __init__(self, page):
-        """Initialize with pdfplumber page object."""
-        self.page = page
-        self.coordinate_extractor = CoordinateExtractor(page)
-        self.page_text = page.extract_text() or ""
+        """Initialize with pdfplumber page object or its PageContext."""
+        self.page = PageContext.of(page)
+        self.coordinate_extractor = CoordinateExtractor(self.page)
+        self.page_text = self.page.text
+        self.values = ValueIndex(self.page_text)
     
     def parse(self) -> List[ClosingDisclosureLineItem]:
         """Parse page 5 and extract loan calculation line items."""
@@ -146,15 +149,16 @@ class Page5Parser:
     
     def _extract_total_of_payments(self) -> Optional[Dict]:
         """Extract Total of Payments amount."""
-        patterns = [
-            r'Total of Payments[.\s]*\$([0-9,]+\.?\d*)',
-            r'Total you will have paid[^$]*\$([0-9,]+\.?\d*)'
+        # Label and the characters allowed between it and the amount (None for any)
+        labels = [
+            ('Total of Payments', '. \t\r\n'),
+            ('Total you will have paid', None)
         ]
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE | re.DOTALL)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
+        for label, gap in labels:
+            entry = self.values.value_after(label, (ValueKind.AMOUNT,), same_line=False, gap=gap)
+            if entry:
+                amount = entry.value
                 if amount:
                     # Find coordinates for highlighting
                     coords = self.coordinate_extractor.find_amount_coordinates(amount)
@@ -202,15 +206,15 @@ class Page5Parser:
     
     def _extract_amount_financed(self) -> Optional[Dict]:
         """Extract Amount Financed."""
-        patterns = [
-            r'Amount Financed[.\s]*\$([0-9,]+\.?\d*)',
-            r'The loan amount available[^$]*\$([0-9,]+\.?\d*)'
+        labels = [
+            ('Amount Financed', '. \t\r\n'),
+            ('The loan amount available', None)
         ]
         
-        for pattern in patterns:
-            match = re.search(pattern, self.page_text, re.IGNORECASE | re.DOTALL)
-            if match:
-                amount = TextUtils.extract_amount(match.group(1))
+        for label, gap in labels:
+            entry = self.values.value_after(label, (ValueKind.AMOUNT,), same_line=False, gap=gap)
+            if entry:
+                amount = entry.value
                 if amount:
                     # Find coordinates for highlighting
                     coords = self.coordinate_extractor.find_amount_coordinates(amount)
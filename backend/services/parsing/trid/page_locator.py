@@ -0,0 +1,126 @@
+"""Locates the Closing Disclosure pages of a closing package with a cheap text pre-pass."""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from parser import PdfSource
+from ..core.extractors import PdfiumExtractor
+
+
+# Pages of a TRID Closing Disclosure
+CD_PAGE_COUNT = 5
+
+
+@dataclass
+class CdPageMap:
+    """Where the Closing Disclosure pages are in a package, with the cheap text of every page."""
+    
+    page_count: int
+    cd_pages: Dict[int, int]  # CD page number (1-5) -> physical page number (1-based)
+    texts: List[str] = field(default_factory=list)  # Pre-pass text of each physical page
+    
+    @property
+    def layout_pages(self) -> Set[int]:
+        """Physical page numbers that get full layout extraction."""
+        return set(self.cd_pages.values())
+    
+    def seed_texts(self) -> List[Optional[str]]:
+        """Pre-pass text of the pages outside the CD, None for CD pages so they are laid out."""
+        layout_pages = self.layout_pages
+        return [None if number in layout_pages else text for number, text in enumerate(self.texts, 1)]
+
+
+class CdPageLocator:
+    """
+    Finds the five Closing Disclosure pages among the pages of a closing package.
+    
+    Packages carry the note, deed of trust and addenda along with the CD, but
+    only the CD pages are parsed. pdfium reads the text of every page in C in a
+    few milliseconds; each CD page is then recognized by its title plus one of
+    the headings printed on it, and the CD is the run of five pages starting at
+    the best-matching page 1. Only those pages then need pdfplumber's layout
+    analysis; the others keep their pre-pass text.
+    """
+    
+    # CD page number -> (title, headings of which at least one must also appear)
+    PAGE_MARKERS: Dict[int, Tuple[str, Tuple[str, ...]]] = {
+        1: ('Closing Disclosure', ('Closing Information', 'Loan Terms', 'Projected Payments')),
+        2: ('Loan Costs', ('Closing Cost Details', 'Origination Charges', 'Other Costs')),
+        3: ('Calculating Cash to Close', ('Summaries of Transactions', 'Total Closing Costs (J)')),
+        4: ('Loan Disclosures', ('Additional Information About This Loan', 'Escrow Account', 'Assumption')),
+        5: ('Loan Calculations', ('Other Disclosures', 'Contact Information', 'Finance Charge'))
+    }
+    
+    # CD pages besides page 1 that must match for a page 1 candidate to be accepted
+    MIN_MATCHED_PAGES = 1
+    
+    def __init__(self):
+        self.extractor = PdfiumExtractor()
+    
+    def locate(self, file_path: PdfSource) -> Optional[CdPageMap]:
+        """
+        Locate the CD pages of a PDF.
+        
+        Args:
+            file_path: Path to the PDF file, or its content
+        
+        Returns:
+            The page map, or None if the PDF is no longer than a CD, has no text
+            layer, no CD was recognized or pdfium is unavailable
+        """
+        if not self.extractor.available:
+            return None
+        
+        try:
+            texts = self._read_texts(file_path)
+        except Exception as e:
+            print(f"Warning: CD page pre-pass failed: {e}")
+            return None
+        if texts is None:
+            return None
+        
+        cd_pages = self.match_pages(texts)
+        if cd_pages is None:
+            return None
+        return CdPageMap(page_count=len(texts), cd_pages=cd_pages, texts=texts)
+    
+    def match_pages(self, texts: List[str]) -> Optional[Dict[int, int]]:
+        """
+        Map CD page numbers to the physical pages holding them.
+        
+        Args:
+            texts: Text of each physical page in order
+        
+        Returns:
+            CD page number -> physical page number, or None if no CD was recognized
+        """
+        normalized = [' '.join(text.split()) for text in texts]
+        best_start, best_score = None, 0
+        for start, text in enumerate(normalized):
+            if not self._is_page(1, text):
+                continue
+            score = sum(
+                1 for cd_page in range(2, CD_PAGE_COUNT + 1)
+                if start + cd_page - 1 < len(normalized) and self._is_page(cd_page, normalized[start + cd_page - 1])
+            )
+            if score > best_score:
+                best_start, best_score = start, score
+        
+        if best_start is None or best_score < self.MIN_MATCHED_PAGES:
+            return None
+        return {
+            cd_page: best_start + cd_page
+            for cd_page in range(1, CD_PAGE_COUNT + 1)
+            if best_start + cd_page <= len(texts)
+        }
+    
+    def _is_page(self, cd_page: int, text: str) -> bool:
+        """Check if a page's text carries the title and a heading of a CD page."""
+        title, headings = self.PAGE_MARKERS[cd_page]
+        return title in text and any(heading in text for heading in headings)
+    
+    def _read_texts(self, file_path: PdfSource) -> Optional[List[str]]:
+        """Read the text of every page with pdfium, or None for PDFs no longer than a CD."""
+        if self.extractor.page_count(file_path) <= CD_PAGE_COUNT:
+            return None
+        return self.extractor.extract_pages(file_path)
\ No newline at end of file
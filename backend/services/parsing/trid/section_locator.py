@@ -0,0 +1,76 @@
+"""Locates TRID page and section boundaries in extracted document text."""
+
+from typing import List, Dict, Optional
+
+from models.document import DocumentLayout, DocumentSection, Span
+from .page2_parser import Page2Parser
+
+
+class SectionLocator:
+    """Builds a DocumentLayout from the extracted text of each page."""
+    
+    # Page holding the lettered closing cost sections (A-J)
+    CLOSING_COSTS_PAGE = 2
+    
+    # Sections that make up a whole page
+    PAGE_SECTIONS = {
+        1: [DocumentSection.LOAN_SUMMARY],
+        3: [DocumentSection.BORROWER_TRANSACTION, DocumentSection.SELLER_TRANSACTION],
+        5: [DocumentSection.LOAN_CALCULATIONS]
+    }
+    
+    def locate(self, pages: List[str], cd_pages: Optional[Dict[int, int]] = None) -> DocumentLayout:
+        """
+        Join page texts into document text and find page and section spans.
+        
+        Args:
+            pages: Extracted text of each page in order (empty for pages without text)
+            cd_pages: Physical page number of each Closing Disclosure page, if the CD is not pages 1-5
+        
+        Returns:
+            DocumentLayout whose text matches joining the non-empty pages with newlines
+        """
+        parts = []
+        page_spans: List[Span] = []
+        offset = 0
+        
+        for page_text in pages:
+            page_spans.append((offset, offset + len(page_text)))
+            if page_text:
+                parts.append(page_text)
+                offset += len(page_text) + 1
+        
+        layout = DocumentLayout(text="\n".join(parts), page_spans=page_spans)
+        
+        cd_pages = cd_pages or {}
+        for cd_page, sections in self.PAGE_SECTIONS.items():
+            page_number = cd_pages.get(cd_page, cd_page)
+            if page_number <= len(page_spans):
+                for section in sections:
+                    layout.section_spans.setdefault(section, []).append(page_spans[page_number - 1])
+        
+        closing_costs_page = cd_pages.get(self.CLOSING_COSTS_PAGE, self.CLOSING_COSTS_PAGE)
+        if closing_costs_page <= len(page_spans):
+            start, end = page_spans[closing_costs_page - 1]
+            for section, spans in self._locate_closing_cost_sections(layout.text, start, end).items():
+                layout.section_spans.setdefault(section, []).extend(spans)
+        
+        return layout
+    
+    def _locate_closing_cost_sections(self, text: str, start: int, end: int) -> Dict[DocumentSection, List[Span]]:
+        """Split the closing costs page at each lettered section header."""
+        headers = []
+        offset = start
+        
+        for line in text[start:end].splitlines(keepends=True):
+            header = Page2Parser._parse_section_header(line.strip())
+            if header:
+                headers.append((offset, Page2Parser.SECTION_MAP[header['letter']]))
+            offset += len(line)
+        
+        sections: Dict[DocumentSection, List[Span]] = {}
+        for index, (header_start, section) in enumerate(headers):
+            header_end = headers[index + 1][0] if index + 1 < len(headers) else end
+            sections.setdefault(section, []).append((header_start, header_end))
+        
+        return sections
\ No newline at end of file
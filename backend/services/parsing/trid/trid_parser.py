@@ -1,19 +1,21 @@
 """Main TRID Closing Disclosure parser orchestrator."""
 
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 
-from ..core import BaseParser
+from parser import PdfSource
+from ..core import BaseParser, PageContext
 from models.document import ParsedDocument, LoanSummary
 
 
 class TridParser(BaseParser):
     """Main parser for TRID Closing Disclosure documents."""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: PdfSource, filename: Optional[str] = None):
         """Initialize TRID parser."""
-        super().__init__(file_path)
+        super().__init__(file_path, filename)
         self.document_type = "TRID Closing Disclosure"
+        self.cd_pages: Dict[int, int] = {}  # CD page number -> physical page, when the CD is not pages 1-5
         
         # Page parsers (to be imported when implemented)
         self._page1_parser = None
@@ -24,7 +26,7 @@ class TridParser(BaseParser):
         """Parse complete TRID document."""
         # Initialize result document
         result = ParsedDocument(
-            filename=self.file_path.name,
+            filename=self.filename,
             page_count=self.get_page_count(),
             parsing_errors=self.errors.copy()
         )
@@ -86,11 +88,11 @@ class TridParser(BaseParser):
                 return False
             
             # Check for key identifiers on page 1
-            page1 = self.get_page(1)
+            page1 = self.get_cd_page(1)
             if not page1:
                 return False
             
-            page1_text = page1.extract_text() or ""
+            page1_text = page1.text
             
             # Look for TRID-specific text
             trid_indicators = [
@@ -115,7 +117,7 @@ class TridParser(BaseParser):
     def _parse_page1(self) -> Optional[LoanSummary]:
         """Parse page 1 - loan summary information."""
         try:
-            page1 = self.get_page(1)
+            page1 = self.get_cd_page(1)
             if not page1:
                 return None
             
@@ -131,7 +133,7 @@ class TridParser(BaseParser):
     def _parse_page2(self) -> list:
         """Parse page 2 - closing costs sections."""
         try:
-            page2 = self.get_page(2)
+            page2 = self.get_cd_page(2)
             if not page2:
                 return []
             
@@ -147,7 +149,7 @@ class TridParser(BaseParser):
     def _parse_page3(self) -> list:
         """Parse page 3 - transaction sections.""" 
         try:
-            page3 = self.get_page(3)
+            page3 = self.get_cd_page(3)
             if not page3:
                 return []
             
@@ -163,7 +165,7 @@ class TridParser(BaseParser):
     def _parse_page4(self) -> list:
         """Parse page 4 - loan disclosures and escrow information."""
         try:
-            page4 = self.get_page(4)
+            page4 = self.get_cd_page(4)
             if not page4:
                 return []
             
@@ -179,7 +181,7 @@ class TridParser(BaseParser):
     def _parse_page5(self) -> tuple:
         """Parse page 5 - loan calculations and disclosures."""
         try:
-            page5 = self.get_page(5)
+            page5 = self.get_cd_page(5)
             if not page5:
                 return [], {}
             
@@ -203,6 +205,10 @@ class TridParser(BaseParser):
             self.add_error(f"Error parsing page 5: {e}")
             return [], {}
     
+    def get_cd_page(self, cd_page: int) -> Optional[PageContext]:
+        """Get the extraction context of a Closing Disclosure page (1-5)."""
+        return self.get_page(self.cd_pages.get(cd_page, cd_page))
+    
     def get_document_metadata(self) -> dict:
         """Get metadata about the parsed document."""
         return {
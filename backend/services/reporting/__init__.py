@@ -1,8 +1,12 @@
 """Report generation services."""
 
+from .rescoring_service import ReportRescorer, StoredDocument
+
 # Future implementation:
 # from .report_generator import ReportGenerator
 
 __all__ = [
+    'ReportRescorer',
+    'StoredDocument'
     # 'ReportGenerator'
 ]
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""Re-scoring of stored reports when the rules configuration changes."""
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+from models.core import Flag, UserContext
+from models.document import DocumentLayout, ParsedDocument
+
+
+@dataclass
+class StoredDocument:
+    """Extracted content of an uploaded document, kept so its report can be re-scored without the PDF."""
+    
+    layout: DocumentLayout
+    document: Optional[ParsedDocument] = None
+    user_context: Optional[UserContext] = None
+
+
+class ReportRescorer:
+    """
+    Service that brings stored reports up to date with the current rules.
+    
+    Each report records the content hash of every rule its flags were computed
+    with. When rules-config.yaml changes, only the rules whose hash differs (or
+    that were added) are re-run against the stored document text; flags of
+    unchanged rules are kept and flags of removed rules are dropped.
+    
+    Documents are kept in memory only by default: the most recently used
+    `max_documents`, whose reports stay re-scorable. Reports whose document was
+    evicted keep their flags but are no longer re-scored.
+    
+    With a `document_dir`, each document is also written there, one file per
+    report, on a background thread so uploads never wait for the disk, and read
+    back when an evicted report is re-scored. The files hold borrower data and
+    the report store lives in memory, so files whose report is gone (e.g. every
+    file after a restart) or older than `document_max_age` are purged at
+    startup and on every background check.
+    """
+    
+    def __init__(self, rule_engine, scoring_service, reports_store: Dict[str, Dict[str, Any]],
+                 documents: Optional[Dict[str, StoredDocument]] = None, max_documents: Optional[int] = 256,
+                 document_dir: Optional[str] = None, document_max_age: Optional[float] = None):
+        """
+        Initialize the rescorer.
+        
+        Args:
+            rule_engine: RuleEngineService providing the current rule plan
+            scoring_service: ScoringService recomputing report analytics
+            reports_store: Report dictionaries by report ID, updated in place
+            documents: Stored documents by report ID
+            max_documents: Documents kept in memory, least recently stored or used evicted first (None for no limit)
+            document_dir: Directory the documents are written to, or None to keep them in memory only
+            document_max_age: Seconds a written document is kept before it is purged (None until its report is gone)
+        """
+        self.rule_engine = rule_engine
+        self.scoring_service = scoring_service
+        self.reports_store = reports_store
+        self.documents: "OrderedDict[str, StoredDocument]" = OrderedDict(documents or {})
+        self.max_documents = max_documents
+        self.document_dir = document_dir
+        self.document_max_age = document_max_age
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._documents_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._config_hash: Optional[str] = None
+        if document_dir:
+            os.makedirs(document_dir, exist_ok=True)
+            # One writer keeps the writes and removals of each report's file in order
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='document-writer')
+            self.purge_documents()
+    
+    def store_document(self, report_id: str, layout: DocumentLayout, document: Optional[ParsedDocument] = None,
+                       user_context: Optional[UserContext] = None):
+        """Keep a report's document so it can be re-scored later, evicting the oldest from memory beyond max_documents."""
+        stored = StoredDocument(layout=layout, document=document, user_context=user_context)
+        self._cache_document(report_id, stored)
+        self._submit(self._write_document, report_id, stored)
+    
+    def update_context(self, report_id: str, user_context: Optional[UserContext]):
+        """Record the user context a report was last scored with."""
+        stored = self._load_document(report_id)
+        if stored is not None:
+            stored.user_context = user_context
+            self._submit(self._write_document, report_id, stored)
+    
+    def discard_document(self, report_id: str):
+        """Forget a deleted report's document."""
+        with self._documents_lock:
+            self.documents.pop(report_id, None)
+        self._submit(self._remove_document, report_id)
+    
+    def purge_documents(self) -> int:
+        """
+        Remove the written documents whose report is gone or that are older than document_max_age.
+        
+        Returns:
+            Number of documents removed
+        """
+        if self._writer is None:
+            return 0
+        return self._writer.submit(self._purge_documents).result()
+    
+    def flush(self):
+        """Wait until the documents stored so far are written."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+    
+    def find_stale(self) -> List[str]:
+        """List the reports whose rule hashes differ from the current rules."""
+        current = self.rule_engine.get_plan().rule_hashes
+        stale = []
+        for report_id in list(self.reports_store):
+            report = self.reports_store.get(report_id)
+            if report is None or not self._has_document(report_id):
+                continue
+            metadata = report.get('metadata') or {}
+            if metadata.get('rule_hashes') != current:
+                stale.append(report_id)
+        return stale
+    
+    def rescore_report(self, report_id: str) -> Optional[List[str]]:
+        """
+        Re-run the added and changed rules against a stored report.
+        
+        Returns:
+            Names of the rules re-run, or None if the report or its document is gone
+        """
+        report = self.reports_store.get(report_id)
+        if report is None:
+            return None
+        stored = self._load_document(report_id)
+        if stored is None:
+            return None
+        
+        metadata = dict(report.get('metadata') or {})
+        analysis = self.rule_engine.create_analysis(stored.layout.text, layout=stored.layout, document=stored.document)
+        result = self.rule_engine.rescore(
+            analysis,
+            [Flag.from_dict(flag) for flag in report.get('flags', [])],
+            metadata.get('rule_hashes') or {},
+            stored.user_context
+        )
+        analytics = self.scoring_service.create_analytics(result.flags)
+        
+        metadata['rule_hashes'] = result.rule_hashes
+        metadata['rescored_timestamp'] = str(int(time.time()))
+        updated = dict(report)
+        updated['flags'] = [flag.to_dict() for flag in result.flags]
+        updated['analytics'] = {
+            'forensic_score': analytics.forensic_score,
+            'total_flags': analytics.total_flags,
+            'high_severity': analytics.high_severity,
+            'medium_severity': analytics.medium_severity,
+            'low_severity': analytics.low_severity
+        }
+        updated['metadata'] = metadata
+        
+        # The report may have been deleted or re-scored with new context meanwhile
+        if self.reports_store.get(report_id) is report:
+            self.reports_store[report_id] = updated
+        return result.stats['rescored_rules']
+    
+    def rescore_all(self) -> Dict[str, Any]:
+        """Re-score every stale report, returning a summary."""
+        with self._lock:
+            start_time = time.time()
+            plan = self.rule_engine.get_plan()
+            rescored = 0
+            rules_run = 0
+            
+            for report_id in self.find_stale():
+                try:
+                    rules = self.rescore_report(report_id)
+                except Exception as e:
+                    print(f"ERROR re-scoring report {report_id}: {e}")
+                    continue
+                if rules is not None:
+                    rescored += 1
+                    rules_run += len(rules)
+            
+            self._config_hash = plan.config_hash
+            summary = {
+                'config_hash': plan.config_hash,
+                'reports_rescored': rescored,
+                'rules_run': rules_run,
+                'seconds': time.time() - start_time
+            }
+            if rescored:
+                print(f"Re-scored {rescored} reports ({rules_run} rule runs) in {summary['seconds']:.2f}s")
+            return summary
+    
+    def start(self, interval: float = 30.0):
+        """Start re-scoring in the background whenever the rules configuration changes."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._config_hash = self.rule_engine.get_plan().config_hash
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="report-rescorer", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background re-scorer."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _watch(self, interval: float):
+        """Poll the rule plan and re-score stale reports after it changes."""
+        while not self._stop_event.wait(interval):
+            try:
+                if self.rule_engine.get_plan().config_hash != self._config_hash:
+                    self.rescore_all()
+                self.purge_documents()
+            except Exception as e:
+                print(f"ERROR in background re-scoring: {e}")
+    
+    def _submit(self, function, *args):
+        """Run a file operation on the writer thread, if documents are written at all."""
+        if self._writer is not None:
+            self._writer.submit(function, *args)
+    
+    def _cache_document(self, report_id: str, stored: StoredDocument):
+        """Keep a document in memory as the most recently used, evicting the oldest beyond max_documents."""
+        with self._documents_lock:
+            self.documents[report_id] = stored
+            self.documents.move_to_end(report_id)
+            while self.max_documents is not None and len(self.documents) > self.max_documents:
+                self.documents.popitem(last=False)
+    
+    def _has_document(self, report_id: str) -> bool:
+        """Check if a report's document is in memory or on disk."""
+        with self._documents_lock:
+            if report_id in self.documents:
+                return True
+        path = self._document_path(report_id)
+        return path is not None and os.path.exists(path)
+    
+    def _load_document(self, report_id: str) -> Optional[StoredDocument]:
+        """Get a report's document from memory, reading it back from its file if it was evicted."""
+        with self._documents_lock:
+            stored = self.documents.get(report_id)
+            if stored is not None:
+                self.documents.move_to_end(report_id)
+                return stored
+        
+        path = self._document_path(report_id)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as file:
+                stored = pickle.load(file)
+        except Exception as e:
+            print(f"Warning: Could not read stored document of report {report_id}: {e}")
+            return None
+        self._cache_document(report_id, stored)
+        return stored
+    
+    def _write_document(self, report_id: str, stored: StoredDocument):
+        """Write a report's document to its file, replacing any previous version atomically."""
+        path = self._document_path(report_id)
+        if path is None:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.document_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump(stored, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            print(f"Warning: Could not store document of report {report_id}, keeping it in memory only: {e}")
+    
+    def _remove_document(self, report_id: str):
+        """Remove a report's file."""
+        path = self._document_path(report_id)
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not remove stored document of report {report_id}: {e}")
+    
+    def _purge_documents(self) -> int:
+        """Remove orphaned, expired and partially written files; runs on the writer thread."""
+        cutoff = time.time() - self.document_max_age if self.document_max_age else None
+        removed = 0
+        for entry in os.scandir(self.document_dir):
+            if not entry.is_file():
+                continue
+            report_id, extension = os.path.splitext(entry.name)
+            try:
+                expired = cutoff is not None and entry.stat().st_mtime < cutoff
+                if extension == '.tmp' or (extension == '.pickle' and (expired or report_id not in self.reports_store)):
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError as e:
+                print(f"Warning: Could not purge stored document {entry.name}: {e}")
+        if removed:
+            print(f"Purged {removed} stored documents")
+        return removed
+    
+    def _document_path(self, report_id: str) -> Optional[str]:
+        """File of a report's document, or None if documents are only kept in memory."""
+        if not self.document_dir or os.path.basename(report_id) != report_id or report_id in ('', '.', '..'):
+            return None
+        return os.path.join(self.document_dir, f"{report_id}.pickle")
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Summarize the shadow comparisons recorded between the serving and legacy engines.
+
+Enable shadowing on the API with SHADOW_SAMPLE_RATE (e.g. 0.05 for 5% of
+uploads), then report on what was recorded:
+    python shadow_report.py [--store shadow-results.jsonl] [--limit N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import Settings
+from services.analysis.shadow_runner import ShadowStore, summarize_results
+
+
+def format_ms(value) -> str:
+    """Format an optional millisecond figure."""
+    return f"{value:.1f}ms" if value is not None else "-"
+
+
+def format_ratio(value) -> str:
+    """Format an optional latency ratio."""
+    return f"{value:.2f}x" if value is not None else "-"
+
+
+def print_summary(summary: dict, top: int):
+    """Print a summary as a readable report."""
+    print(f"Samples: {summary['samples']} ({summary['errors']} failed) against {', '.join(summary['engines']) or 'no engine'}")
+    if summary['agreement_rate'] is not None:
+        print(f"Documents with identical flags: {summary['agreement_rate']:.1%}")
+    print(f"Serving engine: p50 {format_ms(summary['primary_ms']['p50'])}, p95 {format_ms(summary['primary_ms']['p95'])}")
+    print(f"Shadow engine:  p50 {format_ms(summary['shadow_ms']['p50'])}, p95 {format_ms(summary['shadow_ms']['p95'])}")
+    print(f"Shadow/serving latency: p50 {format_ratio(summary['latency_ratio']['p50'])}, "
+          f"p95 {format_ratio(summary['latency_ratio']['p95'])}")
+    if summary.get('skipped_rules'):
+        print(f"Not compared, the shadow engine cannot evaluate them: "
+              f"{', '.join(item['rule'] for item in summary['skipped_rules'])}")
+    
+    if not summary['rules']:
+        return
+    print(f"\n{'Rule':<45} {'Docs':>6} {'Serving only':>13} {'Shadow only':>12} {'Message':>8}")
+    for rule in summary['rules'][:top]:
+        print(f"{rule['rule']:<45} {rule['documents']:>6} {rule['only_primary']:>13} "
+              f"{rule['only_shadow']:>12} {rule['message_mismatches']:>8}")
+
+
+def main() -> int:
+    """Read the shadow store and print its summary."""
+    parser = argparse.ArgumentParser(description="Summarize shadow comparisons of the rule engines")
+    parser.add_argument('--store', default=Settings.from_env().shadow_store_path, help="Shadow results file")
+    parser.add_argument('--limit', type=int, default=None, help="Only summarize the most recent N comparisons")
+    parser.add_argument('--top', type=int, default=20, help="Rules with the most disagreements to list")
+    parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    args = parser.parse_args()
+    
+    results = ShadowStore(args.store).read(args.limit)
+    if not results:
+        print(f"No shadow results in {args.store}")
+        return 1
+    
+    summary = summarize_results(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""Tests for the fuzzy index of builder affiliations and the captive services rule."""
+
+from models.core import Rule
+from models.document import ClosingDisclosureLineItem, DocumentSection, ParsedDocument
+from rules.affiliates import AffiliateIndex, load_affiliate_index, normalize_company
+from rules.compound_rules import CrossReferencePatternHandler
+from rules.matcher import DocumentMatcher
+from services.analysis import RuleEngineService
+
+
+CAPTIVE_RULE = {
+    'name': 'builder_captive_services',
+    'type': 'cross_reference_pattern',
+    'primary_pattern': "Seller.*?([A-Z][A-Z\\s]+(?:HOMES?|BUILDER?|CONSTRUCTION))",
+    'secondary_patterns': [
+        {'pattern': "Lender.*?([A-Z][A-Z\\s]+(?:MORTGAGE|LENDING|FINANCIAL))", 'service': 'mortgage'},
+        {'pattern': "Title.*?([A-Z][A-Z\\s]+(?:TITLE|ESCROW))", 'service': 'title'}
+    ],
+    'match_vendors': True,
+    'message': "{primary} controls {services}"
+}
+
+
+def test_company_names_are_normalized():
+    """Case, punctuation, initials and legal suffixes are ignored."""
+    assert normalize_company("D.R. Horton, Inc.") == "DR HORTON"
+    assert normalize_company("M/I Homes LLC") == "MI HOMES"
+    assert normalize_company("Toll Brothers & Co") == "TOLL BROTHERS AND"
+
+
+def test_lookup_finds_the_group_of_a_known_company():
+    """Names containing a company's distinctive words, or close enough to it, match that company."""
+    index = load_affiliate_index()
+    assert len(index) > 0
+    
+    found = index.lookup("DHI MORTGAGE COMPANY LTD")
+    assert (found.company.group, found.company.role, found.score) == ("D.R. Horton", "mortgage", 1.0)
+    assert index.lookup("Eagle Home Mortgage of California").company.group == "Lennar"
+    
+    misspelled = index.lookup("Toll Brother Mortgage")
+    assert misspelled.company.group == "Toll Brothers"
+    assert 0.75 <= misspelled.score < 1.0
+
+
+def test_generic_and_unknown_names_do_not_match():
+    """Industry words alone never identify a company."""
+    index = load_affiliate_index()
+    assert index.lookup("First American Title") is None
+    assert index.lookup("Acme Mortgage") is None
+    assert index.lookup("Toll Mortgage") is None
+    assert index.lookup("") is None
+
+
+def test_index_is_built_from_groups():
+    """Each role of a group lists its companies; duplicate names are indexed once."""
+    index = AffiliateIndex.from_dict({'groups': [
+        {'name': "Acme", 'builder': ["Acme Homes"], 'mortgage': ["Acme Lending", "ACME LENDING LLC"]}
+    ]})
+    assert len(index) == 2
+    assert [company.role for company in index.groups["Acme"]] == ["builder", "mortgage"]
+    assert index.lookup("Acme Lending Inc").company.name == "Acme Lending"
+    assert load_affiliate_index("missing-affiliates.yaml") is None
+
+
+def test_captive_providers_of_the_sellers_group_are_flagged():
+    """A lender of the seller's group is flagged though their names share no word."""
+    handler = CrossReferencePatternHandler()
+    rule = Rule.from_dict(CAPTIVE_RULE)
+    text = "Seller LENNAR HOMES, Miami\nLender EAGLE HOME MORTGAGE\nTitle WESTMINSTER TITLE"
+    
+    flags = handler.process_rule(rule, text, matcher=DocumentMatcher(text))
+    assert [flag.message for flag in flags] == ["LENNAR HOMES controls mortgage"]
+    
+    independent = "Seller LENNAR HOMES, Miami\nLender ACME MORTGAGE\nTitle WESTMINSTER TITLE"
+    assert handler.process_rule(rule, independent, matcher=DocumentMatcher(independent)) == []
+
+
+def test_vendors_of_one_group_are_flagged_without_a_seller():
+    """Line item vendors providing two services of one known group are captive without a seller match."""
+    handler = CrossReferencePatternHandler()
+    rule = Rule.from_dict(CAPTIVE_RULE)
+    document = ParsedDocument(filename="cd.pdf", page_count=5, line_items=[
+        ClosingDisclosureLineItem("A.01", 2, DocumentSection.ORIGINATION_CHARGES, "Origination Fee",
+                                  vendor="DHI Mortgage Company, Ltd."),
+        ClosingDisclosureLineItem("C.01", 2, DocumentSection.SERVICES_SHOPPED, "Title - Settlement Fee",
+                                  vendor="DHI Title of Texas")
+    ])
+    text = "Closing Disclosure"
+    
+    flags = handler.process_rule(rule, text, matcher=DocumentMatcher(text, document=document))
+    assert [flag.message for flag in flags] == ["D.R. Horton controls mortgage, title"]
+
+def test_vendor_matching_does_not_require_a_parsed_document(disclosure):
+    """Uploads stay text-only; vendors add the captive lender only when the disclosure was parsed anyway."""
+    layout, document = disclosure
+    engine = RuleEngineService("rules-config.yaml")
+    assert not engine.requires_document()
+    
+    def captive_messages(**inputs):
+        return [flag.message for flag in engine.analyze(layout.text, layout=layout, **inputs).flags
+                if flag.rule == "builder_captive_services"]
+    
+    assert captive_messages() == [
+        "⚠️ BUILDER CAPTIVE SERVICES: LGI HOMES controls insurance - seek independent pricing comparison"
+    ]
+    assert captive_messages(document=document) == [
+        "⚠️ BUILDER CAPTIVE SERVICES: LGI HOMES controls insurance, mortgage - seek independent pricing comparison"
+    ]
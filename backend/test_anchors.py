@@ -0,0 +1,80 @@
+"""Tests for the literal anchors used to skip patterns that cannot match a document."""
+
+import re
+
+from rules.anchors import extract_anchors, find_literals, clauses_satisfied, normalize_text
+from rules.matcher import DocumentMatcher
+from services.analysis import RuleEngineService
+
+
+SAMPLE_TEXTS = [
+    """
+Closing Disclosure
+Loan Terms Loan Amount $450,000.00
+Interest Rate 7.25%
+Annual Percentage Rate (APR) 7.9%
+Total Interest Percentage (TIP) 135.5%
+Total Closing Costs: $25,000.00
+Origination Fee: $8,000.00
+Wire Transfer: $15,000.00
+Owner's Title Insurance Borrower $2,500.00
+Survey Borrower $450.00
+Loan Type Conventional FHA UP FRONT MIP $3,000.00
+Seller PULTE HOMES OF TEXAS
+Lender PULTE MORTGAGE LLC
+""",
+    "Closing Disclosure\nTitle insurance included. home inspection done. Mortgage Insurance Premium (12 mo)\n",
+    "CLOSING DISCLOSURE\nWIRE TRANSFER: $9,999.99\nLOAN AMOUNT $200,000\n",
+    "nothing relevant here at all"
+]
+
+
+def test_required_literals_are_extracted():
+    """Every match must contain the pattern's literal prefix."""
+    assert extract_anchors("Loan Amount.*?\\$([0-9,]+)", re.IGNORECASE) == [frozenset({"loan amount"})]
+
+
+def test_alternatives_form_one_clause():
+    """Alternatives are kept as one clause, with literals implied by a shorter one dropped."""
+    clauses = extract_anchors("(?:Total Closing Costs|Closing Costs).*?\\$", re.IGNORECASE)
+    assert clauses == [frozenset({"closing costs"})]
+    
+    clauses = extract_anchors("(?:Wire Transfer|Courier Fee)", re.IGNORECASE)
+    assert clauses == [frozenset({"wire transfer", "courier fee"})]
+
+
+def test_patterns_without_required_literals_are_not_prefiltered():
+    """Patterns whose matches need no literal, or invalid ones, cannot be skipped."""
+    assert extract_anchors("[0-9]+%") == []
+    assert extract_anchors("(?:Fee)?[0-9]+") == []
+    assert extract_anchors("(unclosed") == []
+
+
+def test_literals_are_found_case_insensitively():
+    """Literals are looked up in casefolded text."""
+    present = find_literals(normalize_text("WIRE TRANSFER: $9,999"), ["wire transfer", "loan amount"])
+    assert present == {"wire transfer"}
+    assert clauses_satisfied([frozenset({"wire transfer", "loan amount"})], present)
+    assert not clauses_satisfied([frozenset({"loan amount"})], present)
+
+
+def test_skipped_patterns_never_match():
+    """A pattern the anchors rule out has no match in the document."""
+    plan = RuleEngineService("rules-config.yaml").get_plan()
+    for text in SAMPLE_TEXTS:
+        matcher = DocumentMatcher(text, plan.patterns, plan.anchors)
+        for key, compiled in plan.patterns.items():
+            if not matcher.can_match(*key):
+                assert compiled.search(text) is None, key
+
+
+def test_flags_match_an_analysis_without_anchors():
+    """Skipping patterns by their anchors does not change any flag."""
+    engine = RuleEngineService("rules-config.yaml")
+    unfiltered = RuleEngineService("rules-config.yaml")
+    unfiltered.get_plan().anchors.clear()
+    
+    for text in SAMPLE_TEXTS:
+        result = engine.analyze(text, all_matches=True)
+        assert result.flags == unfiltered.analyze(text, all_matches=True).flags
+    assert engine.analyze(SAMPLE_TEXTS[-1]).stats['prefiltered'] > 0
\ No newline at end of file
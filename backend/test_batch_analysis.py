@@ -0,0 +1,91 @@
+"""Tests for batch rule evaluation with and without NumPy."""
+
+import pytest
+
+from services.analysis import RuleEngineService
+from services.analysis import batch_analysis
+
+
+TEXTS = [
+    """Closing Disclosure
+Loan Amount $450,000.00
+Interest Rate 7.25%
+Annual Percentage Rate (APR) 7.61%
+Total Closing Costs: $25,000.00
+Finance Charge $700,000.00
+Wire Transfer: $15,000.00""",
+    """Closing Disclosure
+Loan Amount $200,000.00
+Interest Rate 5.50%
+Total Closing Costs: $4,000.00
+Survey Borrower $450.00""",
+    """Loan Estimate
+Loan Amount $0.00
+Finance Charge $1,000.00
+Buyer waived the home inspection""",
+    ""
+]
+
+
+def engine_flags(engine: RuleEngineService, text: str) -> set:
+    return {flag.rule for flag in engine.analyze(text).flags}
+
+
+def test_batch_flags_the_rules_analyze_flags():
+    """Each document's row holds the rules a single-document analysis flags."""
+    engine = RuleEngineService("rules-config.yaml")
+    result = engine.analyze_batch(TEXTS, workers=1)
+    
+    assert result.stats['documents'] == len(TEXTS)
+    assert result.stats['vectorized_rules'] > 0
+    for document, text in enumerate(TEXTS):
+        assert set(result.flagged_rules(document)) == engine_flags(engine, text)
+
+
+def test_python_fallback_matches_numpy(monkeypatch, capsys):
+    """Without NumPy the comparisons run in pure Python with the same result."""
+    pytest.importorskip("numpy")
+    engine = RuleEngineService("rules-config.yaml")
+    vectorized = engine.analyze_batch(TEXTS, workers=1)
+    
+    monkeypatch.setattr(batch_analysis, "NUMPY_AVAILABLE", False)
+    monkeypatch.setattr(batch_analysis, "_fallback_warned", False)
+    fallback = engine.analyze_batch(TEXTS, workers=1)
+    
+    assert "NumPy is not installed" in capsys.readouterr().out
+    assert fallback.stats['numpy'] is False
+    assert fallback.to_dict()['flags'] == vectorized.flags.tolist()
+
+
+def test_worker_processes_match_in_process_extraction():
+    """Extracting captures in a process pool gives the same flags as extracting them in-process."""
+    engine = RuleEngineService("rules-config.yaml")
+    texts = TEXTS * (batch_analysis.MIN_POOL_BATCH // len(TEXTS) + 1)
+    
+    pooled = engine.analyze_batch(texts, workers=2)
+    in_process = engine.analyze_batch(texts, workers=1)
+    assert pooled.to_dict()['flags'] == in_process.to_dict()['flags']
+
+BOUNDARY_RULES = """
+rules:
+  - name: "fees_over_seven_percent"
+    type: "calculated_percentage"
+    numerator_pattern: "Fees \\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    denominator_pattern: "Loan Amount \\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 7.0
+    operator: ">"
+    message: "Fees are {percentage}% of the loan"
+"""
+
+
+def test_percentages_at_the_threshold_compare_alike(engine_for, monkeypatch):
+    """NumPy, the pure-Python fallback and a single analysis round 7/100 of a loan alike at a 7% threshold."""
+    pytest.importorskip("numpy")
+    engine = engine_for(BOUNDARY_RULES)
+    texts = ["Fees $7.00\nLoan Amount $100.00", "Fees $6.00\nLoan Amount $100.00"]
+    expected = [[bool(engine.analyze(text).flags)] for text in texts]
+    assert expected == [[True], [False]]  # 7 / 100 * 100 is 7.000000000000001
+    
+    assert engine.analyze_batch(texts, workers=1).flags.tolist() == expected
+    monkeypatch.setattr(batch_analysis, "NUMPY_AVAILABLE", False)
+    assert engine.analyze_batch(texts, workers=1).to_dict()['flags'] == expected
@@ -23,7 +23,7 @@ def test_rule_loading():
     
     # Test new engine
     try:
-        from services.rule_engine import RuleEngineService
+        from services.analysis import RuleEngineService
         new_engine = RuleEngineService("rules-config.yaml")
         summary = new_engine.get_rules_summary()
         new_rules_count = summary['enabled_rules']
@@ -68,7 +68,7 @@ def test_text_analysis():
     # Test new engine
     new_flags = []
     try:
-        from services.rule_engine import RuleEngineService
+        from services.analysis import RuleEngineService
         new_engine = RuleEngineService("rules-config.yaml")
         new_flags = new_engine.analyze_text(sample_text)
         print(f"New engine found {len(new_flags)} flags")
@@ -116,8 +116,8 @@ def test_scoring():
     
     # Test new scoring
     try:
-        from models.flag import Flag
-        from services.scoring_service import ScoringService
+        from models.core import Flag
+        from services.analysis import ScoringService
         
         # Convert to new flag format
         new_flags = [
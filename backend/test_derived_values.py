@@ -0,0 +1,147 @@
+"""Tests for named values and the rules that read them."""
+
+from rules.derived_values import ValueGraph, parse_value_definition
+from rules.matcher import DocumentMatcher
+from services.analysis import RuleEngineService
+
+
+VALUES = {
+    'interest_rate': {'pattern': "Interest Rate\\s+([0-9]+(?:\\.[0-9]+)?)%"},
+    'apr': {'label': "Annual Percentage Rate (APR)", 'value_type': 'percent'},
+    'apr_spread': "apr - interest_rate",
+    'loan_amount': {'lookup': "loan amount"},
+    'finance_charge': {'lookup': "finance charge"},
+    'finance_charge_ratio': "finance_charge / loan_amount * 100",
+    'largest_fee': "max(finance_charge, loan_amount)",
+    'unused': "1 / 0"
+}
+
+RULES = """
+values:
+  interest_rate:
+    pattern: "Interest Rate\\\\s+([0-9]+(?:\\\\.[0-9]+)?)%"
+  apr:
+    pattern: "Annual Percentage Rate \\\\(APR\\\\).*?([0-9]+(?:\\\\.[0-9]+)?)%"
+  apr_spread: "apr - interest_rate"
+  closing_costs:
+    pattern: "Total Closing Costs.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+
+rules:
+  - name: "apr_spread"
+    type: "value_threshold"
+    value: "apr_spread"
+    threshold: 0.25
+    operator: ">"
+    message: "APR ({apr}%) is {value} points above the rate ({interest_rate}%)"
+  
+  - name: "expensive_loan"
+    type: "compound_rule"
+    conditions:
+      - value: "interest_rate"
+        threshold: 6.5
+        operator: ">"
+        value_name: "rate"
+      - value: "closing_costs"
+        threshold: 15000
+        operator: ">"
+        value_name: "fees"
+    message: "Rate {rate}% and fees ${fees}"
+"""
+
+def test_definitions_are_parsed_and_checked():
+    """Strings are expressions over other values; anything beyond arithmetic is rejected."""
+    definition, errors = parse_value_definition('apr_spread', "apr - interest_rate")
+    assert errors == []
+    assert definition.source == 'expression'
+    assert definition.dependencies == ('apr', 'interest_rate')
+    
+    assert "unsupported syntax" in parse_value_definition('power', "apr ** 2")[1][0]
+    assert "unsupported syntax" in parse_value_definition('call', "__import__('os')")[1][0]
+    assert "takes at least 2" in parse_value_definition('largest', "max(apr)")[1][0]
+    assert "exactly one of" in parse_value_definition('both', {'pattern': "x", 'lookup': "y"})[1][0]
+    assert "Invalid value_type" in parse_value_definition('rate', {'label': "Rate", 'value_type': 'date'})[1][0]
+
+
+def test_only_needed_values_are_resolved_in_dependency_order():
+    """A value comes after everything it is computed from, and unneeded values are left out."""
+    graph = ValueGraph.parse(VALUES, ['apr_spread', 'finance_charge_ratio'])
+    assert graph.errors == []
+    assert graph.dependencies('apr_spread') == ('apr', 'interest_rate', 'apr_spread')
+    assert graph.dependencies('finance_charge_ratio') == ('finance_charge', 'loan_amount', 'finance_charge_ratio')
+    assert 'unused' not in graph.definitions
+    assert graph.requires_document
+
+
+def test_cycles_and_unknown_values_are_errors():
+    """Values depending on each other, or on undefined values, cannot be computed."""
+    graph = ValueGraph.parse({'a': "b + 1", 'b': "a * 2", 'c': "missing + 1"}, ['a', 'c'])
+    assert graph.errors == [
+        "Values depend on each other in a cycle: a -> b -> a",
+        "Unknown value 'missing' referenced by value 'c'"
+    ]
+    assert 'a' not in graph
+    assert 'c' not in graph
+
+
+def test_values_are_computed_once_per_document(closing_text):
+    """Each value is computed at most once, and missing operands or division by zero give None."""
+    graph = ValueGraph.parse(VALUES, ['apr_spread', 'finance_charge_ratio', 'largest_fee'])
+    matcher = DocumentMatcher(closing_text, value_graph=graph)
+    
+    assert round(matcher.named_value('apr_spread'), 2) == 0.36
+    assert round(matcher.named_value('finance_charge_ratio'), 2) == 155.56
+    assert matcher.named_value('largest_fee') == 700000.0
+    searches = matcher.stats['searches']
+    matcher.named_value('apr_spread')
+    assert matcher.stats['searches'] == searches
+    
+    empty = DocumentMatcher("Loan Amount $0.00\nFinance Charge $1,000.00", value_graph=graph)
+    assert empty.named_value('apr_spread') is None
+    assert empty.named_value('finance_charge_ratio') is None
+
+
+def test_value_rules_read_named_values(engine_for, closing_text):
+    """Threshold rules and compound conditions compare named values and show them in their messages."""
+    engine = engine_for(RULES)
+    assert engine.get_plan().errors == []
+    
+    messages = {flag.rule: flag.message for flag in engine.analyze_text(closing_text)}
+    assert messages == {
+        "apr_spread": "APR (7.61%) is 0.36 points above the rate (7.25%)",
+        "expensive_loan": "Rate 7.25% and fees $25000.0"
+    }
+    assert [flag.rule for flag in engine.analyze_text(closing_text.replace("$25,000.00", "$5,000.00"))] == ["apr_spread"]
+
+
+def test_redefining_a_value_changes_the_rules_reading_it(engine_for):
+    """A rule's hash covers the values it reads, so re-scoring re-runs it when one is redefined."""
+    hashes = engine_for(RULES).get_plan().rule_hashes
+    edited = engine_for(RULES.replace("(?:\\\\.[0-9]{2})?", "(?:\\\\.[0-9]{1,2})?")).get_plan().rule_hashes
+    
+    changed = {key for key in hashes if hashes[key] != edited[key]}
+    assert len(changed) == 1
+    assert "expensive_loan" in next(iter(changed))
+
+
+def test_undefined_values_are_compile_errors(engine_for):
+    """A rule reading a value the configuration does not define is reported against the rule."""
+    engine = engine_for(RULES.replace('value: "apr_spread"', 'value: "apr_gap"'))
+    assert engine.get_plan().errors == [
+        "Value 'apr_gap' in rule 'apr_spread' is not defined or cannot be computed"
+    ]
+
+# Rules the baseline configuration flags on the sample Closing Disclosure, in rule order
+SAMPLE_FLAGS = [
+    "missing_home_inspection", "missing_buyer_representation", "builder_captive_services",
+    "zero_closing_costs_deception", "fha_mip_on_conventional_loan", "demand_feature_on_purchase_loan",
+    "missing_mortgage_insurance_escrow_details", "buyer_paying_survey_fee", "buyer_paying_settlement_fee",
+    "buyer_paying_notary_fee", "buyer_paying_courier_fee"
+]
+
+
+def test_configured_rules_flag_the_sample_disclosure_as_before(disclosure):
+    """The rate, APR and finance charge rules stay as quiet as the baseline ones on the real disclosure."""
+    layout, _ = disclosure
+    engine = RuleEngineService("rules-config.yaml")
+    assert [flag.rule for flag in engine.analyze(layout.text, layout=layout).flags] == SAMPLE_FLAGS
+    assert [flag.rule for flag in engine.analyze_text(layout.text)] == SAMPLE_FLAGS
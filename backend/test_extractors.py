@@ -0,0 +1,45 @@
+"""Tests for the pluggable PDF text extraction backends."""
+
+import pytest
+
+from parser import extract_pages
+from services.parsing.core import extractors
+from services.parsing.core.extractors import EXTRACTORS, PdfplumberExtractor, get_extractor
+
+
+@pytest.mark.parametrize("name", sorted(EXTRACTORS))
+def test_backends_read_every_page(name, pdf_path, pdf_data):
+    """Every backend reads the same pages, from a path or from the file content."""
+    extractor = get_extractor(name)
+    if extractor.name != name:
+        pytest.skip(f"{name} is not installed")
+    
+    pages = extractor.extract_pages(pdf_data)
+    assert len(pages) == extractor.page_count(pdf_data) == extractor.page_count(pdf_path) == 5
+    assert extractor.extract_pages(pdf_path) == pages
+    text = "\n".join(pages)
+    for heading in ("Closing Disclosure", "Loan Terms", "Loan Costs", "Loan Calculations"):
+        assert heading in text
+
+
+def test_pdfplumber_matches_the_default_extraction(pdf_data):
+    """The layout backend returns what parser.extract_pages does."""
+    assert PdfplumberExtractor().extract_pages(pdf_data) == extract_pages(pdf_data)
+    assert PdfplumberExtractor.layout
+    assert not extractors.PdfiumExtractor.layout
+
+
+def test_backends_are_looked_up_by_name():
+    """Names are case-insensitive, instances pass through and unknown names are errors."""
+    assert isinstance(get_extractor(" PDFPlumber "), PdfplumberExtractor)
+    extractor = PdfplumberExtractor()
+    assert get_extractor(extractor) is extractor
+    with pytest.raises(ValueError, match="Unknown text extractor 'pdfminer'"):
+        get_extractor("pdfminer")
+
+
+def test_missing_backends_fall_back_to_pdfplumber(monkeypatch, capsys):
+    """A backend whose library is not installed is replaced by pdfplumber, with a warning."""
+    monkeypatch.setattr(extractors, "PDFIUM_AVAILABLE", False)
+    assert isinstance(get_extractor("pdfium"), PdfplumberExtractor)
+    assert "Text extractor 'pdfium' is not installed" in capsys.readouterr().out
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Tests for the rules that read fields and line items of a parsed closing disclosure."""
+
+from models.document import (
+    ClosingDisclosureLineItem, DocumentSection, LoanSummary, ParsedDocument, PaymentResponsibility
+)
+
+
+RULES = """
+rules:
+  - name: "high_rate"
+    type: "field_threshold"
+    field: "interest_rate"
+    threshold: 7.0
+    message: "Interest rate of {value}% is high"
+  
+  - name: "costly_closing"
+    type: "field_ratio"
+    numerator_field: "total_closing_costs"
+    denominator_field: "loan_amount"
+    threshold: 5
+    operator: ">="
+    message: "Closing costs are {percentage}% of the loan"
+  
+  - name: "borrower_paid_survey"
+    type: "line_item_match"
+    description_pattern: "survey"
+    scope: ["other"]
+    paid_by: "borrower"
+    threshold: 400
+    message: "{description} charged to the borrower: ${amount}"
+"""
+
+
+def parsed_document(interest_rate=7.25, total_closing_costs=25000.0, loan_amount=450000.0,
+                    survey_amount=450.0) -> ParsedDocument:
+    """A parsed disclosure with a loan summary and a survey in section H."""
+    return ParsedDocument(
+        filename="cd.pdf",
+        page_count=5,
+        loan_summary=LoanSummary(loan_amount=loan_amount, interest_rate=interest_rate,
+                                 total_closing_costs=total_closing_costs),
+        line_items=[
+            ClosingDisclosureLineItem("C.01", 2, DocumentSection.SERVICES_SHOPPED, "Survey Fee",
+                                      vendor="Acme Surveying", amount=600.0),
+            ClosingDisclosureLineItem("H.01", 2, DocumentSection.OTHER, "Survey Fee",
+                                      vendor="Acme Surveying", amount=survey_amount),
+            ClosingDisclosureLineItem("H.02", 2, DocumentSection.OTHER, "Survey Fee",
+                                      amount=900.0, paid_by=PaymentResponsibility.SELLER),
+            ClosingDisclosureLineItem("H.00", 2, DocumentSection.OTHER, "Total Other Costs", amount=1350.0)
+        ]
+    )
+
+
+def flag_messages(engine, document: ParsedDocument) -> dict:
+    return {flag.rule: flag.message for flag in engine.analyze("Closing Disclosure", document=document).flags}
+
+
+def test_field_rules_compare_parsed_fields(engine_for):
+    """Thresholds and ratios are evaluated on the loan summary, and line items on their section, payer and amount."""
+    engine = engine_for(RULES)
+    assert engine.get_plan().errors == []
+    assert engine.requires_document()
+    
+    assert flag_messages(engine, parsed_document()) == {
+        "high_rate": "Interest rate of 7.25% is high",
+        "costly_closing": "Closing costs are 5.56% of the loan",
+        "borrower_paid_survey": "Survey Fee charged to the borrower: $450.0"
+    }
+
+
+def test_field_rules_below_their_threshold_do_not_flag(engine_for):
+    """A rate, ratio or line item amount short of the threshold gives no flag."""
+    engine = engine_for(RULES)
+    document = parsed_document(interest_rate=6.5, total_closing_costs=20000.0, survey_amount=350.0)
+    assert flag_messages(engine, document) == {}
+
+
+def test_missing_fields_and_zero_denominators_do_not_flag(engine_for):
+    """Unparsed fields, a zero loan amount and a missing parsed document are skipped rather than compared."""
+    engine = engine_for(RULES)
+    document = parsed_document(interest_rate=None, loan_amount=0.0)
+    assert flag_messages(engine, document) == {"borrower_paid_survey": "Survey Fee charged to the borrower: $450.0"}
+    
+    document.loan_summary = None
+    assert set(flag_messages(engine, document)) == {"borrower_paid_survey"}
+    assert engine.analyze_text("Closing Disclosure") == []
+
+
+def test_line_items_match_by_name_and_amount(engine_for):
+    """Only items whose description matches are flagged, and only when their amount meets the threshold."""
+    engine = engine_for(RULES.replace('description_pattern: "survey"', 'description_pattern: "pest"'))
+    assert flag_messages(engine, parsed_document()).get("borrower_paid_survey") is None
+    
+    engine = engine_for(RULES.replace("threshold: 400", "threshold: 500"))
+    assert "borrower_paid_survey" not in flag_messages(engine, parsed_document())
+
+
+def test_invalid_fields_are_compile_errors(engine_for):
+    """Fields LoanSummary does not have and unknown payers are reported when the rules are compiled."""
+    engine = engine_for(RULES.replace('field: "interest_rate"', 'field: "rate"').replace('"borrower"', '"lender"'))
+    assert engine.get_plan().errors == [
+        "Unknown field 'rate' in rule 'high_rate'",
+        "Invalid paid_by 'lender' in rule 'borrower_paid_survey'"
+    ]
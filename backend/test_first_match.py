@@ -0,0 +1,80 @@
+"""Tests for rule handlers stopping at the first qualifying match."""
+
+from models.core import Rule
+from rules.matcher import DocumentMatcher
+from rules.numeric_rules import NumericThresholdHandler
+from rules.regex_rules import RegexAmountHandler
+from services.analysis import RuleEngineService
+
+
+SAMPLE_TEXT = """
+Closing Disclosure
+Loan Terms Loan Amount $450,000.00
+Interest Rate 7.25%
+Total Closing Costs: $25,000.00
+Wire Transfer: $5,000.00
+Wire Transfer: $15,000.00
+Wire Transfer: $25,000.00
+Owner's Title Insurance Borrower $2,500.00
+Survey Borrower $450.00
+Seller PULTE HOMES OF TEXAS
+Lender PULTE MORTGAGE LLC
+"""
+
+WIRE_RULE = {
+    'name': 'large_wire',
+    'type': 'regex_amount',
+    'pattern': 'Wire Transfer.*?\\$([0-9,]+(?:\\.[0-9]{2})?)',
+    'threshold': 10000,
+    'operator': '>',
+    'message': 'Large wire transfer: ${value}'
+}
+
+PERCENTAGE_RULE = {
+    'name': 'wire_share',
+    'type': 'calculated_percentage',
+    'numerator_pattern': 'Wire Transfer.*?\\$([0-9,]+(?:\\.[0-9]{2})?)',
+    'denominator_pattern': 'Loan Amount.*?\\$([0-9,]+(?:\\.[0-9]{2})?)',
+    'threshold': 1.0,
+    'operator': '>',
+    'message': 'Wire transfer is {percentage}% of the loan'
+}
+
+
+def test_first_flag_is_the_first_of_all_flags():
+    """Stopping early yields the flag a full scan reports first."""
+    handler = RegexAmountHandler()
+    rule = Rule.from_dict(WIRE_RULE)
+    
+    all_flags = handler.process_rule(rule, SAMPLE_TEXT, matcher=DocumentMatcher(SAMPLE_TEXT))
+    assert [flag.message for flag in all_flags] == ["Large wire transfer: $15000.0", "Large wire transfer: $25000.0"]
+    
+    matcher = DocumentMatcher(SAMPLE_TEXT)
+    assert handler.first_flag(rule, SAMPLE_TEXT, matcher=matcher) == all_flags[0]
+    # The third wire transfer is never scanned
+    assert matcher.stats['matches_scanned'] == 2
+
+
+def test_calculated_percentage_yields_lazily():
+    """The percentage check is a generator that stops at its first flag."""
+    handler = NumericThresholdHandler()
+    rule = Rule.from_dict(PERCENTAGE_RULE)
+    flags = handler.iter_flags(rule, SAMPLE_TEXT, matcher=DocumentMatcher(SAMPLE_TEXT))
+    
+    first = next(flags)
+    assert first.message == "Wire transfer is 1.11% of the loan"
+    assert first == handler.process_rule(rule, SAMPLE_TEXT)[0]
+
+
+def test_engine_flags_equal_the_first_flag_of_each_rule():
+    """The default analysis keeps each rule's first flag of an all-matches analysis."""
+    engine = RuleEngineService("rules-config.yaml")
+    first_flags = engine.analyze(SAMPLE_TEXT).flags
+    all_flags = engine.analyze(SAMPLE_TEXT, all_matches=True).flags
+    
+    expected = []
+    for flag in all_flags:
+        if flag.rule not in [seen.rule for seen in expected]:
+            expected.append(flag)
+    assert first_flags == expected
+    assert len(all_flags) >= len(first_flags)
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Tests for the label-to-value map and the rules that look values up in it."""
+
+from models.core import Rule
+from models.document import KeyValueMap, LoanSummary, ParsedDocument, ValueIndex, ValueKind
+from models.document.key_values import normalize_label
+from rules.matcher import DocumentMatcher
+from rules.numeric_rules import NumericThresholdHandler
+
+
+SAMPLE_TEXT = """Closing Disclosure
+Loan Amount $450,000.00
+Interest Rate 7.25%
+Purchase Price $500,000.00
+01 Appraisal Fee to ABC Appraisals $650.00
+Finance Charge $700,000.00"""
+
+
+def test_labels_are_normalized():
+    """Case, line numbers, parentheticals and punctuation are ignored."""
+    assert normalize_label("01 Appraisal Fee") == "appraisal fee"
+    assert normalize_label("Annual Percentage Rate (APR)") == "annual percentage rate"
+    assert KeyValueMap.resolve("Purchase Price") == "sale price"
+    assert KeyValueMap.resolve("APR") == "annual percentage rate"
+
+
+def test_standard_labels_are_read_from_the_text():
+    """Each standard label maps to the value of its kind after it on the same line."""
+    key_values = KeyValueMap.build(ValueIndex(SAMPLE_TEXT))
+    
+    assert key_values.first("loan amount").value == 450000.0
+    assert key_values.first("Interest Rate").kind == ValueKind.PERCENT
+    assert key_values.first("sale price").value == 500000.0
+    assert key_values.first("appraisal fee to abc appraisals").value == 650.0
+    assert "cash to close" not in key_values
+
+
+def test_layout_values_come_first():
+    """Values the page parsers located come before values found in the text."""
+    document = ParsedDocument(filename="cd.pdf", page_count=5,
+                              loan_summary=LoanSummary(loan_amount=455000.0))
+    key_values = KeyValueMap.build(ValueIndex(SAMPLE_TEXT), document)
+    
+    assert [entry.value for entry in key_values.get("loan amount")] == [455000.0, 450000.0]
+    assert key_values.first("loan amount").start is None
+
+
+def test_layout_values_merge_with_the_same_value_in_the_text():
+    """A located value also printed in the text is one entry, with its text offsets."""
+    document = ParsedDocument(filename="cd.pdf", page_count=5,
+                              loan_summary=LoanSummary(loan_amount=450000.0))
+    key_values = KeyValueMap.build(ValueIndex(SAMPLE_TEXT, [(0, len(SAMPLE_TEXT))]), document)
+    
+    entries = key_values.get("loan amount")
+    assert len(entries) == 1
+    assert entries[0].start == SAMPLE_TEXT.index("$450,000.00")
+
+
+def test_lookup_rules_read_the_map():
+    """Threshold and percentage rules can look their values up by standard label."""
+    handler = NumericThresholdHandler()
+    threshold_rule = Rule.from_dict({
+        'name': 'large_loan',
+        'type': 'numeric_threshold',
+        'lookup': 'loan amount',
+        'threshold': 400000,
+        'operator': '>',
+        'message': 'Large loan: ${value}'
+    })
+    percentage_rule = Rule.from_dict({
+        'name': 'finance_charge_ratio',
+        'type': 'calculated_percentage',
+        'numerator_lookup': 'finance charge',
+        'denominator_lookup': 'loan amount',
+        'threshold': 100,
+        'operator': '>',
+        'message': 'Finance charge is {percentage}% of the loan'
+    })
+    matcher = DocumentMatcher(SAMPLE_TEXT)
+    
+    assert [flag.message for flag in handler.process_rule(threshold_rule, SAMPLE_TEXT, matcher=matcher)] == [
+        "Large loan: $450000.0"
+    ]
+    assert [flag.message for flag in handler.process_rule(percentage_rule, SAMPLE_TEXT, matcher=matcher)] == [
+        "Finance charge is 155.56% of the loan"
+    ]
+
+
+def test_lookup_with_a_pattern_is_a_compile_error(engine_for):
+    """A rule reads its value one way only."""
+    engine = engine_for("""
+rules:
+  - name: "large_loan"
+    type: "numeric_threshold"
+    lookup: "loan amount"
+    pattern: "Loan Amount.*?\\\\$([0-9,]+)"
+    threshold: 400000
+    message: "Large loan"
+""")
+    errors = engine.get_plan().errors
+    assert errors == ["Rule 'large_loan' sets 'lookup' with 'pattern' or 'label'; use one of them"]
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Tests for the per-document matcher that shares regex matches across rules."""
+
+import re
+
+from rules.anchors import extract_anchors
+from rules.matcher import DocumentMatcher
+
+
+SAMPLE_TEXT = """
+Closing Disclosure
+Origination Fee: $8,000.00
+Wire Transfer: $15,000.00
+Courier Fee: $75.00
+Wire Transfer: $2,500.00
+"""
+
+AMOUNT_PATTERN = "Wire Transfer.*?\\$([0-9,]+(?:\\.[0-9]{2})?)"
+
+
+def test_matches_equal_the_re_module():
+    """search and finditer find what re.search and re.finditer do."""
+    matcher = DocumentMatcher(SAMPLE_TEXT)
+    expected = [match.span() for match in re.finditer(AMOUNT_PATTERN, SAMPLE_TEXT, re.IGNORECASE)]
+    
+    assert matcher.search(AMOUNT_PATTERN, re.IGNORECASE).span() == expected[0]
+    assert [match.span() for match in matcher.finditer(AMOUNT_PATTERN, re.IGNORECASE)] == expected
+    assert matcher.search("Seller Credit") is None
+
+
+def test_rules_share_one_search_per_pattern():
+    """A pattern searched again, by the same or another rule, reuses the first scan."""
+    matcher = DocumentMatcher(SAMPLE_TEXT)
+    first = matcher.search(AMOUNT_PATTERN, re.IGNORECASE)
+    
+    assert matcher.search(AMOUNT_PATTERN, re.IGNORECASE) is first
+    assert matcher.stats['cache_misses'] == 1
+    assert matcher.stats['cache_hits'] == 1
+    
+    # The same pattern with other flags is a different search
+    matcher.search(AMOUNT_PATTERN)
+    assert matcher.stats['cache_misses'] == 2
+
+
+def test_matches_are_scanned_only_as_far_as_needed():
+    """The first match does not scan the rest of the document."""
+    matcher = DocumentMatcher(SAMPLE_TEXT)
+    matcher.search(AMOUNT_PATTERN, re.IGNORECASE)
+    assert matcher.stats['matches_scanned'] == 1
+    
+    assert len(list(matcher.finditer(AMOUNT_PATTERN, re.IGNORECASE))) == 2
+    assert matcher.stats['matches_scanned'] == 2
+
+
+def test_plan_patterns_and_anchors_are_used():
+    """Pre-compiled patterns are reused and patterns missing their anchors are not searched."""
+    key = ("Seller Credit.*?\\$([0-9,]+)", re.IGNORECASE)
+    compiled = re.compile(*key)
+    matcher = DocumentMatcher(SAMPLE_TEXT, {key: compiled}, {key: extract_anchors(*key)})
+    
+    assert matcher.compile(*key) is compiled
+    assert not matcher.can_match(*key)
+    assert matcher.search(*key) is None
+    assert matcher.stats['prefiltered'] == 1
\ No newline at end of file
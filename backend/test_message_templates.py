@@ -0,0 +1,99 @@
+"""Tests for rule severities and message templates resolved when the rules are compiled."""
+
+from models.core import FlagSeverity, Rule, compile_template
+from rules.regex_rules import RegexAmountHandler
+
+
+RULES = """
+values:
+  interest_rate:
+    pattern: "Interest Rate\\\\s+([0-9]+(?:\\\\.[0-9]+)?)%"
+  apr:
+    pattern: "Annual Percentage Rate \\\\(APR\\\\).*?([0-9]+(?:\\\\.[0-9]+)?)%"
+  apr_spread: "apr - interest_rate"
+
+rules:
+  - name: "declared_low"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    severity: "low"
+    message: "🚨 Large wire transfer: ${value}"
+  
+  - name: "declared_upper_case"
+    type: "regex_presence"
+    pattern: "home inspection"
+    severity: "HIGH"
+    message: "Home inspection waived"
+  
+  - name: "inferred_medium"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    message: "⚠️ Survey charged to the borrower (${1})"
+  
+  - name: "apr_spread"
+    type: "value_threshold"
+    value: "apr_spread"
+    threshold: 0.25
+    message: "APR ({apr}%) is {value} points above the rate ({interest_rate}%) for {borrower}"
+"""
+
+
+def test_declared_severity_wins_over_keywords(engine_for, closing_text):
+    """A severity set in the YAML is used whatever the message says; without one it is inferred from keywords."""
+    engine = engine_for(RULES)
+    assert engine.get_plan().errors == []
+    
+    severities = {flag.rule: flag.severity for flag in engine.analyze_text(closing_text)}
+    assert severities == {
+        "declared_low": FlagSeverity.LOW,
+        "declared_upper_case": FlagSeverity.HIGH,
+        "inferred_medium": FlagSeverity.MEDIUM,
+        "apr_spread": FlagSeverity.LOW
+    }
+
+
+def test_invalid_severity_is_a_plan_error(engine_for):
+    """An unknown severity is reported against the rule when the rules are compiled."""
+    engine = engine_for(RULES.replace('severity: "low"', 'severity: "urgent"'))
+    assert engine.get_plan().errors == [
+        "Invalid severity 'urgent' in rule 'declared_low': expected one of ['high', 'medium', 'low']"
+    ]
+
+
+def test_templates_fill_their_placeholders():
+    """{name} and ${name} slots are filled by name; placeholders without a value are kept as written."""
+    template = compile_template("Fee ${1} of {value}, paid by {payer}")
+    assert template.slots == ["1", "value", "payer"]
+    assert template.render(**{"1": "450.00"}, value=450.0) == "Fee $450.00 of 450.0, paid by {payer}"
+    assert template.render() == "Fee ${1} of {value}, paid by {payer}"
+    assert compile_template("No placeholders").render(value=1) == "No placeholders"
+
+
+def test_messages_render_values_and_named_values(engine_for, closing_text):
+    """Handlers fill {value} and the named values a rule reads; other placeholders stay as written."""
+    engine = engine_for(RULES)
+    plan = engine.get_plan()
+    assert all(compiled.rule.message_template is not None for compiled in plan.compiled_rules)
+    
+    messages = {flag.rule: flag.message for flag in engine.analyze_text(closing_text)}
+    assert messages["declared_low"] == "🚨 Large wire transfer: $15000.0"
+    assert messages["inferred_medium"] == "⚠️ Survey charged to the borrower (${1})"
+    assert messages["apr_spread"] == "APR (7.61%) is 0.36 points above the rate (7.25%) for {borrower}"
+
+
+def test_handlers_render_rules_compiled_without_a_plan():
+    """A rule used outside a plan has its message compiled and its severity inferred on the flag."""
+    rule = Rule.from_dict({
+        'name': 'large_wire',
+        'type': 'regex_amount',
+        'pattern': "Wire Transfer.*?\\$([0-9,]+(?:\\.[0-9]{2})?)",
+        'threshold': 10000,
+        'message': "Excessive wire transfer: ${value}"
+    })
+    assert rule.message_template is None
+    
+    flags = RegexAmountHandler().process_rule(rule, "Wire Transfer: $15,000.00")
+    assert [(flag.message, flag.severity) for flag in flags] == [
+        ("Excessive wire transfer: $15000.0", FlagSeverity.MEDIUM)
+    ]
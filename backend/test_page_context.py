@@ -0,0 +1,112 @@
+"""Tests for the per-page extraction context shared by text, table and word extraction."""
+
+import pdfplumber
+import pytest
+
+from services.parsing.core import PageContext
+from services.parsing.trid import TridParser
+from services.parsing.trid.page1_parser import Page1Parser
+from services.parsing.trid.page2_parser import Page2Parser
+from services.parsing.trid.page3_parser import Page3Parser
+from services.parsing.trid.page4_parser import Page4Parser
+from services.parsing.trid.page5_parser import Page5Parser
+
+
+PAGE_PARSERS = [Page1Parser, Page2Parser, Page3Parser, Page4Parser, Page5Parser]
+
+TABLE_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+
+
+def test_context_matches_the_pdfplumber_page(pdf_path):
+    """Text, tables and words derived from the one layout pass equal those of a plain page."""
+    with pdfplumber.open(pdf_path) as shared, pdfplumber.open(pdf_path) as plain:
+        for shared_page, plain_page in zip(shared.pages, plain.pages):
+            context = PageContext(shared_page)
+            assert context.extract_text() == (plain_page.extract_text() or "")
+            assert context.extract_tables() == plain_page.extract_tables()
+            assert context.extract_tables(TABLE_SETTINGS) == plain_page.extract_tables(table_settings=TABLE_SETTINGS)
+            assert context.extract_words() == plain_page.extract_words()
+            assert len(context.chars) == len(plain_page.chars)
+
+
+class CountingPage:
+    """A pdfplumber page recording the extractions the context asks it for."""
+    
+    def __init__(self, page):
+        self.page = page
+        self.calls = []
+    
+    def __getattr__(self, name):
+        attribute = getattr(self.page, name)
+        if not name.startswith("extract_"):
+            return attribute
+        
+        def extract(*args, **kwargs):
+            self.calls.append(name)
+            return attribute(*args, **kwargs)
+        return extract
+
+
+def test_results_are_cached_per_settings(pdf_path):
+    """Each extraction runs once per page, and tables once for each distinct table settings."""
+    with pdfplumber.open(pdf_path) as pdf:
+        page = CountingPage(pdf.pages[1])
+        context = PageContext(page)
+        assert context.extract_text() is context.text
+        assert context.extract_words() is context.words
+        assert context.extract_tables() is context.tables
+        
+        tables = context.extract_tables(TABLE_SETTINGS)
+        assert context.extract_tables(dict(reversed(list(TABLE_SETTINGS.items())))) is tables
+        assert context.extract_tables() is not tables
+        assert sorted(page.calls) == ["extract_tables", "extract_tables", "extract_text", "extract_words"]
+
+
+def test_text_extracted_elsewhere_is_not_laid_out_again(pdf_path):
+    """A context given its page text, e.g. by a page pool worker, returns it as is."""
+    with pdfplumber.open(pdf_path) as pdf:
+        context = PageContext(pdf.pages[0], "page text")
+        assert context.extract_text() == "page text"
+        assert context._objects is None
+
+
+def test_of_passes_contexts_through(pdf_path):
+    """Wrapping a context again returns the same context, so readers share its cached layout."""
+    with pdfplumber.open(pdf_path) as pdf:
+        context = PageContext.of(pdf.pages[0])
+        assert isinstance(context, PageContext)
+        assert context.page is pdf.pages[0]
+        assert PageContext.of(context) is context
+
+
+@pytest.mark.parametrize("page_number", range(1, 6))
+def test_page_parsers_read_a_shared_context_like_a_plain_page(pdf_path, page_number):
+    """A parser given a context other readers already used parses what it parses from a fresh page."""
+    parser_class = PAGE_PARSERS[page_number - 1]
+    with pdfplumber.open(pdf_path) as shared, pdfplumber.open(pdf_path) as plain:
+        context = PageContext(shared.pages[page_number - 1])
+        context.extract_text()
+        context.extract_words()
+        context.char_index()
+        
+        expected = parser_class(plain.pages[page_number - 1]).parse()
+        assert parser_class(context).parse() == expected
+        assert parser_class(context).parse() == expected
+
+
+def test_trid_parser_reads_shared_contexts_like_fresh_ones(pdf_path):
+    """Contexts already used for the raw text and tables give the same parsed document as fresh ones."""
+    with TridParser(pdf_path) as parser:
+        expected = parser.parse()
+    
+    with TridParser(pdf_path) as parser:
+        for context in parser.get_pages():
+            context.extract_tables()
+            context.extract_words()
+        contexts = dict(parser.page_contexts)
+        document = parser.parse()
+        assert parser.page_contexts == contexts
+    
+    assert document.loan_summary is not None
+    assert document.line_items
+    assert document == expected
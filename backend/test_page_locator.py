@@ -0,0 +1,72 @@
+"""Tests for locating the Closing Disclosure pages of a closing package."""
+
+import io
+import os
+
+import pytest
+
+from services.parsing.trid.page_locator import CdPageLocator, CdPageMap
+
+
+TEXT_PDF = os.path.join("..", "testfiles", "Closing Disclosure (Syed A Tabish) (1).pdf")
+
+CD_PAGES = [
+    "Closing Disclosure Closing Information Date Issued 04/01/2024 Loan Terms Loan Amount $450,000",
+    "Loan Costs Closing Cost Details A. Origination Charges Other Costs",
+    "Calculating Cash to Close Total Closing Costs (J) Summaries of Transactions",
+    "Loan Disclosures Assumption Escrow Account",
+    "Loan Calculations Total of Payments Finance Charge Other Disclosures Contact Information"
+]
+
+NOTE = "Note. For value received, Borrower promises to pay the Loan Amount"
+DEED = "Deed of Trust. This Security Instrument secures the Closing Disclosure dated 04/01/2024"
+
+
+def test_cd_is_found_inside_a_package():
+    """The CD is the run of five pages after the best-matching page 1."""
+    texts = [NOTE, DEED] + CD_PAGES + [NOTE]
+    assert CdPageLocator().match_pages(texts) == {1: 3, 2: 4, 3: 5, 4: 6, 5: 7}
+
+
+def test_page_one_needs_a_following_cd_page():
+    """A cover page carrying page 1's markers is skipped when no CD pages follow it."""
+    cover = "Closing Disclosure package - Loan Terms acknowledgement"
+    texts = [cover, NOTE, NOTE] + CD_PAGES
+    assert CdPageLocator().match_pages(texts)[1] == 4
+    assert CdPageLocator().match_pages([cover, NOTE, NOTE]) is None
+    assert CdPageLocator().match_pages([NOTE, DEED]) is None
+
+
+def test_pages_are_matched_across_line_breaks():
+    """Headings split over lines by the text layer still match."""
+    texts = [NOTE] + [text.replace(" ", "\n") for text in CD_PAGES[:2]]
+    assert CdPageLocator().match_pages(texts) == {1: 2, 2: 3}
+
+
+def test_only_cd_pages_are_laid_out():
+    """Pages outside the CD keep their pre-pass text; CD pages are left for layout extraction."""
+    page_map = CdPageMap(page_count=4, cd_pages={1: 2, 2: 3}, texts=["note", "cd 1", "cd 2", "deed"])
+    assert page_map.layout_pages == {2, 3}
+    assert page_map.seed_texts() == ["note", None, None, "deed"]
+
+
+def test_cd_pages_of_a_pdf_are_located():
+    """The pdfium pre-pass finds a CD behind other pages, and leaves a bare CD alone."""
+    PyPDF2 = pytest.importorskip("PyPDF2")
+    locator = CdPageLocator()
+    if not locator.extractor.available or not os.path.exists(TEXT_PDF):
+        pytest.skip("pdfium or the test PDF is not available")
+    assert locator.locate(TEXT_PDF) is None
+    
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(612, 792)
+    writer.add_blank_page(612, 792)
+    for page in PyPDF2.PdfReader(TEXT_PDF).pages:
+        writer.add_page(page)
+    package = io.BytesIO()
+    writer.write(package)
+    
+    page_map = locator.locate(package.getvalue())
+    assert page_map.page_count == 7
+    assert page_map.cd_pages == {1: 3, 2: 4, 3: 5, 4: 6, 5: 7}
+    assert page_map.seed_texts()[:2] == ["", ""]
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Tests for extracting the pages of a PDF on the worker pool."""
+
+from parser import extract_pages
+from services.parsing.core.page_pool import PagePool
+
+
+def test_pool_pages_equal_in_process_pages(pdf_data):
+    """Page ranges are reassembled in order, so the pool returns what extract_pages does."""
+    pool = PagePool(workers=2, min_pages=2)
+    try:
+        pages = pool.extract(pdf_data)
+        assert pages is not None
+        assert pages.contents == extract_pages(pdf_data)
+        assert len(pages.texts) == len(pages.contents)
+        assert any("Closing Disclosure" in text for text in pages.texts)
+        
+        # Workers reopen the PDF for the next document rather than reusing a stale copy
+        assert pool.extract(pdf_data).contents == pages.contents
+    finally:
+        pool.shutdown()
+
+
+def test_small_pdfs_stay_in_process(pdf_data):
+    """PDFs below min_pages, and pools of one worker, leave extraction to the caller."""
+    assert PagePool(workers=2, min_pages=20).extract(pdf_data) is None
+    assert PagePool(workers=1, min_pages=2).extract(pdf_data) is None
+    assert PagePool(workers=2, min_pages=2).extract(b"not a pdf") is None
+
+
+def test_ranges_cover_every_page_once():
+    """Pages are split into contiguous ranges, several per worker."""
+    pool = PagePool(workers=2)
+    ranges = pool._split(150)
+    assert len(ranges) == 8
+    assert ranges[0][0] == 0 and ranges[-1][1] == 150
+    assert all(first < last for first, last in ranges)
+    assert all(previous[1] == following[0] for previous, following in zip(ranges, ranges[1:]))
+    assert pool._split(3) == [(0, 1), (1, 2), (2, 3)]
\ No newline at end of file
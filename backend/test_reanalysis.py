@@ -0,0 +1,119 @@
+"""Tests for re-running the context rules of an analyzed document when the user context changes."""
+
+from models.core import UserContext
+
+
+RULES = """
+rules:
+  - name: "large_loan"
+    type: "regex_amount"
+    pattern: "Loan Amount.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 300000
+    message: "Large loan: ${value}"
+  
+  - name: "appraisal"
+    type: "regex_presence"
+    pattern: "Appraisal"
+    message: "Appraisal charged"
+  
+  - name: "loan_amount_mismatch"
+    type: "context_comparison"
+    comparison_type: "loan_amount_mismatch"
+    pattern: "Loan Amount.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    message: "Loan amount ${document_amount} is not the ${expected_amount} expected"
+  
+  - name: "title_fees_promise"
+    type: "context_comparison"
+    comparison_type: "broken_promise"
+    promise_type: "title_fees"
+    message: "Builder promised to cover the title fees"
+"""
+
+CONTEXT_RULES = ["loan_amount_mismatch", "title_fees_promise"]
+
+
+def record_runs(engine, monkeypatch) -> list:
+    """Record the rule and matcher of each handler run."""
+    runs = []
+    run_handler = engine._run_handler
+    monkeypatch.setattr(engine, '_run_handler', lambda handler, rule, matcher, *args: (
+        runs.append((rule.name, matcher)), run_handler(handler, rule, matcher, *args))[1])
+    return runs
+
+
+def test_reanalysis_reruns_only_context_rules(engine_for, sample_layout, monkeypatch):
+    """A new context re-runs the context rules on the cached matcher and keeps the other flags."""
+    engine = engine_for(RULES)
+    layout = sample_layout()
+    runs = record_runs(engine, monkeypatch)
+    
+    analysis = engine.prepare_analysis(layout.text, layout=layout)
+    matcher = analysis.matcher
+    assert [name for name, _ in runs] == ["large_loan", "appraisal"]
+    without_context = engine.reanalyze(analysis)
+    stats = dict(matcher.stats)
+    
+    runs.clear()
+    context = UserContext(expected_loan_amount=400000.0, builder_promised_to_cover_title_fees=True)
+    result = engine.reanalyze(analysis, context)
+    
+    assert runs == [(name, matcher) for name in CONTEXT_RULES]
+    assert analysis.matcher is matcher
+    # The loan amount match large_loan found is reused; only the title fees pattern is new
+    assert matcher.stats['searches'] == stats['searches'] + 1
+    assert matcher.stats['cache_hits'] > stats['cache_hits']
+    assert [flag.rule for flag in result.flags] == ["large_loan", "appraisal"] + CONTEXT_RULES
+    assert [flag for flag in result.flags if flag.rule not in CONTEXT_RULES] == without_context.flags
+    assert result.flags[2].message == "Loan amount $450000.0 is not the $400000.0 expected"
+
+
+def upload(client, pdf_path) -> str:
+    with open(pdf_path, 'rb') as file:
+        response = client.post("/upload", files={"file": ("cd.pdf", file, "application/pdf")})
+    assert response.status_code == 200
+    return response.json()["report_id"]
+
+
+def report_flags(report) -> dict:
+    return {flag['rule']: flag['message'] for flag in report['flags']}
+
+
+def test_context_endpoint_rescores_the_report(api, client, engine_for, pdf_path, monkeypatch):
+    """Posting a context re-runs the context rules of the cached analysis and stores the updated report."""
+    engine = engine_for(RULES)
+    monkeypatch.setattr(api, 'rule_engine_service', engine)
+    report_id = upload(client, pdf_path)
+    uploaded = report_flags(client.get(f"/report/{report_id}").json())
+    assert set(uploaded) == {"large_loan", "appraisal"}
+    
+    runs = record_runs(engine, monkeypatch)
+    response = client.post(f"/report/{report_id}/context", json={"expectedLoanAmount": 300000})
+    assert response.status_code == 200
+    assert [name for name, _ in runs] == CONTEXT_RULES
+    assert all(matcher is api.analysis_cache[report_id].matcher for _, matcher in runs)
+    
+    flags = report_flags(response.json())
+    assert flags == {**uploaded, "loan_amount_mismatch": "Loan amount $396583.0 is not the $300000.0 expected"}
+    assert report_flags(client.get(f"/report/{report_id}").json()) == flags
+    
+    response = client.post(f"/report/{report_id}/context", json={"expectedLoanAmount": 396583})
+    assert report_flags(response.json()) == uploaded
+
+
+def test_context_endpoint_needs_a_cached_analysis(api, client, engine_for, pdf_path, monkeypatch):
+    """Unknown reports, and reports whose analysis was evicted from the cache, are not found."""
+    monkeypatch.setattr(api, 'rule_engine_service', engine_for(RULES))
+    unknown = "00000000-0000-0000-0000-000000000000"
+    response = client.post(f"/report/{unknown}/context", json={"expectedLoanAmount": 300000})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Report not found"
+    
+    report_id = upload(client, pdf_path)
+    monkeypatch.setattr(api.settings, 'analysis_cache_size', 1)
+    api.cache_analysis("newer", api.analysis_cache[report_id])
+    assert report_id not in api.analysis_cache
+    
+    response = client.post(f"/report/{report_id}/context", json={"expectedLoanAmount": 300000})
+    assert response.status_code == 404
+    assert "expired" in response.json()["detail"]
+    assert report_id in api.reports_store
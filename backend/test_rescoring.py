@@ -0,0 +1,182 @@
+"""Tests for re-scoring stored reports after the rules configuration changes."""
+
+import asyncio
+import os
+
+from config.settings import Settings
+from models.document import DocumentLayout
+from services.analysis import RuleEngineService, ScoringService
+from services.reporting import ReportRescorer
+
+
+RULES = """
+rules:
+  - name: "large_wire"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    message: "Large wire transfer: ${value}"
+  
+  - name: "inspection"
+    type: "regex_presence"
+    pattern: "home inspection"
+    message: "Home inspection mentioned"
+  
+  - name: "survey"
+    type: "regex_presence"
+    pattern: "Survey"
+    message: "Survey mentioned"
+"""
+
+APPRAISAL_RULE = """
+  - name: "appraisal"
+    type: "regex_presence"
+    pattern: "Appraisal Fee"
+    message: "Appraisal fee charged"
+"""
+
+
+def store_report(rescorer: ReportRescorer, report_id: str, text: str):
+    """Analyze a document and store its report the way the upload endpoint does."""
+    layout = DocumentLayout(text=text)
+    analysis = rescorer.rule_engine.analyze(text, layout=layout)
+    rescorer.reports_store[report_id] = {
+        'id': report_id,
+        'flags': [flag.to_dict() for flag in analysis.flags],
+        'metadata': {'rule_hashes': analysis.rule_hashes}
+    }
+    rescorer.store_document(report_id, layout)
+
+
+def flag_messages(report) -> dict:
+    return {flag['rule']: flag['message'] for flag in report['flags']}
+
+
+def test_only_added_and_changed_rules_are_rerun(write_rules, closing_text):
+    """Unchanged rules keep their flags, changed and added rules are re-run and removed rules dropped."""
+    config = write_rules(RULES, 1_000_000)
+    engine = RuleEngineService(str(config))
+    rescorer = ReportRescorer(engine, ScoringService(), {})
+    store_report(rescorer, "report", closing_text)
+    assert set(flag_messages(rescorer.reports_store["report"])) == {"large_wire", "inspection", "survey"}
+    assert rescorer.find_stale() == []
+    
+    # A kept flag is never recomputed, so its edited message survives
+    rescorer.reports_store["report"]['flags'][1]['message'] = "Kept"
+    edited = RULES.replace("threshold: 10000", "threshold: 20000")
+    edited = edited[:edited.index('  - name: "survey"')] + APPRAISAL_RULE
+    write_rules(edited, 1_000_100)
+    assert rescorer.find_stale() == ["report"]
+    
+    assert rescorer.rescore_report("report") == ["appraisal", "large_wire"]
+    report = rescorer.reports_store["report"]
+    assert flag_messages(report) == {"inspection": "Kept", "appraisal": "Appraisal fee charged"}
+    assert report['analytics']['total_flags'] == 2
+    assert report['metadata']['rule_hashes'] == engine.get_plan().rule_hashes
+    assert rescorer.find_stale() == []
+
+
+def test_rescored_flags_equal_a_fresh_analysis(write_rules, closing_text):
+    """A re-scored report carries the flags of analyzing its document with the new rules."""
+    config = write_rules(RULES, 1_000_000)
+    engine = RuleEngineService(str(config))
+    rescorer = ReportRescorer(engine, ScoringService(), {})
+    store_report(rescorer, "report", closing_text)
+    
+    write_rules(RULES.replace("Survey mentioned", "Survey charged") + APPRAISAL_RULE, 1_000_100)
+    summary = rescorer.rescore_all()
+    assert summary['reports_rescored'] == 1
+    assert summary['rules_run'] == 2
+    
+    fresh = [flag.to_dict() for flag in engine.analyze(closing_text).flags]
+    assert rescorer.reports_store["report"]['flags'] == fresh
+
+
+def test_documents_evicted_from_memory_are_read_back_from_disk(tmp_path, write_rules, closing_text):
+    """With a document directory every report stays re-scorable, however few documents are kept in memory."""
+    config = write_rules(RULES, 1_000_000)
+    document_dir = tmp_path / "documents"
+    rescorer = ReportRescorer(RuleEngineService(str(config)), ScoringService(), {},
+                              max_documents=1, document_dir=str(document_dir))
+    for report_id in ("first", "second", "third"):
+        store_report(rescorer, report_id, closing_text)
+    assert list(rescorer.documents) == ["third"]
+    rescorer.flush()
+    assert sorted(os.listdir(document_dir)) == ["first.pickle", "second.pickle", "third.pickle"]
+    
+    write_rules(RULES + APPRAISAL_RULE, 1_000_100)
+    assert rescorer.rescore_all()['reports_rescored'] == 3
+    assert all("appraisal" in flag_messages(report) for report in rescorer.reports_store.values())
+    
+    rescorer.discard_document("first")
+    rescorer.flush()
+    assert sorted(os.listdir(document_dir)) == ["second.pickle", "third.pickle"]
+
+
+def test_written_documents_are_purged_with_their_reports(tmp_path, write_rules, closing_text):
+    """Files of reports that are gone, e.g. from before a restart, and expired files are removed."""
+    config = write_rules(RULES, 1_000_000)
+    document_dir = tmp_path / "documents"
+    document_dir.mkdir()
+    (document_dir / "before-restart.pickle").write_bytes(b"")
+    (document_dir / "interrupted.tmp").write_bytes(b"")
+    
+    rescorer = ReportRescorer(RuleEngineService(str(config)), ScoringService(), {},
+                              document_dir=str(document_dir), document_max_age=3600)
+    assert os.listdir(document_dir) == []
+    
+    for report_id in ("old", "deleted", "recent"):
+        store_report(rescorer, report_id, closing_text)
+    rescorer.flush()
+    os.utime(document_dir / "old.pickle", (1_000_000, 1_000_000))
+    del rescorer.reports_store["deleted"]
+    
+    assert rescorer.purge_documents() == 2
+    assert os.listdir(document_dir) == ["recent.pickle"]
+
+
+def test_documents_are_kept_in_memory_by_default(monkeypatch):
+    """Unless a document directory is configured, no report documents are written to disk."""
+    monkeypatch.delenv('RESCORE_DOCUMENT_DIR', raising=False)
+    assert Settings.from_env().rescore_document_dir == ""
+    assert ReportRescorer(None, None, {}).purge_documents() == 0
+
+
+def test_documents_evicted_without_a_directory_are_not_rescored(write_rules, closing_text):
+    """Without a document directory, reports whose document was evicted keep their flags."""
+    config = write_rules(RULES, 1_000_000)
+    rescorer = ReportRescorer(RuleEngineService(str(config)), ScoringService(), {}, max_documents=1)
+    store_report(rescorer, "first", closing_text)
+    store_report(rescorer, "second", closing_text)
+    
+    write_rules(RULES + APPRAISAL_RULE, 1_000_100)
+    assert rescorer.find_stale() == ["second"]
+    assert rescorer.rescore_report("first") is None
+    assert "appraisal" not in flag_messages(rescorer.reports_store["first"])
+
+
+def test_rescore_endpoint_runs_off_the_event_loop(api, client, write_rules, closing_text, monkeypatch):
+    """POST /debug/rescore re-scores stored reports on a worker thread rather than on the event loop."""
+    config = write_rules(RULES, 1_000_000)
+    rescorer = ReportRescorer(RuleEngineService(str(config)), ScoringService(), api.reports_store)
+    monkeypatch.setattr(api, 'report_rescorer', rescorer)
+    store_report(rescorer, "report", closing_text)
+    write_rules(RULES + APPRAISAL_RULE, 1_000_100)
+    
+    on_event_loop = []
+    rescore_all = rescorer.rescore_all
+    
+    def record_thread():
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return rescore_all()
+    
+    monkeypatch.setattr(rescorer, 'rescore_all', record_thread)
+    response = client.post("/debug/rescore")
+    assert response.status_code == 200
+    assert response.json()['reports_rescored'] == 1
+    assert on_event_loop == [False]
+    assert "appraisal" in flag_messages(api.reports_store["report"])
@@ -0,0 +1,56 @@
+"""Tests for the compiled rule plan RuleEngineService caches between analyses."""
+
+import os
+
+from services.analysis import RuleEngineService
+
+
+RULES = """
+rules:
+  - name: "large_wire"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    message: "Large wire transfer: ${amount}"
+"""
+
+
+def test_plan_is_reused_until_the_config_changes(write_rules, closing_text):
+    """Only an edit of the configuration compiles a new plan."""
+    config = write_rules(RULES, 1_000_000)
+    engine = RuleEngineService(str(config))
+    
+    plan = engine.get_plan()
+    assert engine.get_plan() is plan
+    
+    # Touched but not edited
+    os.utime(config, (1_000_100, 1_000_100))
+    assert engine.get_plan() is plan
+    assert plan.config_mtime == 1_000_100
+    
+    write_rules(RULES.replace("threshold: 10000", "threshold: 20000"), 1_000_200)
+    rebuilt = engine.get_plan()
+    assert rebuilt is not plan
+    assert rebuilt.config_hash != plan.config_hash
+    assert engine.analyze_text(closing_text) == []
+
+
+def test_cached_plan_gives_the_same_flags_as_a_fresh_engine(write_rules, closing_text):
+    """Analyses reusing the plan flag the same rules as the first one."""
+    config = write_rules(RULES, 1_000_000)
+    engine = RuleEngineService(str(config))
+    
+    first = engine.analyze_text(closing_text)
+    assert [flag.rule for flag in first] == ["large_wire"]
+    assert engine.analyze_text(closing_text) == first
+    assert RuleEngineService(str(config)).analyze_text(closing_text) == first
+
+
+def test_missing_config_keeps_serving_the_last_plan(write_rules):
+    """A configuration removed after loading does not break analysis."""
+    config = write_rules(RULES, 1_000_000)
+    engine = RuleEngineService(str(config))
+    plan = engine.get_plan()
+    
+    config.unlink()
+    assert engine.get_plan() is plan
\ No newline at end of file
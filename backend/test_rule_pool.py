@@ -0,0 +1,46 @@
+"""Tests for evaluating the rules of one document on the worker pool."""
+
+from services.analysis import RuleEngineService
+
+
+def test_pool_flags_equal_in_process_flags(sample_layout):
+    """Sharded rules are merged back in plan order, so the pool returns the in-process result."""
+    in_process = RuleEngineService("rules-config.yaml")
+    pooled = RuleEngineService("rules-config.yaml", pool_workers=2, pool_min_chars=0)
+    try:
+        for all_matches in (False, True):
+            layout = sample_layout()
+            expected = in_process.analyze(layout.text, all_matches=all_matches, layout=layout)
+            result = pooled.analyze(layout.text, all_matches=all_matches, layout=sample_layout())
+            assert result.flags == expected.flags
+            assert result.stats['timed_out_rules'] == expected.stats['timed_out_rules']
+            assert result.stats['scoped_rules'] == expected.stats['scoped_rules']
+        assert pooled.rule_pool._executor is not None
+        assert expected.flags
+    finally:
+        pooled.rule_pool.shutdown()
+
+
+def test_small_documents_stay_in_process(closing_text):
+    """Documents below min_chars, and runs of a single rule, are not worth sending to the workers."""
+    engine = RuleEngineService("rules-config.yaml", pool_workers=2, pool_min_chars=len(closing_text) + 1)
+    pool = engine.rule_pool
+    assert not pool.should_shard(closing_text, [0, 1])
+    assert not pool.should_shard(closing_text + "!", [0])
+    assert pool.should_shard(closing_text + "!", [0, 1])
+    
+    engine.analyze(closing_text)
+    assert pool._executor is None
+
+
+def test_shards_cover_every_rule_once():
+    """Rules are split into at most one shard per worker, each in plan order."""
+    engine = RuleEngineService("rules-config.yaml", pool_workers=3)
+    plan = engine.get_plan()
+    positions = list(range(len(plan.compiled_rules)))
+    
+    shards = engine.rule_pool._split(plan, positions)
+    assert len(shards) == 3
+    assert sorted(position for shard in shards for position in shard) == positions
+    assert all(shard == sorted(shard) for shard in shards)
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
\ No newline at end of file
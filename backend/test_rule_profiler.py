@@ -0,0 +1,88 @@
+"""Tests for the per-rule timings and match counts collected while rules run."""
+
+import pytest
+
+
+RULES = """
+rules:
+  - name: "large_wire"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    message: "Large wire transfer: ${value}"
+  
+  - name: "amounts"
+    type: "regex_amount"
+    pattern: "\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 1000000
+    message: "Amount over a million: ${value}"
+  
+  - name: "pest_inspection"
+    type: "regex_presence"
+    pattern: "pest inspection"
+    message: "Pest inspection charged"
+"""
+
+
+def rule_profiles(engine) -> dict:
+    return {rule['rule']: rule for rule in engine.profiler.to_dict()['rules']}
+
+
+def test_profiles_accumulate_across_analyses(engine_for, closing_text):
+    """Evaluations, flags, matches scanned and time add up over every document analyzed."""
+    engine = engine_for(RULES)
+    engine.analyze(closing_text)
+    first = rule_profiles(engine)
+    assert set(first) == {"large_wire", "amounts", "pest_inspection"}
+    assert first["large_wire"]["flagged"] == 1
+    assert first["amounts"]["flagged"] == 0
+    assert first["amounts"]["matches_scanned"] == 7  # Every amount, none over the threshold
+    
+    engine.analyze(closing_text)
+    engine.analyze("Closing Disclosure")
+    profiles = rule_profiles(engine)
+    for name, profile in profiles.items():
+        assert profile["evaluations"] == 3
+        assert profile["matches_scanned"] == 2 * first[name]["matches_scanned"]
+        assert profile["total_ms"] >= first[name]["total_ms"]
+        assert profile["p50_ms"] is not None
+    assert profiles["large_wire"]["flagged"] == 2
+    assert profiles["large_wire"]["flag_rate"] == 2 / 3
+    assert sum(profile["time_share"] for profile in profiles.values()) == pytest.approx(1.0)
+
+
+def test_reloading_the_rules_resets_the_profiles(engine_for, closing_text):
+    """Timings of the previous rules are dropped when the rules are reloaded."""
+    engine = engine_for(RULES)
+    engine.analyze(closing_text)
+    started = engine.profiler.started
+    assert rule_profiles(engine)
+    
+    engine.reload_rules()
+    assert engine.profiler.to_dict()['rules'] == []
+    assert engine.profiler.started >= started
+    
+    engine.analyze(closing_text)
+    assert all(profile["evaluations"] == 1 for profile in rule_profiles(engine).values())
+
+
+def test_profile_endpoint_reports_and_resets(api, client, engine_for, closing_text, monkeypatch):
+    """The debug endpoint lists the slowest rules first and clears them when asked to."""
+    engine = engine_for(RULES)
+    monkeypatch.setattr(api, 'rule_engine_service', engine)
+    engine.analyze(closing_text)
+    engine.analyze(closing_text)
+    
+    profile = client.get("/debug/rules/profile").json()
+    totals = [rule['total_ms'] for rule in profile['rules']]
+    assert totals == sorted(totals, reverse=True)
+    assert {rule['rule']: rule['evaluations'] for rule in profile['rules']} == {
+        "large_wire": 2, "amounts": 2, "pest_inspection": 2
+    }
+    
+    reset = client.get("/debug/rules/profile?reset=true").json()
+    assert [rule['evaluations'] for rule in reset['rules']] == [2, 2, 2]
+    assert client.get("/debug/rules/profile").json()['rules'] == []
+    
+    monkeypatch.setattr(api, 'rule_engine_service', engine_for(RULES, profile_window=0))
+    assert client.get("/debug/rules/profile").status_code == 404
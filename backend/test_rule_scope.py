@@ -0,0 +1,101 @@
+"""Tests for evaluating rules against their TRID page or section scope."""
+
+from models.document import DocumentSection
+from services.analysis import RuleEngineService
+
+
+RULES = """
+rules:
+  - name: "survey_unscoped"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower"
+    message: "Survey paid by borrower"
+  
+  - name: "survey_in_other_costs"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower"
+    scope: ["other"]
+    message: "Survey paid by borrower"
+  
+  - name: "survey_on_page_two"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower"
+    scope: [2]
+    message: "Survey paid by borrower"
+"""
+
+PAGE_ONE = "Closing Disclosure Loan Amount $450,000.00 Survey"
+SECTION_C = "C. Services Borrower Did Shop For Pest Inspection Borrower $150.00"
+SECTION_H = "H. Other Survey Borrower $450.00"
+
+
+def scope_pages(section_h: str = SECTION_H) -> list:
+    """Page 1, then page 2 holding sections C and H."""
+    return [
+        [(None, PAGE_ONE)],
+        [(DocumentSection.SERVICES_SHOPPED, SECTION_C), (DocumentSection.OTHER, section_h)]
+    ]
+
+
+def test_scoped_matches_cannot_cross_into_other_sections(engine_for, sample_layout):
+    """A match starting on page 1 counts only for the unscoped rule; scoped rules find the one in section H."""
+    engine = engine_for(RULES)
+    layout = sample_layout(scope_pages())
+    result = engine.analyze(layout.text, layout=layout)
+    
+    snippets = {flag.rule: flag.snippet for flag in result.flags}
+    assert set(snippets) == {"survey_unscoped", "survey_in_other_costs", "survey_on_page_two"}
+    assert snippets["survey_unscoped"].startswith("Closing Disclosure")
+    assert snippets["survey_in_other_costs"] == SECTION_H
+    assert result.stats['scoped_rules'] == 2
+
+
+def test_scoped_rules_skip_documents_without_a_match_in_scope(engine_for, sample_layout):
+    """Only the unscoped rule flags a survey whose borrower column lies outside the scope."""
+    engine = engine_for(RULES)
+    layout = sample_layout(scope_pages("H. Other Survey Seller $450.00"))
+    
+    flagged = [flag.rule for flag in engine.analyze(layout.text, layout=layout).flags]
+    assert flagged == ["survey_unscoped"]
+
+
+def test_scoped_rules_see_the_whole_text_without_a_layout(engine_for, sample_layout):
+    """Without page and section spans every rule reads the whole text."""
+    engine = engine_for(RULES)
+    result = engine.analyze(sample_layout(scope_pages()).text)
+    assert len(result.flags) == 3
+    assert result.stats['scoped_rules'] == 0
+
+
+def test_invalid_scope_is_a_compile_error(engine_for):
+    """Unknown sections and page numbers below 1 are reported when the rules are compiled."""
+    engine = engine_for(RULES.replace('scope: ["other"]', 'scope: ["section_z", 0]'))
+    errors = engine.get_plan().errors
+    assert any("section_z" in error for error in errors)
+    assert any("Invalid scope '0'" in error for error in errors)
+
+
+FEE_RULES = ("buyer_paying_", "excessive_title_fees")
+
+SCOPED_SURVEY = """
+rules:
+  - name: "buyer_paying_survey_fee"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    scope: ["services_not_shopped", "services_shopped", "other"]
+    message: "Survey paid by borrower"
+"""
+
+
+def test_configured_fee_rules_flag_the_sample_disclosure(disclosure, engine_for):
+    """The borrower-paid fee rules flag the real Closing Disclosure whether or not its layout is given."""
+    layout, _ = disclosure
+    engine = RuleEngineService("rules-config.yaml")
+    expected = {"buyer_paying_courier_fee", "buyer_paying_notary_fee", "buyer_paying_settlement_fee",
+                "buyer_paying_survey_fee"}
+    for result in (engine.analyze(layout.text), engine.analyze(layout.text, layout=layout)):
+        assert {flag.rule for flag in result.flags if flag.rule.startswith(FEE_RULES)} == expected
+    
+    # Fee lines name no payer: scoped to the fee sections, the pattern loses the 'Borrower' of the next header
+    assert DocumentSection.SERVICES_NOT_SHOPPED in layout.section_spans
+    assert engine_for(SCOPED_SURVEY).analyze(layout.text, layout=layout).flags == []
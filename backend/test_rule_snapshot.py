@@ -0,0 +1,115 @@
+"""Tests for loading the compiled rules from a snapshot instead of the YAML."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+import build_rules_snapshot
+from models.core import FlagSeverity
+from services.analysis import RuleEngineService
+from services.analysis import rule_snapshot
+from services.analysis.rule_snapshot import snapshot_path
+
+
+RULES = """
+rules:
+  - name: "large_wire"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    severity: "high"
+    message: "Large wire transfer: ${value}"
+  
+  - name: "survey"
+    type: "regex_presence"
+    pattern: "Survey.*?Borrower"
+    scope: ["other"]
+    message: "Survey charged to the borrower"
+"""
+
+
+@pytest.fixture
+def snapshot(write_rules, monkeypatch):
+    """Write the rules and build their snapshot as the deploy step does, returning the configuration path."""
+    config = write_rules(RULES, 1_000_000)
+    monkeypatch.setattr('sys.argv', ["build_rules_snapshot.py", str(config)])
+    assert build_rules_snapshot.main() == 0
+    assert os.path.exists(snapshot_path(str(config)))
+    return config
+
+
+def count_compiles(engine: RuleEngineService, monkeypatch) -> list:
+    """Record each time the engine compiles its plan from the YAML."""
+    compiles = []
+    compile_rules = engine.compiler.compile
+    monkeypatch.setattr(engine.compiler, 'compile', lambda *args, **kwargs: (
+        compiles.append(True), compile_rules(*args, **kwargs))[1])
+    return compiles
+
+
+def test_matching_snapshot_is_loaded_instead_of_compiling(snapshot, monkeypatch, sample_layout):
+    """The snapshot's plan is used as compiled, with handlers re-attached, and flags like the YAML."""
+    engine = RuleEngineService(str(snapshot), use_snapshot=True)
+    compiles = count_compiles(engine, monkeypatch)
+    
+    plan = engine.get_plan()
+    assert compiles == []
+    assert plan.config_mtime == 1_000_000
+    assert all(compiled.handler is not None for compiled in plan.compiled_rules)
+    assert plan.compiled_rules[0].rule.severity == FlagSeverity.HIGH
+    
+    layout = sample_layout()
+    compiled = RuleEngineService(str(snapshot)).analyze(layout.text, layout=layout).flags
+    assert engine.analyze(layout.text, layout=layout).flags == compiled
+    assert [flag.rule for flag in compiled] == ["large_wire", "survey"]
+
+
+def test_snapshot_of_another_config_is_rejected(snapshot, write_rules, monkeypatch):
+    """An edited configuration no longer matches the snapshot's config hash and is compiled from the YAML."""
+    write_rules(RULES.replace("threshold: 10000", "threshold: 20000"), 1_000_100)
+    engine = RuleEngineService(str(snapshot), use_snapshot=True)
+    compiles = count_compiles(engine, monkeypatch)
+    
+    assert engine.get_plan().compiled_rules[0].rule.threshold == 20000
+    assert compiles == [True]
+
+
+def test_snapshot_of_other_code_is_rejected(snapshot, monkeypatch):
+    """A snapshot built by a different version of the compiler or handlers is compiled from the YAML."""
+    monkeypatch.setattr(rule_snapshot, '_code_hash', "0" * 64)
+    engine = RuleEngineService(str(snapshot), use_snapshot=True)
+    compiles = count_compiles(engine, monkeypatch)
+    
+    engine.get_plan()
+    assert compiles == [True]
+
+
+@pytest.mark.parametrize("module", ["models/core/flag.py", "models/document/layout.py", "rules/regex_rules.py"])
+def test_code_hash_covers_the_model_and_rule_modules(monkeypatch, module):
+    """Editing any module of the model packages or the rules package changes the code hash."""
+    monkeypatch.setattr(rule_snapshot, '_code_hash', None)
+    original = rule_snapshot.code_hash()
+    
+    read_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, 'read_bytes', lambda path: read_bytes(path) + (
+        b"\n# edited" if path.as_posix().endswith(module) else b""))
+    monkeypatch.setattr(rule_snapshot, '_code_hash', None)
+    assert rule_snapshot.code_hash() != original
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", None])
+def test_unreadable_snapshot_falls_back_to_compiling(snapshot, monkeypatch, capsys, content):
+    """Empty, corrupt and truncated snapshots are ignored with a warning rather than failing to load the rules."""
+    path = snapshot_path(str(snapshot))
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(data[:len(data) // 2] if content is None else content)
+    
+    engine = RuleEngineService(str(snapshot), use_snapshot=True)
+    compiles = count_compiles(engine, monkeypatch)
+    
+    assert [compiled.rule.name for compiled in engine.get_plan().compiled_rules] == ["large_wire", "survey"]
+    assert compiles == [True]
+    assert "Ignoring unreadable rules snapshot" in capsys.readouterr().out
@@ -0,0 +1,143 @@
+"""Tests for shadowing sampled uploads with the legacy rule engine."""
+
+import functools
+
+import pytest
+
+from services.analysis import RuleEngineService
+from services.analysis.shadow_runner import ShadowRunner, ShadowStore, legacy_engine
+
+
+RULES = """
+values:
+  interest_rate:
+    label: "Interest Rate"
+    value_type: percent
+
+rules:
+  - name: "large_wire"
+    type: "regex_amount"
+    pattern: "Wire Transfer.*?\\\\$([0-9,]+(?:\\\\.[0-9]{2})?)"
+    threshold: 10000
+    message: "Large wire transfer: ${value}"
+  
+  - name: "inspection"
+    type: "regex_presence"
+    pattern: "home inspection"
+    message: "Home inspection mentioned"
+  
+  - name: "appraisal_in_other_costs"
+    type: "regex_presence"
+    pattern: "Appraisal Fee"
+    scope: ["other"]
+    message: "Appraisal fee in other costs"
+  
+  - name: "high_rate"
+    type: "value_threshold"
+    value: "interest_rate"
+    threshold: 7
+    message: "Interest rate of {value}%"
+  
+  - name: "appraisal_label"
+    type: "regex_amount"
+    label: "Appraisal Fee"
+    threshold: 500
+    message: "Appraisal fee of ${value}"
+"""
+
+
+@pytest.fixture
+def runner_for(write_rules, tmp_path):
+    """Create a legacy shadow runner for a rules configuration, recording to the test's directory."""
+    runners = []
+    
+    def create(rules: str = RULES, sample_rate: float = 1.0) -> ShadowRunner:
+        config = write_rules(rules)
+        runner = ShadowRunner('legacy', functools.partial(legacy_engine, str(config)),
+                              ShadowStore(str(tmp_path / "shadow.jsonl")), sample_rate=sample_rate)
+        runners.append(runner)
+        return runner
+    yield create
+    for runner in runners:
+        runner.shutdown(wait=False)
+
+
+def test_sampled_document_records_flag_differences(runner_for, sample_layout):
+    """A shadowed document records the rules each engine flagged, the diffs and both latencies."""
+    runner = runner_for()
+    layout = sample_layout()
+    engine = RuleEngineService(runner.engine_factory.args[0])
+    flags = [flag.to_dict() for flag in engine.analyze(layout.text, layout=layout).flags]
+    assert [flag['rule'] for flag in flags] == ["large_wire", "inspection", "high_rate", "appraisal_label"]
+    
+    assert runner.submit("report", layout.text, flags, 0.002)
+    runner.shutdown()
+    
+    [result] = runner.store.read()
+    assert result.report_id == "report"
+    assert result.engine == "legacy"
+    assert result.error is None
+    assert result.primary_rules == ["inspection", "large_wire"]
+    assert result.shadow_rules == ["appraisal_in_other_costs", "inspection", "large_wire"]
+    assert result.only_primary == []
+    assert result.only_shadow == ["appraisal_in_other_costs"]  # The legacy engine ignores scopes
+    assert result.message_mismatches == ["large_wire"]  # "$15000.0" against "$15000.00"
+    assert not result.agrees
+    assert result.primary_ms == pytest.approx(2.0)
+    assert result.shadow_ms > 0
+    assert runner.stats == {'sampled': 1, 'dropped': 0, 'completed': 1, 'errors': 0, 'timeouts': 0}
+
+
+def test_rules_the_legacy_engine_cannot_evaluate_are_skipped(runner_for, closing_text):
+    """Unknown rule types and rules without a pattern are left out of the comparison and listed."""
+    runner = runner_for()
+    flags = [
+        {'rule': "inspection", 'message': "Home inspection mentioned"},
+        {'rule': "high_rate", 'message': "Interest rate of 7.25%"},
+        {'rule': "appraisal_label", 'message': "Appraisal fee of $650.0"}
+    ]
+    assert runner.submit("report", closing_text, flags, 0.001)
+    runner.shutdown()
+    
+    [result] = runner.store.read()
+    assert result.skipped_rules == ["appraisal_label", "high_rate"]
+    assert "high_rate" not in result.primary_rules + result.only_primary
+    assert "appraisal_label" not in result.primary_rules + result.only_primary
+
+
+def test_zero_sample_rate_disables_shadowing(runner_for, closing_text):
+    """Without a sample rate nothing is queued, recorded or started."""
+    runner = runner_for(sample_rate=0.0)
+    assert not runner.submit("report", closing_text, [], 0.001)
+    runner.shutdown()
+    
+    assert runner.store.read() == []
+    assert runner.stats['sampled'] == 0
+    assert runner._pool is None
+
+
+def test_shadow_endpoint_summarizes_sampled_uploads(api, client, runner_for, pdf_path, monkeypatch):
+    """Uploads are shadowed at the runner's sample rate and summarized by the debug endpoint."""
+    monkeypatch.setattr(api, 'shadow_runner', runner_for(sample_rate=0.0))
+    with open(pdf_path, 'rb') as file:
+        assert client.post("/upload", files={"file": ("cd.pdf", file, "application/pdf")}).status_code == 200
+    assert client.get("/debug/shadow").json()["summary"]["samples"] == 0
+    
+    runner = runner_for()
+    monkeypatch.setattr(api, 'shadow_runner', runner)
+    with open(pdf_path, 'rb') as file:
+        assert client.post("/upload", files={"file": ("cd.pdf", file, "application/pdf")}).status_code == 200
+    runner.shutdown()
+    
+    response = client.get("/debug/shadow").json()
+    assert response["sample_rate"] == 1.0
+    assert response["runner"]["completed"] == 1
+    summary = response["summary"]
+    assert summary["samples"] == 1
+    assert summary["errors"] == 0
+    assert summary["engines"] == ["legacy"]
+    assert summary["primary_ms"]["p50"] > 0
+    assert summary["shadow_ms"]["p50"] > 0
+    assert summary["skipped_rules"] == [
+        {'rule': "appraisal_label", 'documents': 1}, {'rule': "high_rate", 'documents': 1}
+    ]
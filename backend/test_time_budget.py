@@ -0,0 +1,109 @@
+"""Tests for backtracking detection and the time budgets that bound rules."""
+
+import re
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from rules.backtracking import find_backtracking_risks
+from rules.time_budget import TimeBudget, RuleTimeoutError
+from services.analysis.rule_pool import RulePool
+
+
+RULES = """
+rules:
+  - name: "nested_repeat"
+    type: "regex_presence"
+    pattern: "(a+)+$"
+    message: "Nested repeat matched"
+  
+  - name: "inspection"
+    type: "regex_presence"
+    pattern: "home inspection"
+    message: "Home inspection mentioned"
+"""
+
+# Fails "(a+)+$" only after trying every way to split the a's
+EVIL_TEXT = "home inspection " + "a" * 40 + "b"
+
+
+def test_nested_repeats_are_exponential():
+    """A repeat inside a repeat is reported as an exponential risk."""
+    risks = find_backtracking_risks("(a+)+$")
+    assert any(risk.exponential for risk in risks)
+
+
+def test_wildcards_spanning_lines_are_polynomial():
+    """Lazy wildcards that cross line breaks are a polynomial, not exponential, risk."""
+    risks = find_backtracking_risks("Survey.*?Borrower.*?\\$", re.IGNORECASE | re.DOTALL)
+    assert len(risks) == 1
+    assert not risks[0].exponential
+    assert "O(n^3)" in str(risks[0])
+
+
+def test_line_bounded_patterns_are_safe():
+    """Wildcards that stop at line breaks, and invalid patterns, carry no risk."""
+    assert find_backtracking_risks("Survey.*?Borrower.*?\\$", re.IGNORECASE) == []
+    assert find_backtracking_risks("Loan Amount\\s+\\$([0-9,]+)") == []
+    assert find_backtracking_risks("(unclosed") == []
+
+
+def test_budget_interrupts_a_search_on_the_main_thread():
+    """The interval timer stops a regex stuck backtracking."""
+    assert TimeBudget.can_interrupt()
+    start = time.perf_counter()
+    with pytest.raises(RuleTimeoutError):
+        with TimeBudget(0.2):
+            re.search("(a+)+$", EVIL_TEXT)
+    assert time.perf_counter() - start < 5
+
+
+def test_budget_is_checked_between_matches():
+    """check() raises once the deadline has passed, and an unlimited budget never does."""
+    with TimeBudget(None) as unlimited:
+        unlimited.check()
+        assert unlimited.remaining() is None
+    
+    with pytest.raises(RuleTimeoutError):
+        with TimeBudget(0) as budget:
+            budget.check()
+
+
+def test_rules_at_risk_are_bounded_off_the_main_thread(engine_for):
+    """Another thread runs rules that may backtrack on a worker, where their budget stops them."""
+    engine = engine_for(RULES, rule_time_budget=0.5, analysis_time_budget=10.0)
+    assert [compiled.backtracking_risk for compiled in engine.get_plan().compiled_rules] == [True, False]
+    
+    results = []
+    thread = threading.Thread(target=lambda: results.append(engine.analyze(EVIL_TEXT)))
+    start = time.perf_counter()
+    thread.start()
+    thread.join(60)
+    assert not thread.is_alive()
+    assert time.perf_counter() - start < 30
+    
+    result = results[0]
+    assert [flag.rule for flag in result.flags] == ["inspection"]
+    assert result.stats['timed_out_rules'] == ["nested_repeat"]
+    assert result.flags == engine.analyze(EVIL_TEXT).flags
+
+def test_rules_at_risk_run_in_process_when_no_worker_can(engine_for, monkeypatch):
+    """A worker pool that breaks or cannot start leaves the rules to the budget checked between matches."""
+    engine = engine_for(RULES, rule_time_budget=0.5, analysis_time_budget=10.0)
+    text = "home inspection aaa"
+    
+    def broken(*args, **kwargs):
+        raise BrokenProcessPool("worker died")
+    
+    for run in (lambda *args, **kwargs: None, broken):
+        monkeypatch.setattr(RulePool, 'run', run)
+        
+        results = []
+        thread = threading.Thread(target=lambda: results.append(engine.analyze(text)))
+        thread.start()
+        thread.join(30)
+        
+        assert [flag.rule for flag in results[0].flags] == ["nested_repeat", "inspection"]
+        assert results[0].stats['timed_out_rules'] == []
@@ -0,0 +1,172 @@
+"""Tests for reading uploads in memory up to the memory limit and spilling larger ones to disk."""
+
+import asyncio
+import io
+import json
+import os
+from pathlib import Path
+
+import PyPDF2
+import pytest
+
+from services.parsing import DocumentParserService
+from services.parsing.core.multipart_upload import MultipartUploadError, read_multipart
+from services.parsing.legacy.document_parser_legacy import DEFAULT_UPLOAD_MEMORY_LIMIT
+
+
+LIMITS = [0, 1000, DEFAULT_UPLOAD_MEMORY_LIMIT]
+
+BOUNDARY = "closeguard-test-boundary"
+
+
+def multipart_body(pdf_data: bytes, context=None) -> bytes:
+    """A multipart form with the PDF as its 'file' part, and the context as JSON if given."""
+    parts = []
+    if context is not None:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="context"\r\n\r\n'.encode()
+                     + json.dumps(context).encode() + b"\r\n")
+    parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="cd.pdf"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n'.encode() + pdf_data + b"\r\n")
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def chunked(data: bytes, size: int = 4096):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def record_sources(service: DocumentParserService, monkeypatch) -> list:
+    """Record whether each upload was extracted from memory or from a spilled file."""
+    sources = []
+    extract_source = service._extract_source
+    monkeypatch.setattr(service, '_extract_source', lambda source, *args: (
+        sources.append(source), extract_source(source, *args))[1])
+    return sources
+
+
+def test_upload_is_extracted_alike_at_every_memory_limit(pdf_path, pdf_data, tmp_path, monkeypatch):
+    """Bytes and streams give the same layout and parsed document in memory and spilled to disk."""
+    expected = DocumentParserService(str(tmp_path)).extract_and_parse_file(pdf_path, "cd.pdf")
+    assert expected[1] is not None
+    
+    for limit in LIMITS:
+        service = DocumentParserService(str(tmp_path), upload_memory_limit=limit)
+        sources = record_sources(service, monkeypatch)
+        for content in (pdf_data, io.BytesIO(pdf_data)):
+            assert service.extract_from_upload(content, "cd.pdf", parse_document=True) == expected
+        
+        if limit >= len(pdf_data):
+            assert sources == [pdf_data, pdf_data]
+        else:
+            assert all(Path(source).parent == tmp_path for source in sources)
+        assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("limit", LIMITS)
+def test_multipart_files_are_kept_in_memory_up_to_the_limit(pdf_data, tmp_path, limit):
+    """File parts past the limit are written once to a temporary file, removed when the form is closed."""
+    body = multipart_body(pdf_data, {"expectedLoanAmount": 300000})
+    form = asyncio.run(read_multipart(f"multipart/form-data; boundary={BOUNDARY}", chunked(body),
+                                      limit, str(tmp_path)))
+    try:
+        assert json.loads(form.fields["context"]) == {"expectedLoanAmount": 300000}
+        upload = form.files["file"]
+        assert (upload.filename, upload.content_type, upload.size) == ("cd.pdf", "application/pdf", len(pdf_data))
+        
+        if limit >= len(pdf_data):
+            assert upload.in_memory
+            assert upload.source == pdf_data
+            assert list(tmp_path.iterdir()) == []
+        else:
+            assert Path(upload.source).parent == tmp_path
+            assert Path(upload.source).suffix == ".pdf"
+            assert Path(upload.source).read_bytes() == pdf_data
+    finally:
+        form.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_malformed_forms_are_rejected(tmp_path):
+    """Bodies without a multipart boundary, or cut off mid-part, raise and leave no temporary files."""
+    with pytest.raises(MultipartUploadError):
+        asyncio.run(read_multipart("application/pdf", chunked(b"%PDF"), 0, str(tmp_path)))
+    
+    body = multipart_body(b"%PDF-1.4 " * 1000)
+    for malformed in (body[:len(body) // 2], body.replace(b'name="file"', b'filename="cd.pdf"')):
+        with pytest.raises(MultipartUploadError):
+            asyncio.run(read_multipart(f"multipart/form-data; boundary={BOUNDARY}", chunked(malformed),
+                                       0, str(tmp_path)))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_limits_are_enforced_while_the_body_is_received(tmp_path):
+    """Oversized files and fields and too many parts are rejected before the rest of the body is read."""
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+    body = multipart_body(b"%PDF-1.4 " * 10_000, {"expectedLoanAmount": 300000})
+    
+    async def read(data: bytes, received: list, **limits):
+        async def counted():
+            async for chunk in chunked(data):
+                received.append(len(chunk))
+                yield chunk
+        return await read_multipart(content_type, counted(), 0, str(tmp_path), **limits)
+    
+    for limits in ({'max_file_size': 20_000}, {'max_field_size': 10}, {'max_parts': 1}):
+        received = []
+        with pytest.raises(MultipartUploadError):
+            asyncio.run(read(body, received, **limits))
+        assert sum(received) < len(body)
+        assert list(tmp_path.iterdir()) == []
+    
+    received = []
+    form = asyncio.run(read(body, received, max_file_size=90_000, max_field_size=64, max_parts=2))
+    form.close()
+    assert sum(received) == len(body)
+
+
+@pytest.fixture
+def large_pdf_data(pdf_path) -> bytes:
+    """The text-based Closing Disclosure with a 2MB attachment, past Starlette's 1MB spool size."""
+    reader = PyPDF2.PdfReader(pdf_path)
+    writer = PyPDF2.PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    writer.add_attachment("padding.bin", os.urandom(2 * 1024 * 1024))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_upload_endpoint_reads_the_form_itself(api, client, large_pdf_data, tmp_path, monkeypatch):
+    """The endpoint flags the same rules in memory and spilled, leaving no temporary files."""
+    temp_dir = tmp_path / "uploads"
+    temp_dir.mkdir()
+    service = api.document_parser_service
+    monkeypatch.setattr(service, 'temp_dir', str(temp_dir))
+    sources = record_sources(service, monkeypatch)
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    
+    reports = []
+    for limit in (DEFAULT_UPLOAD_MEMORY_LIMIT, 0):
+        monkeypatch.setattr(service, 'upload_memory_limit', limit)
+        response = client.post("/upload", content=multipart_body(large_pdf_data), headers=headers)
+        assert response.status_code == 200
+        reports.append(client.get(f"/report/{response.json()['report_id']}").json())
+    
+    assert sources[0] == large_pdf_data  # Past Starlette's 1MB spool size, still extracted from memory
+    assert Path(sources[1]).parent == temp_dir
+    assert list(temp_dir.iterdir()) == []
+    assert reports[0]['flags']
+    assert reports[0]['flags'] == reports[1]['flags']
+    
+    assert client.post("/upload", data={"context": "{}"}).status_code == 400
+    without_file = multipart_body(b"%PDF-1.4").replace(b'; filename="cd.pdf"', b"")
+    assert client.post("/upload", content=without_file, headers=headers).status_code == 422
+    as_field = multipart_body(large_pdf_data).replace(b'; filename="cd.pdf"', b"")
+    assert client.post("/upload", content=as_field, headers=headers).status_code == 400  # Past the field size limit
+    
+    monkeypatch.setattr(api.settings, 'max_file_size', len(large_pdf_data) - 1)
+    too_large = client.post("/upload", content=multipart_body(large_pdf_data), headers=headers)
+    assert too_large.status_code == 400
+    assert "exceeds maximum allowed size" in too_large.json()['detail']
+    assert list(temp_dir.iterdir()) == []
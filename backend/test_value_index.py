@@ -0,0 +1,92 @@
+"""Tests for the document value index and the label rules that read it."""
+
+import yaml
+
+from models.core import Rule
+from models.document import ValueIndex, ValueKind
+from rules.numeric_rules import NumericThresholdHandler
+from services.analysis import RuleEngineService
+
+
+SAMPLE_TEXT = """Closing Disclosure
+Loan Amount $450,000.00
+Interest Rate 7.25%
+Lender Credits -$1,250.00 (includes $50.00)
+Seller Credit ($2,000.00)
+Total Closing Costs: $25,000.00
+Closing Date 04/15/2024"""
+
+
+def test_values_are_tokenized_by_kind():
+    """Dollar amounts, percentages and other numbers are indexed in document order."""
+    index = ValueIndex(SAMPLE_TEXT)
+    entries = list(index)
+    
+    assert [(entry.value, entry.kind) for entry in entries[:2]] == [
+        (450000.0, ValueKind.AMOUNT), (7.25, ValueKind.PERCENT)
+    ]
+    assert entries[0].label == "Loan Amount"
+    assert entries[0].raw == "$450,000.00"
+    assert [entry.value for entry in index.find(kinds=[ValueKind.NUMBER])] == [4.0, 15.0, 2024.0]
+
+
+def test_negative_amounts():
+    """A leading minus sign or enclosing parentheses make an amount negative."""
+    amounts = [entry.value for entry in ValueIndex(SAMPLE_TEXT).find(kinds=[ValueKind.AMOUNT])]
+    assert amounts == [450000.0, -1250.0, 50.0, -2000.0, 25000.0]
+
+
+def test_values_record_their_page():
+    """Values get the 1-based page of the span they start in."""
+    text = "Loan Amount $100.00\nCash to Close $20.00"
+    index = ValueIndex(text, page_spans=[(0, 20), (20, len(text))])
+    assert [entry.page for entry in index] == [1, 2]
+    assert [entry.value for entry in index.on_page(2)] == [20.0]
+
+
+def test_value_after_a_label():
+    """The first value of the requested kind after the label, on its line and within reach."""
+    index = ValueIndex(SAMPLE_TEXT)
+    assert index.value_after("loan amount").value == 450000.0
+    assert index.value_after("Interest Rate", kinds=[ValueKind.PERCENT]).value == 7.25
+    assert index.value_after("Interest Rate") is None  # No amount on its line
+    assert index.value_after("Lender Credits", within=3).value == -1250.0
+    assert index.value_after("Lender Credits", within=0) is None
+    assert index.value_after("Escrow Waiver Fee") is None
+
+
+def test_label_rules_read_the_value_index():
+    """A rule with a label reads the value after it instead of scanning its pattern."""
+    handler = NumericThresholdHandler()
+    rule = Rule.from_dict({
+        'name': 'high_interest_rate',
+        'type': 'numeric_threshold',
+        'label': 'Interest Rate',
+        'value_type': 'percent',
+        'threshold': 7.0,
+        'operator': '>',
+        'message': 'High interest rate: {value}%'
+    })
+    flags = handler.process_rule(rule, SAMPLE_TEXT)
+    assert [flag.message for flag in flags] == ["High interest rate: 7.25%"]
+
+
+def test_label_rules_flag_like_their_legacy_pattern(write_rules):
+    """The configured label rules flag the same rules as the patterns kept for the legacy engine."""
+    with open("rules-config.yaml") as file:
+        config = yaml.safe_load(file)
+    labelled = [rule['name'] for rule in config['rules'] if rule.get('label') and rule.get('pattern')]
+    assert labelled
+    
+    pattern_only = dict(config)
+    pattern_only['rules'] = [
+        {key: value for key, value in rule.items() if key not in ('label', 'value_type', 'within')}
+        for rule in config['rules']
+    ]
+    pattern_config = write_rules(yaml.safe_dump(pattern_only, allow_unicode=True))
+    
+    text = SAMPLE_TEXT + "\nWire Transfer: $15,000.00\nTotal Interest Percentage (TIP) 135.5%"
+    label_flags = {flag.rule for flag in RuleEngineService("rules-config.yaml").analyze_text(text)}
+    pattern_flags = {flag.rule for flag in RuleEngineService(str(pattern_config)).analyze_text(text)}
+    assert {name for name in labelled if name in label_flags} == {name for name in labelled if name in pattern_flags}
+    assert "suspicious_wire_transfer" in label_flags
\ No newline at end of file